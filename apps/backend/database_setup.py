@@ -10,14 +10,14 @@ from pathlib import Path
 # Add the src directory to the Python path
 sys.path.append(str(Path(__file__).parent / "src"))
 
-from src.config.config_database import engine
+from src.config.config_database import init_engine
 from sqlalchemy import text
 
 def test_connection():
     """Test database connection and check table structure"""
     try:
         # Test connection
-        with engine.connect() as connection:
+        with init_engine().connect() as connection:
             print("✅ Database connection successful!")
             
             # Check if region_data table exists and has correct structure
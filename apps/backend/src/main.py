@@ -1,17 +1,102 @@
-from fastapi import FastAPI
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import ValidationError
 from fastapi.middleware.cors import CORSMiddleware
+from . import models
+from .config.config_database import SessionLocal, init_engine, prewarm_pool, dispose_engine
 from .routers.regions import router as regions_router
 from .routers.paths import router as paths_router
 from .routers.points import router as points_router
+from .routers.zones import router as zones_router
+from .routers.changes import router as changes_router
+from .routers.snapshot import router as snapshot_router
+from .routers.search import router as search_router
+from .routers.jobs import router as jobs_router
+from .routers.changesets import router as changesets_router
+from .schemas.change import ChangeSubscription
+from .services.change_feed import change_feed
+from .services.nearest_index import region_index
+from .services.snap_index import snap_index
+from .services.zone_stats import zone_stats_index
+from .services.path_raster import path_raster_index
+from .services.path_network import path_network_index
+from .services.search_index import search_index
+from .services.readiness import readiness
+from .services.admission import render_metrics
+from .services.single_flight import SingleFlightMiddleware, single_flight
+from .services.world_snapshot import snapshot_store, PROCESS_STARTED_AT
+from .services.region_membership import membership_store
+from .services.jobs import job_runner
+from .services.geometry_pool import geometry_pool
+
+def _load_models() -> None:
+    # First access imports geoalchemy2 and maps the tables
+    models.Region, models.Path
+
+def _prewarm_database() -> None:
+    init_engine()
+    prewarm_pool()
+
+def _build_world_snapshot() -> None:
+    db = SessionLocal()
+    try:
+        snapshot_store.rebuild(db, unless_built_after=PROCESS_STARTED_AT)
+    finally:
+        db.close()
+
+def _index_loader(index):
+    def load() -> None:
+        db = SessionLocal()
+        try:
+            index.ensure_loaded(db)
+        finally:
+            db.close()
+    return load
+
+# Everything a worker needs before /api/ready reports it can take traffic.
+# Indexes are built from the world snapshot, so it comes first.
+WARMUP_STEPS = [
+    ("models", _load_models),
+    ("database", _prewarm_database),
+    ("world_snapshot", _build_world_snapshot),
+    ("nearest_index", _index_loader(region_index)),
+    ("snap_index", _index_loader(snap_index)),
+    ("zone_stats", _index_loader(zone_stats_index)),
+    ("path_raster", _index_loader(path_raster_index)),
+    ("path_network", _index_loader(path_network_index)),
+    ("search_index", _index_loader(search_index)),
+    ("region_membership", membership_store.ensure_current),
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up in the background so liveness checks answer while the worker is cold"""
+    stop = threading.Event()
+    threading.Thread(target=readiness.run, args=(WARMUP_STEPS, stop), name="warmup", daemon=True).start()
+    yield
+    stop.set()
+    job_runner.shutdown()
+    geometry_pool.shutdown()
+    snapshot_store.flush()
+    dispose_engine()
 
 app = FastAPI(
     title="Wildeditor Backend API",
     description="Backend API for the Luminari Wilderness Editor",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
+# Coalesce identical concurrent reads; added first so CORS wraps it and
+# still answers each request for its own origin
+app.add_middleware(SingleFlightMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +110,12 @@ app.add_middleware(
 app.include_router(regions_router, prefix="/api/regions", tags=["Regions"])
 app.include_router(paths_router, prefix="/api/paths", tags=["Paths"])
 app.include_router(points_router, prefix="/api/points", tags=["Points"])
+app.include_router(zones_router, prefix="/api/zones", tags=["Zones"])
+app.include_router(changes_router, prefix="/api/changes", tags=["Changes"])
+app.include_router(snapshot_router, prefix="/api/snapshot", tags=["Snapshot"])
+app.include_router(search_router, prefix="/api/search", tags=["Search"])
+app.include_router(jobs_router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(changesets_router, prefix="/api/changesets", tags=["Changesets"])
 
 @app.get("/api/health")
 def health_check():
@@ -35,6 +126,80 @@ def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/api/ready")
+def readiness_check():
+    """
+    Readiness probe for load balancers and rolling restarts.
+    
+    Returns 503 until the connection pool is pre-warmed and the in-memory
+    indexes are loaded, so cold workers are not sent full-world requests.
+    """
+    state = readiness.status()
+    return JSONResponse(state, status_code=200 if readiness.ready else 503)
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus metrics for this worker.
+    
+    Reports admission control per cost class: slots and queue limits, running
+    and queued requests, and how many were admitted or rejected with 503.
+    Also reports how many GET requests shared another request's response.
+    """
+    return render_metrics() + single_flight.render_metrics()
+
+async def _forward_changes(websocket: WebSocket, subscriber) -> None:
+    while True:
+        await websocket.send_text(await subscriber.queue.get())
+
+@app.websocket("/api/ws/changes")
+async def changes_websocket(websocket: WebSocket):
+    """
+    Live feed of region and path changes for collaborative editing.
+    
+    After connecting, the client sends {"type": "subscribe", "bbox": {...}, "zone_vnum": n}
+    and re-sends it whenever its viewport changes. The server then pushes
+    {"type": "change", "kind", "action", "vnum", "feature"} for every committed
+    write whose geometry (before or after the write) intersects that viewport.
+    A {"type": "resync"} message means events were dropped and the client
+    should refetch its view.
+    """
+    await websocket.accept()
+    subscriber = change_feed.register(asyncio.get_running_loop())
+    forwarder = asyncio.create_task(_forward_changes(websocket, subscriber))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            # Malformed messages are answered with an error; the connection stays open
+            try:
+                data = json.loads(message.get("text") or message.get("bytes") or "")
+            except ValueError as e:
+                subscriber.send(json.dumps({"type": "error", "detail": f"Invalid JSON: {e}"}))
+                continue
+            if not isinstance(data, dict):
+                subscriber.send(json.dumps({"type": "error", "detail": "Expected a JSON object"}))
+                continue
+            try:
+                subscription = ChangeSubscription(**data)
+            except (ValidationError, TypeError) as e:
+                subscriber.send(json.dumps({"type": "error", "detail": str(e)}))
+                continue
+            
+            bbox = subscription.bbox
+            change_feed.update(
+                subscriber,
+                (bbox.min_x, bbox.min_y, bbox.max_x, bbox.max_y) if bbox else None,
+                subscription.zone_vnum
+            )
+            subscriber.send(json.dumps({"type": "subscribed", **subscription.dict(exclude={"type"})}))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        change_feed.unregister(subscriber)
+        forwarder.cancel()
+
 @app.get("/")
 def root():
     """Root endpoint"""
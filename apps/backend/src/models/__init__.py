@@ -0,0 +1,15 @@
+"""
+SQLAlchemy models for region_data and path_data.
+
+The models depend on geoalchemy2, which is slow to import, so they are
+loaded on first access (models.Region, models.Path) instead of when the
+routers are imported. The app's lifespan hook touches them during warm-up.
+"""
+import importlib
+
+_MODEL_MODULES = {"Region": ".region", "Path": ".path"}
+
+def __getattr__(name):
+    if name in _MODEL_MODULES:
+        return getattr(importlib.import_module(_MODEL_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
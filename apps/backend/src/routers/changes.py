@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from .. import models
+from .regions import region_to_response
+from .paths import path_to_response
+from ..services import feature_events
+from ..services.change_log import current_token, changes_since, parse_token
+from ..services.admission import admission, FULL_LIST
+from ..config.config_database import get_db
+
+router = APIRouter()
+
+@router.get("/", response_model=dict, dependencies=[admission(FULL_LIST)])
+def get_changes(
+    since: Optional[str] = Query(None, description="Token from a previous response; omit to get a starting token"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the regions and paths changed since a token.
+    
+    Lets reconnecting editors and the MUD reload job catch up without
+    refetching the world. Every region/path write appends to a change log in
+    the same transaction; this endpoint collapses the log after `since` to
+    the latest state of each feature: full objects (with geometry) for
+    upserts, vnums for deletes.
+    
+    Without `since`, only a starting token is returned: take it, fetch the
+    full lists, then poll with it. Keep polling while `has_more` is true.
+    A change may be delivered twice around a token boundary; applying it
+    again is harmless.
+    """
+    try:
+        if since is None:
+            return {
+                "token": current_token(db),
+                "has_more": False,
+                "regions": {"upserted": [], "deleted": []},
+                "paths": {"upserted": [], "deleted": []}
+            }
+        
+        try:
+            since_id = parse_token(since)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        token, has_more, changes = changes_since(db, since_id)
+        region_changes = changes[feature_events.FEATURE_REGION]
+        path_changes = changes[feature_events.FEATURE_PATH]
+        
+        regions = []
+        if region_changes["upserted"]:
+            rows = db.query(models.Region).filter(models.Region.vnum.in_(region_changes["upserted"])).order_by(models.Region.vnum).all()
+            regions = [region_to_response(region, db) for region in rows]
+        paths = []
+        if path_changes["upserted"]:
+            rows = db.query(models.Path).filter(models.Path.vnum.in_(path_changes["upserted"])).order_by(models.Path.vnum).all()
+            paths = [path_to_response(path, db) for path in rows]
+        
+        # Upserted in this page but deleted by a later write
+        region_deleted = sorted(set(region_changes["deleted"]) | (set(region_changes["upserted"]) - {r.vnum for r in regions}))
+        path_deleted = sorted(set(path_changes["deleted"]) | (set(path_changes["upserted"]) - {p.vnum for p in paths}))
+        
+        return {
+            "token": token,
+            "has_more": has_more,
+            "regions": {"upserted": regions, "deleted": region_deleted},
+            "paths": {"upserted": paths, "deleted": path_deleted}
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving changes: {str(e)}"
+        )
@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..schemas.changeset import ChangesetRequest, ChangesetResponse
+from ..services.changesets import apply_changeset, CONCURRENCY_FAILURES, STATUS_APPLIED
+from ..services.admission import admission, BULK_WRITE
+from ..config.config_database import get_db
+
+router = APIRouter()
+
+@router.post("/", response_model=ChangesetResponse, dependencies=[admission(BULK_WRITE)])
+def commit_changeset(changeset: ChangesetRequest, db: Session = Depends(get_db)):
+    """
+    Commit the staged edits of an editing session in one transaction.
+    
+    Operations (region and path creates, updates and deletes) are applied in
+    order, so later operations see the result of earlier ones. Either all of
+    them are committed or none are. Updates and deletes carrying a
+    base_version are checked against the stored geometry_version, like
+    PATCH, and the touched rows stay locked until the commit.
+    
+    Returns 200 with a result per operation when the changeset is
+    committed. Otherwise nothing is written and the same body comes back
+    with the failing operation marked: 409 Conflict when another session's
+    writes are the cause (stale base_version, feature deleted or created
+    meanwhile), 400 when the changeset itself is invalid.
+    """
+    try:
+        committed, results = apply_changeset(db, changeset.operations)
+        response = ChangesetResponse(
+            committed=committed,
+            applied=sum(1 for result in results if result["status"] == STATUS_APPLIED),
+            results=results
+        )
+        if committed:
+            return response
+        
+        conflict = any(result["status"] in CONCURRENCY_FAILURES for result in results)
+        return JSONResponse(
+            response.dict(),
+            status_code=status.HTTP_409_CONFLICT if conflict else status.HTTP_400_BAD_REQUEST
+        )
+        
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Changeset conflicts with a concurrent write; reload and retry"
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error committing changeset: {str(e)}"
+        )
@@ -0,0 +1,144 @@
+import os
+from fastapi import APIRouter, HTTPException, Path, Query, status
+from fastapi.responses import FileResponse
+from typing import List
+from ..schemas.job import JobCreate, JobResponse
+from ..services.jobs import job_runner, JOB_TYPES, JOB_SUCCEEDED, FINISHED_STATES, JobQueueFull
+from ..services.admission import admission, BULK_WRITE, CHEAP_READ
+
+router = APIRouter()
+
+# Seconds a client should wait before submitting again when the job queue is full
+JOB_QUEUE_RETRY_AFTER = 30
+
+def _get_job_or_404(job_id: int) -> dict:
+    job = job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with id {job_id} not found"
+        )
+    return job
+
+@router.get("/types", response_model=dict)
+def get_job_types():
+    """List the job types that can be started, with their result content type"""
+    return {
+        name: {"content_type": job.content_type, "extension": job.extension, "description": job.description}
+        for name, job in JOB_TYPES.items()
+    }
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED, dependencies=[admission(BULK_WRITE)])
+def create_job(job: JobCreate):
+    """
+    Start a background job.
+    
+    Returns at once with the queued job; poll GET /api/jobs/{job_id} for
+    progress. The job runs on the worker that accepted it, independent of
+    this request, so it keeps going if the client disconnects and is not
+    limited by proxy timeouts. Returns 503 with Retry-After when the worker
+    already has a full job queue.
+    """
+    try:
+        return job_runner.submit(job.job_type, job.params)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Job queue is full ({str(e)}), retry shortly",
+            headers={"Retry-After": str(JOB_QUEUE_RETRY_AFTER)}
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error starting job: {str(e)}"
+        )
+
+@router.get("/", response_model=List[JobResponse], dependencies=[admission(CHEAP_READ)])
+def get_jobs(limit: int = Query(50, ge=1, le=500, description="Number of most recent jobs to return")):
+    """List the most recent jobs, newest first"""
+    try:
+        return job_runner.store.list(limit)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving jobs: {str(e)}"
+        )
+
+@router.get("/{job_id}", response_model=JobResponse, dependencies=[admission(CHEAP_READ)])
+def get_job(job_id: int = Path(..., description="Job ID")):
+    """Get a job's status and progress"""
+    try:
+        return _get_job_or_404(job_id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving job: {str(e)}"
+        )
+
+@router.post("/{job_id}/cancel", response_model=JobResponse, dependencies=[admission(BULK_WRITE)])
+def cancel_job(job_id: int = Path(..., description="Job ID")):
+    """
+    Cancel a job.
+    
+    A queued job is cancelled at once. A running job stops at its next
+    progress report, so its status changes to cancelled shortly after.
+    Returns 409 if the job has already finished.
+    """
+    try:
+        job = _get_job_or_404(job_id)
+        if job["status"] in FINISHED_STATES:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job {job_id} has already {job['status']}"
+            )
+        job_runner.store.request_cancel(job_id)
+        return _get_job_or_404(job_id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error cancelling job: {str(e)}"
+        )
+
+@router.get("/{job_id}/result", dependencies=[admission(CHEAP_READ)])
+def get_job_result(job_id: int = Path(..., description="Job ID")):
+    """
+    Download a succeeded job's result.
+    
+    The file is streamed in chunks and supports Range requests, so large
+    exports can be resumed. Returns 409 until the job has succeeded and 410
+    once the result has been cleaned up (results are kept for a day).
+    """
+    try:
+        job = _get_job_or_404(job_id)
+        if job["status"] != JOB_SUCCEEDED:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job {job_id} is {job['status']}; a result is only available once it has succeeded"
+            )
+        path = job_runner.result_path(job_id)
+        if not os.path.exists(path):
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail=f"Result of job {job_id} is no longer available"
+            )
+        job_type = JOB_TYPES[job["job_type"]]
+        return FileResponse(path, media_type=job_type.content_type,
+                            filename=f"{job['job_type']}-{job_id}.{job_type.extension}")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving job result: {str(e)}"
+        )
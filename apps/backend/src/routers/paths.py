@@ -1,74 +1,94 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import text
 from sqlalchemy.engine import Result
 from typing import List, Optional, Any
 from datetime import datetime
-from ..models.path import Path
+from .. import models
 from ..schemas.path import (
     PathCreate, PathResponse, PathUpdate, get_path_type_name,
     PATH_TYPES, PATH_ROAD, PATH_DIRT_ROAD, PATH_GEOGRAPHIC, PATH_RIVER, PATH_STREAM,
     PATH_SECTOR_MAPPING 
 )
+from ..schemas.region import get_sector_type_name
+from ..schemas.common import GeometryPatch, GeometryPatchAck
+from ..services.wkt import coordinates_to_linestring_wkt, linestring_wkt_to_coordinates
+from ..services.vertex_patch import apply_vertex_operations, geometry_version
+from ..services.feature_filters import apply_feature_filters
+from ..services.sparse_fields import fields_parameter, needs_geometry, sparse_response
+from ..services.coordinate_encoding import (
+    COORDINATE_FORMAT_DICT, encode_coordinates, get_coordinate_format
+)
+from ..services.geometry_codec import DEFAULT_GRID, MAX_GRID
+from ..services import feature_events
+from ..services.change_log import record_change
+from ..services.revision_history import (
+    DEFAULT_HISTORY_LIMIT, MAX_HISTORY_LIMIT, feature_at_revision, feature_history, record_revision
+)
+from ..services.path_raster import path_raster_index
+from ..services.path_network import path_network_index, DEFAULT_SNAP_DISTANCE, MAX_SNAP_DISTANCE
+from ..services.admission import admission, BULK_WRITE, CHEAP_READ, FULL_LIST
 from ..config.config_database import get_db
 
 router = APIRouter()
 
-def coordinates_to_linestring_wkt(coordinates: List[dict]) -> str:
-    """
-    Convert coordinate list to MySQL LINESTRING WKT format.
-    
-    Args:
-        coordinates: List of coordinate dictionaries with 'x' and 'y' keys
-        
-    Returns:
-        WKT string in format: LINESTRING(x1 y1, x2 y2, ...)
-    """
-    if not coordinates or len(coordinates) < 2:
-        raise ValueError("Path must have at least 2 coordinate points")
-    
-    points = [f"{coord['x']} {coord['y']}" for coord in coordinates]
-    return f"LINESTRING({', '.join(points)})"
+# Parses the fields= parameter of the list and single-path endpoints
+get_path_fields = fields_parameter(PathResponse)
+
+def path_coordinates(path: "models.Path", db: Session) -> List[dict]:
+    """Read a Path row's linestring as coordinates via WKT"""
+    # Convert MySQL LINESTRING to coordinates
+    coordinates = []
+    if path.path_linestring:
+        # Use ST_AsText to get WKT format
+        result = db.execute(text("SELECT ST_AsText(:linestring)"), {"linestring": path.path_linestring}).fetchone()
+        if result:
+            coordinates = linestring_wkt_to_coordinates(result[0])
+    return coordinates
 
-def linestring_wkt_to_coordinates(wkt: str) -> List[dict]:
+def path_to_dict(path: "models.Path", db: Session, geometry: bool = True) -> dict:
     """
-    Convert MySQL LINESTRING WKT format to coordinate list.
+    Response fields of a Path row.
     
-    Args:
-        wkt: WKT string in format LINESTRING(x1 y1, x2 y2, ...)
-        
-    Returns:
-        List of coordinate dictionaries with 'x' and 'y' keys
+    With geometry=False the linestring is never read or decoded, so the
+    column can be deferred; coordinates and geometry_version are left out.
     """
-    if not wkt:
-        return []
-    
-    try:
-        # Remove LINESTRING( and )
-        coords_str = wkt.replace("LINESTRING(", "").replace(")", "")
-        point_pairs = coords_str.split(", ")
-        
-        coordinates = []
-        for pair in point_pairs:
-            if pair.strip():
-                parts = pair.strip().split()
-                if len(parts) >= 2:
-                    x, y = float(parts[0]), float(parts[1])
-                    coordinates.append({"x": x, "y": y})
-        
-        return coordinates
-    except Exception as e:
-        print(f"Error parsing LINESTRING WKT: {e}, WKT: {wkt}")
-        return []
+    path_dict = {
+        "vnum": path.vnum,
+        "zone_vnum": path.zone_vnum,
+        "name": path.name,
+        "path_type": path.path_type,
+        "path_props": path.path_props,
+        "path_type_name": get_path_type_name(path.path_type)
+    }
+    if geometry:
+        coordinates = path_coordinates(path, db)
+        path_dict["coordinates"] = coordinates
+        path_dict["geometry_version"] = geometry_version(coordinates)
+    return path_dict
+
+def path_to_response(path: "models.Path", db: Session) -> PathResponse:
+    """Convert a Path row to its API response, reading the linestring as WKT"""
+    return PathResponse(**path_to_dict(path, db))
 
-@router.get("/", response_model=List[PathResponse])
+@router.get("/", response_model=List[PathResponse], dependencies=[admission(FULL_LIST)])
 def get_paths(
-    path_type: Optional[int] = Query(None, description="Filter by path type (1=Road, 2=Dirt Road, 3=Geographic, 5=River, 6=Stream)"),
-    zone_vnum: Optional[int] = Query(None, description="Filter by zone vnum"),
+    path_type: Optional[List[int]] = Query(None, description="Filter by path type (1=Road, 2=Dirt Road, 3=Geographic, 5=River, 6=Stream); repeat for several"),
+    zone_vnum: Optional[List[int]] = Query(None, description="Filter by zone vnum; repeat for several"),
+    path_props: Optional[List[int]] = Query(None, description="Filter by path_props value; repeat for several"),
+    vnum_min: Optional[int] = Query(None, description="Lowest vnum to return"),
+    vnum_max: Optional[int] = Query(None, description="Highest vnum to return"),
+    has_geometry: Optional[bool] = Query(None, description="Only paths with (true) or without (false) stored geometry"),
+    coordinate_format: str = Depends(get_coordinate_format),
+    grid: int = Query(DEFAULT_GRID, ge=1, le=MAX_GRID, description="Quantization steps per map unit for binary responses"),
+    fields: Optional[List[str]] = Depends(get_path_fields),
     db: Session = Depends(get_db)
 ):
     """
-    Get all paths, optionally filtered by type or zone.
+    Get all paths in vnum order, optionally filtered.
+    
+    Type, zone and props filters accept several values (repeat the parameter);
+    all filters combine with AND and run as indexed SQL.
     
     Paths are linear features that override terrain and provide navigation routes:
     
@@ -84,37 +104,28 @@ def get_paths(
     **Visual System**: Paths use orientation-based glyphs (NS, EW, Intersection) for wilderness map display.
     """
     try:
-        query = db.query(Path)
-        if path_type:
-            query = query.filter(Path.path_type == path_type)
-        if zone_vnum:
-            query = query.filter(Path.zone_vnum == zone_vnum)
+        query = db.query(models.Path)
+        if not needs_geometry(fields):
+            # Listing without geometry never transfers or decodes it
+            query = query.options(defer(models.Path.path_linestring))
+        query = apply_feature_filters(query, models.Path, feature_events.FEATURE_PATH,
+                                      types=path_type, zones=zone_vnum, props=path_props,
+                                      vnum_min=vnum_min, vnum_max=vnum_max, has_geometry=has_geometry)
         
         paths = query.all()
         
+        if fields is not None:
+            items = [path_to_dict(path, db, geometry=needs_geometry(fields)) for path in paths]
+            by_vnum = {path.vnum: path for path in paths}
+            return sparse_response(feature_events.FEATURE_PATH, items, fields, coordinate_format,
+                                   lambda vnum: path_coordinates(by_vnum[vnum], db))
+        
         # Convert to response format
-        response_paths = []
-        for path in paths:
-            # Convert MySQL LINESTRING to coordinates
-            coordinates = []
-            if path.path_linestring:
-                # Use ST_AsText to get WKT format
-                result = db.execute(text("SELECT ST_AsText(:linestring)"), {"linestring": path.path_linestring}).fetchone()
-                if result:
-                    coordinates = linestring_wkt_to_coordinates(result[0])
-            
-            path_dict = {
-                "vnum": path.vnum,
-                "zone_vnum": path.zone_vnum,
-                "name": path.name,
-                "path_type": path.path_type,
-                "coordinates": coordinates,
-                "path_props": path.path_props,
-                "path_type_name": get_path_type_name(path.path_type)
-            }
-            response_paths.append(PathResponse(**path_dict))
+        response_paths = [path_to_response(path, db) for path in paths]
         
-        return response_paths
+        return encode_coordinates(response_paths, feature_events.FEATURE_PATH, coordinate_format, grid=grid)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -199,42 +210,165 @@ def get_path_types():
         }
     }
 
-@router.get("/{vnum}", response_model=PathResponse)
-def get_path(vnum: int, db: Session = Depends(get_db)):
+@router.get("/raster", response_model=dict, dependencies=[admission(FULL_LIST)])
+def get_path_raster(
+    min_x: Optional[int] = Query(None, description="Minimum X coordinate of the cells to return"),
+    min_y: Optional[int] = Query(None, description="Minimum Y coordinate of the cells to return"),
+    max_x: Optional[int] = Query(None, description="Maximum X coordinate of the cells to return"),
+    max_y: Optional[int] = Query(None, description="Maximum Y coordinate of the cells to return"),
+    path_vnum: Optional[int] = Query(None, description="Only return the cells of this path"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get the wilderness cells paths occupy and the sector each cell receives.
+    
+    Every cell a path's linestring passes through is included (supercover
+    traversal). Roads and dirt roads pick their north-south, east-west or
+    intersection sector (11/12/13, 26/27/28) from the path's local direction
+    and from crossings with other road paths; other paths keep their
+    path_props sector. Where paths overlap, the highest vnum wins, as in the
+    game. Use the bounding box for previews and omit it to export everything.
+    Answered from a per-path cache built from the shared world snapshot; it
+    follows new snapshot generations, so writes made through any worker show up.
+    """
+    try:
+        path_raster_index.ensure_loaded(db)
+        cells = path_raster_index.cells(min_x, min_y, max_x, max_y, path_vnum)
+        for cell in cells:
+            cell["sector_type_name"] = get_sector_type_name(cell["sector"]) if cell["sector"] is not None else None
+        
+        return {"count": len(cells), "cells": cells}
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error rasterizing paths: {str(e)}"
+        )
+
+@router.get("/network", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_path_network(db: Session = Depends(get_db)):
+    """
+    Summarize the road and river networks.
+    
+    Roads and dirt roads form the road network; rivers and streams form the
+    river network. Nodes are path endpoints and the points where paths of the
+    same network cross or touch. More than one component means some paths
+    are not connected to the rest.
+    """
+    try:
+        path_network_index.ensure_loaded(db)
+        return path_network_index.stats()
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reading path network: {str(e)}"
+        )
+
+@router.get("/network/route", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_network_route(
+    start_x: float = Query(..., description="X coordinate to travel from"),
+    start_y: float = Query(..., description="Y coordinate to travel from"),
+    goal_x: float = Query(..., description="X coordinate to travel to"),
+    goal_y: float = Query(..., description="Y coordinate to travel to"),
+    network: str = Query("road", pattern="^(road|river)$", description="Network to travel along"),
+    max_snap_distance: float = Query(DEFAULT_SNAP_DISTANCE, gt=0, le=MAX_SNAP_DISTANCE, description="How far the start and goal may be from the network"),
+    db: Session = Depends(get_db)
+):
+    """
+    Find the shortest route along the road or river network between two points.
+    
+    The start and goal are snapped to the nearest point of the network within
+    max_snap_distance. The response lists the paths travelled in order and the
+    route's coordinates; `connected` is false when no route exists. Answered
+    with A* over an in-memory graph that follows new world snapshot
+    generations, so writes made through any worker show up.
+    """
+    try:
+        path_network_index.ensure_loaded(db)
+        return path_network_index.route(network, start_x, start_y, goal_x, goal_y, max_snap_distance)
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error routing along path network: {str(e)}"
+        )
+
+@router.get("/{vnum}", response_model=PathResponse, dependencies=[admission(CHEAP_READ)])
+def get_path(
+    vnum: int,
+    db: Session = Depends(get_db),
+    coordinate_format: str = Depends(get_coordinate_format),
+    grid: int = Query(DEFAULT_GRID, ge=1, le=MAX_GRID, description="Quantization steps per map unit for binary responses"),
+    fields: Optional[List[str]] = Depends(get_path_fields)
+):
     """
     Get a specific path by vnum.
     
     Args:
         vnum: Unique path identifier (primary key)
     """
-    path = db.query(Path).filter(Path.vnum == vnum).first()
+    query = db.query(models.Path).filter(models.Path.vnum == vnum)
+    if not needs_geometry(fields):
+        query = query.options(defer(models.Path.path_linestring))
+    path = query.first()
     if not path:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Path with vnum {vnum} not found"
         )
     
-    # Convert MySQL LINESTRING to coordinates
-    coordinates = []
-    if path.path_linestring:
-        result = db.execute(text("SELECT ST_AsText(:linestring)"), {"linestring": path.path_linestring}).fetchone()
-        if result:
-            coordinates = linestring_wkt_to_coordinates(result[0])
+    if fields is not None:
+        return sparse_response(feature_events.FEATURE_PATH, path_to_dict(path, db, geometry=needs_geometry(fields)),
+                               fields, coordinate_format, lambda _: path_coordinates(path, db))
     
-    path_dict = {
-        "vnum": path.vnum,
-        "zone_vnum": path.zone_vnum,
-        "name": path.name,
-        "path_type": path.path_type,
-        "coordinates": coordinates,
-        "path_props": path.path_props,
-        "path_type_name": get_path_type_name(path.path_type)
-    }
+    return encode_coordinates(path_to_response(path, db), feature_events.FEATURE_PATH, coordinate_format, grid=grid)
+
+@router.get("/{vnum}/history", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_path_history(
+    vnum: int,
+    before: Optional[int] = Query(None, ge=1, description="Only revisions older than this (next_before of the previous page)"),
+    limit: int = Query(DEFAULT_HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT, description="Revisions per page"),
+    include_features: bool = Query(False, description="Include the full path as of each revision"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a path's revision history, newest first.
     
-    return PathResponse(**path_dict)
+    Each revision lists the changed fields and how many vertices were inserted
+    and deleted. History is kept for deleted paths as well.
+    """
+    try:
+        return feature_history(db, feature_events.FEATURE_PATH, vnum, before, limit, include_features)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving path history: {str(e)}"
+        )
+
+@router.get("/{vnum}/history/{revision}", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_path_revision(vnum: int, revision: int, db: Session = Depends(get_db)):
+    """Get one revision of a path, with the path as it was after that revision"""
+    try:
+        entry = feature_at_revision(db, feature_events.FEATURE_PATH, vnum, revision)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving path revision: {str(e)}"
+        )
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Path {vnum} has no revision {revision}"
+        )
+    return entry
 
-@router.post("/", response_model=PathResponse, status_code=status.HTTP_201_CREATED)
-def create_path(path: PathCreate, db: Session = Depends(get_db)):
+@router.post("/", response_model=PathResponse, status_code=status.HTTP_201_CREATED, dependencies=[admission(BULK_WRITE)])
+def create_path(
+    path: PathCreate,
+    db: Session = Depends(get_db),
+    coordinate_format: str = Depends(get_coordinate_format)
+):
     """
     Create a new path.
     
@@ -266,7 +400,7 @@ def create_path(path: PathCreate, db: Session = Depends(get_db)):
     """
     try:
         # Check if vnum already exists
-        existing_path = db.query(Path).filter(Path.vnum == path.vnum).first()
+        existing_path = db.query(models.Path).filter(models.Path.vnum == path.vnum).first()
         if existing_path:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -289,10 +423,14 @@ def create_path(path: PathCreate, db: Session = Depends(get_db)):
             "path_props": path.path_props
         })
         
+        record_revision(db, feature_events.FEATURE_PATH, path.vnum)
+        record_change(db, feature_events.FEATURE_PATH, feature_events.ACTION_UPSERT, path.vnum)
         db.commit()
         
         # Return the created path
-        return get_path(path.vnum, db)
+        created = get_path(path.vnum, db, COORDINATE_FORMAT_DICT, DEFAULT_GRID, None)
+        feature_events.publish(feature_events.FEATURE_PATH, feature_events.ACTION_UPSERT, created.vnum, created.dict())
+        return encode_coordinates(created, feature_events.FEATURE_PATH, coordinate_format, status.HTTP_201_CREATED)
         
     except HTTPException:
         raise
@@ -303,8 +441,13 @@ def create_path(path: PathCreate, db: Session = Depends(get_db)):
             detail=f"Error creating path: {str(e)}"
         )
 
-@router.put("/{vnum}", response_model=PathResponse)
-def update_path(vnum: int, path_update: PathUpdate, db: Session = Depends(get_db)):
+@router.put("/{vnum}", response_model=PathResponse, dependencies=[admission(BULK_WRITE)])
+def update_path(
+    vnum: int,
+    path_update: PathUpdate,
+    db: Session = Depends(get_db),
+    coordinate_format: str = Depends(get_coordinate_format)
+):
     """
     Update an existing path.
     
@@ -313,7 +456,7 @@ def update_path(vnum: int, path_update: PathUpdate, db: Session = Depends(get_db
     """
     try:
         # Check if path exists
-        existing_path = db.query(Path).filter(Path.vnum == vnum).first()
+        existing_path = db.query(models.Path).filter(models.Path.vnum == vnum).first()
         if not existing_path:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -350,10 +493,14 @@ def update_path(vnum: int, path_update: PathUpdate, db: Session = Depends(get_db
                 query = f"UPDATE path_data SET {', '.join(query_parts)} WHERE vnum = :vnum"  # nosec B608
                 db.execute(text(query), params)
         
+        record_revision(db, feature_events.FEATURE_PATH, vnum)
+        record_change(db, feature_events.FEATURE_PATH, feature_events.ACTION_UPSERT, vnum)
         db.commit()
         
         # Return updated path
-        return get_path(vnum, db)
+        updated = get_path(vnum, db, COORDINATE_FORMAT_DICT, DEFAULT_GRID, None)
+        feature_events.publish(feature_events.FEATURE_PATH, feature_events.ACTION_UPSERT, vnum, updated.dict())
+        return encode_coordinates(updated, feature_events.FEATURE_PATH, coordinate_format)
         
     except HTTPException:
         raise
@@ -364,7 +511,77 @@ def update_path(vnum: int, path_update: PathUpdate, db: Session = Depends(get_db
             detail=f"Error updating path: {str(e)}"
         )
 
-@router.delete("/{vnum}", status_code=status.HTTP_204_NO_CONTENT)
+@router.patch("/{vnum}", response_model=GeometryPatchAck, dependencies=[admission(BULK_WRITE)])
+def patch_path_geometry(vnum: int, patch: GeometryPatch, db: Session = Depends(get_db)):
+    """
+    Apply vertex-level edits to a path linestring.
+    
+    The request carries only the changed vertices (insert/move/delete at an index)
+    and the geometry_version the editor last saw, so dragging one vertex of a long
+    river does not resend the whole linestring. Stale versions are rejected with
+    409 Conflict; the row stays locked from the version check to the commit, so
+    of two patches against the same version the second always gets the 409.
+    
+    Each patch still reads and rewrites the whole linestring, so its server cost
+    is O(n) in the vertex count.
+    
+    Returns a small acknowledgment with the new geometry_version.
+    """
+    try:
+        path = db.query(models.Path).filter(models.Path.vnum == vnum).with_for_update().first()
+        if not path:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Path with vnum {vnum} not found"
+            )
+        
+        coordinates = []
+        if path.path_linestring:
+            result = db.execute(text("SELECT ST_AsText(:linestring)"), {"linestring": path.path_linestring}).fetchone()
+            if result:
+                coordinates = linestring_wkt_to_coordinates(result[0])
+        
+        if geometry_version(coordinates) != patch.base_version:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Path {vnum} geometry has changed since version {patch.base_version}"
+            )
+        
+        try:
+            coordinates = apply_vertex_operations(coordinates, patch.operations)
+            linestring_wkt = coordinates_to_linestring_wkt(coordinates)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        feature = {
+            "vnum": vnum,
+            "zone_vnum": path.zone_vnum,
+            "name": path.name,
+            "path_type": path.path_type,
+            "path_props": path.path_props,
+            "coordinates": coordinates
+        }
+        db.execute(
+            text("UPDATE path_data SET path_linestring = ST_GeomFromText(:linestring) WHERE vnum = :vnum"),
+            {"vnum": vnum, "linestring": linestring_wkt}
+        )
+        record_revision(db, feature_events.FEATURE_PATH, vnum)
+        record_change(db, feature_events.FEATURE_PATH, feature_events.ACTION_UPSERT, vnum)
+        db.commit()
+        feature_events.publish(feature_events.FEATURE_PATH, feature_events.ACTION_UPSERT, vnum, feature)
+        
+        return GeometryPatchAck(vnum=vnum, version=geometry_version(coordinates), vertex_count=len(coordinates))
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error patching path: {str(e)}"
+        )
+
+@router.delete("/{vnum}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[admission(BULK_WRITE)])
 def delete_path(vnum: int, db: Session = Depends(get_db)):
     """
     Delete a path.
@@ -373,6 +590,9 @@ def delete_path(vnum: int, db: Session = Depends(get_db)):
     Any references to this path in the game world will need to be updated separately.
     """
     try:
+        # Capture the last stored state for change listeners (404s if missing)
+        deleted = get_path(vnum, db, COORDINATE_FORMAT_DICT, DEFAULT_GRID, None)
+        
         result = db.execute(text("DELETE FROM path_data WHERE vnum = :vnum"), {"vnum": vnum})
         
         # Check if any rows were affected using hasattr to avoid mypy issues
@@ -382,7 +602,10 @@ def delete_path(vnum: int, db: Session = Depends(get_db)):
                 detail=f"Path with vnum {vnum} not found"
             )
         
+        record_revision(db, feature_events.FEATURE_PATH, vnum)
+        record_change(db, feature_events.FEATURE_PATH, feature_events.ACTION_DELETE, vnum)
         db.commit()
+        feature_events.publish(feature_events.FEATURE_PATH, feature_events.ACTION_DELETE, vnum, deleted.dict())
         return None
         
     except HTTPException:
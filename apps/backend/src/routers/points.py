@@ -2,14 +2,22 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import List, Optional
-from ..models.region import Region
-from ..models.path import Path
+import numpy as np
+from .. import models
 from ..schemas.region import get_region_type_name, get_sector_type_name, REGION_SECTOR
+from ..schemas.path import get_path_type_name
+from ..schemas.point import PointBatchRequest
+from ..services.nearest_index import region_index
+from ..services.snap_index import snap_index, MAX_TOLERANCE
+from ..services.spatial import (
+    wkt_to_rings, bounding_box, envelope_wkt, points_near_polygon, points_near_segments
+)
+from ..services.admission import admission, CHEAP_READ, FULL_LIST
 from ..config.config_database import get_db
 
 router = APIRouter()
 
-@router.get("/", response_model=dict)
+@router.get("/", response_model=dict, dependencies=[admission(CHEAP_READ)])
 def get_point_info(
     x: float = Query(..., description="X coordinate"), 
     y: float = Query(..., description="Y coordinate"),
@@ -56,7 +64,7 @@ def get_point_info(
         
         # Find paths that pass through or near this point
         # Note: This is a simplified check - you may want to enhance with proper line-to-point distance
-        paths = db.query(Path).all()
+        paths = db.query(models.Path).all()
         matching_paths = []
         
         for path in paths:
@@ -99,6 +107,214 @@ def get_point_info(
             detail=f"Error retrieving point information: {str(e)}"
         )
 
+@router.get("/nearest", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_nearest_regions(
+    x: float = Query(..., description="X coordinate"),
+    y: float = Query(..., description="Y coordinate"),
+    k: int = Query(5, ge=1, le=100, description="Number of regions to return"),
+    region_type: Optional[int] = Query(None, description="Only consider this region type (1=Geographic for landmarks)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Find the k regions or landmarks nearest to a coordinate.
+    
+    Feeds the dynamic description engine ("what notable things are near this room").
+    Answered from an in-memory R-tree with a best-first search, so only regions
+    near the point are examined. Distance is 0 when the point lies inside a region.
+    The index is loaded from the world snapshot on first use and follows new
+    snapshot generations, so region writes made through any worker show up.
+    """
+    try:
+        region_index.ensure_loaded(db)
+        nearest = region_index.nearest(x, y, k, region_type)
+        
+        results = []
+        for distance, entry in nearest:
+            min_x, min_y, max_x, max_y = entry.bbox
+            results.append({
+                "vnum": entry.vnum,
+                "zone_vnum": entry.zone_vnum,
+                "name": entry.name,
+                "region_type": entry.region_type,
+                "region_type_name": get_region_type_name(entry.region_type),
+                "region_props": entry.region_props,
+                "sector_type_name": get_sector_type_name(entry.region_props) if entry.region_type == REGION_SECTOR and entry.region_props is not None else None,
+                "distance": distance,
+                "center": {"x": (min_x + max_x) / 2, "y": (min_y + max_y) / 2}
+            })
+        
+        return {
+            "coordinate": {"x": x, "y": y},
+            "k": k,
+            "results": results
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error finding nearest regions: {str(e)}"
+        )
+
+@router.get("/snap", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def snap_point(
+    x: float = Query(..., description="X coordinate"),
+    y: float = Query(..., description="Y coordinate"),
+    tolerance: float = Query(2.0, gt=0, le=MAX_TOLERANCE, description="Snap distance in map units"),
+    exclude_kind: Optional[str] = Query(None, pattern="^(region|path)$", description="Kind of the feature being edited"),
+    exclude_vnum: Optional[int] = Query(None, description="Vnum of the feature being edited"),
+    db: Session = Depends(get_db)
+):
+    """
+    Snap a cursor position to the nearest existing vertex or edge.
+    
+    Called on mouse move while drawing or dragging vertices. Vertices take
+    priority over edges; `snapped` is false when nothing lies within tolerance.
+    Pass exclude_kind/exclude_vnum to ignore the feature currently being edited.
+    Answered from an in-memory grid index that follows new world snapshot
+    generations, so writes made through any worker show up.
+    """
+    try:
+        snap_index.ensure_loaded(db)
+        exclude = (exclude_kind, exclude_vnum) if exclude_kind and exclude_vnum is not None else None
+        target = snap_index.snap(x, y, tolerance, exclude)
+        
+        return {
+            "coordinate": {"x": x, "y": y},
+            "snapped": target is not None,
+            "target": target
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error snapping point: {str(e)}"
+        )
+
+@router.post("/batch", response_model=dict, dependencies=[admission(FULL_LIST)])
+def get_point_info_batch(request: PointBatchRequest, db: Session = Depends(get_db)):
+    """
+    Look up the regions and paths at many coordinates in one request.
+    
+    Candidate features are prefiltered in MySQL with MBRIntersects against the
+    bounding box of all requested points. Each candidate is then tested against
+    the points inside its own bounding box with NumPy-vectorized point-in-polygon
+    and point-to-segment distance checks.
+    
+    Feature details are listed once in `regions`/`paths`; each entry in `results`
+    only references vnums, in database order.
+    """
+    try:
+        points = np.array([(coord['x'], coord['y']) for coord in request.coordinates], dtype=np.float64)
+        px, py = points[:, 0], points[:, 1]
+        radius = request.radius
+        
+        envelope = envelope_wkt(
+            float(px.min()) - radius, float(py.min()) - radius,
+            float(px.max()) + radius, float(py.max()) + radius
+        )
+        
+        region_rows = db.execute(text("""
+            SELECT vnum, zone_vnum, name, region_type, region_props, ST_AsText(region_polygon) as polygon_wkt
+            FROM region_data
+            WHERE region_polygon IS NOT NULL
+            AND MBRIntersects(region_polygon, ST_GeomFromText(:envelope))
+            ORDER BY vnum
+        """), {"envelope": envelope}).fetchall()
+        
+        path_rows = db.execute(text("""
+            SELECT vnum, zone_vnum, name, path_type, path_props, ST_AsText(path_linestring) as linestring_wkt
+            FROM path_data
+            WHERE path_linestring IS NOT NULL
+            AND MBRIntersects(path_linestring, ST_GeomFromText(:envelope))
+            ORDER BY vnum
+        """), {"envelope": envelope}).fetchall()
+        
+        # Points sorted by x let each feature find its bounding-box candidates by bisection
+        x_order = np.argsort(px, kind="stable")
+        sorted_x = px[x_order]
+        
+        point_regions: List[List[int]] = [[] for _ in range(len(points))]
+        point_paths: List[List[int]] = [[] for _ in range(len(points))]
+        matching_regions = []
+        matching_paths = []
+        
+        for row in region_rows:
+            rings = wkt_to_rings(row.polygon_wkt)
+            if not rings:
+                continue
+            nearby = _points_in_box(sorted_x, x_order, py, bounding_box(rings), radius)
+            if nearby.size == 0:
+                continue
+            hits = nearby[points_near_polygon(px[nearby], py[nearby], rings, radius)]
+            if hits.size == 0:
+                continue
+            for index in hits.tolist():
+                point_regions[index].append(row.vnum)
+            matching_regions.append({
+                "vnum": row.vnum,
+                "zone_vnum": row.zone_vnum,
+                "name": row.name,
+                "region_type": row.region_type,
+                "region_type_name": get_region_type_name(row.region_type),
+                "region_props": row.region_props,
+                "sector_type_name": get_sector_type_name(row.region_props) if row.region_type == REGION_SECTOR and row.region_props is not None else None
+            })
+        
+        for row in path_rows:
+            rings = wkt_to_rings(row.linestring_wkt)
+            if not rings:
+                continue
+            nearby = _points_in_box(sorted_x, x_order, py, bounding_box(rings), radius)
+            if nearby.size == 0:
+                continue
+            hits = nearby[points_near_segments(px[nearby], py[nearby], rings[0], radius)]
+            if hits.size == 0:
+                continue
+            for index in hits.tolist():
+                point_paths[index].append(row.vnum)
+            matching_paths.append({
+                "vnum": row.vnum,
+                "zone_vnum": row.zone_vnum,
+                "name": row.name,
+                "path_type": row.path_type,
+                "path_type_name": get_path_type_name(row.path_type),
+                "path_props": row.path_props
+            })
+        
+        results = [
+            {"x": x, "y": y, "regions": point_regions[i], "paths": point_paths[i]}
+            for i, (x, y) in enumerate(points.tolist())
+        ]
+        
+        return {
+            "radius": radius,
+            "results": results,
+            "regions": matching_regions,
+            "paths": matching_paths,
+            "summary": {
+                "point_count": len(results),
+                "region_count": len(matching_regions),
+                "path_count": len(matching_paths)
+            }
+        }
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving batch point information: {str(e)}"
+        )
+
+def _points_in_box(sorted_x: np.ndarray, x_order: np.ndarray, py: np.ndarray, box: tuple, radius: float) -> np.ndarray:
+    """
+    Indices of points inside a feature's bounding box expanded by radius.
+    """
+    min_x, min_y, max_x, max_y = box
+    lo = np.searchsorted(sorted_x, min_x - radius, side="left")
+    hi = np.searchsorted(sorted_x, max_x + radius, side="right")
+    candidates = x_order[lo:hi]
+    candidate_y = py[candidates]
+    return candidates[(candidate_y >= min_y - radius) & (candidate_y <= max_y + radius)]
+
 def _point_near_path(x: float, y: float, path_points: List[dict], radius: float) -> bool:
     """
     Check if a point is near any segment of a path.
@@ -1,108 +1,121 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, defer
 from sqlalchemy import text
 from sqlalchemy.engine import Result
 from typing import List, Optional, Any
 from datetime import datetime
-from ..models.region import Region
+from .. import models
 from ..schemas.region import (
-    RegionCreate, RegionResponse, RegionUpdate, create_landmark_region,
+    RegionCreate, RegionResponse, RegionUpdate, RegionValidationRequest,
+    RegionValidationResponse, RegionOverlapRequest, RegionOverlapResponse, RegionOverlap,
+    create_landmark_region,
     get_region_type_name, get_sector_type_name, REGION_GEOGRAPHIC, REGION_ENCOUNTER,
     REGION_SECTOR_TRANSFORM, REGION_SECTOR, SECTOR_TYPES
 )
+from ..schemas.common import GeometryPatch, GeometryPatchAck
+from ..services.wkt import coordinates_to_polygon_wkt, polygon_wkt_to_coordinates
+from ..services.vertex_patch import apply_vertex_operations, geometry_version
+from ..services.polygon_validity import validate_polygons, signed_area
+from ..services.feature_filters import apply_feature_filters
+from ..services.sparse_fields import fields_parameter, needs_geometry, sparse_response
+from ..services.coordinate_encoding import (
+    COORDINATE_FORMAT_DICT, encode_coordinates, get_coordinate_format
+)
+from ..services.geometry_codec import DEFAULT_GRID, MAX_GRID
+from ..services import feature_events
+from ..services.change_log import record_change
+from ..services.revision_history import (
+    DEFAULT_HISTORY_LIMIT, MAX_HISTORY_LIMIT, feature_at_revision, feature_history, record_revision
+)
+from ..services.admission import admission, BULK_WRITE, CHEAP_READ, FULL_LIST
 from ..config.config_database import get_db
 
 router = APIRouter()
 
-def coordinates_to_polygon_wkt(coordinates: List[dict]) -> str:
-    """Convert coordinate list to MySQL POLYGON WKT format"""
-    if not coordinates:
-        return ""
+# Parses the fields= parameter of the list and single-region endpoints
+get_region_fields = fields_parameter(RegionResponse)
+
+def validated_polygon_coordinates(coordinates: List[dict]) -> List[dict]:
+    """
+    Run the polygon validity engine and return the normalized coordinates.
     
-    # Handle single point (create a tiny polygon around it)
+    Single-point landmarks are returned unchanged. Raises a 400 error listing
+    the problems if the polygon is self-intersecting or degenerate.
+    """
     if len(coordinates) == 1:
-        x, y = coordinates[0]['x'], coordinates[0]['y']
-        # Create a very small square around the point (0.001 radius)
-        radius = 0.001
-        coords = [
-            {"x": x - radius, "y": y - radius},
-            {"x": x + radius, "y": y - radius}, 
-            {"x": x + radius, "y": y + radius},
-            {"x": x - radius, "y": y + radius},
-            {"x": x - radius, "y": y - radius}  # Close polygon
-        ]
-    else:
-        coords = coordinates.copy()
-    
-    # Ensure polygon is closed (first point = last point)
-    if len(coords) > 1 and coords[0] != coords[-1]:
-        coords.append(coords[0])
+        return coordinates
     
-    points = [f"{coord['x']} {coord['y']}" for coord in coords]
-    return f"POLYGON(({', '.join(points)}))"
+    # Through the geometry pool, so a very large polygon does not stall this worker
+    result, = validate_polygons([coordinates])
+    if not result["valid"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid polygon: {'; '.join(result['errors'])}"
+        )
+    return result["coordinates"]
 
-def polygon_wkt_to_coordinates(wkt: str) -> List[dict]:
-    """Convert MySQL POLYGON WKT format to coordinate list"""
-    if not wkt:
-        return []
+def region_coordinates(region: "models.Region", db: Session) -> List[dict]:
+    """Read a Region row's polygon as coordinates via WKT"""
+    # Convert MySQL POLYGON to coordinates
+    coordinates = []
+    if region.region_polygon:
+        # Use ST_AsText to get WKT format
+        result = db.execute(text("SELECT ST_AsText(:polygon)"), {"polygon": region.region_polygon}).fetchone()
+        if result:
+            coordinates = polygon_wkt_to_coordinates(result[0])
+    return coordinates
+
+def region_to_dict(region: "models.Region", db: Session, geometry: bool = True) -> dict:
+    """
+    Response fields of a Region row.
     
-    # Parse WKT format: POLYGON((x1 y1, x2 y2, ...))
-    try:
-        # Remove POLYGON(( and ))
-        coords_str = wkt.replace("POLYGON((", "").replace("))", "")
-        point_pairs = coords_str.split(", ")
-        
-        coordinates = []
-        for pair in point_pairs:
-            if pair.strip():
-                parts = pair.strip().split()
-                if len(parts) >= 2:
-                    x, y = float(parts[0]), float(parts[1])
-                    coordinates.append({"x": x, "y": y})
-        
-        # Remove duplicate closing point if present
-        if len(coordinates) > 1 and coordinates[0] == coordinates[-1]:
-            coordinates = coordinates[:-1]
-        
-        # Handle point regions (landmarks) - check if all points are the same
-        if len(coordinates) >= 3:
-            unique_points: List[dict] = []
-            for coord in coordinates:
-                if not any(abs(coord['x'] - up['x']) < 0.001 and abs(coord['y'] - up['y']) < 0.001 for up in unique_points):
-                    unique_points.append(coord)
-            
-            # If all points are essentially the same (landmark), return single point
-            if len(unique_points) == 1:
-                return [unique_points[0]]
-            
-            # If it's a very small polygon, might be a point region
-            if len(unique_points) <= 4:
-                x_coords = [c['x'] for c in unique_points]
-                y_coords = [c['y'] for c in unique_points]
-                x_range = max(x_coords) - min(x_coords) if len(x_coords) > 1 else 0
-                y_range = max(y_coords) - min(y_coords) if len(y_coords) > 1 else 0
-                
-                # If it's a very small area (< 0.01), treat as point
-                if x_range < 0.01 and y_range < 0.01:
-                    center_x = sum(x_coords) / len(x_coords)
-                    center_y = sum(y_coords) / len(y_coords)
-                    return [{"x": center_x, "y": center_y}]
-                
-            coordinates = unique_points
-            
-        return coordinates
-    except Exception as e:
-        print(f"Error parsing WKT: {e}, WKT: {wkt}")
-        return []
+    With geometry=False the polygon is never read or decoded, so the column
+    can be deferred; coordinates and geometry_version are left out.
+    """
+    # Handle MySQL zero datetime
+    reset_time = region.region_reset_time
+    if reset_time and reset_time.year < 1900:
+        reset_time = datetime(2000, 1, 1)
+    
+    region_dict = {
+        "vnum": region.vnum,
+        "zone_vnum": region.zone_vnum,
+        "name": region.name,
+        "region_type": region.region_type,
+        "region_props": region.region_props,
+        "region_reset_data": region.region_reset_data or "",
+        "region_reset_time": reset_time,
+        "region_type_name": get_region_type_name(region.region_type),
+        "sector_type_name": get_sector_type_name(region.region_props) if region.region_type == REGION_SECTOR and region.region_props is not None else None
+    }
+    if geometry:
+        coordinates = region_coordinates(region, db)
+        region_dict["coordinates"] = coordinates
+        region_dict["geometry_version"] = geometry_version(coordinates)
+    return region_dict
+
+def region_to_response(region: "models.Region", db: Session) -> RegionResponse:
+    """Convert a Region row to its API response, reading the polygon as WKT"""
+    return RegionResponse(**region_to_dict(region, db))
 
-@router.get("/", response_model=List[RegionResponse])
+@router.get("/", response_model=List[RegionResponse], dependencies=[admission(FULL_LIST)])
 def get_regions(
-    region_type: Optional[int] = Query(None, description="Filter by region type (1=Geographic, 2=Encounter, 3=Sector Transform, 4=Sector Override)"),
-    zone_vnum: Optional[int] = Query(None, description="Filter by zone vnum"),
+    region_type: Optional[List[int]] = Query(None, description="Filter by region type (1=Geographic, 2=Encounter, 3=Sector Transform, 4=Sector Override); repeat for several"),
+    zone_vnum: Optional[List[int]] = Query(None, description="Filter by zone vnum; repeat for several"),
+    region_props: Optional[List[int]] = Query(None, description="Filter by region_props value; repeat for several"),
+    vnum_min: Optional[int] = Query(None, description="Lowest vnum to return"),
+    vnum_max: Optional[int] = Query(None, description="Highest vnum to return"),
+    has_geometry: Optional[bool] = Query(None, description="Only regions with (true) or without (false) stored geometry"),
+    coordinate_format: str = Depends(get_coordinate_format),
+    grid: int = Query(DEFAULT_GRID, ge=1, le=MAX_GRID, description="Quantization steps per map unit for binary responses"),
+    fields: Optional[List[str]] = Depends(get_region_fields),
     db: Session = Depends(get_db)
 ):
     """
-    Get all regions, optionally filtered by type or zone.
+    Get all regions in vnum order, optionally filtered.
+    
+    Type, zone and props filters accept several values (repeat the parameter);
+    all filters combine with AND and run as indexed SQL.
     
     Regions are polygonal areas that modify terrain properties:
     
@@ -115,45 +128,28 @@ def get_regions(
     Regions are processed in database order during terrain generation, with later regions overriding earlier ones.
     """
     try:
-        query = db.query(Region)
-        if region_type:
-            query = query.filter(Region.region_type == region_type)
-        if zone_vnum:
-            query = query.filter(Region.zone_vnum == zone_vnum)
+        query = db.query(models.Region)
+        if not needs_geometry(fields):
+            # Listing without geometry never transfers or decodes it
+            query = query.options(defer(models.Region.region_polygon))
+        query = apply_feature_filters(query, models.Region, feature_events.FEATURE_REGION,
+                                      types=region_type, zones=zone_vnum, props=region_props,
+                                      vnum_min=vnum_min, vnum_max=vnum_max, has_geometry=has_geometry)
         
         regions = query.all()
         
+        if fields is not None:
+            items = [region_to_dict(region, db, geometry=needs_geometry(fields)) for region in regions]
+            by_vnum = {region.vnum: region for region in regions}
+            return sparse_response(feature_events.FEATURE_REGION, items, fields, coordinate_format,
+                                   lambda vnum: region_coordinates(by_vnum[vnum], db))
+        
         # Convert to response format
-        response_regions = []
-        for region in regions:
-            # Convert MySQL POLYGON to coordinates
-            coordinates = []
-            if region.region_polygon:
-                # Use ST_AsText to get WKT format
-                result = db.execute(text("SELECT ST_AsText(:polygon)"), {"polygon": region.region_polygon}).fetchone()
-                if result:
-                    coordinates = polygon_wkt_to_coordinates(result[0])
-            
-            # Handle MySQL zero datetime
-            reset_time = region.region_reset_time
-            if reset_time and reset_time.year < 1900:
-                reset_time = datetime(2000, 1, 1)
-            
-            region_dict = {
-                "vnum": region.vnum,
-                "zone_vnum": region.zone_vnum,
-                "name": region.name,
-                "region_type": region.region_type,
-                "coordinates": coordinates,
-                "region_props": region.region_props,
-                "region_reset_data": region.region_reset_data or "",
-                "region_reset_time": reset_time,
-                "region_type_name": get_region_type_name(region.region_type),
-                "sector_type_name": get_sector_type_name(region.region_props) if region.region_type == REGION_SECTOR and region.region_props is not None else None
-            }
-            response_regions.append(RegionResponse(**region_dict))
+        response_regions = [region_to_response(region, db) for region in regions]
         
-        return response_regions
+        return encode_coordinates(response_regions, feature_events.FEATURE_REGION, coordinate_format, grid=grid)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -208,45 +204,157 @@ def get_region_types():
         "processing_order": "Regions processed in database order - later regions override earlier ones"
     }
 
-@router.get("/{vnum}", response_model=RegionResponse)
-def get_region(vnum: int, db: Session = Depends(get_db)):
+@router.post("/validate", response_model=RegionValidationResponse, dependencies=[admission(CHEAP_READ)])
+def validate_region_polygon(request: RegionValidationRequest):
+    """
+    Check a polygon without saving it.
+    
+    Runs the same validity engine used on create/update:
+    
+    - Removes consecutive duplicate vertices (including an explicit closing point)
+    - Detects self-intersections, touching edges and spikes with an O(n log n) sweep-line
+    - Rejects zero-area polygons
+    - Normalizes the ring to counter-clockwise orientation
+    
+    Returns the problems found and the normalized coordinates that would be stored.
+    """
+    result, = validate_polygons([request.coordinates])
+    return RegionValidationResponse(**result)
+
+@router.post("/overlaps", response_model=RegionOverlapResponse, dependencies=[admission(CHEAP_READ)])
+def find_region_overlaps(request: RegionOverlapRequest, db: Session = Depends(get_db)):
+    """
+    Find existing regions that overlap a candidate polygon.
+    
+    Useful before saving a REGION_SECTOR override, since overlapping regions are
+    processed in database order and later regions override earlier ones.
+    
+    The query is answered in MySQL: MBRIntersects prefilters through the spatial
+    index on region_polygon, then ST_Intersects and ST_Intersection compute the
+    exact overlap for the remaining candidates. Regions that only touch along an
+    edge are reported with an intersection_area of 0.
+    """
+    candidate = validated_polygon_coordinates(request.coordinates)
+    polygon_wkt = coordinates_to_polygon_wkt(candidate)
+    candidate_area = signed_area([(coord['x'], coord['y']) for coord in candidate])
+    
+    filters = ""
+    params = {"polygon": polygon_wkt}
+    if request.region_type is not None:
+        filters += " AND region_type = :region_type"
+        params["region_type"] = request.region_type
+    if request.exclude_vnum is not None:
+        filters += " AND vnum <> :exclude_vnum"
+        params["exclude_vnum"] = request.exclude_vnum
+    
+    try:
+        rows = db.execute(text(f"""
+            SELECT vnum, zone_vnum, name, region_type, region_props,
+                   ST_Area(region_polygon) AS region_area,
+                   ST_Area(ST_Intersection(region_polygon, ST_GeomFromText(:polygon))) AS intersection_area
+            FROM region_data
+            WHERE region_polygon IS NOT NULL
+            AND MBRIntersects(region_polygon, ST_GeomFromText(:polygon))
+            AND ST_Intersects(region_polygon, ST_GeomFromText(:polygon)){filters}
+            ORDER BY vnum
+        """), params).fetchall()  # nosec B608
+        
+        overlaps = [
+            RegionOverlap(
+                vnum=row.vnum,
+                zone_vnum=row.zone_vnum,
+                name=row.name,
+                region_type=row.region_type,
+                region_type_name=get_region_type_name(row.region_type),
+                region_props=row.region_props,
+                sector_type_name=get_sector_type_name(row.region_props) if row.region_type == REGION_SECTOR and row.region_props is not None else None,
+                region_area=row.region_area or 0.0,
+                intersection_area=row.intersection_area or 0.0
+            )
+            for row in rows
+        ]
+        
+        return RegionOverlapResponse(
+            candidate_area=candidate_area,
+            overlaps=overlaps,
+            total_intersection_area=sum(overlap.intersection_area for overlap in overlaps)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error finding overlapping regions: {str(e)}"
+        )
+
+@router.get("/{vnum}", response_model=RegionResponse, dependencies=[admission(CHEAP_READ)])
+def get_region(
+    vnum: int,
+    db: Session = Depends(get_db),
+    coordinate_format: str = Depends(get_coordinate_format),
+    grid: int = Query(DEFAULT_GRID, ge=1, le=MAX_GRID, description="Quantization steps per map unit for binary responses"),
+    fields: Optional[List[str]] = Depends(get_region_fields)
+):
     """Get a specific region by vnum"""
-    region = db.query(Region).filter(Region.vnum == vnum).first()
+    query = db.query(models.Region).filter(models.Region.vnum == vnum)
+    if not needs_geometry(fields):
+        query = query.options(defer(models.Region.region_polygon))
+    region = query.first()
     if not region:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Region with vnum {vnum} not found"
         )
     
-    # Convert MySQL POLYGON to coordinates
-    coordinates = []
-    if region.region_polygon:
-        result = db.execute(text("SELECT ST_AsText(:polygon)"), {"polygon": region.region_polygon}).fetchone()
-        if result:
-            coordinates = polygon_wkt_to_coordinates(result[0])
-    
-    # Handle MySQL zero datetime  
-    reset_time = region.region_reset_time
-    if reset_time and reset_time.year < 1900:
-        reset_time = datetime(2000, 1, 1)
+    if fields is not None:
+        return sparse_response(feature_events.FEATURE_REGION, region_to_dict(region, db, geometry=needs_geometry(fields)),
+                               fields, coordinate_format, lambda _: region_coordinates(region, db))
     
-    region_dict = {
-        "vnum": region.vnum,
-        "zone_vnum": region.zone_vnum,
-        "name": region.name,
-        "region_type": region.region_type,
-        "coordinates": coordinates,
-        "region_props": region.region_props,
-        "region_reset_data": region.region_reset_data or "",
-        "region_reset_time": reset_time,
-        "region_type_name": get_region_type_name(region.region_type),
-        "sector_type_name": get_sector_type_name(region.region_props) if region.region_type == REGION_SECTOR and region.region_props is not None else None
-    }
+    return encode_coordinates(region_to_response(region, db), feature_events.FEATURE_REGION, coordinate_format, grid=grid)
+
+@router.get("/{vnum}/history", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_region_history(
+    vnum: int,
+    before: Optional[int] = Query(None, ge=1, description="Only revisions older than this (next_before of the previous page)"),
+    limit: int = Query(DEFAULT_HISTORY_LIMIT, ge=1, le=MAX_HISTORY_LIMIT, description="Revisions per page"),
+    include_features: bool = Query(False, description="Include the full region as of each revision"),
+    db: Session = Depends(get_db)
+):
+    """
+    Get a region's revision history, newest first.
     
-    return RegionResponse(**region_dict)
+    Each revision lists the changed fields and how many vertices were inserted
+    and deleted. History is kept for deleted regions as well.
+    """
+    try:
+        return feature_history(db, feature_events.FEATURE_REGION, vnum, before, limit, include_features)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving region history: {str(e)}"
+        )
 
-@router.post("/", response_model=RegionResponse, status_code=status.HTTP_201_CREATED)
-def create_region(region: RegionCreate, db: Session = Depends(get_db)):
+@router.get("/{vnum}/history/{revision}", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_region_revision(vnum: int, revision: int, db: Session = Depends(get_db)):
+    """Get one revision of a region, with the region as it was after that revision"""
+    try:
+        entry = feature_at_revision(db, feature_events.FEATURE_REGION, vnum, revision)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving region revision: {str(e)}"
+        )
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Region {vnum} has no revision {revision}"
+        )
+    return entry
+
+@router.post("/", response_model=RegionResponse, status_code=status.HTTP_201_CREATED, dependencies=[admission(BULK_WRITE)])
+def create_region(
+    region: RegionCreate,
+    db: Session = Depends(get_db),
+    coordinate_format: str = Depends(get_coordinate_format)
+):
     """
     Create a new region.
     
@@ -278,15 +386,15 @@ def create_region(region: RegionCreate, db: Session = Depends(get_db)):
     """
     try:
         # Check if vnum already exists
-        existing_region = db.query(Region).filter(Region.vnum == region.vnum).first()
+        existing_region = db.query(models.Region).filter(models.Region.vnum == region.vnum).first()
         if existing_region:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Region with vnum {region.vnum} already exists"
             )
         
-        # Convert coordinates to MySQL POLYGON
-        polygon_wkt = coordinates_to_polygon_wkt(region.coordinates)
+        # Convert validated coordinates to MySQL POLYGON
+        polygon_wkt = coordinates_to_polygon_wkt(validated_polygon_coordinates(region.coordinates))
         
         # Create region with MySQL POLYGON
         db.execute(text("""
@@ -303,10 +411,14 @@ def create_region(region: RegionCreate, db: Session = Depends(get_db)):
             "region_reset_time": region.region_reset_time
         })
         
+        record_revision(db, feature_events.FEATURE_REGION, region.vnum)
+        record_change(db, feature_events.FEATURE_REGION, feature_events.ACTION_UPSERT, region.vnum)
         db.commit()
         
         # Return the created region
-        return get_region(region.vnum, db)
+        created = get_region(region.vnum, db, COORDINATE_FORMAT_DICT, DEFAULT_GRID, None)
+        feature_events.publish(feature_events.FEATURE_REGION, feature_events.ACTION_UPSERT, created.vnum, created.dict())
+        return encode_coordinates(created, feature_events.FEATURE_REGION, coordinate_format, status.HTTP_201_CREATED)
         
     except HTTPException:
         raise
@@ -317,7 +429,7 @@ def create_region(region: RegionCreate, db: Session = Depends(get_db)):
             detail=f"Error creating region: {str(e)}"
         )
 
-@router.post("/landmarks", response_model=RegionResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/landmarks", response_model=RegionResponse, status_code=status.HTTP_201_CREATED, dependencies=[admission(BULK_WRITE)])
 def create_landmark(
     x: float = Query(..., description="X coordinate for the landmark"),
     y: float = Query(..., description="Y coordinate for the landmark"),
@@ -339,7 +451,7 @@ def create_landmark(
     """
     try:
         # Check if vnum already exists
-        existing_region = db.query(Region).filter(Region.vnum == vnum).first()
+        existing_region = db.query(models.Region).filter(models.Region.vnum == vnum).first()
         if existing_region:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -350,7 +462,7 @@ def create_landmark(
         landmark_data = create_landmark_region(x, y, name, vnum, zone_vnum, radius)
         landmark = RegionCreate(**landmark_data)
         
-        return create_region(landmark, db)
+        return create_region(landmark, db, COORDINATE_FORMAT_DICT)
         
     except HTTPException:
         raise
@@ -360,12 +472,17 @@ def create_landmark(
             detail=f"Error creating landmark: {str(e)}"
         )
 
-@router.put("/{vnum}", response_model=RegionResponse)
-def update_region(vnum: int, region_update: RegionUpdate, db: Session = Depends(get_db)):
+@router.put("/{vnum}", response_model=RegionResponse, dependencies=[admission(BULK_WRITE)])
+def update_region(
+    vnum: int,
+    region_update: RegionUpdate,
+    db: Session = Depends(get_db),
+    coordinate_format: str = Depends(get_coordinate_format)
+):
     """Update an existing region"""
     try:
         # Check if region exists
-        existing_region = db.query(Region).filter(Region.vnum == vnum).first()
+        existing_region = db.query(models.Region).filter(models.Region.vnum == vnum).first()
         if not existing_region:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -377,7 +494,7 @@ def update_region(vnum: int, region_update: RegionUpdate, db: Session = Depends(
         
         # Handle coordinates separately if provided
         if region_update.coordinates is not None:
-            polygon_wkt = coordinates_to_polygon_wkt(region_update.coordinates)
+            polygon_wkt = coordinates_to_polygon_wkt(validated_polygon_coordinates(region_update.coordinates))
             
             # Update with new polygon
             query_parts = []
@@ -402,10 +519,14 @@ def update_region(vnum: int, region_update: RegionUpdate, db: Session = Depends(
                 query = f"UPDATE region_data SET {', '.join(query_parts)} WHERE vnum = :vnum"  # nosec B608
                 db.execute(text(query), params)
         
+        record_revision(db, feature_events.FEATURE_REGION, vnum)
+        record_change(db, feature_events.FEATURE_REGION, feature_events.ACTION_UPSERT, vnum)
         db.commit()
         
         # Return updated region
-        return get_region(vnum, db)
+        updated = get_region(vnum, db, COORDINATE_FORMAT_DICT, DEFAULT_GRID, None)
+        feature_events.publish(feature_events.FEATURE_REGION, feature_events.ACTION_UPSERT, vnum, updated.dict())
+        return encode_coordinates(updated, feature_events.FEATURE_REGION, coordinate_format)
         
     except HTTPException:
         raise
@@ -416,11 +537,100 @@ def update_region(vnum: int, region_update: RegionUpdate, db: Session = Depends(
             detail=f"Error updating region: {str(e)}"
         )
 
-@router.delete("/{vnum}", status_code=status.HTTP_204_NO_CONTENT)
+@router.patch("/{vnum}", response_model=GeometryPatchAck, dependencies=[admission(BULK_WRITE)])
+def patch_region_geometry(vnum: int, patch: GeometryPatch, db: Session = Depends(get_db)):
+    """
+    Apply vertex-level edits to a region polygon.
+    
+    Instead of resending the full coordinate list through PUT, the editor sends
+    only the changed vertices (insert/move/delete at an index) together with the
+    geometry_version it last saw. The request is rejected with 409 Conflict if the
+    stored polygon has changed since then. The row stays locked from the version
+    check to the commit, so of two patches against the same version the second
+    always gets the 409.
+    
+    This saves request size, not server work: each patch still reads, revalidates
+    and rewrites the whole polygon, so its cost is O(n) in the vertex count.
+    
+    Returns a small acknowledgment with the new geometry_version.
+    """
+    try:
+        region = db.query(models.Region).filter(models.Region.vnum == vnum).with_for_update().first()
+        if not region:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Region with vnum {vnum} not found"
+            )
+        
+        coordinates = []
+        if region.region_polygon:
+            result = db.execute(text("SELECT ST_AsText(:polygon)"), {"polygon": region.region_polygon}).fetchone()
+            if result:
+                coordinates = polygon_wkt_to_coordinates(result[0])
+        
+        if geometry_version(coordinates) != patch.base_version:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Region {vnum} geometry has changed since version {patch.base_version}"
+            )
+        
+        try:
+            coordinates = apply_vertex_operations(coordinates, patch.operations)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        if len(coordinates) != 1 and len(coordinates) < 3:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Polygons must have at least 3 points, or use 1 point for landmarks"
+            )
+        
+        polygon_wkt = coordinates_to_polygon_wkt(validated_polygon_coordinates(coordinates))
+        feature = {
+            "vnum": vnum,
+            "zone_vnum": region.zone_vnum,
+            "name": region.name,
+            "region_type": region.region_type,
+            "region_props": region.region_props
+        }
+        db.execute(
+            text("UPDATE region_data SET region_polygon = ST_GeomFromText(:polygon) WHERE vnum = :vnum"),
+            {"vnum": vnum, "polygon": polygon_wkt}
+        )
+        record_revision(db, feature_events.FEATURE_REGION, vnum)
+        record_change(db, feature_events.FEATURE_REGION, feature_events.ACTION_UPSERT, vnum)
+        db.commit()
+        
+        # Version what a subsequent GET will return for the stored polygon
+        stored = polygon_wkt_to_coordinates(polygon_wkt)
+        feature["coordinates"] = stored
+        feature_events.publish(feature_events.FEATURE_REGION, feature_events.ACTION_UPSERT, vnum, feature)
+        return GeometryPatchAck(
+            vnum=vnum,
+            version=geometry_version(stored),
+            vertex_count=len(stored),
+            normalized=stored != coordinates
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error patching region: {str(e)}"
+        )
+
+@router.delete("/{vnum}", status_code=status.HTTP_204_NO_CONTENT, dependencies=[admission(BULK_WRITE)])
 def delete_region(vnum: int, db: Session = Depends(get_db)):
     """Delete a region"""
     try:
+        # Capture the last stored state for change listeners (404s if missing)
+        deleted = get_region(vnum, db, COORDINATE_FORMAT_DICT, DEFAULT_GRID, None)
+        
         result = db.execute(text("DELETE FROM region_data WHERE vnum = :vnum"), {"vnum": vnum})
+        record_revision(db, feature_events.FEATURE_REGION, vnum)
+        record_change(db, feature_events.FEATURE_REGION, feature_events.ACTION_DELETE, vnum)
         db.commit()
         
         # Check if any rows were affected using hasattr to avoid mypy issues
@@ -431,6 +641,7 @@ def delete_region(vnum: int, db: Session = Depends(get_db)):
             )
         
         db.commit()
+        feature_events.publish(feature_events.FEATURE_REGION, feature_events.ACTION_DELETE, vnum, deleted.dict())
         return None
         
     except HTTPException:
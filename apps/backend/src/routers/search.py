@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..services.search_index import search_index
+from ..services.admission import admission, CHEAP_READ
+from ..config.config_database import get_db
+
+router = APIRouter()
+
+@router.get("/", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def search_features(
+    q: str = Query(..., min_length=1, max_length=100, description="Name, type or zone to search for; the last word may be partial"),
+    kind: Optional[str] = Query(None, pattern="^(region|path)$", description="Only return regions or only paths"),
+    zone_vnum: Optional[int] = Query(None, description="Only return features in this zone"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of matches"),
+    db: Session = Depends(get_db)
+):
+    """
+    Find regions and paths by name, type or zone.
+    
+    Every query word must match the start of a word in the feature's name,
+    type name or zone number, so partial input works for type-ahead. Exact
+    and prefix name matches rank first; names that are only similar (for
+    misspellings) rank last. Each match includes its bounding box so the map
+    can jump to it. Served from an in-memory index that follows new world
+    snapshot generations, so writes made through any worker show up.
+    """
+    try:
+        search_index.ensure_loaded(db)
+        results = search_index.search(q, limit, kind, zone_vnum)
+        return {"query": q, "count": len(results), "results": results}
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error searching features: {str(e)}"
+        )
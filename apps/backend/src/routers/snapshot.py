@@ -0,0 +1,94 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from ..services import feature_events
+from ..services.world_snapshot import snapshot_store
+from ..services.admission import admission, CHEAP_READ
+from ..services.region_membership import membership_store, WORLD_MIN, WORLD_MAX
+
+router = APIRouter()
+
+@router.get("/", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_snapshot_info():
+    """
+    Describe the shared world snapshot this worker is reading.
+    
+    The snapshot is a memory-mapped file of all region and path geometry
+    that every worker maps read-only. It is rebuilt at startup and a new
+    generation is written shortly after each region or path write.
+    """
+    try:
+        snapshot = snapshot_store.current()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reading world snapshot: {str(e)}"
+        )
+    
+    if snapshot is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="World snapshot has not been built yet"
+        )
+    
+    return {
+        "generation": snapshot.generation,
+        "built_at": snapshot.built_at,
+        "size_bytes": snapshot.size_bytes,
+        "regions": snapshot.count(feature_events.FEATURE_REGION),
+        "paths": snapshot.count(feature_events.FEATURE_PATH)
+    }
+
+@router.get("/membership", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_membership_info():
+    """
+    Describe the published region membership index.
+    
+    The game server maps this file to find the regions covering any cell
+    without testing polygons. Its version increases with every file
+    published, so the game can reload when it changes.
+    """
+    try:
+        index = membership_store.current()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reading region membership index: {str(e)}"
+        )
+    
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Region membership index has not been built yet"
+        )
+    
+    return {
+        "path": membership_store.path,
+        "version": index.version,
+        "source_generation": index.source_generation,
+        "world_min": index.world_min,
+        "world_max": index.world_max,
+        "runs": index.run_count,
+        "region_sets": index.set_count,
+        "size_bytes": index.size_bytes
+    }
+
+@router.get("/membership/cell", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_cell_membership(
+    x: int = Query(..., ge=WORLD_MIN, le=WORLD_MAX, description="Cell X coordinate"),
+    y: int = Query(..., ge=WORLD_MIN, le=WORLD_MAX, description="Cell Y coordinate")
+):
+    """List the regions covering a cell, in the order the game applies them"""
+    try:
+        index = membership_store.current()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error reading region membership index: {str(e)}"
+        )
+    
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Region membership index has not been built yet"
+        )
+    
+    return {"x": x, "y": y, "version": index.version, "regions": index.lookup(x, y)}
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from ..schemas.region import get_region_type_name
+from ..schemas.path import get_path_type_name
+from ..services.zone_stats import zone_stats_index
+from ..services.admission import admission, CHEAP_READ
+from ..config.config_database import get_db
+
+router = APIRouter()
+
+@router.get("/{zone_vnum}/stats", response_model=dict, dependencies=[admission(CHEAP_READ)])
+def get_zone_stats(zone_vnum: int, db: Session = Depends(get_db)):
+    """
+    Get summary statistics for one zone's regions and paths.
+    
+    Returns feature counts by type, total region area, total path length,
+    vertex counts and bounding boxes. Served from aggregates that every
+    region/path write adjusts, so polling this is cheap compared to
+    downloading the zone. Zones without features report zero counts.
+    """
+    try:
+        zone_stats_index.ensure_loaded(db)
+        stats = zone_stats_index.zone_stats(zone_vnum)
+        
+        stats["regions"]["by_type_name"] = {
+            get_region_type_name(region_type): count
+            for region_type, count in stats["regions"]["by_type"].items()
+        }
+        stats["paths"]["by_type_name"] = {
+            get_path_type_name(path_type): count
+            for path_type, count in stats["paths"]["by_type"].items()
+        }
+        return stats
+        
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error retrieving zone statistics: {str(e)}"
+        )
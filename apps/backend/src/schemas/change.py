@@ -0,0 +1,44 @@
+import math
+from pydantic import BaseModel, validator
+from typing import Optional
+
+class BoundingBox(BaseModel):
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+    
+    @validator('min_x', 'min_y', 'max_x', 'max_y')
+    def validate_finite(cls, v):
+        if not math.isfinite(v):
+            raise ValueError('bbox coordinates must be finite numbers')
+        return v
+    
+    @validator('max_x')
+    def validate_x_order(cls, v, values):
+        if 'min_x' in values and v < values['min_x']:
+            raise ValueError('max_x must not be less than min_x')
+        return v
+    
+    @validator('max_y')
+    def validate_y_order(cls, v, values):
+        if 'min_y' in values and v < values['min_y']:
+            raise ValueError('max_y must not be less than min_y')
+        return v
+
+class ChangeSubscription(BaseModel):
+    """
+    Viewport filter sent by a change feed client.
+    
+    Omitting bbox receives changes anywhere; omitting zone_vnum receives every zone.
+    Sending a new subscription replaces the previous one.
+    """
+    type: str = "subscribe"
+    bbox: Optional[BoundingBox] = None
+    zone_vnum: Optional[int] = None
+    
+    @validator('type')
+    def validate_type(cls, v):
+        if v != "subscribe":
+            raise ValueError('Only "subscribe" messages are accepted')
+        return v
@@ -0,0 +1,84 @@
+from pydantic import BaseModel, validator
+from typing import Any, Dict, List, Optional
+
+# Operations a changeset can contain, and the features they apply to
+CHANGESET_OPS = ("create", "update", "delete")
+CHANGESET_KINDS = ("region", "path")
+
+# Largest changeset accepted in one request
+MAX_CHANGESET_OPERATIONS = 1000
+
+class ChangesetOperation(BaseModel):
+    """
+    One staged edit.
+    
+    - **create**: `data` holds every field of a new region/path (as for POST)
+    - **update**: `data` holds the fields to change (as for PUT)
+    - **delete**: no `data`
+    
+    For update and delete, `base_version` is the geometry_version the editor
+    last saw; the changeset is rejected if the feature has changed since.
+    Omit it to skip the check (e.g. for a later operation on a feature the
+    same changeset already touched).
+    """
+    op: str
+    kind: str
+    vnum: int
+    base_version: Optional[str] = None
+    data: Optional[Dict[str, Any]] = None
+    
+    @validator('op')
+    def validate_op(cls, v):
+        if v not in CHANGESET_OPS:
+            raise ValueError(f'Operation must be one of: {", ".join(CHANGESET_OPS)}')
+        return v
+    
+    @validator('kind')
+    def validate_kind(cls, v):
+        if v not in CHANGESET_KINDS:
+            raise ValueError(f'Kind must be one of: {", ".join(CHANGESET_KINDS)}')
+        return v
+    
+    @validator('data', always=True)
+    def validate_data(cls, v, values):
+        op = values.get('op')
+        if op in ('create', 'update') and not v:
+            raise ValueError(f'{op} operations need data')
+        if op == 'delete' and v:
+            raise ValueError('delete operations take no data')
+        return v
+
+class ChangesetRequest(BaseModel):
+    """Ordered edits from one editing session, applied all together or not at all"""
+    operations: List[ChangesetOperation]
+    
+    @validator('operations')
+    def validate_operations(cls, v):
+        if not v:
+            raise ValueError('At least one operation is required')
+        if len(v) > MAX_CHANGESET_OPERATIONS:
+            raise ValueError(f'A changeset can contain at most {MAX_CHANGESET_OPERATIONS} operations')
+        return v
+
+class ChangesetOperationResult(BaseModel):
+    """
+    Outcome of one operation.
+    
+    status is applied, or why the changeset was rejected: conflict (base_version
+    is stale), not_found, exists (create of an existing vnum) or invalid; the
+    other operations of a rejected changeset are not_applied.
+    geometry_version is the version after an applied create or update.
+    """
+    index: int
+    op: str
+    kind: str
+    vnum: int
+    status: str
+    detail: Optional[str] = None
+    geometry_version: Optional[str] = None
+
+class ChangesetResponse(BaseModel):
+    """Result of a changeset: committed as a whole, or rejected with the failing operations marked"""
+    committed: bool
+    applied: int
+    results: List[ChangesetOperationResult]
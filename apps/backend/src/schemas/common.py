@@ -1,8 +1,12 @@
-from pydantic import BaseModel
-from typing import Generic, TypeVar, Optional
+from pydantic import BaseModel, validator
+from typing import Generic, TypeVar, Optional, List, Dict, Union
 
 T = TypeVar('T')
 
+# Coordinates accepted by region and path payloads: the default
+# [{"x": x0, "y": y0}, ...] list or the compact flat [x0, y0, x1, y1, ...] array
+CoordinateList = Union[List[Dict[str, float]], List[float]]
+
 class ApiResponse(BaseModel, Generic[T]):
     """Standard API response wrapper"""
     data: T
@@ -13,3 +17,42 @@ class ErrorResponse(BaseModel):
     """Error response model"""
     error: str
     detail: Optional[str] = None
+
+class VertexOperation(BaseModel):
+    """
+    A single vertex-level edit against a stored geometry.
+    
+    - **insert**: Insert (x, y) before `index` (use the vertex count to append)
+    - **move**: Replace the vertex at `index` with (x, y)
+    - **delete**: Remove the vertex at `index`
+    """
+    op: str
+    index: int
+    x: Optional[float] = None
+    y: Optional[float] = None
+    
+    @validator('op')
+    def validate_op(cls, v):
+        if v not in ('insert', 'move', 'delete'):
+            raise ValueError('Operation must be one of: insert, move, delete')
+        return v
+
+class GeometryPatch(BaseModel):
+    """Vertex operations to apply to the geometry identified by base_version"""
+    base_version: str
+    operations: List[VertexOperation]
+    
+    @validator('operations')
+    def validate_operations(cls, v):
+        if not v:
+            raise ValueError('At least one operation is required')
+        return v
+
+class GeometryPatchAck(BaseModel):
+    """Acknowledgment returned after a geometry patch is applied"""
+    vnum: int
+    version: str
+    vertex_count: int
+    # True when the server cleaned up the geometry (e.g. re-oriented the ring),
+    # so the client's vertex indices no longer match and it should refetch
+    normalized: bool = False
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+class JobCreate(BaseModel):
+    """A background job to start; see GET /api/jobs/types for the job types and their params"""
+    job_type: str
+    params: Dict[str, Any] = {}
+
+class JobResponse(BaseModel):
+    """
+    State of a background job.
+    
+    status is queued, running, succeeded, failed or cancelled; progress runs
+    from 0 to 1. result_size is set once a succeeded job's result can be
+    downloaded from /api/jobs/{job_id}/result.
+    """
+    job_id: int
+    job_type: str
+    status: str
+    params: Dict[str, Any]
+    progress: float
+    message: Optional[str] = None
+    error: Optional[str] = None
+    result_size: Optional[int] = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
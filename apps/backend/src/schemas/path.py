@@ -1,6 +1,8 @@
 from pydantic import BaseModel, validator
-from typing import List, Dict, Optional
+from typing import Optional
 from datetime import datetime
+from .common import CoordinateList
+from ..services.coordinate_encoding import is_flat_coordinates, flat_to_coordinates
 
 # Path type constants (based on LuminariMUD wilderness system)
 PATH_ROAD = 1           # Paved roads - High-speed travel routes
@@ -53,7 +55,7 @@ class PathBase(BaseModel):
     zone_vnum: int 
     name: str
     path_type: int
-    coordinates: List[Dict[str, float]]  # Will be converted to/from MySQL LINESTRING
+    coordinates: CoordinateList  # Will be converted to/from MySQL LINESTRING
     path_props: Optional[int] = 0  # Sector type to apply along the path (0-36)
     
     @validator('name')
@@ -73,6 +75,13 @@ class PathBase(BaseModel):
     
     @validator('coordinates')
     def validate_coordinates(cls, v):
+        # Compact [x0, y0, x1, y1, ...] payloads are bounds-checked in one pass
+        if v and is_flat_coordinates(v):
+            v = flat_to_coordinates(v)
+            if len(v) < 2:
+                raise ValueError('Path must have at least 2 coordinate points for valid linestring')
+            return v
+        
         if not v or len(v) < 2:
             raise ValueError('Path must have at least 2 coordinate points for valid linestring')
         
@@ -113,7 +122,7 @@ class PathUpdate(BaseModel):
     zone_vnum: Optional[int] = None
     name: Optional[str] = None
     path_type: Optional[int] = None
-    coordinates: Optional[List[Dict[str, float]]] = None
+    coordinates: Optional[CoordinateList] = None
     path_props: Optional[int] = None
     
     @validator('name')
@@ -135,6 +144,12 @@ class PathUpdate(BaseModel):
     
     @validator('coordinates')
     def validate_coordinates_if_provided(cls, v):
+        if v and is_flat_coordinates(v):
+            v = flat_to_coordinates(v)
+            if len(v) < 2:
+                raise ValueError('Path must have at least 2 coordinate points')
+            return v
+        
         if v is not None:
             if len(v) < 2:
                 raise ValueError('Path must have at least 2 coordinate points')
@@ -158,6 +173,8 @@ class PathResponse(PathBase):
     """
     # Add computed fields for frontend
     path_type_name: Optional[str] = None
+    # Version token for vertex-level PATCH requests
+    geometry_version: Optional[str] = None
     
     class Config:
         from_attributes = True
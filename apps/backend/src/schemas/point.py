@@ -0,0 +1,35 @@
+from pydantic import BaseModel, validator
+from typing import Optional
+from .common import CoordinateList
+from ..services.coordinate_encoding import is_flat_coordinates, flat_to_coordinates
+
+# Upper bound on coordinates per batch lookup request
+MAX_BATCH_POINTS = 100000
+
+class PointBatchRequest(BaseModel):
+    """
+    Coordinates to look up in one request.
+    
+    Accepts [{"x": x0, "y": y0}, ...] or the flat [x0, y0, x1, y1, ...] encoding.
+    """
+    coordinates: CoordinateList
+    radius: Optional[float] = 0.1  # Search radius around each point
+    
+    @validator('coordinates')
+    def validate_coordinates(cls, v):
+        if not v:
+            raise ValueError('At least one coordinate is required')
+        if is_flat_coordinates(v):
+            v = flat_to_coordinates(v)
+        if len(v) > MAX_BATCH_POINTS:
+            raise ValueError(f'Batch lookups are limited to {MAX_BATCH_POINTS} coordinates')
+        for i, coord in enumerate(v):
+            if 'x' not in coord or 'y' not in coord:
+                raise ValueError(f'Coordinate {i} must have x and y values')
+        return v
+    
+    @validator('radius')
+    def validate_radius(cls, v):
+        if v is not None and v < 0:
+            raise ValueError('Radius cannot be negative')
+        return v if v is not None else 0.1
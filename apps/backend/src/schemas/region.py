@@ -1,6 +1,8 @@
 from pydantic import BaseModel, validator
 from typing import List, Dict, Optional
 from datetime import datetime
+from .common import CoordinateList
+from ..services.coordinate_encoding import is_flat_coordinates, flat_to_coordinates
 
 # Region type constants
 REGION_GEOGRAPHIC = 1      # Named areas
@@ -24,7 +26,7 @@ class RegionBase(BaseModel):
     zone_vnum: int
     name: str  # Required in API even though nullable in DB
     region_type: int
-    coordinates: List[Dict[str, float]]  # Will be converted to/from MySQL POLYGON
+    coordinates: CoordinateList  # Will be converted to/from MySQL POLYGON
     region_props: Optional[int] = None
     region_reset_data: str = ""  # Allow empty string (common in existing data)
     region_reset_time: datetime = datetime(2000, 1, 1)  # Default to valid datetime
@@ -71,6 +73,13 @@ class RegionBase(BaseModel):
         if not v:
             raise ValueError('Coordinates are required')
         
+        # Compact [x0, y0, x1, y1, ...] payloads are bounds-checked in one pass
+        if is_flat_coordinates(v):
+            v = flat_to_coordinates(v)
+            if len(v) == 2:
+                raise ValueError('Polygons must have at least 3 points, or use 1 point for landmarks')
+            return v
+        
         # Allow single points (will be treated as point regions/landmarks)
         if len(v) == 1:
             coord = v[0]
@@ -97,7 +106,7 @@ class RegionUpdate(BaseModel):
     zone_vnum: Optional[int] = None
     name: Optional[str] = None
     region_type: Optional[int] = None
-    coordinates: Optional[List[Dict[str, float]]] = None
+    coordinates: Optional[CoordinateList] = None
     region_props: Optional[int] = None
     region_reset_data: Optional[str] = None
     region_reset_time: Optional[datetime] = None
@@ -111,15 +120,81 @@ class RegionUpdate(BaseModel):
                 raise ValueError('Name cannot be longer than 50 characters')
             return v.strip()
         return v
+    
+    @validator('coordinates')
+    def validate_coordinates_if_provided(cls, v):
+        if v is not None and is_flat_coordinates(v):
+            return flat_to_coordinates(v)
+        return v
 
 class RegionResponse(RegionBase):
     # Add human-readable type and sector descriptions
     region_type_name: Optional[str] = None
     sector_type_name: Optional[str] = None
+    # Version token for vertex-level PATCH requests
+    geometry_version: Optional[str] = None
     
     class Config:
         from_attributes = True
 
+class RegionValidationRequest(BaseModel):
+    """Polygon to check with the region validity engine"""
+    coordinates: CoordinateList
+    
+    @validator('coordinates')
+    def validate_coordinates_present(cls, v):
+        if not v:
+            raise ValueError('Coordinates are required')
+        if is_flat_coordinates(v):
+            return flat_to_coordinates(v)
+        for i, coord in enumerate(v):
+            if 'x' not in coord or 'y' not in coord:
+                raise ValueError(f'Coordinate {i} must have x and y values')
+        return v
+
+class RegionValidationResponse(BaseModel):
+    """Result of polygon validation, including the normalized coordinates"""
+    valid: bool
+    errors: List[str]
+    coordinates: List[Dict[str, float]]
+    duplicates_removed: int = 0
+    orientation_fixed: bool = False
+
+class RegionOverlapRequest(BaseModel):
+    """Candidate polygon to test against existing regions"""
+    coordinates: CoordinateList
+    region_type: Optional[int] = None  # Only report regions of this type
+    exclude_vnum: Optional[int] = None  # Skip the region being edited
+    
+    @validator('coordinates')
+    def validate_polygon_coordinates(cls, v):
+        if is_flat_coordinates(v):
+            v = flat_to_coordinates(v)
+        if len(v) < 3:
+            raise ValueError('Candidate polygon must have at least 3 points')
+        for i, coord in enumerate(v):
+            if 'x' not in coord or 'y' not in coord:
+                raise ValueError(f'Coordinate {i} must have x and y values')
+        return v
+
+class RegionOverlap(BaseModel):
+    """An existing region overlapping the candidate polygon"""
+    vnum: int
+    zone_vnum: int
+    name: Optional[str] = None
+    region_type: int
+    region_type_name: str
+    region_props: Optional[int] = None
+    sector_type_name: Optional[str] = None
+    region_area: float
+    intersection_area: float
+
+class RegionOverlapResponse(BaseModel):
+    """Overlapping regions listed in database (processing) order"""
+    candidate_area: float
+    overlaps: List[RegionOverlap]
+    total_intersection_area: float
+
 # Helper function to create a landmark/point region (as geographic type)
 def create_landmark_region(x: float, y: float, name: str, vnum: int, zone_vnum: int, radius: float = 0.2) -> dict:
     """
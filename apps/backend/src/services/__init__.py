@@ -0,0 +1,6 @@
+"""
+Geometry services for the Wildeditor Backend.
+
+Pure-Python helpers shared by the routers that operate on coordinate
+lists rather than on database rows.
+"""
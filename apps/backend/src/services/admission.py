@@ -0,0 +1,120 @@
+import asyncio
+from typing import Dict, List, NamedTuple, Optional
+
+from fastapi import Depends, HTTPException, status
+
+# Cost classes endpoints are admitted under
+FULL_LIST = "full_list"     # Whole-table reads and exports (seconds, large responses)
+BULK_WRITE = "bulk_write"   # Writes: hold a transaction and update every in-memory index
+CHEAP_READ = "cheap_read"   # Latency-sensitive editor lookups
+
+class AdmissionLimit(NamedTuple):
+    concurrency: int        # Requests running at once
+    queue_size: int         # Requests allowed to wait for a slot; more are rejected at once
+    max_wait: float         # Seconds a queued request waits before it is rejected
+    retry_after: int        # Retry-After sent with the 503
+
+# Heavy classes together stay well under the threadpool (40 threads) and the
+# database pool (5 + 10 overflow connections), so cheap reads always find both.
+ADMISSION_LIMITS = {
+    FULL_LIST: AdmissionLimit(concurrency=2, queue_size=4, max_wait=10.0, retry_after=5),
+    BULK_WRITE: AdmissionLimit(concurrency=4, queue_size=16, max_wait=10.0, retry_after=2),
+    CHEAP_READ: AdmissionLimit(concurrency=24, queue_size=96, max_wait=2.0, retry_after=1),
+}
+
+class AdmissionController:
+    """
+    Bounded concurrency for one cost class, enforced on the event loop.
+
+    Requests are admitted before their endpoint is handed to the threadpool
+    or opens a database session, so a burst of exports waits here instead of
+    occupying threads and connections that lookups need. When the wait queue
+    is full, or a request has waited max_wait seconds, it is rejected with
+    503 and Retry-After rather than queueing without bound.
+    """
+
+    def __init__(self, name: str, limit: AdmissionLimit):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.queued = 0
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _reject(self, reason: str) -> HTTPException:
+        self.rejected_total += 1
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server busy ({self.name}: {reason}), retry shortly",
+            headers={"Retry-After": str(self.limit.retry_after)}
+        )
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # One loop per worker; a new loop (tests, reloads) starts from scratch
+            self._semaphore = asyncio.Semaphore(self.limit.concurrency)
+            self._loop = loop
+        if self._semaphore.locked() and self.queued >= self.limit.queue_size:
+            raise self._reject("queue full")
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.limit.max_wait)
+        except asyncio.TimeoutError:
+            raise self._reject("timed out waiting")
+        finally:
+            self.queued -= 1
+        self.active += 1
+        self.admitted_total += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "concurrency": self.limit.concurrency,
+            "queue_size": self.limit.queue_size,
+            "active": self.active,
+            "queued": self.queued,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total
+        }
+
+# Process-wide controllers, one per cost class
+controllers: Dict[str, AdmissionController] = {
+    name: AdmissionController(name, limit) for name, limit in ADMISSION_LIMITS.items()
+}
+
+def admission(cost_class: str):
+    """Route dependency admitting a request under a cost class, e.g. dependencies=[admission(FULL_LIST)]"""
+    controller = controllers[cost_class]
+
+    async def admit():
+        await controller.acquire()
+        try:
+            yield
+        finally:
+            controller.release()
+
+    return Depends(admit)
+
+def render_metrics() -> str:
+    """Admission state in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric, kind, help_text in (
+        ("concurrency", "gauge", "Requests allowed to run at once"),
+        ("queue_size", "gauge", "Requests allowed to wait for a slot"),
+        ("active", "gauge", "Requests currently running"),
+        ("queued", "gauge", "Requests currently waiting for a slot"),
+        ("admitted_total", "counter", "Requests admitted since start"),
+        ("rejected_total", "counter", "Requests rejected with 503 since start"),
+    ):
+        name = f"wildeditor_admission_{metric}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for controller in controllers.values():
+            lines.append(f'{name}{{cost_class="{controller.name}"}} {controller.stats()[metric]}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,128 @@
+import asyncio
+import itertools
+import json
+import threading
+from typing import Dict, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+from . import feature_events
+# Imported first so the snapshot store queues each write before the feed reads what it replaced
+from .world_snapshot import SnapshotStore, snapshot_store
+
+# Messages buffered per client before it is told to resync instead
+MAX_QUEUED_MESSAGES = 256
+
+BBox = Tuple[float, float, float, float]
+
+def _feature_bbox(feature: Optional[dict]) -> Optional[BBox]:
+    coordinates = (feature or {}).get("coordinates") or []
+    if not coordinates:
+        return None
+    xs = [c["x"] for c in coordinates]
+    ys = [c["y"] for c in coordinates]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+def _bbox_tuple(bbox: Optional[Dict[str, float]]) -> Optional[BBox]:
+    if bbox is None:
+        return None
+    return (bbox["min_x"], bbox["min_y"], bbox["max_x"], bbox["max_y"])
+
+def _intersects(a: BBox, b: BBox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+class Subscriber:
+    """One connected editor and the part of the world it is looking at"""
+
+    def __init__(self, subscriber_id: int, loop: asyncio.AbstractEventLoop):
+        self.id = subscriber_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=MAX_QUEUED_MESSAGES)
+        self.bbox: Optional[BBox] = None
+        self.zone_vnum: Optional[int] = None
+
+    def wants(self, zone_vnum: Optional[int], boxes) -> bool:
+        if self.zone_vnum is not None and zone_vnum != self.zone_vnum:
+            return False
+        if self.bbox is None:
+            return True
+        return any(box is not None and _intersects(self.bbox, box) for box in boxes)
+
+    def send(self, message: str) -> None:
+        """Queue a message; must run on the subscriber's event loop"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # The client fell behind: drop its backlog and ask it to refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(json.dumps({"type": "resync"}))
+
+class ChangeFeed:
+    """
+    Fans committed region/path writes out to WebSocket subscribers.
+
+    Each subscriber registers a viewport (bounding box) and optionally a
+    zone. An event is serialized once and queued only for subscribers whose
+    viewport intersects the feature's new geometry or the geometry it had
+    before the write, so a feature moved out of view is still reported.
+    The geometry before the write comes from the shared world snapshot, so
+    it is known after a restart and for features last written by another
+    worker. Work per event is proportional to the number of connected
+    editors, not to the size of the world.
+    """
+
+    def __init__(self, snapshots: SnapshotStore):
+        self.snapshots = snapshots
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._subscribers: Dict[int, Subscriber] = {}
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def register(self, loop: asyncio.AbstractEventLoop) -> Subscriber:
+        subscriber = Subscriber(next(self._ids), loop)
+        with self._lock:
+            self._subscribers[subscriber.id] = subscriber
+        return subscriber
+
+    def unregister(self, subscriber: Subscriber) -> None:
+        with self._lock:
+            self._subscribers.pop(subscriber.id, None)
+
+    def update(self, subscriber: Subscriber, bbox: Optional[BBox], zone_vnum: Optional[int]) -> None:
+        with self._lock:
+            subscriber.bbox = bbox
+            subscriber.zone_vnum = zone_vnum
+
+    def publish(self, kind: str, action: str, vnum: int, feature: Optional[dict]) -> None:
+        """Deliver one change to interested subscribers; safe to call from any thread"""
+        new_bbox = _feature_bbox(feature)
+        old_bbox = _bbox_tuple(self.snapshots.replaced_bbox(kind, vnum))
+        zone_vnum = feature.get("zone_vnum") if feature else None
+
+        with self._lock:
+            targets = [s for s in self._subscribers.values() if s.wants(zone_vnum, (new_bbox, old_bbox))]
+
+        if not targets:
+            return
+
+        message = {"type": "change", "kind": kind, "action": action, "vnum": vnum}
+        if action != feature_events.ACTION_DELETE:
+            message["feature"] = feature
+        payload = json.dumps(jsonable_encoder(message))
+        for subscriber in targets:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.send, payload)
+            except RuntimeError:
+                # Event loop already closed; the connection is gone
+                self.unregister(subscriber)
+
+# Process-wide feed used by the WebSocket endpoint in main.py
+change_feed = ChangeFeed(snapshot_store)
+
+def _on_feature_change(kind: str, action: str, vnum: int, feature: Optional[dict]) -> None:
+    change_feed.publish(kind, action, vnum, feature)
+
+feature_events.subscribe(_on_feature_change)
@@ -0,0 +1,81 @@
+from typing import Dict, List, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from . import feature_events
+
+# Change-log rows read per request; clients keep polling while has_more is set
+MAX_CHANGES_PER_REQUEST = 5000
+
+def record_change(db: Session, kind: str, action: str, vnum: int) -> None:
+    """
+    Append a region/path write to the change log.
+
+    Must be the last statement before the write's commit so the log entry
+    and the data change land in the same transaction (see record_changes).
+    """
+    record_changes(db, [(kind, action, vnum)])
+
+def record_changes(db: Session, changes: Sequence[Tuple[str, str, int]]) -> None:
+    """
+    Append several (kind, action, vnum) writes to the change log in one batched statement.
+
+    The single feature_change_sequence row is locked first and stays locked
+    until the transaction ends, so writers append to the log one transaction
+    at a time and change_id follows commit order: once a change is visible,
+    every smaller change_id has committed or rolled back, and a token never
+    skips a change. Call this last before commit to keep the lock short.
+    """
+    if changes:
+        db.execute(text("""
+            INSERT INTO feature_change_sequence (id, writes) VALUES (1, 1)
+            ON DUPLICATE KEY UPDATE writes = writes + 1
+        """))
+        db.execute(
+            text("INSERT INTO feature_change_log (feature_kind, vnum, action) VALUES (:kind, :vnum, :action)"),
+            [{"kind": kind, "vnum": vnum, "action": action} for kind, action, vnum in changes]
+        )
+
+def parse_token(token: str) -> int:
+    """Turn a client token back into a change id"""
+    if not token.isdigit():
+        raise ValueError(f"Invalid change token '{token}'")
+    return int(token)
+
+def current_token(db: Session) -> str:
+    """Token to start from after a full fetch"""
+    row = db.execute(text("SELECT COALESCE(MAX(change_id), 0) AS change_id FROM feature_change_log")).fetchone()
+    return str(row.change_id if row else 0)
+
+def changes_since(db: Session, since: int, limit: int = MAX_CHANGES_PER_REQUEST) -> Tuple[str, bool, Dict[str, Dict[str, List[int]]]]:
+    """
+    Collapse the change log after `since` into the latest action per feature.
+
+    Returns:
+        Tuple of (new token, has_more, changes) where changes maps each
+        feature kind to {"upserted": [vnums], "deleted": [vnums]}
+    """
+    rows = db.execute(text("""
+        SELECT change_id, feature_kind, vnum, action
+        FROM feature_change_log
+        WHERE change_id > :since
+        ORDER BY change_id
+        LIMIT :limit
+    """), {"since": since, "limit": limit}).fetchall()
+
+    token = since
+    latest: Dict[Tuple[str, int], str] = {}
+    for row in rows:
+        latest[(row.feature_kind, row.vnum)] = row.action
+        token = row.change_id
+
+    changes: Dict[str, Dict[str, List[int]]] = {
+        kind: {"upserted": [], "deleted": []}
+        for kind in (feature_events.FEATURE_REGION, feature_events.FEATURE_PATH)
+    }
+    for (kind, vnum), action in sorted(latest.items()):
+        bucket = "deleted" if action == feature_events.ACTION_DELETE else "upserted"
+        changes[kind][bucket].append(vnum)
+
+    return str(token), len(rows) == limit, changes
@@ -0,0 +1,311 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from . import feature_events
+from .change_log import record_changes
+from .polygon_validity import validate_polygons
+from .revision_history import record_revisions
+from .vertex_patch import geometry_version
+from .wkt import (
+    coordinates_to_polygon_wkt, polygon_wkt_to_coordinates,
+    coordinates_to_linestring_wkt, linestring_wkt_to_coordinates
+)
+from ..schemas.changeset import ChangesetOperation
+from ..schemas.region import RegionCreate, RegionUpdate
+from ..schemas.path import PathCreate, PathUpdate
+
+# Per-operation outcomes
+STATUS_APPLIED = "applied"
+STATUS_CONFLICT = "conflict"
+STATUS_NOT_FOUND = "not_found"
+STATUS_EXISTS = "exists"
+STATUS_INVALID = "invalid"
+STATUS_NOT_APPLIED = "not_applied"
+
+# Failures another session's writes can cause, answered with 409 rather than 400
+CONCURRENCY_FAILURES = (STATUS_CONFLICT, STATUS_NOT_FOUND, STATUS_EXISTS)
+
+FeatureKey = Tuple[str, int]
+# Stored columns of a region/path plus its coordinates as a GET would return them
+Feature = Dict
+State = Dict[FeatureKey, Optional[Feature]]
+
+class _Table:
+    """How one feature kind is validated, read and written"""
+
+    def __init__(self, kind, table, columns, geometry_column, create_model, update_model):
+        self.kind = kind
+        self.table = table
+        self.columns = columns
+        self.geometry_column = geometry_column
+        self.create_model = create_model
+        self.update_model = update_model
+
+    def geometry_wkt(self, coordinates: List[dict]) -> Optional[str]:
+        if not coordinates:
+            return None
+        if self.kind == feature_events.FEATURE_REGION:
+            return coordinates_to_polygon_wkt(coordinates)
+        return coordinates_to_linestring_wkt(coordinates)
+
+    def stored_coordinates(self, coordinates: List[dict]) -> List[dict]:
+        """Coordinates as they read back from MySQL (what geometry_version is taken over)"""
+        wkt = self.geometry_wkt(coordinates)
+        if wkt is None:
+            return []
+        if self.kind == feature_events.FEATURE_REGION:
+            return polygon_wkt_to_coordinates(wkt)
+        return linestring_wkt_to_coordinates(wkt)
+
+TABLES = {
+    feature_events.FEATURE_REGION: _Table(
+        feature_events.FEATURE_REGION, "region_data",
+        ("vnum", "zone_vnum", "name", "region_type", "region_props", "region_reset_data", "region_reset_time"),
+        "region_polygon", RegionCreate, RegionUpdate
+    ),
+    feature_events.FEATURE_PATH: _Table(
+        feature_events.FEATURE_PATH, "path_data",
+        ("vnum", "zone_vnum", "name", "path_type", "path_props"),
+        "path_linestring", PathCreate, PathUpdate
+    ),
+}
+
+class _Rejected(Exception):
+    def __init__(self, status: str, detail: str):
+        self.status = status
+        self.detail = detail
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in error.errors())
+
+def _parse_operation(operation: ChangesetOperation):
+    """Validated fields of a create/update, the _Rejected it fails with, or None for a delete"""
+    table = TABLES[operation.kind]
+    try:
+        if operation.op == "create":
+            return table.create_model(**{"vnum": operation.vnum, **operation.data}).dict()
+        if operation.op == "update":
+            return table.update_model(**operation.data).dict(exclude_unset=True)
+    except ValidationError as e:
+        return _Rejected(STATUS_INVALID, _validation_detail(e))
+    return None
+
+def _check_polygons(operations: Sequence[ChangesetOperation], parsed: List) -> Dict[int, Dict]:
+    """
+    validate_polygon result of every region polygon in the changeset, by
+    operation index. They are checked as one batch, which runs in the
+    geometry pool once the changeset is large enough.
+    """
+    indices = [
+        index for index, (operation, fields) in enumerate(zip(operations, parsed))
+        if operation.kind == feature_events.FEATURE_REGION and isinstance(fields, dict)
+        and fields.get("coordinates") is not None and len(fields["coordinates"]) != 1
+    ]
+    return dict(zip(indices, validate_polygons([parsed[index]["coordinates"] for index in indices])))
+
+def _validated_coordinates(kind: str, coordinates: List[dict], check: Optional[Dict]) -> List[dict]:
+    """Normalized geometry of a create/update, as the single-feature endpoints store it"""
+    if check is not None:
+        if not check["valid"]:
+            raise _Rejected(STATUS_INVALID, f"Invalid polygon: {'; '.join(check['errors'])}")
+        coordinates = check["coordinates"]
+    return TABLES[kind].stored_coordinates(coordinates)
+
+def _apply_operation(operation: ChangesetOperation, current: Optional[Feature],
+                     parsed, check: Optional[Dict]) -> Optional[Feature]:
+    """
+    The feature after one operation, or _Rejected explaining why it cannot
+    apply. parsed and check are the operation's _parse_operation and
+    _check_polygons results.
+    """
+    table = TABLES[operation.kind]
+    label = f"{operation.kind.capitalize()} {operation.vnum}"
+
+    if operation.op == "create":
+        if current is not None:
+            raise _Rejected(STATUS_EXISTS, f"{label} already exists")
+        if isinstance(parsed, _Rejected):
+            raise parsed
+        if parsed["vnum"] != operation.vnum:
+            raise _Rejected(STATUS_INVALID, f"data.vnum {parsed['vnum']} does not match vnum {operation.vnum}")
+        feature = {column: parsed[column] for column in table.columns}
+        feature["coordinates"] = _validated_coordinates(operation.kind, parsed["coordinates"], check)
+        return feature
+
+    if current is None:
+        raise _Rejected(STATUS_NOT_FOUND, f"{label} not found")
+    if operation.base_version is not None and geometry_version(current["coordinates"]) != operation.base_version:
+        raise _Rejected(STATUS_CONFLICT, f"{label} geometry has changed since version {operation.base_version}")
+    if operation.op == "delete":
+        return None
+
+    if isinstance(parsed, _Rejected):
+        raise parsed
+    fields = dict(parsed)
+    if fields.pop("vnum", operation.vnum) != operation.vnum:
+        raise _Rejected(STATUS_INVALID, "vnum cannot be changed in a changeset; delete and create instead")
+    feature = dict(current)
+    feature.update((column, value) for column, value in fields.items() if column in table.columns)
+    if fields.get("coordinates") is not None:
+        feature["coordinates"] = _validated_coordinates(operation.kind, fields["coordinates"], check)
+    return feature
+
+def plan_changeset(operations: Sequence[ChangesetOperation], initial: State) -> Tuple[bool, List[dict], State]:
+    """
+    Apply the operations in order to the features they touch, in memory.
+
+    initial holds the stored state of every feature the operations name
+    (None where absent). Returns (ok, per-operation results, final state);
+    when any operation fails, ok is False and the others are not_applied.
+    """
+    state = dict(initial)
+    results = []
+    ok = True
+    parsed = [_parse_operation(operation) for operation in operations]
+    checks = _check_polygons(operations, parsed)
+    for index, operation in enumerate(operations):
+        key = (operation.kind, operation.vnum)
+        result = {"index": index, "op": operation.op, "kind": operation.kind, "vnum": operation.vnum,
+                  "status": STATUS_APPLIED, "detail": None, "geometry_version": None}
+        results.append(result)
+        if not ok:
+            result["status"] = STATUS_NOT_APPLIED
+            continue
+        try:
+            state[key] = _apply_operation(operation, state[key], parsed[index], checks.get(index))
+        except _Rejected as e:
+            result.update(status=e.status, detail=e.detail)
+            ok = False
+            continue
+        if state[key] is not None:
+            result["geometry_version"] = geometry_version(state[key]["coordinates"])
+
+    if not ok:
+        # Report everything that did not fail as not applied
+        for result in results:
+            if result["status"] == STATUS_APPLIED:
+                result.update(status=STATUS_NOT_APPLIED, geometry_version=None)
+    return ok, results, state
+
+def load_features(db: Session, kind: str, vnums: Sequence[int]) -> State:
+    """Stored state of the given vnums, locked until the transaction ends"""
+    table = TABLES[kind]
+    state: State = {(kind, vnum): None for vnum in vnums}
+    if not vnums:
+        return state
+    query = text(f"""
+        SELECT {', '.join(table.columns)}, ST_AsText({table.geometry_column}) AS geometry_wkt
+        FROM {table.table}
+        WHERE vnum IN :vnums
+        FOR UPDATE
+    """).bindparams(bindparam("vnums", expanding=True))  # nosec B608
+    for row in db.execute(query, {"vnums": list(vnums)}).fetchall():
+        feature = {column: getattr(row, column) for column in table.columns}
+        if kind == feature_events.FEATURE_REGION:
+            feature["coordinates"] = polygon_wkt_to_coordinates(row.geometry_wkt)
+            feature["region_reset_data"] = feature["region_reset_data"] or ""
+        else:
+            feature["coordinates"] = linestring_wkt_to_coordinates(row.geometry_wkt)
+        state[(kind, row.vnum)] = feature
+    return state
+
+def net_changes(initial: State, final: State) -> Tuple[List[FeatureKey], List[FeatureKey], List[FeatureKey]]:
+    """(inserted, updated, deleted) keys between two states; unchanged features are left out"""
+    inserted, updated, deleted = [], [], []
+    for key in sorted(final):
+        before, after = initial.get(key), final[key]
+        if before is None and after is not None:
+            inserted.append(key)
+        elif before is not None and after is None:
+            deleted.append(key)
+        elif before is not None and after != before:
+            updated.append(key)
+    return inserted, updated, deleted
+
+def _row_params(table: _Table, feature: Feature) -> dict:
+    params = {column: feature[column] for column in table.columns}
+    params["geometry_wkt"] = table.geometry_wkt(feature["coordinates"])
+    return params
+
+def write_changes(db: Session, initial: State, final: State) -> List[Tuple[str, str, int]]:
+    """
+    Write the net effect of a changeset with one statement per kind and
+    action (executemany for inserts and updates), plus one revision-history
+    batch per kind and one change-log batch.
+
+    Returns the (kind, action, vnum) changes written.
+    """
+    inserted, updated, deleted = net_changes(initial, final)
+    for kind, table in TABLES.items():
+        columns = ", ".join(table.columns)
+        values = ", ".join(f":{column}" for column in table.columns)
+        gone = [vnum for k, vnum in deleted if k == kind]
+        if gone:
+            db.execute(
+                text(f"DELETE FROM {table.table} WHERE vnum IN :vnums").bindparams(bindparam("vnums", expanding=True)),  # nosec B608
+                {"vnums": gone}
+            )
+        rows = [_row_params(table, final[key]) for key in inserted if key[0] == kind]
+        if rows:
+            db.execute(text(f"""
+                INSERT INTO {table.table} ({columns}, {table.geometry_column})
+                VALUES ({values}, ST_GeomFromText(:geometry_wkt))
+            """), rows)  # nosec B608
+        rows = [_row_params(table, final[key]) for key in updated if key[0] == kind]
+        if rows:
+            # A zero reset time reads back as NULL; keep the stored value then
+            assignments = ", ".join(
+                f"{column} = COALESCE(:{column}, {column})" if column == "region_reset_time" else f"{column} = :{column}"
+                for column in table.columns if column != "vnum"
+            )
+            db.execute(text(f"""
+                UPDATE {table.table}
+                SET {assignments}, {table.geometry_column} = ST_GeomFromText(:geometry_wkt)
+                WHERE vnum = :vnum
+            """), rows)  # nosec B608
+
+    changes = [(kind, feature_events.ACTION_UPSERT, vnum) for kind, vnum in inserted + updated]
+    changes += [(kind, feature_events.ACTION_DELETE, vnum) for kind, vnum in deleted]
+    for kind in TABLES:
+        vnums = [vnum for k, _, vnum in changes if k == kind]
+        # History records the rows as stored, as the single-feature endpoints do
+        stored = load_features(db, kind, vnums)
+        record_revisions(db, kind, {vnum: stored[(kind, vnum)] for vnum in vnums})
+    # Last, as it serializes committing writers
+    record_changes(db, changes)
+    return changes
+
+def event_feature(feature: Feature) -> dict:
+    """Response-shaped dict published to feature listeners"""
+    return {**feature, "geometry_version": geometry_version(feature["coordinates"])}
+
+def apply_changeset(db: Session, operations: Sequence[ChangesetOperation]) -> Tuple[bool, List[dict]]:
+    """
+    Apply a changeset in one transaction.
+
+    The touched rows are read and locked with one query per kind, the
+    operations are checked and applied in memory, and the net result is
+    written in a handful of batched statements before a single commit.
+    Nothing is written if any operation fails. Listeners are notified once
+    per changed feature after the commit.
+    """
+    initial: State = {}
+    for kind in TABLES:
+        vnums = sorted({operation.vnum for operation in operations if operation.kind == kind})
+        initial.update(load_features(db, kind, vnums))
+
+    ok, results, final = plan_changeset(operations, initial)
+    if not ok:
+        db.rollback()
+        return False, results
+
+    changes = write_changes(db, initial, final)
+    db.commit()
+
+    for kind, action, vnum in changes:
+        feature = final[(kind, vnum)] if action == feature_events.ACTION_UPSERT else initial[(kind, vnum)]
+        feature_events.publish(kind, action, vnum, event_feature(feature))
+    return True, results
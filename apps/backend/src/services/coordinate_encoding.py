@@ -0,0 +1,106 @@
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+from fastapi import Header, HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from . import feature_events
+from .geometry_codec import DEFAULT_GRID, KIND_PATHS, KIND_REGIONS, encode_features
+
+# Coordinate formats understood by the region and path endpoints
+COORDINATE_FORMAT_DICT = "dict"   # [{"x": x0, "y": y0}, {"x": x1, "y": y1}, ...] (default)
+COORDINATE_FORMAT_FLAT = "flat"   # [x0, y0, x1, y1, ...]
+COORDINATE_FORMAT_BINARY = "binary"  # Quantized, delta-encoded WGEO payload (see geometry_codec)
+COORDINATE_FORMATS = (COORDINATE_FORMAT_DICT, COORDINATE_FORMAT_FLAT, COORDINATE_FORMAT_BINARY)
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+def is_flat_coordinates(values: Sequence) -> bool:
+    """Check whether a coordinate payload uses the flat [x0, y0, ...] encoding"""
+    return bool(values) and not isinstance(values[0], dict)
+
+def flat_to_coordinates(values: Sequence[float]) -> List[dict]:
+    """
+    Validate a flat [x0, y0, x1, y1, ...] array and expand it to coordinate dicts.
+    
+    Bounds are checked with a single vectorized pass over the whole array
+    instead of validating each vertex individually.
+    
+    Raises:
+        ValueError: If the array has an odd length or values outside the wilderness bounds
+    """
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim != 1 or array.size % 2:
+        raise ValueError('Flat coordinates must be [x0, y0, x1, y1, ...] with an even number of values')
+    
+    in_bounds = np.isfinite(array) & (np.abs(array) <= 1024)
+    if not in_bounds.all():
+        vertex = int(np.argmin(in_bounds)) // 2
+        raise ValueError(f'Coordinate {vertex} outside wilderness bounds (-1024 to +1024)')
+    
+    return [{"x": x, "y": y} for x, y in array.reshape(-1, 2).tolist()]
+
+def coordinates_to_flat(coordinates: Sequence[dict]) -> List[float]:
+    """Collapse coordinate dicts to the flat [x0, y0, x1, y1, ...] encoding"""
+    flat: List[float] = []
+    for coord in coordinates:
+        flat.append(coord['x'])
+        flat.append(coord['y'])
+    return flat
+
+def get_coordinate_format(
+    coordinate_format: Optional[str] = Query(None, description="Coordinate encoding for responses: 'dict' (default), 'flat' ([x0, y0, x1, y1, ...]) or 'binary'"),
+    x_coordinate_format: Optional[str] = Header(None, description="Alternative to the coordinate_format query parameter"),
+    accept: Optional[str] = Header(None)
+) -> str:
+    """
+    Negotiate the response coordinate format.
+    
+    Checks the coordinate_format query parameter, then the X-Coordinate-Format
+    header, then an Accept header asking for application/octet-stream.
+    """
+    requested = coordinate_format or x_coordinate_format
+    if not requested and accept and BINARY_MEDIA_TYPE in accept:
+        requested = COORDINATE_FORMAT_BINARY
+    requested = (requested or COORDINATE_FORMAT_DICT).lower()
+    if requested not in COORDINATE_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Coordinate format must be one of: {', '.join(COORDINATE_FORMATS)}"
+        )
+    return requested
+
+def encode_coordinates(
+    result: Union[BaseModel, List[BaseModel]],
+    kind: str,
+    coordinate_format: str,
+    status_code: int = status.HTTP_200_OK,
+    grid: int = DEFAULT_GRID
+):
+    """
+    Return a region/path response in the negotiated coordinate format.
+    
+    The default dict format returns the models unchanged so FastAPI applies the
+    declared response_model. The flat and binary formats are serialized
+    directly, since they do not match the dict-based response schema.
+    kind (feature_events.FEATURE_REGION or FEATURE_PATH) is written into
+    binary payloads, so an empty list still decodes as the right kind.
+    """
+    if coordinate_format == COORDINATE_FORMAT_BINARY:
+        items = result if isinstance(result, list) else [result]
+        codec_kind = KIND_PATHS if kind == feature_events.FEATURE_PATH else KIND_REGIONS
+        return Response(content=encode_features(items, codec_kind, grid), media_type=BINARY_MEDIA_TYPE, status_code=status_code)
+    
+    if coordinate_format != COORDINATE_FORMAT_FLAT:
+        return result
+    
+    def encode(item: BaseModel) -> dict:
+        data = jsonable_encoder(item, exclude={'coordinates'})
+        data["coordinates"] = coordinates_to_flat(item.coordinates)
+        return data
+    
+    if isinstance(result, list):
+        return JSONResponse(content=[encode(item) for item in result], status_code=status_code)
+    return JSONResponse(content=encode(result), status_code=status_code)
@@ -0,0 +1,38 @@
+from typing import Callable, List, Optional
+
+# Feature kinds and actions published after region/path writes commit
+FEATURE_REGION = "region"
+FEATURE_PATH = "path"
+ACTION_UPSERT = "upsert"
+ACTION_DELETE = "delete"
+
+# listener(kind, action, vnum, feature) - feature is the response dict
+# (vnum, zone_vnum, name, type, props, coordinates, ...) as stored after an
+# upsert, or as it was just before a delete (None if unknown)
+FeatureListener = Callable[[str, str, int, Optional[dict]], None]
+
+_listeners: List[FeatureListener] = []
+
+def subscribe(listener: FeatureListener) -> None:
+    """Register a callback for committed region/path changes"""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+def unsubscribe(listener: FeatureListener) -> None:
+    """Remove a previously registered callback"""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+def publish(kind: str, action: str, vnum: int, feature: Optional[dict] = None) -> None:
+    """
+    Notify listeners that a region or path write has been committed.
+    
+    Listeners keep in-memory indexes in step with the database. A failing
+    listener must never fail the write that triggered it, so errors are
+    logged and the remaining listeners still run.
+    """
+    for listener in list(_listeners):
+        try:
+            listener(kind, action, vnum, feature)
+        except Exception as e:
+            print(f"Warning: {kind} {action} listener failed for vnum {vnum}: {e}")
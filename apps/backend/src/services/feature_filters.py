@@ -0,0 +1,57 @@
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Query
+
+from . import feature_events
+
+# Geometry column of each feature kind
+GEOMETRY_COLUMNS = {
+    feature_events.FEATURE_REGION: "region_polygon",
+    feature_events.FEATURE_PATH: "path_linestring",
+}
+
+def _filter_values(query: Query, column, values: Optional[List[int]]) -> Query:
+    # None means "not filtered"; 0 is a real value and must not be skipped
+    if values is None:
+        return query
+    if len(values) == 1:
+        return query.filter(column == values[0])
+    return query.filter(column.in_(values))
+
+def apply_feature_filters(
+    query: Query,
+    model,
+    kind: str,
+    types: Optional[List[int]] = None,
+    zones: Optional[List[int]] = None,
+    props: Optional[List[int]] = None,
+    vnum_min: Optional[int] = None,
+    vnum_max: Optional[int] = None,
+    has_geometry: Optional[bool] = None
+) -> Query:
+    """
+    Add the list endpoint filters to a region or path query.
+    
+    Every filter is a plain equality, IN or range predicate on an indexed
+    column, so MySQL can seek on the (zone_vnum, type, vnum) and
+    (type, props, vnum) composite indexes instead of reading the table.
+    Results are ordered by vnum, the order the game processes features in.
+    """
+    if vnum_min is not None and vnum_max is not None and vnum_min > vnum_max:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="vnum_min must not be greater than vnum_max"
+        )
+    
+    query = _filter_values(query, model.zone_vnum, zones)
+    query = _filter_values(query, getattr(model, f"{kind}_type"), types)
+    query = _filter_values(query, getattr(model, f"{kind}_props"), props)
+    if vnum_min is not None:
+        query = query.filter(model.vnum >= vnum_min)
+    if vnum_max is not None:
+        query = query.filter(model.vnum <= vnum_max)
+    if has_geometry is not None:
+        geometry = getattr(model, GEOMETRY_COLUMNS[kind])
+        query = query.filter(geometry.isnot(None) if has_geometry else geometry.is_(None))
+    return query.order_by(model.vnum)
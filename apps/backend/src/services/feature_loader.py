@@ -0,0 +1,43 @@
+from typing import Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .wkt import polygon_wkt_to_coordinates, linestring_wkt_to_coordinates
+
+def load_region_features(db: Session) -> List[Dict]:
+    """
+    Read every region as a response-shaped dict, ordered by vnum.
+
+    Only the fields the in-memory indexes need are included: vnum,
+    zone_vnum, name, region_type, region_props and coordinates.
+    """
+    rows = db.execute(text("""
+        SELECT vnum, zone_vnum, name, region_type, region_props, ST_AsText(region_polygon) as polygon_wkt
+        FROM region_data
+        ORDER BY vnum
+    """)).fetchall()
+    return [{
+        "vnum": row.vnum,
+        "zone_vnum": row.zone_vnum,
+        "name": row.name,
+        "region_type": row.region_type,
+        "region_props": row.region_props,
+        "coordinates": polygon_wkt_to_coordinates(row.polygon_wkt)
+    } for row in rows]
+
+def load_path_features(db: Session) -> List[Dict]:
+    """Read every path as a response-shaped dict, ordered by vnum"""
+    rows = db.execute(text("""
+        SELECT vnum, zone_vnum, name, path_type, path_props, ST_AsText(path_linestring) as linestring_wkt
+        FROM path_data
+        ORDER BY vnum
+    """)).fetchall()
+    return [{
+        "vnum": row.vnum,
+        "zone_vnum": row.zone_vnum,
+        "name": row.name,
+        "path_type": row.path_type,
+        "path_props": row.path_props,
+        "coordinates": linestring_wkt_to_coordinates(row.linestring_wkt)
+    } for row in rows]
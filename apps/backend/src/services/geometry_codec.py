@@ -0,0 +1,205 @@
+"""
+Binary geometry transport format.
+
+Wilderness coordinates are nearly always integers or quarter-units, so each
+vertex is quantized to a grid, delta-encoded against the previous vertex of
+the same feature and written as a zigzag varint. Most deltas fit in one byte.
+
+Layout (all integers are unsigned LEB128 varints):
+
+    magic       4 bytes, b"WGEO"
+    version     1 byte
+    kind        1 byte (1 = regions, 2 = paths), always set by the caller, so
+                an empty list still says what it is a list of
+    grid        quantization steps per map unit
+    count       number of features
+    count x     zigzag(vnum), zigzag(zone_vnum), zigzag(type),
+                props (0 = null, otherwise zigzag(props) + 1),
+                name length in bytes, vertex count,
+                geometry version (0 = none, otherwise the CRC32 + 1),
+                reset time (0 = null, otherwise zigzag(Unix seconds, UTC) + 1),
+                reset data length in bytes (reset fields are 0 for paths)
+    vertices    per feature: zigzag(x0), zigzag(y0), zigzag(dx1), zigzag(dy1), ...
+    names       UTF-8 names concatenated in feature order
+    reset data  UTF-8 region_reset_data concatenated in feature order
+
+Every stored field survives the round trip. Only the display names derived
+from type and props (region_type_name, sector_type_name, path_type_name)
+are left out; clients look them up from GET /regions/types and /paths/types.
+
+The frontend decoder lives in apps/frontend/src/services/geometryCodec.ts.
+"""
+import calendar
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"WGEO"
+FORMAT_VERSION = 2
+KIND_REGIONS = 1
+KIND_PATHS = 2
+
+# Quarter-unit grid matches the precision used by existing wilderness data
+DEFAULT_GRID = 4
+MAX_GRID = 1000
+
+# Unsigned varints per feature in the attribute section
+ATTRIBUTE_COUNT = 9
+
+def _zigzag(values: np.ndarray) -> np.ndarray:
+    """Map signed integers to unsigned so small magnitudes stay small"""
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """Encode an array of unsigned integers as LEB128 varints in one vectorized pass"""
+    remaining = np.asarray(values, dtype=np.uint64).copy()
+    groups = np.empty((remaining.size, 10), dtype=np.uint8)
+    lengths = np.ones(remaining.size, dtype=np.int64)
+
+    for i in range(10):
+        low_bits = (remaining & np.uint64(0x7F)).astype(np.uint8)
+        remaining >>= np.uint64(7)
+        more = remaining > 0
+        groups[:, i] = low_bits | (more.astype(np.uint8) << 7)
+        lengths += more
+
+    mask = np.arange(10) < lengths[:, None]
+    return groups[mask].tobytes()
+
+def decode_varints(data: bytes, offset: int, count: int) -> Tuple[List[int], int]:
+    """Read `count` varints starting at `offset`, returning the values and the new offset"""
+    values = []
+    for _ in range(count):
+        result = 0
+        shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                break
+            shift += 7
+        values.append(result)
+    return values, offset
+
+def _optional(value: Optional[int]) -> int:
+    """0 for null, otherwise zigzag(value) + 1"""
+    return 0 if value is None else int(_zigzag(np.array([value]))[0]) + 1
+
+def _from_optional(value: int) -> Optional[int]:
+    return None if value == 0 else _unzigzag(value - 1)
+
+def encode_features(features: Sequence[Dict], kind: int, grid: int = DEFAULT_GRID) -> bytes:
+    """
+    Encode region or path responses into the binary transport format.
+
+    Args:
+        features: Dicts or models with vnum, zone_vnum, region_type/path_type,
+                  region_props/path_props, name and coordinates, plus
+                  geometry_version and the region reset fields when present
+        kind: KIND_REGIONS or KIND_PATHS
+        grid: Quantization steps per map unit (coordinates are rounded to 1/grid)
+    """
+    if kind not in (KIND_REGIONS, KIND_PATHS):
+        raise ValueError(f"Unknown geometry kind {kind}")
+    prefix = "region" if kind == KIND_REGIONS else "path"
+
+    attributes = np.zeros((len(features), ATTRIBUTE_COUNT), dtype=np.uint64)
+    names: List[bytes] = []
+    reset_data: List[bytes] = []
+    flat: List[float] = []
+
+    for i, feature in enumerate(features):
+        if not isinstance(feature, dict):
+            feature = feature.dict()
+        name = (feature.get("name") or "").encode("utf-8")
+        names.append(name)
+        data = (feature.get("region_reset_data") or "").encode("utf-8") if kind == KIND_REGIONS else b""
+        reset_data.append(data)
+        reset_time: Optional[datetime] = feature.get("region_reset_time") if kind == KIND_REGIONS else None
+        version = feature.get("geometry_version")
+        coordinates = feature.get("coordinates") or []
+
+        signed = np.array([feature["vnum"], feature["zone_vnum"], feature[f"{prefix}_type"]], dtype=np.int64)
+        attributes[i, 0:3] = _zigzag(signed)
+        attributes[i, 3] = _optional(feature.get(f"{prefix}_props"))
+        attributes[i, 4] = len(name)
+        attributes[i, 5] = len(coordinates)
+        attributes[i, 6] = 0 if not version else int(version, 16) + 1
+        attributes[i, 7] = _optional(None if reset_time is None else calendar.timegm(reset_time.timetuple()))
+        attributes[i, 8] = len(data)
+        for coord in coordinates:
+            flat.append(coord["x"])
+            flat.append(coord["y"])
+
+    # Quantize every vertex, then delta-encode within each feature
+    quantized = np.rint(np.asarray(flat, dtype=np.float64) * grid).astype(np.int64).reshape(-1, 2)
+    deltas = np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+    starts = np.cumsum(attributes[:, 5].astype(np.int64)) - attributes[:, 5].astype(np.int64)
+    starts = starts[attributes[:, 5] > 0]
+    deltas[starts] = quantized[starts]
+
+    stream = np.concatenate([
+        np.array([grid, len(features)], dtype=np.uint64),
+        attributes.reshape(-1),
+        _zigzag(deltas.reshape(-1))
+    ])
+    return MAGIC + bytes([FORMAT_VERSION, kind]) + encode_varints(stream) + b"".join(names) + b"".join(reset_data)
+
+def decode_features(data: bytes) -> Tuple[int, int, List[Dict]]:
+    """
+    Decode a binary geometry payload.
+
+    Returns:
+        Tuple of (kind, grid, features) where features are dicts with vnum,
+        zone_vnum, type, props, name, geometry_version and coordinates, plus
+        reset_data and reset_time (naive UTC datetime) for regions
+    """
+    if data[:4] != MAGIC:
+        raise ValueError("Not a WGEO geometry payload")
+    if data[4] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported WGEO version {data[4]}")
+    kind = data[5]
+
+    (grid, count), offset = decode_varints(data, 6, 2)
+    attributes, offset = decode_varints(data, offset, count * ATTRIBUTE_COUNT)
+    rows = [attributes[i * ATTRIBUTE_COUNT:(i + 1) * ATTRIBUTE_COUNT] for i in range(count)]
+    deltas, offset = decode_varints(data, offset, sum(row[5] for row in rows) * 2)
+
+    features = []
+    cursor = 0
+    for vnum, zone_vnum, feature_type, props, name_length, vertex_count, version, _, _ in rows:
+        name = data[offset:offset + name_length].decode("utf-8")
+        offset += name_length
+
+        coordinates = []
+        x = y = 0
+        for j in range(vertex_count):
+            dx, dy = _unzigzag(deltas[cursor]), _unzigzag(deltas[cursor + 1])
+            cursor += 2
+            x, y = (dx, dy) if j == 0 else (x + dx, y + dy)
+            coordinates.append({"x": x / grid, "y": y / grid})
+
+        features.append({
+            "vnum": _unzigzag(vnum),
+            "zone_vnum": _unzigzag(zone_vnum),
+            "type": _unzigzag(feature_type),
+            "props": _from_optional(props),
+            "name": name,
+            "geometry_version": None if version == 0 else f"{version - 1:08x}",
+            "coordinates": coordinates
+        })
+
+    if kind == KIND_REGIONS:
+        for feature, row in zip(features, rows):
+            reset_time, reset_length = _from_optional(row[7]), row[8]
+            feature["reset_data"] = data[offset:offset + reset_length].decode("utf-8")
+            feature["reset_time"] = None if reset_time is None else datetime.fromtimestamp(reset_time, timezone.utc).replace(tzinfo=None)
+            offset += reset_length
+
+    return kind, grid, features
@@ -0,0 +1,215 @@
+"""
+Process pool for CPU-bound geometry kernels.
+
+Rasterizing and validating polygons is pure-Python work that holds the GIL,
+so inside one worker full-world passes run on one core and stall every
+other request meanwhile. Kernels run here over a batch of
+features stored as columnar arrays (coordinates, offsets and per-feature
+columns, as in the world snapshot) and are split across a pool of
+processes:
+
+- The arrays are copied once into a shared-memory block that every process
+  maps; each task carries only the block name, the array layout and the
+  range of features it covers, so nothing is pickled per feature.
+- Batches below INLINE_VERTEX_LIMIT vertices, or any batch when the pool is
+  disabled (GEOMETRY_PROCESSES=1) or unavailable, run in the calling
+  thread, where process start-up and IPC would cost more than the work.
+
+Kernels must be module-level functions taking (arrays, start, stop, *args)
+and returning a picklable, preferably compact, result for features
+start..stop-1.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Batches with fewer vertices than this run inline
+INLINE_VERTEX_LIMIT = 50000
+
+# Tasks per process, so uneven chunks still finish together
+CHUNKS_PER_PROCESS = 4
+
+# Chunks an inline run is split into when progress is reported
+INLINE_PROGRESS_CHUNKS = 20
+
+Arrays = Dict[str, np.ndarray]
+Kernel = Callable[..., Any]
+# (name, dtype, shape, byte offset) of each array in a shared block
+ArrayLayout = List[Tuple[str, str, Tuple[int, ...], int]]
+
+def default_processes() -> int:
+    """GEOMETRY_PROCESSES, or one process per CPU this worker may use"""
+    configured = int(os.getenv("GEOMETRY_PROCESSES", "0"))
+    if configured > 0:
+        return configured
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+class SharedArrays:
+    """Copy of a set of NumPy arrays in one shared-memory block, unlinked on exit"""
+
+    def __init__(self, arrays: Arrays):
+        self.layout: ArrayLayout = []
+        size = 0
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            self.layout.append((name, array.dtype.str, array.shape, size))
+            size += array.nbytes + (-array.nbytes % 8)
+        self.shm = SharedMemory(create=True, size=max(size, 1))
+        for (name, dtype, shape, offset), array in zip(self.layout, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=offset)[...] = array
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+def _attach(name: str) -> SharedMemory:
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 attaching registers the block with this process's
+        # resource tracker, which would unlink it when the process exits
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+def _run_shared(kernel: Kernel, name: str, layout: ArrayLayout, start: int, stop: int, args: tuple) -> Any:
+    """Pool task: map the shared block and run the kernel on one chunk"""
+    shm = _attach(name)
+    try:
+        arrays = {key: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+                  for key, dtype, shape, offset in layout}
+        result = kernel(arrays, start, stop, *args)
+        del arrays
+        return result
+    finally:
+        shm.close()
+
+def chunk_bounds(weights: np.ndarray, chunks: int) -> List[Tuple[int, int]]:
+    """Split range(len(weights)) into up to `chunks` contiguous ranges of similar total weight"""
+    count = len(weights)
+    if count == 0:
+        return []
+    cumulative = np.cumsum(weights, dtype=np.float64)
+    targets = cumulative[-1] * np.arange(1, chunks) / chunks
+    # Cut after the feature that reaches each target share of the total
+    cuts = np.unique(np.concatenate([[0], np.searchsorted(cumulative, targets) + 1, [count]]))
+    return [(int(start), int(stop)) for start, stop in zip(cuts[:-1], cuts[1:]) if start < stop]
+
+class GeometryPool:
+    """
+    Runs geometry kernels over columnar batches, across processes when the
+    batch is large enough to be worth it.
+
+    The pool is started on first use and shared by every thread of the
+    worker; a pool that cannot start or breaks is replaced by inline
+    execution with a warning rather than failing the request.
+    """
+
+    def __init__(self, processes: Optional[int] = None, inline_vertex_limit: int = INLINE_VERTEX_LIMIT):
+        self.processes = processes or default_processes()
+        self.inline_vertex_limit = inline_vertex_limit
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._disabled = self.processes <= 1
+
+    @property
+    def parallel(self) -> bool:
+        return not self._disabled
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        with self._lock:
+            if self._executor is None and not self._disabled:
+                methods = multiprocessing.get_all_start_methods()
+                # Forking a threaded server process is unsafe
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+            return self._executor
+
+    def _disable(self, reason: Exception) -> None:
+        print(f"Warning: geometry process pool unavailable, running geometry inline: {reason}")
+        with self._lock:
+            self._disabled = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, kernel: Kernel, arrays: Arrays, weights: Sequence[int], args: tuple = (),
+            progress: Optional[Callable[[int, int], None]] = None) -> List[Any]:
+        """
+        Run `kernel` over features 0..len(weights)-1 and return its results
+        per chunk, in feature order.
+
+        weights gives each feature's cost (usually its vertex count) and is
+        used to choose between inline and pooled execution and to balance
+        the chunks. progress(done, total) is called as chunks complete.
+        """
+        weights = np.asarray(weights)
+        count = len(weights)
+        if count == 0:
+            return []
+        executor = None
+        if self.parallel and weights.sum() >= self.inline_vertex_limit:
+            try:
+                executor = self._get_executor()
+            except (OSError, ValueError) as e:
+                self._disable(e)
+        if executor is None:
+            # Inline, still in chunks when the caller wants progress (and a chance to cancel)
+            results = []
+            for start, stop in chunk_bounds(weights, INLINE_PROGRESS_CHUNKS if progress else 1):
+                results.append(kernel(arrays, start, stop, *args))
+                if progress:
+                    progress(stop, count)
+            return results
+
+        bounds = chunk_bounds(weights, self.processes * CHUNKS_PER_PROCESS)
+        try:
+            with SharedArrays(arrays) as shared:
+                futures = {
+                    executor.submit(_run_shared, kernel, shared.name, shared.layout, start, stop, args): i
+                    for i, (start, stop) in enumerate(bounds)
+                }
+                results: List[Any] = [None] * len(bounds)
+                done = 0
+                try:
+                    for future in as_completed(futures):
+                        i = futures[future]
+                        results[i] = future.result()
+                        done += bounds[i][1] - bounds[i][0]
+                        if progress:
+                            progress(done, count)
+                except BaseException:
+                    # e.g. a cancelled job: drop chunks that have not started
+                    for future in futures:
+                        future.cancel()
+                    raise
+                return results
+        except (BrokenProcessPool, OSError) as e:
+            self._disable(e)
+            return self.run(kernel, arrays, weights, args, progress)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+# Process-wide pool shared by the geometry services
+geometry_pool = GeometryPool()
@@ -0,0 +1,404 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import bindparam, text
+
+from . import feature_events
+from .feature_loader import load_region_features, load_path_features
+
+# Job states; queued and running jobs are still owned by a worker process
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED)
+
+# Jobs running at once per worker process; more wait in the queue
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+# Jobs allowed to wait per worker process; more are rejected with 503
+MAX_QUEUED_JOBS = 16
+
+# A worker refreshes heartbeat_at of the jobs it holds this often; jobs not
+# refreshed for STALE_JOB_SECONDS belonged to a worker that died and are failed
+HEARTBEAT_SECONDS = 10
+STALE_JOB_SECONDS = 60
+
+# Finished results are deleted after this long
+RESULT_RETENTION_SECONDS = 24 * 3600
+
+DEFAULT_RESULTS_DIR = os.path.join(tempfile.gettempdir(), "wildeditor-jobs")
+
+class JobCancelled(Exception):
+    """Raised inside a job when it has been cancelled or the worker is stopping"""
+
+class JobQueueFull(Exception):
+    """Raised when a worker already holds as many jobs as it can queue"""
+
+class JobContext:
+    """
+    What a job handler gets: its params, a database session, the file its
+    result is written to, and progress() to report how far it has got.
+    """
+
+    def __init__(self, runner: "JobRunner", job_id: int, params: dict, db, output: BinaryIO):
+        self.job_id = job_id
+        self.params = params
+        self.db = db
+        self.output = output
+        self._runner = runner
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        """
+        Record progress (0-1) and stop the job if it was cancelled.
+
+        Handlers call this between chunks of work; it raises JobCancelled
+        when a cancel was requested (from any worker) or this worker is
+        shutting down.
+        """
+        cancel_requested = self._runner.store.progress(self.job_id, max(0.0, min(1.0, fraction)), message)
+        if cancel_requested or self._runner.stopping:
+            raise JobCancelled()
+
+JobHandler = Callable[[JobContext], Optional[str]]
+
+class JobType(NamedTuple):
+    handler: JobHandler     # Writes the result to context.output; returns a final message
+    content_type: str       # Content type of the downloaded result
+    extension: str          # File extension of the downloaded result
+    description: str
+
+# Job types that can be started with POST /api/jobs
+JOB_TYPES: Dict[str, JobType] = {}
+
+def job_type(name: str, content_type: str, extension: str, description: str):
+    """Register a job handler, e.g. @job_type("export_world", "application/x-ndjson", "ndjson", "Export ...")"""
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_TYPES[name] = JobType(handler, content_type, extension, description)
+        return handler
+    return register
+
+def _job_to_dict(row) -> dict:
+    return {
+        "job_id": row.job_id,
+        "job_type": row.job_type,
+        "status": row.status,
+        "params": json.loads(row.params) if row.params else {},
+        "progress": float(row.progress),
+        "message": row.message,
+        "error": row.error,
+        "result_size": row.result_size,
+        "cancel_requested": bool(row.cancel_requested),
+        "created_at": row.created_at,
+        "started_at": row.started_at,
+        "finished_at": row.finished_at
+    }
+
+_JOB_COLUMNS = """
+    job_id, job_type, status, params, progress, message, error, result_size,
+    cancel_requested, created_at, started_at, finished_at
+"""
+
+class SqlJobStore:
+    """
+    Job rows in the background_job table, shared by every worker.
+
+    Each statement runs in its own short session and commits at once, so
+    progress is visible to the worker that answers GET /api/jobs/{id} and a
+    cancel reaches the worker running the job.
+    """
+
+    def __init__(self, session_factory: Callable):
+        self.session_factory = session_factory
+
+    def _execute(self, statement, params: dict, fetch: Optional[Callable] = None):
+        db = self.session_factory()
+        try:
+            result = db.execute(text(statement) if isinstance(statement, str) else statement, params)
+            value = fetch(result) if fetch else result
+            db.commit()
+            return value
+        finally:
+            db.close()
+
+    def create(self, job_type_name: str, params: dict) -> int:
+        return self._execute("""
+            INSERT INTO background_job (job_type, status, params, heartbeat_at)
+            VALUES (:job_type, :status, :params, NOW(6))
+        """, {"job_type": job_type_name, "status": JOB_QUEUED, "params": json.dumps(params)},
+            fetch=lambda result: result.lastrowid)
+
+    def start(self, job_id: int) -> bool:
+        """Mark a queued job running; False if it was cancelled while queued"""
+        return self._execute("""
+            UPDATE background_job
+            SET status = :running, started_at = NOW(6), heartbeat_at = NOW(6)
+            WHERE job_id = :job_id AND status = :queued
+        """, {"job_id": job_id, "running": JOB_RUNNING, "queued": JOB_QUEUED},
+            fetch=lambda result: result.rowcount == 1)
+
+    def progress(self, job_id: int, fraction: float, message: Optional[str]) -> bool:
+        """Record progress; returns whether a cancel has been requested"""
+        db = self.session_factory()
+        try:
+            db.execute(text("""
+                UPDATE background_job
+                SET progress = :progress, message = COALESCE(:message, message), heartbeat_at = NOW(6)
+                WHERE job_id = :job_id
+            """), {"job_id": job_id, "progress": fraction, "message": message})
+            row = db.execute(text("SELECT cancel_requested FROM background_job WHERE job_id = :job_id"),
+                             {"job_id": job_id}).fetchone()
+            db.commit()
+            return bool(row and row.cancel_requested)
+        finally:
+            db.close()
+
+    def finish(self, job_id: int, status: str, message: Optional[str] = None,
+               error: Optional[str] = None, result_size: Optional[int] = None) -> None:
+        self._execute("""
+            UPDATE background_job
+            SET status = :status, message = COALESCE(:message, message), error = :error,
+                result_size = :result_size, finished_at = NOW(6),
+                progress = CASE WHEN :status = 'succeeded' THEN 1 ELSE progress END
+            WHERE job_id = :job_id
+        """, {"job_id": job_id, "status": status, "message": message, "error": error, "result_size": result_size})
+
+    def heartbeat(self, job_ids: List[int]) -> None:
+        if job_ids:
+            self._execute(
+                text("UPDATE background_job SET heartbeat_at = NOW(6) WHERE job_id IN :job_ids")
+                .bindparams(bindparam("job_ids", expanding=True)),
+                {"job_ids": job_ids}
+            )
+
+    def expire_stale(self) -> None:
+        """Fail jobs whose worker stopped refreshing them (crashed or killed)"""
+        self._execute("""
+            UPDATE background_job
+            SET status = :failed, error = 'Interrupted: the worker running this job stopped', finished_at = NOW(6)
+            WHERE status IN (:queued, :running) AND heartbeat_at < NOW(6) - INTERVAL :stale SECOND
+        """, {"failed": JOB_FAILED, "queued": JOB_QUEUED, "running": JOB_RUNNING, "stale": STALE_JOB_SECONDS})
+
+    def get(self, job_id: int) -> Optional[dict]:
+        row = self._execute(f"SELECT {_JOB_COLUMNS} FROM background_job WHERE job_id = :job_id",
+                            {"job_id": job_id}, fetch=lambda result: result.fetchone())
+        return _job_to_dict(row) if row else None
+
+    def list(self, limit: int) -> List[dict]:
+        rows = self._execute(f"SELECT {_JOB_COLUMNS} FROM background_job ORDER BY job_id DESC LIMIT :limit",
+                             {"limit": limit}, fetch=lambda result: result.fetchall())
+        return [_job_to_dict(row) for row in rows]
+
+    def request_cancel(self, job_id: int) -> None:
+        """Cancel a queued job at once; ask a running one to stop at its next progress()"""
+        # MySQL applies SET assignments left to right, so finished_at sees the new status
+        self._execute("""
+            UPDATE background_job
+            SET cancel_requested = 1,
+                status = CASE WHEN status = :queued THEN :cancelled ELSE status END,
+                finished_at = CASE WHEN status = :cancelled THEN NOW(6) ELSE finished_at END
+            WHERE job_id = :job_id AND status IN (:queued, :running)
+        """, {"job_id": job_id, "queued": JOB_QUEUED, "running": JOB_RUNNING, "cancelled": JOB_CANCELLED})
+
+class JobRunner:
+    """
+    Runs long operations (exports, snapshot and index rebuilds) outside of
+    request handlers.
+
+    POST /api/jobs records the job and returns at once; the job then runs on
+    this worker's bounded thread pool, independent of the request and its
+    client. Progress, cancellation and the result are shared through the job
+    table and the results directory, so any worker can answer for any job.
+    """
+
+    def __init__(self, store, workers: int = JOB_WORKERS, max_queued: int = MAX_QUEUED_JOBS,
+                 results_dir: Optional[str] = None, session_factory: Optional[Callable] = None):
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.results_dir = results_dir or os.getenv("JOB_RESULTS_DIR", DEFAULT_RESULTS_DIR)
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._held: Dict[int, Any] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    @property
+    def held(self) -> int:
+        """Jobs queued or running on this worker"""
+        return len(self._held)
+
+    def result_path(self, job_id: int) -> str:
+        return os.path.join(self.results_dir, f"job-{job_id}.result")
+
+    def submit(self, job_type_name: str, params: dict) -> dict:
+        """Record a job and queue it on this worker; returns the job row"""
+        if job_type_name not in JOB_TYPES:
+            raise ValueError(f"Unknown job type '{job_type_name}'")
+        with self._lock:
+            if self._stop.is_set():
+                raise JobQueueFull("Worker is shutting down")
+            if len(self._held) >= self.workers + self.max_queued:
+                raise JobQueueFull(f"{len(self._held)} jobs already queued or running on this worker")
+            if self._executor is None:
+                os.makedirs(self.results_dir, exist_ok=True)
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+                self._heartbeat = threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+                self._heartbeat.start()
+            job_id = self.store.create(job_type_name, params)
+            self._held[job_id] = self._executor.submit(self._run, job_id, JOB_TYPES[job_type_name], params)
+        self._prune_results()
+        return self.store.get(job_id)
+
+    def get(self, job_id: int) -> Optional[dict]:
+        self.store.expire_stale()
+        return self.store.get(job_id)
+
+    def _run(self, job_id: int, job: JobType, params: dict) -> None:
+        try:
+            if self._stop.is_set() or not self.store.start(job_id):
+                return
+            self._execute(job_id, job, params)
+        finally:
+            with self._lock:
+                self._held.pop(job_id, None)
+
+    def _execute(self, job_id: int, job: JobType, params: dict) -> None:
+        path = self.result_path(job_id)
+        partial = path + ".part"
+        db = self.session_factory() if self.session_factory else None
+        try:
+            with open(partial, "wb") as output:
+                message = job.handler(JobContext(self, job_id, params, db, output))
+            os.replace(partial, path)
+            self.store.finish(job_id, JOB_SUCCEEDED, message=message, result_size=os.path.getsize(path))
+        except JobCancelled:
+            if self._stop.is_set():
+                self.store.finish(job_id, JOB_FAILED, error="Interrupted: the worker was shut down")
+            else:
+                self.store.finish(job_id, JOB_CANCELLED)
+        except Exception as e:
+            print(f"Warning: job {job_id} failed: {e}")
+            self.store.finish(job_id, JOB_FAILED, error=str(e))
+        finally:
+            if db is not None:
+                db.close()
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stop.wait(HEARTBEAT_SECONDS):
+            with self._lock:
+                job_ids = list(self._held)
+            try:
+                self.store.heartbeat(job_ids)
+            except Exception as e:
+                print(f"Warning: could not refresh job heartbeats: {e}")
+
+    def _prune_results(self) -> None:
+        cutoff = time.time() - RESULT_RETENTION_SECONDS
+        try:
+            for name in os.listdir(self.results_dir):
+                path = os.path.join(self.results_dir, name)
+                if name.startswith("job-") and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+        except OSError as e:
+            print(f"Warning: could not prune old job results: {e}")
+
+    def shutdown(self) -> None:
+        """Stop running jobs at their next progress() and fail the queued ones"""
+        with self._lock:
+            self._stop.set()
+            executor, self._executor = self._executor, None
+            queued = [job_id for job_id, future in self._held.items() if future.cancel()]
+        for job_id in queued:
+            self._held.pop(job_id, None)
+            try:
+                self.store.finish(job_id, JOB_FAILED, error="Interrupted: the worker was shut down")
+            except Exception as e:
+                print(f"Warning: could not mark job {job_id} interrupted: {e}")
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+def _session_factory():
+    from ..config.config_database import SessionLocal, init_engine
+    init_engine()
+    return SessionLocal()
+
+# Process-wide runner used by the jobs router
+job_runner = JobRunner(SqlJobStore(_session_factory), session_factory=_session_factory)
+
+# Features written between progress reports by export_world
+EXPORT_PROGRESS_EVERY = 500
+
+@job_type("export_world", "application/x-ndjson", "ndjson",
+          "Every region and path (optionally one zone) as newline-delimited JSON, "
+          'one {"kind", ...feature} object per line')
+def export_world(context: JobContext) -> str:
+    zone_vnum = context.params.get("zone_vnum")
+    context.progress(0.0, "Reading regions")
+    features = [(feature_events.FEATURE_REGION, f) for f in load_region_features(context.db)]
+    context.progress(0.05, "Reading paths")
+    features += [(feature_events.FEATURE_PATH, f) for f in load_path_features(context.db)]
+    if zone_vnum is not None:
+        features = [(kind, f) for kind, f in features if f["zone_vnum"] == zone_vnum]
+
+    for i, (kind, feature) in enumerate(features):
+        if i % EXPORT_PROGRESS_EVERY == 0:
+            context.progress(0.1 + 0.9 * i / len(features), f"Exported {i} of {len(features)} features")
+        context.output.write(json.dumps({"kind": kind, **feature}).encode("utf-8") + b"\n")
+    return f"Exported {len(features)} features"
+
+@job_type("rebuild_snapshot", "application/json", "json",
+          "Rebuild the shared world snapshot and the region membership index from the database")
+def rebuild_snapshot(context: JobContext) -> str:
+    from .world_snapshot import snapshot_store
+    from .region_membership import membership_store
+    context.progress(0.0, "Rebuilding world snapshot")
+    snapshot = snapshot_store.rebuild(context.db)
+    context.progress(0.7, "Compiling region membership index")
+    index = membership_store.ensure_current()
+    summary = {
+        "generation": snapshot.generation,
+        "regions": snapshot.count(feature_events.FEATURE_REGION),
+        "paths": snapshot.count(feature_events.FEATURE_PATH),
+        "membership_version": index.version if index is not None else None
+    }
+    context.output.write(json.dumps(summary).encode("utf-8"))
+    return f"Snapshot generation {snapshot.generation} written"
+
+@job_type("validate_regions", "application/json", "json",
+          "Check every region polygon in the world snapshot across the geometry process pool; "
+          "lists the invalid ones with their errors")
+def validate_regions(context: JobContext) -> str:
+    import numpy as np
+    from .world_snapshot import snapshot_store
+    from .geometry_pool import geometry_pool
+    from .polygon_validity import validate_rings
+    snapshot = snapshot_store.current()
+    if snapshot is None:
+        raise ValueError("World snapshot has not been built yet")
+    count = snapshot.count(feature_events.FEATURE_REGION)
+    batch = snapshot.batch(feature_events.FEATURE_REGION, np.arange(count))
+    chunks = geometry_pool.run(
+        validate_rings, batch, np.diff(batch["offsets"]),
+        progress=lambda done, total: context.progress(done / total, f"Checked {done} of {total} regions")
+    )
+    invalid = [{"vnum": vnum, "errors": errors} for chunk in chunks for vnum, errors in chunk]
+    context.output.write(json.dumps({
+        "generation": snapshot.generation,
+        "checked": count,
+        "invalid": invalid
+    }).encode("utf-8"))
+    return f"{len(invalid)} of {count} regions invalid"
@@ -0,0 +1,205 @@
+import heapq
+import math
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from . import feature_events
+from .snapshot_index import SnapshotIndex
+from .spatial import point_to_ring_distance
+from .world_snapshot import NULL_PROPS, WorldSnapshot
+
+# Children per R-tree node
+NODE_CAPACITY = 16
+
+# Rebuild the packed tree once this many writes have accumulated (or 1/8 of the index)
+MIN_REBUILD_CHANGES = 64
+
+BBox = Tuple[float, float, float, float]
+
+class _Entry:
+    """A region as stored in the index"""
+    __slots__ = ("vnum", "zone_vnum", "name", "region_type", "region_props", "bbox", "ring")
+
+    def __init__(self, vnum: int, zone_vnum: int, name: Optional[str], region_type: int,
+                 region_props: Optional[int], ring: np.ndarray):
+        self.vnum = vnum
+        self.zone_vnum = zone_vnum
+        self.name = name
+        self.region_type = region_type
+        self.region_props = region_props
+        self.ring = ring
+        self.bbox = (
+            float(ring[:, 0].min()), float(ring[:, 1].min()),
+            float(ring[:, 0].max()), float(ring[:, 1].max())
+        )
+
+def _closed_ring(points: np.ndarray) -> np.ndarray:
+    ring = np.array(points, dtype=np.float64).reshape(-1, 2)
+    if len(ring) > 1 and not np.array_equal(ring[0], ring[-1]):
+        ring = np.vstack([ring, ring[:1]])
+    return ring
+
+def _min_distance(x: float, y: float, bbox: BBox) -> float:
+    """Lower bound on the distance from a point to anything inside bbox"""
+    dx = max(bbox[0] - x, 0.0, x - bbox[2])
+    dy = max(bbox[1] - y, 0.0, y - bbox[3])
+    return math.hypot(dx, dy)
+
+def _union(boxes: List[BBox]) -> BBox:
+    return (
+        min(b[0] for b in boxes), min(b[1] for b in boxes),
+        max(b[2] for b in boxes), max(b[3] for b in boxes)
+    )
+
+def _str_pack(items: List[Tuple[BBox, object]], leaf: bool) -> List[tuple]:
+    """Sort-Tile-Recursive packing of (bbox, child) items into nodes"""
+    leaf_count = math.ceil(len(items) / NODE_CAPACITY)
+    slab_size = math.ceil(math.sqrt(leaf_count)) * NODE_CAPACITY
+    items = sorted(items, key=lambda item: item[0][0] + item[0][2])
+
+    nodes = []
+    for i in range(0, len(items), slab_size):
+        slab = sorted(items[i:i + slab_size], key=lambda item: item[0][1] + item[0][3])
+        for j in range(0, len(slab), NODE_CAPACITY):
+            group = slab[j:j + NODE_CAPACITY]
+            nodes.append((_union([bbox for bbox, _ in group]), [child for _, child in group], leaf))
+    return nodes
+
+class NearestRegionIndex(SnapshotIndex):
+    """
+    In-memory nearest-neighbour index over region polygons.
+
+    Regions are bulk-loaded into an STR-packed R-tree. Queries run a
+    best-first search: nodes and regions are popped from a priority queue
+    ordered by their minimum possible distance, so only the part of the tree
+    near the query point is visited.
+
+    The index is built from the world snapshot, and each new generation
+    arrives as the regions it changed. These are applied without rebuilding
+    the tree: changed regions go into a small pending set that every query
+    also searches, and their old tree entries are skipped. The tree is
+    repacked once enough writes accumulate.
+    """
+
+    kinds = (feature_events.FEATURE_REGION,)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._entries: Dict[int, _Entry] = {}
+        self._root: Optional[tuple] = None
+        self._pending: Set[int] = set()
+        self._changes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def load(self, snapshot: WorldSnapshot) -> None:
+        """(Re)load every region polygon from a snapshot generation"""
+        kind = feature_events.FEATURE_REGION
+        table = snapshot.tables[kind]
+        zones, types, props = table["zone_vnum"].tolist(), table["type"].tolist(), table["props"].tolist()
+        entries = {}
+        for i, vnum in enumerate(table["vnum"].tolist()):
+            points = snapshot.coordinates(kind, i)
+            if len(points):
+                entries[vnum] = _Entry(vnum, zones[i], snapshot.name(kind, i), types[i],
+                                       None if props[i] == NULL_PROPS else props[i], _closed_ring(points))
+
+        with self._lock:
+            self._entries = entries
+            self._rebuild()
+            self._loaded = True
+
+    def _rebuild(self) -> None:
+        self._pending = set()
+        self._changes = 0
+        if not self._entries:
+            self._root = None
+            return
+        level = _str_pack([(entry.bbox, entry) for entry in self._entries.values()], leaf=True)
+        while len(level) > 1:
+            level = _str_pack([(node[0], node) for node in level], leaf=False)
+        self._root = level[0]
+
+    def upsert(self, kind: str, feature: dict) -> None:
+        """Add or replace a region from its response dict"""
+        if kind != feature_events.FEATURE_REGION:
+            return
+        coordinates = feature.get("coordinates") or []
+        if not coordinates:
+            self.delete(kind, feature["vnum"])
+            return
+
+        ring = _closed_ring([(c["x"], c["y"]) for c in coordinates])
+        entry = _Entry(feature["vnum"], feature["zone_vnum"], feature.get("name"),
+                       feature["region_type"], feature.get("region_props"), ring)
+
+        with self._lock:
+            self._entries[entry.vnum] = entry
+            self._pending.add(entry.vnum)
+            self._record_change()
+
+    def delete(self, kind: str, vnum: int) -> None:
+        if kind != feature_events.FEATURE_REGION:
+            return
+        with self._lock:
+            self._entries.pop(vnum, None)
+            self._pending.discard(vnum)
+            self._record_change()
+
+    def _record_change(self) -> None:
+        self._changes += 1
+        if self._changes > max(MIN_REBUILD_CHANGES, len(self._entries) // 8):
+            self._rebuild()
+
+    def nearest(self, x: float, y: float, k: int, region_type: Optional[int] = None) -> List[Tuple[float, _Entry]]:
+        """
+        Return up to k (distance, entry) pairs ordered by distance.
+
+        Distance is 0 when the point lies inside a region.
+        """
+        with self._lock:
+            entries = self._entries
+            heap: List[tuple] = []
+            counter = 0
+
+            # Queue items: (distance, tiebreak, stage, item); stage 0 = tree node,
+            # 1 = region with bbox lower bound, 2 = region with exact distance
+            if self._root is not None:
+                heap.append((_min_distance(x, y, self._root[0]), counter, 0, self._root))
+                counter += 1
+            for vnum in self._pending:
+                entry = entries[vnum]
+                if region_type is None or entry.region_type == region_type:
+                    heap.append((_min_distance(x, y, entry.bbox), counter, 1, entry))
+                    counter += 1
+            heapq.heapify(heap)
+
+            results: List[Tuple[float, _Entry]] = []
+            while heap and len(results) < k:
+                distance, _, stage, item = heapq.heappop(heap)
+                if stage == 2:
+                    results.append((distance, item))
+                elif stage == 1:
+                    heapq.heappush(heap, (point_to_ring_distance(x, y, item.ring), counter, 2, item))
+                    counter += 1
+                else:
+                    _, children, leaf = item
+                    for child in children:
+                        if leaf:
+                            # Skip tree entries superseded by a write since the last rebuild
+                            if entries.get(child.vnum) is not child:
+                                continue
+                            if region_type is not None and child.region_type != region_type:
+                                continue
+                            heapq.heappush(heap, (_min_distance(x, y, child.bbox), counter, 1, child))
+                        else:
+                            heapq.heappush(heap, (_min_distance(x, y, child[0]), counter, 0, child))
+                        counter += 1
+            return results
+
+# Process-wide index shared by the points router
+region_index = NearestRegionIndex()
@@ -0,0 +1,420 @@
+import heapq
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import feature_events
+from .snapshot_index import SnapshotIndex
+from .world_snapshot import WorldSnapshot
+from ..schemas.path import PATH_ROAD, PATH_DIRT_ROAD, PATH_RIVER, PATH_STREAM
+
+# Path types that connect into each travel network
+NETWORKS = {
+    "road": {PATH_ROAD, PATH_DIRT_ROAD},
+    "river": {PATH_RIVER, PATH_STREAM},
+}
+
+# Width of a segment grid cell in map units
+CELL_SIZE = 32.0
+
+# How far a route's start or goal may be from the network by default, and at most
+DEFAULT_SNAP_DISTANCE = 16.0
+MAX_SNAP_DISTANCE = 256.0
+
+# Routes remembered until the next path write
+ROUTE_CACHE_SIZE = 256
+
+Point = Tuple[float, float]
+Cell = Tuple[int, int]
+SegmentKey = Tuple[int, int]       # (path vnum, segment index)
+
+def _node(point: Point) -> Point:
+    # Rounded so the same junction computed from either path is one node
+    return (round(point[0], 6), round(point[1], 6))
+
+def _cells(a: Point, b: Point, margin: float = 0.0) -> List[Cell]:
+    x0, x1 = math.floor((min(a[0], b[0]) - margin) / CELL_SIZE), math.floor((max(a[0], b[0]) + margin) / CELL_SIZE)
+    y0, y1 = math.floor((min(a[1], b[1]) - margin) / CELL_SIZE), math.floor((max(a[1], b[1]) + margin) / CELL_SIZE)
+    return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+def _segment_intersection(a: Point, b: Point, c: Point, d: Point) -> Optional[Tuple[float, float, Point]]:
+    """Where segments a-b and c-d touch, as (t on a-b, u on c-d, point); collinear overlaps are ignored"""
+    rx, ry = b[0] - a[0], b[1] - a[1]
+    sx, sy = d[0] - c[0], d[1] - c[1]
+    denominator = rx * sy - ry * sx
+    if denominator == 0:
+        # Parallel: only shared endpoints count
+        for t, p in ((0.0, a), (1.0, b)):
+            for u, q in ((0.0, c), (1.0, d)):
+                if p == q:
+                    return t, u, p
+        return None
+    qx, qy = c[0] - a[0], c[1] - a[1]
+    t = (qx * sy - qy * sx) / denominator
+    u = (qx * ry - qy * rx) / denominator
+    if 0.0 <= t <= 1.0 and 0.0 <= u <= 1.0:
+        return t, u, (a[0] + t * rx, a[1] + t * ry)
+    return None
+
+class _NetworkPath:
+    """One path of a network, with distances along it and its junction cuts"""
+    __slots__ = ("vnum", "name", "path_type", "points", "offsets", "cuts")
+
+    def __init__(self, vnum: int, name: Optional[str], path_type: int, points: List[Point]):
+        self.vnum = vnum
+        self.name = name
+        self.path_type = path_type
+        self.points = points
+        # Distance along the path at each vertex
+        self.offsets = [0.0]
+        for a, b in zip(points, points[1:]):
+            self.offsets.append(self.offsets[-1] + math.hypot(b[0] - a[0], b[1] - a[1]))
+        # Junctions with other paths: distance along this path -> node
+        self.cuts: Dict[float, Point] = {}
+
+    @property
+    def length(self) -> float:
+        return self.offsets[-1]
+
+    def distance_at(self, segment: int, t: float) -> float:
+        return self.offsets[segment] + t * (self.offsets[segment + 1] - self.offsets[segment])
+
+    def nodes(self) -> List[Tuple[float, Point]]:
+        """Endpoints and junctions in order along the path"""
+        nodes = {0.0: _node(self.points[0]), self.length: _node(self.points[-1])}
+        nodes.update(self.cuts)
+        return sorted(nodes.items())
+
+    def polyline(self, start: float, end: float) -> List[Point]:
+        """Points of the path between two distances along it, in travel order"""
+        low, high = min(start, end), max(start, end)
+        points = [self.point_at(low)]
+        points.extend(p for p, offset in zip(self.points, self.offsets) if low < offset < high)
+        points.append(self.point_at(high))
+        return points if start <= end else points[::-1]
+
+    def point_at(self, distance: float) -> Point:
+        for i in range(len(self.points) - 1):
+            if distance <= self.offsets[i + 1] or i == len(self.points) - 2:
+                span = self.offsets[i + 1] - self.offsets[i]
+                t = 0.0 if span == 0 else (distance - self.offsets[i]) / span
+                a, b = self.points[i], self.points[i + 1]
+                return (a[0] + t * (b[0] - a[0]), a[1] + t * (b[1] - a[1]))
+        return self.points[0]
+
+# An edge between consecutive nodes of one path: (neighbour, length, path vnum, from distance, to distance)
+Edge = Tuple[Point, float, int, float, float]
+
+class _Network:
+    """Topology graph of the paths in one network"""
+
+    def __init__(self):
+        self.paths: Dict[int, _NetworkPath] = {}
+        self.grid: Dict[Cell, Set[SegmentKey]] = {}
+        # vnum -> other vnum -> junctions as (distance on vnum, distance on other, node)
+        self.junctions: Dict[int, Dict[int, List[Tuple[float, float, Point]]]] = {}
+        self.adjacency: Dict[Point, List[Edge]] = {}
+
+    def add(self, path: _NetworkPath) -> None:
+        self.paths[path.vnum] = path
+        self.junctions[path.vnum] = {}
+        touched = {path.vnum}
+        for i, (a, b) in enumerate(zip(path.points, path.points[1:])):
+            candidates: Set[SegmentKey] = set()
+            for cell in _cells(a, b):
+                candidates |= self.grid.get(cell, set())
+            for other_vnum, j in candidates:
+                if other_vnum == path.vnum:
+                    continue
+                other = self.paths[other_vnum]
+                hit = _segment_intersection(a, b, other.points[j], other.points[j + 1])
+                if hit is None:
+                    continue
+                t, u, point = hit
+                node = _node(point)
+                self.junctions[path.vnum].setdefault(other_vnum, []).append((path.distance_at(i, t), other.distance_at(j, u), node))
+                self.junctions[other_vnum].setdefault(path.vnum, []).append((other.distance_at(j, u), path.distance_at(i, t), node))
+                touched.add(other_vnum)
+            for cell in _cells(a, b):
+                self.grid.setdefault(cell, set()).add((path.vnum, i))
+        for vnum in touched:
+            self._relink(vnum)
+
+    def remove(self, vnum: int) -> None:
+        path = self.paths.get(vnum)
+        if path is None:
+            return
+        self._unlink(path)
+        for i, (a, b) in enumerate(zip(path.points, path.points[1:])):
+            for cell in _cells(a, b):
+                keys = self.grid[cell]
+                keys.discard((vnum, i))
+                if not keys:
+                    del self.grid[cell]
+        others = list(self.junctions.pop(vnum))
+        del self.paths[vnum]
+        for other in others:
+            del self.junctions[other][vnum]
+            self._relink(other)
+
+    def _unlink(self, path: _NetworkPath) -> None:
+        for _, node in path.nodes():
+            edges = [edge for edge in self.adjacency.get(node, []) if edge[2] != path.vnum]
+            if edges:
+                self.adjacency[node] = edges
+            else:
+                self.adjacency.pop(node, None)
+
+    def _relink(self, vnum: int) -> None:
+        """Recompute one path's junction cuts and its edges"""
+        path = self.paths[vnum]
+        self._unlink(path)
+        path.cuts = {distance: node for hits in self.junctions[vnum].values() for distance, _, node in hits}
+        nodes = path.nodes()
+        for (d0, n0), (d1, n1) in zip(nodes, nodes[1:]):
+            if n0 == n1:
+                continue
+            self.adjacency.setdefault(n0, []).append((n1, d1 - d0, vnum, d0, d1))
+            self.adjacency.setdefault(n1, []).append((n0, d1 - d0, vnum, d1, d0))
+        for _, node in nodes:
+            self.adjacency.setdefault(node, [])
+
+    def locate(self, x: float, y: float, max_distance: float) -> Optional[Tuple[float, int, float, Point]]:
+        """Nearest point on the network as (distance to it, path vnum, distance along path, point)"""
+        best = None
+        candidates: Set[SegmentKey] = set()
+        for cell in _cells((x, y), (x, y), max_distance):
+            candidates |= self.grid.get(cell, set())
+        for vnum, i in candidates:
+            path = self.paths[vnum]
+            a, b = path.points[i], path.points[i + 1]
+            dx, dy = b[0] - a[0], b[1] - a[1]
+            length_sq = dx * dx + dy * dy
+            t = 0.0 if length_sq == 0 else min(1.0, max(0.0, ((x - a[0]) * dx + (y - a[1]) * dy) / length_sq))
+            point = (a[0] + t * dx, a[1] + t * dy)
+            distance = math.hypot(x - point[0], y - point[1])
+            if distance <= max_distance and (best is None or (distance, vnum) < (best[0], best[1])):
+                best = (distance, vnum, path.distance_at(i, t), point)
+        return best
+
+    def _attach(self, vnum: int, distance: float) -> List[Edge]:
+        """Edges from a point part-way along a path to the nodes either side of it"""
+        nodes = self.paths[vnum].nodes()
+        before = max((item for item in nodes if item[0] <= distance), key=lambda item: item[0])
+        after = min((item for item in nodes if item[0] >= distance), key=lambda item: item[0])
+        return [(before[1], distance - before[0], vnum, distance, before[0]),
+                (after[1], after[0] - distance, vnum, distance, after[0])]
+
+    def route(self, start: Tuple[int, float, Point], goal: Tuple[int, float, Point]) -> Optional[Tuple[float, List[Tuple[int, float, float]]]]:
+        """
+        A* between two located points.
+
+        Returns (length, legs) where each leg is (path vnum, from distance, to
+        distance) along that path, or None when they are not connected.
+        """
+        start_vnum, start_distance, start_point = start
+        goal_vnum, goal_distance, goal_point = goal
+        goal_edges = {node: (length, vnum, d1, d0) for node, length, vnum, d0, d1 in self._attach(goal_vnum, goal_distance)}
+
+        def heuristic(node: Point) -> float:
+            return math.hypot(goal_point[0] - node[0], goal_point[1] - node[1])
+
+        best: Dict[object, float] = {}
+        previous: Dict[object, Tuple[object, Tuple[int, float, float]]] = {}
+        heap: List[Tuple[float, float, int, object]] = []
+        counter = 0
+        for node, length, vnum, d0, d1 in self._attach(start_vnum, start_distance):
+            if length < best.get(node, math.inf):
+                best[node] = length
+                previous[node] = ("start", (vnum, d0, d1))
+                heapq.heappush(heap, (length + heuristic(node), length, counter, node))
+                counter += 1
+        if start_vnum == goal_vnum:
+            # Both on the same stretch: go straight along the path
+            nodes = self.paths[start_vnum].nodes()
+            if not any(min(start_distance, goal_distance) < d < max(start_distance, goal_distance) for d, _ in nodes):
+                direct = abs(goal_distance - start_distance)
+                best["goal"] = direct
+                previous["goal"] = ("start", (start_vnum, start_distance, goal_distance))
+                heapq.heappush(heap, (direct, direct, counter, "goal"))
+                counter += 1
+
+        while heap:
+            _, cost, _, node = heapq.heappop(heap)
+            if cost > best.get(node, math.inf):
+                continue
+            if node == "goal":
+                break
+            steps = list(self.adjacency.get(node, []))
+            if node in goal_edges:
+                length, vnum, d0, d1 = goal_edges[node]
+                steps.append(("goal", length, vnum, d0, d1))
+            for neighbour, length, vnum, d0, d1 in steps:
+                total = cost + length
+                if total < best.get(neighbour, math.inf):
+                    best[neighbour] = total
+                    previous[neighbour] = (node, (vnum, d0, d1))
+                    estimate = 0.0 if neighbour == "goal" else heuristic(neighbour)
+                    heapq.heappush(heap, (total + estimate, total, counter, neighbour))
+                    counter += 1
+
+        if "goal" not in best:
+            return None
+        legs = []
+        node = "goal"
+        while node != "start":
+            node, leg = previous[node]
+            legs.append(leg)
+        legs.reverse()
+        return best["goal"], legs
+
+    def stats(self) -> dict:
+        """Node, edge and connected-component counts"""
+        seen: Set[Point] = set()
+        components = 0
+        for node in self.adjacency:
+            if node in seen:
+                continue
+            components += 1
+            stack = [node]
+            seen.add(node)
+            while stack:
+                for neighbour, *_ in self.adjacency[stack.pop()]:
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        stack.append(neighbour)
+        return {
+            "paths": len(self.paths),
+            "nodes": len(self.adjacency),
+            "edges": sum(len(edges) for edges in self.adjacency.values()) // 2,
+            "components": components
+        }
+
+class PathNetworkIndex(SnapshotIndex):
+    """
+    Road and river networks built from every path linestring.
+
+    Nodes are path endpoints and the points where paths of the same network
+    cross or touch; edges are the stretches of path between consecutive
+    nodes. A write to a path only recomputes that path's junctions (found
+    through a grid of segments) and the edges of the paths it meets, so the
+    graph never has to be rebuilt. Routes are found with A* using straight
+    line distance and cached until the next write. The networks are built
+    from the world snapshot and follow its generations.
+    """
+
+    kinds = (feature_events.FEATURE_PATH,)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._networks: Dict[str, _Network] = {name: _Network() for name in NETWORKS}
+        self._network_of: Dict[int, str] = {}
+        self._routes: "OrderedDict[tuple, Optional[dict]]" = OrderedDict()
+
+    def load(self, snapshot: WorldSnapshot) -> None:
+        """(Re)build both networks from a snapshot generation"""
+        kind = feature_events.FEATURE_PATH
+        table = snapshot.tables[kind]
+        types = table["type"].tolist()
+        with self._lock:
+            self._networks = {name: _Network() for name in NETWORKS}
+            self._network_of = {}
+            self._routes.clear()
+            for i, vnum in enumerate(table["vnum"].tolist()):
+                self._add(vnum, snapshot.name(kind, i), types[i],
+                          [tuple(point) for point in snapshot.coordinates(kind, i).tolist()])
+            self._loaded = True
+
+    def upsert(self, kind: str, feature: dict) -> None:
+        """Apply a created or updated path from its response dict"""
+        if kind != feature_events.FEATURE_PATH:
+            return
+        with self._lock:
+            self._remove(feature["vnum"])
+            self._add(feature["vnum"], feature.get("name"), feature["path_type"],
+                      [(float(c["x"]), float(c["y"])) for c in feature.get("coordinates") or []])
+            self._routes.clear()
+
+    def delete(self, kind: str, vnum: int) -> None:
+        if kind != feature_events.FEATURE_PATH:
+            return
+        with self._lock:
+            self._remove(vnum)
+            self._routes.clear()
+
+    def _add(self, vnum: int, name: Optional[str], path_type: int, points: List[Point]) -> None:
+        network = next((network for network, types in NETWORKS.items() if path_type in types), None)
+        if network is None or len(points) < 2:
+            return
+        self._networks[network].add(_NetworkPath(vnum, name, path_type, points))
+        self._network_of[vnum] = network
+
+    def _remove(self, vnum: int) -> None:
+        network = self._network_of.pop(vnum, None)
+        if network is not None:
+            self._networks[network].remove(vnum)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: network.stats() for name, network in self._networks.items()}
+
+    def route(self, network: str, start_x: float, start_y: float, goal_x: float, goal_y: float,
+              max_snap_distance: float = DEFAULT_SNAP_DISTANCE) -> dict:
+        """
+        Shortest route along one network between two map points.
+
+        Both points are first snapped to the nearest point on the network
+        within max_snap_distance. `connected` is false when either point is
+        off the network or the two are in separate components.
+        """
+        key = (network, start_x, start_y, goal_x, goal_y, max_snap_distance)
+        with self._lock:
+            if key in self._routes:
+                self._routes.move_to_end(key)
+                return self._routes[key]
+
+            graph = self._networks[network]
+            start = graph.locate(start_x, start_y, max_snap_distance)
+            goal = graph.locate(goal_x, goal_y, max_snap_distance)
+            result = {
+                "network": network,
+                "start": None if start is None else {"x": start[3][0], "y": start[3][1], "path_vnum": start[1]},
+                "goal": None if goal is None else {"x": goal[3][0], "y": goal[3][1], "path_vnum": goal[1]},
+                "connected": False,
+                "distance": None,
+                "paths": [],
+                "coordinates": []
+            }
+            found = graph.route(start[1:], goal[1:]) if start is not None and goal is not None else None
+            if found is not None:
+                distance, legs = found
+                coordinates: List[Point] = []
+                paths: List[dict] = []
+                for vnum, d0, d1 in legs:
+                    if d0 == d1:
+                        continue
+                    path = graph.paths[vnum]
+                    points = path.polyline(d0, d1)
+                    coordinates.extend(points[1:] if coordinates else points)
+                    if paths and paths[-1]["vnum"] == vnum:
+                        paths[-1]["distance"] += abs(d1 - d0)
+                    else:
+                        paths.append({"vnum": vnum, "name": path.name, "path_type": path.path_type, "distance": abs(d1 - d0)})
+                if not coordinates:
+                    coordinates = [start[3]]
+                result.update({
+                    "connected": True,
+                    "distance": distance,
+                    "paths": paths,
+                    "coordinates": [{"x": x, "y": y} for x, y in coordinates]
+                })
+
+            self._routes[key] = result
+            if len(self._routes) > ROUTE_CACHE_SIZE:
+                self._routes.popitem(last=False)
+            return result
+
+# Process-wide index shared by the paths router
+path_network_index = PathNetworkIndex()
@@ -0,0 +1,183 @@
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from . import feature_events
+from .geometry_pool import geometry_pool
+from .snapshot_index import SnapshotIndex
+from .spatial import supercover_cells
+from .world_snapshot import NULL_PROPS, WorldSnapshot
+
+Cell = Tuple[int, int]
+
+GLYPH_NS = "ns"
+GLYPH_EW = "ew"
+GLYPH_INTERSECTION = "intersection"
+
+# Road sectors come in orientation families: (north-south, east-west, intersection).
+# A path whose path_props is any member of a family is drawn with the whole family.
+GLYPH_FAMILIES = [
+    (11, 12, 13),   # Road
+    (26, 27, 28),   # Dirt road
+]
+_FAMILY_BY_SECTOR = {sector: family for family in GLYPH_FAMILIES for sector in family}
+
+class _PathCells:
+    """The cells one path occupies and the direction it runs through each"""
+    __slots__ = ("vnum", "sector", "family", "cells", "crossings")
+
+    def __init__(self, vnum: int, path_props: Optional[int], points: List[Tuple[float, float]]):
+        self.vnum = vnum
+        self.sector = path_props
+        self.family = _FAMILY_BY_SECTOR.get(path_props)
+        # cell -> accumulated (|dx|, |dy|) of the segments passing through it
+        self.cells: Dict[Cell, Tuple[float, float]] = {}
+        # Cells the path passes through more than once (it crosses itself)
+        self.crossings: Set[Cell] = set()
+
+        if len(points) == 1:
+            self.cells[(int(points[0][0] // 1), int(points[0][1] // 1))] = (0.0, 0.0)
+            return
+
+        previous_cell: Optional[Cell] = None
+        for (x1, y1), (x2, y2) in zip(points, points[1:]):
+            length = abs(x2 - x1) + abs(y2 - y1)
+            if not length:
+                continue
+            weight = (abs(x2 - x1) / length, abs(y2 - y1) / length)
+            for cell in supercover_cells(x1, y1, x2, y2):
+                if cell == previous_cell:
+                    # Shared vertex cell of consecutive segments: a bend, not a crossing
+                    wx, wy = self.cells[cell]
+                    self.cells[cell] = (wx + weight[0], wy + weight[1])
+                    continue
+                if cell in self.cells:
+                    self.crossings.add(cell)
+                    wx, wy = self.cells[cell]
+                    self.cells[cell] = (wx + weight[0], wy + weight[1])
+                else:
+                    self.cells[cell] = weight
+                previous_cell = cell
+
+    def glyph(self, cell: Cell) -> str:
+        """Local orientation: whichever axis the path mostly runs along in this cell"""
+        if cell in self.crossings:
+            return GLYPH_INTERSECTION
+        wx, wy = self.cells[cell]
+        return GLYPH_EW if wx > wy else GLYPH_NS
+
+def rasterize_paths(arrays: Dict[str, Any], start: int, stop: int) -> List[_PathCells]:
+    """Geometry pool kernel: the cells of paths start..stop-1 of a batch with a "props" column"""
+    coords, offsets, vnums, props = arrays["coords"], arrays["offsets"], arrays["vnums"], arrays["props"]
+    return [
+        _PathCells(int(vnums[i]), None if props[i] == NULL_PROPS else int(props[i]),
+                   [tuple(point) for point in coords[offsets[i]:offsets[i + 1]].tolist()])
+        for i in range(start, stop)
+    ]
+
+def _family_sector(family: Tuple[int, int, int], glyph: str) -> int:
+    return family[(GLYPH_NS, GLYPH_EW, GLYPH_INTERSECTION).index(glyph)]
+
+class PathRasterIndex(SnapshotIndex):
+    """
+    Per-cell sector assignments for every path, maintained incrementally.
+
+    Each path is rasterized on its own with a supercover traversal and cached
+    by vnum; a new snapshot generation re-rasterizes only the paths it
+    changed. Where cells are shared the result is resolved when read, following the game's processing order:
+    paths apply in vnum order, so the highest vnum decides the sector. When
+    two or more paths with orientation glyphs (roads, dirt roads) meet in a
+    cell, or one crosses itself, the deciding path's intersection sector is
+    used. Paths without a glyph family (rivers, streams, ...) keep their
+    path_props sector unchanged.
+    """
+
+    kinds = (feature_events.FEATURE_PATH,)
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._paths: Dict[int, _PathCells] = {}
+        self._paths_by_cell: Dict[Cell, Set[int]] = {}
+
+    def load(self, snapshot: WorldSnapshot) -> None:
+        """(Re)rasterize every path from a snapshot generation"""
+        kind = feature_events.FEATURE_PATH
+        batch = snapshot.batch(kind, np.arange(snapshot.count(kind)))
+        batch["props"] = snapshot.tables[kind]["props"]
+        # Rasterizing the whole world is spread over the geometry pool
+        items = [item for chunk in geometry_pool.run(rasterize_paths, batch, np.diff(batch["offsets"])) for item in chunk]
+        with self._lock:
+            self._paths = {}
+            self._paths_by_cell = {}
+            for item in items:
+                self._add(item)
+            self._loaded = True
+
+    def upsert(self, kind: str, feature: dict) -> None:
+        """Re-rasterize a created or updated path from its response dict"""
+        if kind != feature_events.FEATURE_PATH:
+            return
+        points = [(float(c["x"]), float(c["y"])) for c in feature.get("coordinates") or []]
+        item = _PathCells(feature["vnum"], feature.get("path_props"), points)
+        with self._lock:
+            self._remove(feature["vnum"])
+            self._add(item)
+
+    def delete(self, kind: str, vnum: int) -> None:
+        if kind != feature_events.FEATURE_PATH:
+            return
+        with self._lock:
+            self._remove(vnum)
+
+    def _add(self, item: _PathCells) -> None:
+        self._paths[item.vnum] = item
+        for cell in item.cells:
+            self._paths_by_cell.setdefault(cell, set()).add(item.vnum)
+
+    def _remove(self, vnum: int) -> None:
+        item = self._paths.pop(vnum, None)
+        if item is None:
+            return
+        for cell in item.cells:
+            vnums = self._paths_by_cell[cell]
+            vnums.discard(vnum)
+            if not vnums:
+                del self._paths_by_cell[cell]
+
+    def _resolve(self, cell: Cell) -> dict:
+        vnums = sorted(self._paths_by_cell[cell])
+        top = self._paths[vnums[-1]]
+        glyph_paths = [vnum for vnum in vnums if self._paths[vnum].family is not None]
+        if top.family is None:
+            glyph, sector = None, top.sector
+        else:
+            glyph = GLYPH_INTERSECTION if len(glyph_paths) > 1 else top.glyph(cell)
+            sector = _family_sector(top.family, glyph)
+        return {"x": cell[0], "y": cell[1], "sector": sector, "glyph": glyph, "paths": vnums}
+
+    def cells(self, min_x: Optional[int] = None, min_y: Optional[int] = None,
+              max_x: Optional[int] = None, max_y: Optional[int] = None,
+              path_vnum: Optional[int] = None) -> List[dict]:
+        """
+        Resolved cells (sorted by y, then x), optionally limited to a box or one path.
+
+        Limiting to a path still resolves its cells against every other path,
+        so intersections show as they would in the game.
+        """
+        with self._lock:
+            if path_vnum is not None:
+                item = self._paths.get(path_vnum)
+                candidates = list(item.cells) if item is not None else []
+            else:
+                candidates = list(self._paths_by_cell)
+            selected = [
+                cell for cell in candidates
+                if (min_x is None or cell[0] >= min_x) and (max_x is None or cell[0] <= max_x)
+                and (min_y is None or cell[1] >= min_y) and (max_y is None or cell[1] <= max_y)
+            ]
+            return [self._resolve(cell) for cell in sorted(selected, key=lambda c: (c[1], c[0]))]
+
+# Process-wide index shared by the paths router
+path_raster_index = PathRasterIndex()
@@ -0,0 +1,254 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geometry_pool import geometry_pool
+
+Point = Tuple[float, float]
+
+def _orientation(a: Point, b: Point, c: Point) -> int:
+    """Return 1 for a counter-clockwise turn a->b->c, -1 for clockwise, 0 if collinear"""
+    cross = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    return (cross > 0) - (cross < 0)
+
+def _on_segment(a: Point, b: Point, p: Point) -> bool:
+    """Check if collinear point p lies within the bounding box of segment a-b"""
+    return min(a[0], b[0]) <= p[0] <= max(a[0], b[0]) and min(a[1], b[1]) <= p[1] <= max(a[1], b[1])
+
+def segments_intersect(a: Point, b: Point, c: Point, d: Point) -> bool:
+    """Check if closed segments a-b and c-d share at least one point"""
+    o1 = _orientation(a, b, c)
+    o2 = _orientation(a, b, d)
+    o3 = _orientation(c, d, a)
+    o4 = _orientation(c, d, b)
+
+    if o1 != o2 and o3 != o4:
+        return True
+
+    # Collinear and touching cases
+    if o1 == 0 and _on_segment(a, b, c):
+        return True
+    if o2 == 0 and _on_segment(a, b, d):
+        return True
+    if o3 == 0 and _on_segment(c, d, a):
+        return True
+    if o4 == 0 and _on_segment(c, d, b):
+        return True
+    return False
+
+def signed_area(ring: Sequence[Point]) -> float:
+    """Shoelace signed area of an open ring (positive when counter-clockwise)"""
+    area = 0.0
+    n = len(ring)
+    for i in range(n):
+        x1, y1 = ring[i]
+        x2, y2 = ring[(i + 1) % n]
+        area += x1 * y2 - x2 * y1
+    return area / 2.0
+
+def remove_duplicate_vertices(ring: Sequence[Point]) -> List[Point]:
+    """Drop consecutive repeated vertices, including an explicit closing point"""
+    cleaned: List[Point] = []
+    for point in ring:
+        if not cleaned or cleaned[-1] != point:
+            cleaned.append(point)
+    while len(cleaned) > 1 and cleaned[0] == cleaned[-1]:
+        cleaned.pop()
+    return cleaned
+
+def find_self_intersection(ring: Sequence[Point]) -> Optional[Tuple[int, int]]:
+    """
+    Find a pair of non-adjacent ring edges that intersect or touch.
+
+    Uses a Shamos-Hoey sweep: edges are swept left to right and only
+    neighbours in the sweep status are tested, giving O(n log n) comparisons
+    instead of testing every pair. Edge i runs from ring[i] to ring[i + 1].
+
+    The ring must already be free of repeated vertices and spikes (see
+    validate_polygon), which keeps the sweep status consistently ordered.
+
+    Returns:
+        Indices of the first intersecting edge pair found, or None if the ring is simple
+    """
+    n = len(ring)
+    if n < 4:
+        return None
+
+    # Edge endpoints ordered left-to-right (then bottom-to-top)
+    lefts: List[Point] = []
+    rights: List[Point] = []
+    slopes: List[float] = []
+    for i in range(n):
+        p, q = ring[i], ring[(i + 1) % n]
+        if q < p:
+            p, q = q, p
+        lefts.append(p)
+        rights.append(q)
+        slopes.append((q[1] - p[1]) / (q[0] - p[0]) if q[0] != p[0] else float('inf'))
+
+    def adjacent(i: int, j: int) -> bool:
+        return abs(i - j) == 1 or abs(i - j) == n - 1
+
+    low_ys = [min(lefts[i][1], rights[i][1]) for i in range(n)]
+    high_ys = [max(lefts[i][1], rights[i][1]) for i in range(n)]
+
+    def crosses(i: int, j: int) -> bool:
+        if adjacent(i, j):
+            return False
+        # Sweep neighbours always overlap in x, so a y-range check rejects most pairs
+        if high_ys[i] < low_ys[j] or high_ys[j] < low_ys[i]:
+            return False
+        return segments_intersect(lefts[i], rights[i], lefts[j], rights[j])
+
+    # Events: removals at a point are handled before insertions at that point
+    events = []
+    for i in range(n):
+        events.append((lefts[i], 1, i))
+        events.append((rights[i], 0, i))
+    events.sort()
+
+    status: List[int] = []
+    sweep_x = 0.0
+
+    def y_at(i: int) -> float:
+        (x1, y1), (x2, y2) = lefts[i], rights[i]
+        if x1 == x2:
+            return y1
+        return y1 + (y2 - y1) * (sweep_x - x1) / (x2 - x1)
+
+    def status_key(i: int) -> Tuple[float, float]:
+        return (y_at(i), slopes[i])
+
+    for point, is_insert, edge in events:
+        sweep_x = point[0]
+
+        if not is_insert:
+            pos = status.index(edge)
+            if 0 < pos < len(status) - 1 and crosses(status[pos - 1], status[pos + 1]):
+                return (status[pos - 1], status[pos + 1])
+            del status[pos]
+            continue
+
+        key = (point[1], slopes[edge])
+        pos = bisect_left(status, key, key=status_key)
+        status.insert(pos, edge)
+
+        # Every edge passing through this sweep point (or the span of a
+        # vertical edge) is a candidate, not just the immediate neighbours
+        low_y = point[1]
+        high_y = rights[edge][1] if slopes[edge] == float('inf') else point[1]
+        start = bisect_left(status, low_y, key=y_at)
+        end = bisect_right(status, high_y, key=y_at)
+        candidates = set(range(start, end))
+        candidates.update((pos - 1, pos + 1))
+        for other_pos in candidates:
+            if 0 <= other_pos < len(status) and other_pos != pos and crosses(edge, status[other_pos]):
+                return (edge, status[other_pos])
+
+    return None
+
+def validate_polygon(coordinates: Sequence[Dict[str, float]]) -> Dict:
+    """
+    Check and normalize a region polygon before it is written to MySQL.
+
+    - Removes consecutive duplicate vertices (including the closing point)
+    - Rejects rings with repeated vertices, spikes or self-intersections
+    - Rejects rings with zero area
+    - Normalizes the exterior ring to counter-clockwise orientation (OGC convention)
+
+    Single-point landmarks are passed through unchanged.
+
+    Returns:
+        Dict with 'valid', 'errors', normalized 'coordinates',
+        'duplicates_removed' and 'orientation_fixed'
+    """
+    ring = [(float(coord['x']), float(coord['y'])) for coord in coordinates]
+    result = {
+        "valid": True,
+        "errors": [],
+        "coordinates": [{"x": x, "y": y} for x, y in ring],
+        "duplicates_removed": 0,
+        "orientation_fixed": False
+    }
+
+    if len(ring) == 1:
+        return result
+
+    cleaned = remove_duplicate_vertices(ring)
+    result["duplicates_removed"] = len(ring) - len(cleaned)
+    errors: List[str] = result["errors"]
+
+    if len(cleaned) < 3:
+        errors.append("Polygon must have at least 3 distinct vertices")
+    else:
+        seen: Dict[Point, int] = {}
+        for i, point in enumerate(cleaned):
+            if point in seen:
+                errors.append(f"Vertex {i} repeats vertex {seen[point]} at ({point[0]}, {point[1]})")
+                break
+            seen[point] = i
+
+        n = len(cleaned)
+        for i in range(n):
+            a, b, c = cleaned[i - 1], cleaned[i], cleaned[(i + 1) % n]
+            # Collinear edges that double back on themselves overlap
+            if _orientation(a, b, c) == 0 and (a[0] - b[0]) * (c[0] - b[0]) + (a[1] - b[1]) * (c[1] - b[1]) > 0:
+                errors.append(f"Spike at vertex {i} ({b[0]}, {b[1]})")
+                break
+
+        if not errors:
+            crossing = find_self_intersection(cleaned)
+            if crossing:
+                errors.append(f"Edges {min(crossing)} and {max(crossing)} intersect")
+
+        area = signed_area(cleaned)
+        if area == 0:
+            errors.append("Polygon has zero area")
+        elif area < 0:
+            cleaned.reverse()
+            result["orientation_fixed"] = True
+
+    result["valid"] = not errors
+    result["coordinates"] = [{"x": x, "y": y} for x, y in cleaned]
+    return result
+
+def validate_rings(arrays: Dict[str, Any], start: int, stop: int) -> List[Tuple[int, List[str]]]:
+    """Geometry pool kernel: (vnum, errors) of every invalid polygon among start..stop-1 of a batch"""
+    coords, offsets, vnums = arrays["coords"], arrays["offsets"], arrays["vnums"]
+    invalid: List[Tuple[int, List[str]]] = []
+    for i in range(start, stop):
+        ring = [{"x": x, "y": y} for x, y in coords[offsets[i]:offsets[i + 1]].tolist()]
+        result = validate_polygon(ring)
+        if not result["valid"]:
+            invalid.append((int(vnums[i]), result["errors"]))
+    return invalid
+
+def validate_batch(arrays: Dict[str, Any], start: int, stop: int) -> List[Dict]:
+    """
+    Geometry pool kernel: validate_polygon result of every ring among
+    start..stop-1 of a batch, with the normalized coordinates as (n, 2) arrays
+    """
+    coords, offsets = arrays["coords"], arrays["offsets"]
+    results = []
+    for i in range(start, stop):
+        result = validate_polygon([{"x": x, "y": y} for x, y in coords[offsets[i]:offsets[i + 1]].tolist()])
+        result["coordinates"] = np.array([(c["x"], c["y"]) for c in result["coordinates"]], dtype=np.float64).reshape(-1, 2)
+        results.append(result)
+    return results
+
+def validate_polygons(rings: Sequence[Sequence[Dict[str, float]]]) -> List[Dict]:
+    """
+    validate_polygon for several rings at once. Together they go through the
+    geometry pool, so a large polygon or changeset is checked in another
+    process instead of holding this worker's GIL; small ones run inline.
+    """
+    lengths = [len(ring) for ring in rings]
+    arrays = {
+        "coords": np.array([(float(c["x"]), float(c["y"])) for ring in rings for c in ring], dtype=np.float64).reshape(-1, 2),
+        "offsets": np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    }
+    results = [result for chunk in geometry_pool.run(validate_batch, arrays, lengths) for result in chunk]
+    for result in results:
+        result["coordinates"] = [{"x": x, "y": y} for x, y in result["coordinates"].tolist()]
+    return results
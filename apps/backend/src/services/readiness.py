@@ -0,0 +1,69 @@
+import threading
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Delay before retrying a failed warm-up, doubling up to the maximum
+RETRY_DELAY_SECONDS = 2.0
+MAX_RETRY_DELAY_SECONDS = 60.0
+
+WarmupStep = Tuple[str, Callable[[], None]]
+
+class Readiness:
+    """
+    Tracks the warm-up a worker must finish before it should receive traffic.
+
+    Warm-up runs in a background thread started by the app's lifespan hook, so
+    the liveness check (/api/health) answers immediately while the readiness
+    check (/api/ready) stays red until every step has succeeded. Failed steps
+    (for example, MySQL not reachable yet) are retried with backoff; steps
+    that already succeeded are not repeated.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ready = False
+        self._completed: List[str] = []
+        self._error: Optional[str] = None
+        self._attempts = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "status": "ready" if self._ready else "starting",
+                "completed": list(self._completed),
+                "attempts": self._attempts,
+                "error": self._error
+            }
+
+    def run(self, steps: Sequence[WarmupStep], stop: threading.Event,
+            retry_delay: float = RETRY_DELAY_SECONDS) -> None:
+        """Run every step in order, retrying failures until success or `stop` is set"""
+        delay = retry_delay
+        while not stop.is_set():
+            with self._lock:
+                self._attempts += 1
+            try:
+                for name, step in steps:
+                    if name in self._completed:
+                        continue
+                    step()
+                    with self._lock:
+                        self._completed.append(name)
+            except Exception as e:
+                with self._lock:
+                    self._error = f"{name}: {e}"
+                print(f"Warning: warm-up step '{name}' failed, retrying in {delay:.0f}s: {e}")
+                stop.wait(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY_SECONDS)
+                continue
+
+            with self._lock:
+                self._error = None
+                self._ready = True
+            return
+
+# Process-wide readiness state reported by /api/ready
+readiness = Readiness()
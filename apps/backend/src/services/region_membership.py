@@ -0,0 +1,330 @@
+"""
+Precomputed cell-to-region membership index for the game server.
+
+For every wilderness cell (x, y) with -1024 <= x, y <= 1024 the index lists
+the regions covering it in vnum order, which is the order the game applies
+them. A cell is covered when the point (x, y) lies inside the polygon under
+the same even-odd, half-open rule as spatial.points_in_polygon, so a square
+from 0 to 10 covers cells 0..9 on each axis. Single-point landmarks cover
+the cell they sit on.
+
+Each row is run-length encoded against a table of distinct region lists,
+which keeps the file small enough for the game to mmap whole:
+
+    header          struct "<4sIQQiiIII", padded to 48 bytes:
+                    magic b"WRMI", format version, index version (increases
+                    with every published file), source world snapshot
+                    generation (advanced in place, without a new version,
+                    when a generation changes no regions), world_min,
+                    world_max, run_count, set_count, set_value_count
+    row_offsets     uint32[rows + 1]     runs of row y are [row_offsets[y - world_min], row_offsets[y - world_min + 1])
+    run_x           int16[run_count]     first x of each run; a run lasts until the next run of its row
+    run_set         uint32[run_count]    region list of each run (0 = no regions)
+    set_offsets     uint32[set_count + 1]
+    set_vnums       int32[set_value_count]
+
+Every array starts on an 8-byte boundary. To look up (x, y), binary search
+run_x within the row for the last run starting at or before x; cells
+before a row's first run belong to no region.
+"""
+import math
+import mmap
+import os
+import struct
+import tempfile
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from . import feature_events
+from .world_snapshot import WorldSnapshot, SnapshotStore, snapshot_store, _file_identity
+from .geometry_pool import geometry_pool
+
+MAGIC = b"WRMI"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIQQiiIII")
+HEADER_SIZE = 48
+# Byte offset of the source generation within the header
+SOURCE_GENERATION_OFFSET = 16
+
+WORLD_MIN = -1024
+WORLD_MAX = 1024
+ROW_COUNT = WORLD_MAX - WORLD_MIN + 1
+
+DEFAULT_MEMBERSHIP_PATH = os.path.join(tempfile.gettempdir(), "wildeditor-region-membership.idx")
+
+# A row is a list of runs: (first x, vnums covering the run)
+Run = Tuple[int, Tuple[int, ...]]
+Rows = List[List[Run]]
+
+def region_intervals(points: np.ndarray) -> Dict[int, List[Tuple[int, int]]]:
+    """
+    Cells covered by a polygon, as half-open [x_start, x_end) intervals per row.
+
+    Scanline rasterization: every edge contributes one crossing per integer
+    row in its half-open y-range, and consecutive crossings in a row pair up
+    into covered spans.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    if len(points) == 1:
+        x, y = int(round(points[0, 0])), int(round(points[0, 1]))
+        if WORLD_MIN <= x <= WORLD_MAX and WORLD_MIN <= y <= WORLD_MAX:
+            return {y: [(x, x + 1)]}
+        return {}
+    if len(points) < 3:
+        return {}
+
+    ring = np.vstack([points, points[:1]])
+    row_parts: List[np.ndarray] = []
+    x_parts: List[np.ndarray] = []
+    for (x1, y1), (x2, y2) in zip(ring[:-1].tolist(), ring[1:].tolist()):
+        if y1 == y2:
+            continue
+        ys = np.arange(math.ceil(min(y1, y2)), math.ceil(max(y1, y2)), dtype=np.int64)
+        if len(ys):
+            row_parts.append(ys)
+            x_parts.append(x1 + (ys - y1) * ((x2 - x1) / (y2 - y1)))
+    if not row_parts:
+        return {}
+
+    rows = np.concatenate(row_parts)
+    xs = np.concatenate(x_parts)
+    order = np.lexsort((xs, rows))
+    rows, xs = rows[order], xs[order]
+
+    # Each row has an even number of crossings, so consecutive pairs share a row
+    starts = np.clip(np.ceil(xs[0::2]), WORLD_MIN, WORLD_MAX + 1).astype(np.int64)
+    ends = np.clip(np.ceil(xs[1::2]), WORLD_MIN, WORLD_MAX + 1).astype(np.int64)
+    intervals: Dict[int, List[Tuple[int, int]]] = {}
+    for y, start, end in zip(rows[0::2].tolist(), starts.tolist(), ends.tolist()):
+        if start < end and WORLD_MIN <= y <= WORLD_MAX:
+            intervals.setdefault(y, []).append((start, end))
+    return intervals
+
+def _row_runs(entries: List[Tuple[int, int, int]]) -> List[Run]:
+    """Collapse (x_start, x_end, vnum) spans of one row into runs of identical region lists"""
+    if not entries:
+        return []
+    # Sweep the span ends and starts left to right, keeping a count per active vnum
+    events = sorted([(start, 1, vnum) for start, _, vnum in entries] + [(end, -1, vnum) for _, end, vnum in entries])
+    active: Dict[int, int] = {}
+    runs: List[Run] = []
+    previous: Tuple[int, ...] = ()
+    i = 0
+    while i < len(events):
+        x = events[i][0]
+        while i < len(events) and events[i][0] == x:
+            _, delta, vnum = events[i]
+            count = active.get(vnum, 0) + delta
+            if count:
+                active[vnum] = count
+            else:
+                active.pop(vnum, None)
+            i += 1
+        current = tuple(sorted(active))
+        if current != previous:
+            runs.append((x, current))
+            previous = current
+    return runs
+
+def rasterize_regions(arrays: Dict[str, np.ndarray], start: int, stop: int) -> np.ndarray:
+    """Geometry pool kernel: (y, x_start, x_end, vnum) spans of regions start..stop-1 of a batch"""
+    coords, offsets, vnums = arrays["coords"], arrays["offsets"], arrays["vnums"]
+    spans: List[Tuple[int, int, int, int]] = []
+    for i in range(start, stop):
+        vnum = int(vnums[i])
+        for y, intervals in region_intervals(coords[offsets[i]:offsets[i + 1]]).items():
+            spans.extend((y, x_start, x_end, vnum) for x_start, x_end in intervals)
+    return np.array(spans, dtype=np.int32).reshape(-1, 4)
+
+def _region_entries(snapshot: WorldSnapshot, rows: np.ndarray, wanted: Optional[Set[int]]) -> Dict[int, List[Tuple[int, int, int]]]:
+    batch = snapshot.batch(feature_events.FEATURE_REGION, rows)
+    entries: Dict[int, List[Tuple[int, int, int]]] = {}
+    for spans in geometry_pool.run(rasterize_regions, batch, np.diff(batch["offsets"])):
+        for y, x_start, x_end, vnum in spans.tolist():
+            if wanted is None or y in wanted:
+                entries.setdefault(y, []).append((x_start, x_end, vnum))
+    return entries
+
+def build_rows(snapshot: WorldSnapshot) -> Rows:
+    """Membership runs for every row of the world"""
+    all_rows = np.arange(snapshot.count(feature_events.FEATURE_REGION))
+    entries = _region_entries(snapshot, all_rows, None)
+    return [_row_runs(entries.get(y, [])) for y in range(WORLD_MIN, WORLD_MAX + 1)]
+
+def update_rows(rows: Rows, previous: Optional[WorldSnapshot], current: WorldSnapshot, vnums: Set[int]) -> Rows:
+    """
+    Recompute only the rows covered by the changed regions, before or after the change.
+
+    Every region crossing those rows is rasterized again so the region lists
+    of the touched cells stay complete and in vnum order.
+    """
+    touched: Set[int] = set()
+    for snapshot in (previous, current):
+        if snapshot is None:
+            continue
+        for vnum in vnums:
+            i = snapshot.find(feature_events.FEATURE_REGION, vnum)
+            if i is not None:
+                touched.update(region_intervals(snapshot.coordinates(feature_events.FEATURE_REGION, i)))
+    if not touched:
+        return rows
+
+    candidates = current.query(feature_events.FEATURE_REGION, WORLD_MIN, min(touched), WORLD_MAX, max(touched))
+    entries = _region_entries(current, candidates, touched)
+    rows = list(rows)
+    for y in touched:
+        rows[y - WORLD_MIN] = _row_runs(entries.get(y, []))
+    return rows
+
+def encode_index(rows: Rows, version: int, source_generation: int) -> bytes:
+    """Serialize membership rows into the binary layout described above"""
+    set_ids: Dict[Tuple[int, ...], int] = {(): 0}
+    row_offsets = np.zeros(ROW_COUNT + 1, dtype=np.uint32)
+    run_x: List[int] = []
+    run_set: List[int] = []
+    for r, runs in enumerate(rows):
+        for x, vnums in runs:
+            run_x.append(x)
+            run_set.append(set_ids.setdefault(vnums, len(set_ids)))
+        row_offsets[r + 1] = len(run_x)
+
+    sets = sorted(set_ids, key=set_ids.get)
+    set_offsets = np.concatenate([[0], np.cumsum([len(s) for s in sets])]).astype(np.uint32)
+    set_vnums = np.array([vnum for s in sets for vnum in s], dtype=np.int32)
+
+    arrays = [row_offsets, np.array(run_x, dtype=np.int16), np.array(run_set, dtype=np.uint32), set_offsets, set_vnums]
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, version, source_generation, WORLD_MIN, WORLD_MAX,
+                         len(run_x), len(sets), len(set_vnums))
+    chunks = [header.ljust(HEADER_SIZE, b"\0")]
+    for array in arrays:
+        data = array.tobytes()
+        chunks.append(data + b"\0" * (-len(data) % 8))
+    return b"".join(chunks)
+
+class MembershipIndex:
+    """Read-only, memory-mapped view of one published membership file"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.identity = _file_identity(os.fstat(f.fileno()))
+
+        (magic, format_version, self.version, self.source_generation, world_min, world_max,
+         run_count, set_count, set_value_count) = HEADER.unpack(self._map[:HEADER.size])
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a region membership index")
+        if format_version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported region membership index version {format_version}")
+        self.world_min, self.world_max = world_min, world_max
+        self.size_bytes = len(self._map)
+
+        offset = HEADER_SIZE
+        arrays = []
+        for dtype, count in ((np.uint32, world_max - world_min + 2), (np.int16, run_count), (np.uint32, run_count),
+                             (np.uint32, set_count + 1), (np.int32, set_value_count)):
+            array = np.frombuffer(self._map, dtype=dtype, count=count, offset=offset)
+            arrays.append(array)
+            offset += array.nbytes + (-array.nbytes % 8)
+        self.row_offsets, self.run_x, self.run_set, self.set_offsets, self.set_vnums = arrays
+
+    @property
+    def run_count(self) -> int:
+        return len(self.run_x)
+
+    @property
+    def set_count(self) -> int:
+        return len(self.set_offsets) - 1
+
+    def lookup(self, x: int, y: int) -> List[int]:
+        """Region vnums covering a cell, in the order the game applies them"""
+        if not (self.world_min <= x <= self.world_max and self.world_min <= y <= self.world_max):
+            return []
+        start, end = int(self.row_offsets[y - self.world_min]), int(self.row_offsets[y - self.world_min + 1])
+        k = start + int(np.searchsorted(self.run_x[start:end], x, side="right")) - 1
+        if k < start:
+            return []
+        set_id = int(self.run_set[k])
+        return self.set_vnums[self.set_offsets[set_id]:self.set_offsets[set_id + 1]].tolist()
+
+    def to_rows(self) -> Rows:
+        """Decode back into runs so a later write can patch individual rows"""
+        sets = [tuple(self.set_vnums[self.set_offsets[i]:self.set_offsets[i + 1]].tolist()) for i in range(self.set_count)]
+        run_x, run_set = self.run_x.tolist(), self.run_set.tolist()
+        offsets = self.row_offsets.tolist()
+        return [[(run_x[k], sets[run_set[k]]) for k in range(offsets[r], offsets[r + 1])] for r in range(ROW_COUNT)]
+
+class MembershipStore:
+    """
+    Publishes versioned membership files for the game to hot-swap.
+
+    Files are derived from the world snapshot and written while its lock is
+    held, so only one process writes at a time. Each file is written under a
+    temporary name and renamed into place; the game can compare the version
+    in the header and remap when it changes.
+    """
+
+    def __init__(self, snapshots: SnapshotStore, path: Optional[str] = None):
+        self.snapshots = snapshots
+        self.path = path or os.getenv("REGION_MEMBERSHIP_PATH", DEFAULT_MEMBERSHIP_PATH)
+        self._index: Optional[MembershipIndex] = None
+
+    def current(self) -> Optional[MembershipIndex]:
+        try:
+            identity = _file_identity(os.stat(self.path))
+        except FileNotFoundError:
+            return None
+        index = self._index
+        if index is None or index.identity != identity:
+            index = MembershipIndex(self.path)
+            self._index = index
+        return index
+
+    def _write(self, rows: Rows, source_generation: int) -> MembershipIndex:
+        existing = self.current()
+        data = encode_index(rows, existing.version + 1 if existing else 1, source_generation)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        return self.current()
+
+    def _advance(self, source_generation: int) -> MembershipIndex:
+        """Mark the published rows as matching a newer generation, keeping the version"""
+        with open(self.path, "r+b") as f:
+            f.seek(SOURCE_GENERATION_OFFSET)
+            f.write(struct.pack("<Q", source_generation))
+            f.flush()
+            os.fsync(f.fileno())
+        return self.current()
+
+    def on_generation(self, previous: Optional[WorldSnapshot], current: WorldSnapshot,
+                      changed: Optional[Set[Tuple[str, int]]]) -> None:
+        """Snapshot listener: patch the rows touched by region writes, or rebuild"""
+        existing = self.current()
+        if changed is None or existing is None or previous is None or existing.source_generation != previous.generation:
+            self._write(build_rows(current), current.generation)
+            return
+        vnums = {vnum for kind, vnum in changed if kind == feature_events.FEATURE_REGION}
+        if not vnums:
+            # Path and point writes leave every row as it is; don't make the game reload
+            self._advance(current.generation)
+            return
+        self._write(update_rows(existing.to_rows(), previous, current, vnums), current.generation)
+
+    def ensure_current(self) -> Optional[MembershipIndex]:
+        """Rebuild if the published file does not match the current snapshot (startup)"""
+        with self.snapshots.exclusive():
+            snapshot = self.snapshots.current()
+            if snapshot is None:
+                return None
+            existing = self.current()
+            if existing is None or existing.source_generation != snapshot.generation:
+                return self._write(build_rows(snapshot), snapshot.generation)
+            return existing
+
+# Process-wide store for the shared snapshot
+membership_store = MembershipStore(snapshot_store)
+snapshot_store.subscribe(membership_store.on_generation)
@@ -0,0 +1,338 @@
+"""
+Per-feature revision history stored as compressed vertex diffs.
+
+Every region/path write appends one row to feature_revision in the write's
+transaction. Most rows hold only what changed since the previous revision:
+
+    payload = zlib(
+        uint32 attrs_len, attrs JSON     changed attribute columns (all of them in a keyframe)
+        uint32 op_count
+        op_count x (uint32 start, uint32 delete_count, uint32 insert_count,
+                    float64[insert_count * 2] inserted x, y pairs)
+    )
+
+Each op replaces delete_count vertices of the previous revision's
+coordinates, starting at index start, with the inserted vertices; ops are
+in ascending start order and do not overlap. A keyframe is the same record
+against an empty feature (every attribute, one op inserting every vertex).
+A keyframe is written for the first revision, after a delete, every
+KEYFRAME_INTERVAL revisions and whenever a diff would not be smaller, so
+rebuilding any revision reads at most KEYFRAME_INTERVAL rows. A delete is a
+row with action 'delete' and an empty payload record.
+"""
+import difflib
+import json
+import struct
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+from . import feature_events
+from .vertex_patch import geometry_version
+
+# Revisions from one keyframe to the next, bounding reconstruction work
+KEYFRAME_INTERVAL = 16
+
+# History page size
+DEFAULT_HISTORY_LIMIT = 20
+MAX_HISTORY_LIMIT = 100
+
+_LENGTH = struct.Struct("<I")
+_OP = struct.Struct("<III")
+
+Vertex = Tuple[float, float]
+# (start, delete_count, inserted vertices) against the previous coordinates
+VertexOp = Tuple[int, int, List[Vertex]]
+# Attribute columns plus "coordinates", as returned by the single-feature endpoints
+Feature = Dict
+
+def _vertices(coordinates: Sequence[dict]) -> List[Vertex]:
+    return [(float(c["x"]), float(c["y"])) for c in coordinates]
+
+def vertex_diff(old: Sequence[Vertex], new: Sequence[Vertex]) -> List[VertexOp]:
+    """Ops turning one vertex list into another, touching as few vertices as possible"""
+    prefix = 0
+    while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < min(len(old), len(new)) - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    old_middle = list(old[prefix:len(old) - suffix])
+    new_middle = list(new[prefix:len(new) - suffix])
+
+    matcher = difflib.SequenceMatcher(None, old_middle, new_middle, autojunk=False)
+    return [
+        (prefix + i1, i2 - i1, new_middle[j1:j2])
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"
+    ]
+
+def apply_vertex_diff(old: Sequence[Vertex], ops: Sequence[VertexOp]) -> List[Vertex]:
+    result: List[Vertex] = []
+    position = 0
+    for start, delete_count, inserted in ops:
+        result.extend(old[position:start])
+        result.extend(inserted)
+        position = start + delete_count
+    result.extend(old[position:])
+    return result
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _attributes(feature: Feature) -> Dict:
+    return {key: _json_value(value) for key, value in feature.items() if key != "coordinates"}
+
+def encode_record(attributes: Dict, ops: Sequence[VertexOp]) -> bytes:
+    attrs = json.dumps(attributes, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    chunks = [_LENGTH.pack(len(attrs)), attrs, _LENGTH.pack(len(ops))]
+    for start, delete_count, inserted in ops:
+        chunks.append(_OP.pack(start, delete_count, len(inserted)))
+        chunks.append(np.asarray(inserted, dtype="<f8").reshape(-1).tobytes())
+    return zlib.compress(b"".join(chunks), 9)
+
+def decode_record(payload: bytes) -> Tuple[Dict, List[VertexOp]]:
+    data = zlib.decompress(payload)
+    (attrs_len,) = _LENGTH.unpack_from(data, 0)
+    offset = _LENGTH.size
+    attributes = json.loads(data[offset:offset + attrs_len].decode("utf-8"))
+    offset += attrs_len
+    (op_count,) = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    ops: List[VertexOp] = []
+    for _ in range(op_count):
+        start, delete_count, insert_count = _OP.unpack_from(data, offset)
+        offset += _OP.size
+        values = np.frombuffer(data, dtype="<f8", count=insert_count * 2, offset=offset)
+        offset += values.nbytes
+        ops.append((start, delete_count, [tuple(pair) for pair in values.reshape(-1, 2).tolist()]))
+    return attributes, ops
+
+class Revision:
+    """One stored row of a feature's history"""
+    __slots__ = ("revision", "action", "keyframe", "payload", "vertex_count", "geometry_version", "changed_at")
+
+    def __init__(self, revision, action, keyframe, payload, vertex_count=0, geometry_version=None, changed_at=None):
+        self.revision = revision
+        self.action = action
+        self.keyframe = bool(keyframe)
+        self.payload = payload
+        self.vertex_count = vertex_count
+        self.geometry_version = geometry_version
+        self.changed_at = changed_at
+
+def _state(attributes: Dict, vertices: List[Vertex]) -> Feature:
+    feature = dict(attributes)
+    feature["coordinates"] = [{"x": x, "y": y} for x, y in vertices]
+    return feature
+
+def replay(revisions: Sequence[Revision]) -> List[Tuple[Revision, Optional[Feature], List[VertexOp]]]:
+    """
+    Rebuild the feature after each revision, starting from a keyframe.
+
+    Returns (revision, feature or None after a delete, vertex ops relative to
+    the previous revision) for every revision given.
+    """
+    states = []
+    attributes: Optional[Dict] = None
+    vertices: List[Vertex] = []
+    for revision in revisions:
+        if revision.action == feature_events.ACTION_DELETE:
+            states.append((revision, None, [(0, len(vertices), [])] if vertices else []))
+            attributes, vertices = None, []
+            continue
+        changed, ops = decode_record(revision.payload)
+        if revision.keyframe:
+            previous = vertices
+            attributes, vertices = changed, apply_vertex_diff([], ops)
+            ops = vertex_diff(previous, vertices)
+        else:
+            if attributes is None:
+                raise ValueError(f"Revision {revision.revision} is a diff without a keyframe before it")
+            attributes = {**attributes, **changed}
+            vertices = apply_vertex_diff(vertices, ops)
+        states.append((revision, _state(attributes, vertices), ops))
+    return states
+
+def next_revision(chain: Sequence[Revision], feature: Optional[Feature]) -> Revision:
+    """
+    The row recording `feature` (None when deleted) after the revisions of
+    `chain`, which runs from the latest keyframe to the latest revision.
+    """
+    number = chain[-1].revision + 1 if chain else 1
+    if feature is None:
+        return Revision(number, feature_events.ACTION_DELETE, False, encode_record({}, []))
+
+    vertices = _vertices(feature["coordinates"])
+    attributes = _attributes(feature)
+    version = geometry_version(feature["coordinates"])
+    keyframe = encode_record(attributes, [(0, 0, vertices)] if vertices else [])
+    previous = replay(chain)[-1][1] if chain else None
+    if previous is None or len(chain) >= KEYFRAME_INTERVAL:
+        return Revision(number, feature_events.ACTION_UPSERT, True, keyframe, len(vertices), version)
+
+    changed = {key: value for key, value in attributes.items() if _attributes(previous).get(key) != value}
+    diff = encode_record(changed, vertex_diff(_vertices(previous["coordinates"]), vertices))
+    if len(diff) >= len(keyframe):
+        return Revision(number, feature_events.ACTION_UPSERT, True, keyframe, len(vertices), version)
+    return Revision(number, feature_events.ACTION_UPSERT, False, diff, len(vertices), version)
+
+_REVISION_COLUMNS = "revision, action, is_keyframe, payload, vertex_count, geometry_version, changed_at"
+
+def _revision(row) -> Revision:
+    return Revision(row.revision, row.action, row.is_keyframe, row.payload,
+                    row.vertex_count, row.geometry_version, row.changed_at)
+
+def _chains(db: Session, kind: str, vnums: Sequence[int], up_to: Optional[int] = None,
+            lock: bool = False) -> Dict[int, List[Revision]]:
+    """
+    Per vnum, the revisions from the latest keyframe (or delete) at or before
+    up_to (default: the latest revision) through up_to.
+
+    With lock, both the chain and the keyframe lookup are locking reads:
+    they see the latest committed revisions rather than the transaction's
+    REPEATABLE READ snapshot, and hold them until the transaction ends.
+    """
+    chains: Dict[int, List[Revision]] = {vnum: [] for vnum in vnums}
+    if not vnums:
+        return chains
+    for_update = "FOR UPDATE" if lock else ""
+    query = text(f"""
+        SELECT r.vnum, {', '.join('r.' + column for column in _REVISION_COLUMNS.split(', '))}
+        FROM feature_revision r
+        WHERE r.feature_kind = :kind AND r.vnum IN :vnums AND r.revision <= :up_to
+          AND r.revision >= (
+            SELECT COALESCE(MAX(k.revision), 0) FROM feature_revision k
+            WHERE k.feature_kind = r.feature_kind AND k.vnum = r.vnum AND k.revision <= :up_to
+              AND (k.is_keyframe = 1 OR k.action = :delete)
+            {for_update}
+          )
+        ORDER BY r.vnum, r.revision
+        {for_update}
+    """).bindparams(bindparam("vnums", expanding=True))  # nosec B608
+    rows = db.execute(query, {"kind": kind, "vnums": list(vnums),
+                              "up_to": up_to if up_to is not None else 2 ** 31 - 1,
+                              "delete": feature_events.ACTION_DELETE}).fetchall()
+    for row in rows:
+        chains[row.vnum].append(_revision(row))
+    return chains
+
+def record_revisions(db: Session, kind: str, features: Dict[int, Optional[Feature]]) -> None:
+    """
+    Append a revision for each written feature (None when deleted).
+
+    Must be called before the write's commit, like change_log.record_change,
+    so history and data change together, and after the feature rows are
+    written or locked. The chains are read with a locking read, so a
+    concurrent writer of the same vnum waits for this one to commit and then
+    numbers its revision after it, instead of reusing the number from an
+    older snapshot.
+    """
+    chains = _chains(db, kind, sorted(features), lock=True)
+    rows = []
+    for vnum, feature in sorted(features.items()):
+        chain = chains[vnum]
+        if feature is None and chain and chain[-1].action == feature_events.ACTION_DELETE:
+            continue
+        revision = next_revision(chain, feature)
+        rows.append({
+            "kind": kind, "vnum": vnum, "revision": revision.revision, "action": revision.action,
+            "is_keyframe": int(revision.keyframe), "payload": revision.payload,
+            "vertex_count": revision.vertex_count, "geometry_version": revision.geometry_version
+        })
+    if rows:
+        db.execute(text("""
+            INSERT INTO feature_revision (feature_kind, vnum, revision, action, is_keyframe, payload, vertex_count, geometry_version)
+            VALUES (:kind, :vnum, :revision, :action, :is_keyframe, :payload, :vertex_count, :geometry_version)
+        """), rows)
+
+def record_revision(db: Session, kind: str, vnum: int) -> None:
+    """Append a revision with the feature as this transaction now sees it (after its write)"""
+    from .changesets import load_features  # changesets records its writes through this module
+    record_revisions(db, kind, {vnum: load_features(db, kind, [vnum])[(kind, vnum)]})
+
+def _entry(revision: Revision, feature: Optional[Feature], previous: Optional[Feature],
+           ops: List[VertexOp], include_feature: bool) -> dict:
+    before = _attributes(previous) if previous else {}
+    after = _attributes(feature) if feature else {}
+    entry = {
+        "revision": revision.revision,
+        "action": revision.action,
+        "changed_at": revision.changed_at,
+        "keyframe": revision.keyframe,
+        "payload_bytes": len(revision.payload),
+        "geometry_version": revision.geometry_version,
+        "vertex_count": revision.vertex_count,
+        "changed_fields": sorted(key for key in set(before) | set(after) if before.get(key) != after.get(key)),
+        "vertices_deleted": sum(delete_count for _, delete_count, _ in ops),
+        "vertices_inserted": sum(len(inserted) for _, _, inserted in ops)
+    }
+    if include_feature:
+        entry["feature"] = None if feature is None else {**feature, "geometry_version": revision.geometry_version}
+    return entry
+
+def _replay_range(db: Session, kind: str, vnum: int, oldest: int, newest: int):
+    """
+    (revision, feature, previous feature, ops) for revisions oldest..newest,
+    replayed from the keyframe before oldest so the first one has its
+    predecessor too: at most KEYFRAME_INTERVAL + (newest - oldest) rows.
+    """
+    revisions = _chains(db, kind, [vnum], oldest - 1)[vnum] if oldest > 1 else []
+    rows = db.execute(text(f"""
+        SELECT {_REVISION_COLUMNS} FROM feature_revision
+        WHERE feature_kind = :kind AND vnum = :vnum AND revision >= :oldest AND revision <= :newest
+        ORDER BY revision
+    """), {"kind": kind, "vnum": vnum, "oldest": oldest, "newest": newest}).fetchall()  # nosec B608
+    revisions += [_revision(row) for row in rows]
+
+    states = []
+    previous: Optional[Feature] = None
+    for revision, feature, ops in replay(revisions):
+        if revision.revision >= oldest:
+            states.append((revision, feature, previous, ops))
+        previous = feature
+    return states
+
+def feature_history(db: Session, kind: str, vnum: int, before: Optional[int] = None,
+                    limit: int = DEFAULT_HISTORY_LIMIT, include_features: bool = False) -> dict:
+    """
+    A page of a feature's history, newest first.
+
+    Each entry lists the changed attribute names and how many vertices were
+    inserted and deleted; with include_features the full feature at that
+    revision is included too. Pass next_before as `before` for the next page.
+    """
+    newest = before - 1 if before is not None else 2 ** 31 - 1
+    page = db.execute(text("""
+        SELECT revision FROM feature_revision
+        WHERE feature_kind = :kind AND vnum = :vnum AND revision <= :newest
+        ORDER BY revision DESC
+        LIMIT :limit
+    """), {"kind": kind, "vnum": vnum, "newest": newest, "limit": limit + 1}).fetchall()
+    numbers = [row.revision for row in page[:limit]]
+    if not numbers:
+        return {"kind": kind, "vnum": vnum, "revisions": [], "next_before": None}
+
+    oldest = numbers[-1]
+    entries = [
+        _entry(revision, feature, previous, ops, include_features)
+        for revision, feature, previous, ops in _replay_range(db, kind, vnum, oldest, numbers[0])
+    ]
+    entries.reverse()
+    return {
+        "kind": kind,
+        "vnum": vnum,
+        "revisions": entries,
+        "next_before": oldest if len(page) > limit else None
+    }
+
+def feature_at_revision(db: Session, kind: str, vnum: int, revision: int) -> Optional[dict]:
+    """One revision with the feature as it was then; None if there is no such revision"""
+    states = _replay_range(db, kind, vnum, revision, revision)
+    if not states:
+        return None
+    stored, feature, previous, ops = states[0]
+    return _entry(stored, feature, previous, ops, include_feature=True)
@@ -0,0 +1,205 @@
+import bisect
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import feature_events
+from .snapshot_index import SnapshotIndex
+from .world_snapshot import KINDS, WorldSnapshot
+from ..schemas.region import get_region_type_name
+from ..schemas.path import get_path_type_name
+
+# Typo-tolerant matches need at least this trigram similarity (0-1)
+MIN_SIMILARITY = 0.3
+
+# Rank of each way a feature can match; ties go to the shorter name
+SCORE_EXACT = 1000
+SCORE_PREFIX = 800
+SCORE_NAME_WORDS = 600
+SCORE_ANY_WORDS = 400
+SCORE_SIMILAR = 300
+
+FeatureKey = Tuple[str, int]
+
+_WORD = re.compile(r"\w+")
+
+def _normalize(text: str) -> str:
+    return " ".join(_WORD.findall(text.lower()))
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def _type_name(kind: str, feature_type: int) -> str:
+    if kind == feature_events.FEATURE_REGION:
+        return get_region_type_name(feature_type)
+    return get_path_type_name(feature_type)
+
+class _SearchEntry:
+    """A region or path as stored in the search index"""
+    __slots__ = ("kind", "vnum", "name", "normalized", "zone_vnum", "feature_type", "bbox",
+                 "name_words", "other_words", "trigrams")
+
+    def __init__(self, kind: str, vnum: int, name: str, zone_vnum: int, feature_type: int,
+                 bbox: Optional[Dict[str, float]]):
+        self.kind = kind
+        self.vnum = vnum
+        self.name = name
+        self.normalized = _normalize(self.name)
+        self.zone_vnum = zone_vnum
+        self.feature_type = feature_type
+        self.bbox = bbox
+        self.name_words = set(self.normalized.split())
+        # Type names and the zone number also match, ranked below names
+        self.other_words = set(_normalize(_type_name(kind, self.feature_type)).split()) | {str(self.zone_vnum), kind}
+        self.other_words -= self.name_words
+        self.trigrams = _trigrams(self.normalized)
+
+    @property
+    def key(self) -> FeatureKey:
+        return (self.kind, self.vnum)
+
+    def words(self) -> Set[str]:
+        return self.name_words | self.other_words
+
+def _feature_entry(kind: str, feature: dict) -> _SearchEntry:
+    """Search entry for a response-shaped region/path dict"""
+    points = [(float(c["x"]), float(c["y"])) for c in feature.get("coordinates") or []]
+    bbox = None
+    if points:
+        xs, ys = [p[0] for p in points], [p[1] for p in points]
+        bbox = {"min_x": min(xs), "min_y": min(ys), "max_x": max(xs), "max_y": max(ys)}
+    return _SearchEntry(kind, feature["vnum"], feature.get("name") or "", feature["zone_vnum"],
+                        feature[f"{kind}_type"], bbox)
+
+class SearchIndex(SnapshotIndex):
+    """
+    Prefix and trigram index over region and path names, types and zones.
+
+    Every word of a feature's name, type name and zone number is kept in one
+    sorted list, so each query word is a prefix range found by binary search
+    (type-ahead matches "lake of t" against "Lake of Tears"). A trigram index
+    over whole names catches misspellings when words do not match. Built
+    from the world snapshot; a new generation touches only the features it
+    changed.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._entries: Dict[FeatureKey, _SearchEntry] = {}
+        self._words: List[Tuple[str, str, int]] = []
+        self._trigrams: Dict[str, Set[FeatureKey]] = {}
+
+    def load(self, snapshot: WorldSnapshot) -> None:
+        """(Re)index every region and path from a snapshot generation"""
+        entries = []
+        for kind in KINDS:
+            table = snapshot.tables[kind]
+            zones, types = table["zone_vnum"].tolist(), table["type"].tolist()
+            entries += [_SearchEntry(kind, vnum, snapshot.name(kind, i), zones[i], types[i], snapshot.summary(kind, i)["bbox"])
+                        for i, vnum in enumerate(table["vnum"].tolist())]
+        with self._lock:
+            self._entries = {}
+            self._words = []
+            self._trigrams = {}
+            for entry in entries:
+                self._entries[entry.key] = entry
+                self._words.extend((word, entry.kind, entry.vnum) for word in entry.words())
+                for trigram in entry.trigrams:
+                    self._trigrams.setdefault(trigram, set()).add(entry.key)
+            self._words.sort()
+            self._loaded = True
+
+    def upsert(self, kind: str, feature: dict) -> None:
+        """Index a created or updated region/path from its response dict"""
+        entry = _feature_entry(kind, feature)
+        with self._lock:
+            self._remove((kind, feature["vnum"]))
+            self._entries[entry.key] = entry
+            for word in entry.words():
+                bisect.insort(self._words, (word, entry.kind, entry.vnum))
+            for trigram in entry.trigrams:
+                self._trigrams.setdefault(trigram, set()).add(entry.key)
+
+    def delete(self, kind: str, vnum: int) -> None:
+        with self._lock:
+            self._remove((kind, vnum))
+
+    def _remove(self, key: FeatureKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for word in entry.words():
+            i = bisect.bisect_left(self._words, (word, entry.kind, entry.vnum))
+            del self._words[i]
+        for trigram in entry.trigrams:
+            keys = self._trigrams[trigram]
+            keys.discard(key)
+            if not keys:
+                del self._trigrams[trigram]
+
+    def _prefix_matches(self, prefix: str) -> Set[FeatureKey]:
+        matches = set()
+        i = bisect.bisect_left(self._words, (prefix,))
+        while i < len(self._words) and self._words[i][0].startswith(prefix):
+            matches.add((self._words[i][1], self._words[i][2]))
+            i += 1
+        return matches
+
+    def _score(self, entry: _SearchEntry, query: str, tokens: List[str]) -> int:
+        if entry.normalized == query:
+            return SCORE_EXACT
+        if entry.normalized.startswith(query):
+            return SCORE_PREFIX
+        if all(any(word.startswith(token) for word in entry.name_words) for token in tokens):
+            return SCORE_NAME_WORDS
+        return SCORE_ANY_WORDS
+
+    def search(self, q: str, limit: int = 20, kind: Optional[str] = None,
+               zone_vnum: Optional[int] = None) -> List[dict]:
+        """Ranked matches for a (possibly partial) query, best first"""
+        query = _normalize(q)
+        tokens = query.split()
+        if not tokens:
+            return []
+
+        with self._lock:
+            scored: Dict[FeatureKey, float] = {}
+            # Every query word must prefix-match some word of the feature
+            candidates = self._prefix_matches(tokens[0])
+            for token in tokens[1:]:
+                candidates &= self._prefix_matches(token)
+            for key in candidates:
+                scored[key] = self._score(self._entries[key], query, tokens)
+
+            # Fall back to similar names for misspellings
+            query_trigrams = _trigrams(query)
+            shared = Counter(key for trigram in query_trigrams for key in self._trigrams.get(trigram, ()))
+            for key, count in shared.items():
+                if key in scored:
+                    continue
+                similarity = count / (len(query_trigrams) + len(self._entries[key].trigrams) - count)
+                if similarity >= MIN_SIMILARITY:
+                    scored[key] = SCORE_SIMILAR * similarity
+
+            entries = [
+                self._entries[key] for key in scored
+                if (kind is None or key[0] == kind)
+                and (zone_vnum is None or self._entries[key].zone_vnum == zone_vnum)
+            ]
+            entries.sort(key=lambda entry: (-scored[entry.key], len(entry.name), entry.name, entry.kind, entry.vnum))
+            return [{
+                "kind": entry.kind,
+                "vnum": entry.vnum,
+                "name": entry.name,
+                "zone_vnum": entry.zone_vnum,
+                "type": entry.feature_type,
+                "type_name": _type_name(entry.kind, entry.feature_type),
+                "bbox": entry.bbox,
+                "score": round(scored[entry.key], 1)
+            } for entry in entries[:limit]]
+
+# Process-wide index shared by the search router
+search_index = SearchIndex()
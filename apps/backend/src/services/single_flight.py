@@ -0,0 +1,157 @@
+import asyncio
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from . import feature_events
+from .world_snapshot import SnapshotStore, snapshot_store, _file_identity
+
+# GET endpoints whose identical concurrent requests share one execution
+COALESCED_PREFIXES = (
+    "/api/regions",
+    "/api/paths",
+    "/api/points",
+    "/api/zones",
+    "/api/search",
+    "/api/snapshot",
+)
+
+# Request headers that can change a response, so they are part of the key
+VARYING_HEADERS = (b"accept", b"authorization", b"x-coordinate-format")
+
+RequestKey = Tuple
+# Captured ASGI messages of a finished response
+ResponseMessages = List[dict]
+# Writes committed by this worker and the snapshot file other workers' writes reach
+Epoch = Tuple
+
+class SingleFlight:
+    """
+    Identical concurrent GET requests coalesced into one execution.
+
+    The first request for a key (path, query string and the headers in
+    VARYING_HEADERS) runs normally while its response messages are
+    captured; requests for the same key arriving before it finishes wait
+    and replay the captured status, headers and body instead of querying
+    and encoding again. Nothing is kept once the leader finishes, so this
+    is not a cache: a request arriving later runs on its own. If the leader
+    fails, waiting requests run themselves.
+
+    A request only joins a leader that started after the latest write, so
+    a client reading right after its own write never gets a response that
+    was read before the commit. Writes handled by this worker count as soon
+    as they are published; writes handled by another worker count once they
+    reach the shared world snapshot (within FLUSH_DELAY_SECONDS), which is
+    the window in which a read on this worker can still miss them.
+
+    Followers never reach routing, so they do not take admission slots,
+    threads or database connections. The leader's own client receives the
+    response only once it is complete, so coalesced responses are buffered.
+    """
+
+    def __init__(self, prefixes: Tuple[str, ...] = COALESCED_PREFIXES, snapshots: Optional[SnapshotStore] = None):
+        self.prefixes = prefixes
+        self.snapshots = snapshots
+        self._inflight: Dict[RequestKey, Tuple["asyncio.Future[Optional[ResponseMessages]]", Epoch]] = {}
+        self._writes_lock = threading.Lock()
+        self._writes = 0
+        self.leaders_total = 0
+        self.coalesced_total = 0
+
+    def record_write(self) -> None:
+        """Count a committed write; flights already running are no longer joined"""
+        with self._writes_lock:
+            self._writes += 1
+
+    def _epoch(self) -> Epoch:
+        identity = None
+        if self.snapshots is not None:
+            try:
+                identity = _file_identity(os.stat(self.snapshots.path))
+            except FileNotFoundError:
+                pass
+        return (self._writes, identity)
+
+    def _key(self, scope) -> Optional[RequestKey]:
+        if scope["type"] != "http" or scope["method"] != "GET" or not scope["path"].startswith(self.prefixes):
+            return None
+        headers = dict(scope["headers"])
+        return (scope["path"], scope["query_string"]) + tuple(headers.get(name) for name in VARYING_HEADERS)
+
+    async def handle(self, app, scope, receive, send):
+        key = self._key(scope)
+        if key is None:
+            await app(scope, receive, send)
+            return
+
+        epoch = self._epoch()
+        flight = self._inflight.get(key)
+        if flight is not None and flight[1] == epoch:
+            messages = await asyncio.shield(flight[0])
+            if messages is not None:
+                self.coalesced_total += 1
+                for message in messages:
+                    await send(message)
+                return
+            # The leader failed; run this request on its own
+            await app(scope, receive, send)
+            return
+
+        # Lead, replacing any flight that started before the latest write
+        future: "asyncio.Future[Optional[ResponseMessages]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (future, epoch)
+        self.leaders_total += 1
+        messages: ResponseMessages = []
+
+        async def capture(message):
+            messages.append(message)
+
+        try:
+            await app(scope, receive, capture)
+        except BaseException:
+            future.set_result(None)
+            raise
+        else:
+            future.set_result(messages)
+        finally:
+            if self._inflight.get(key, (None,))[0] is future:
+                del self._inflight[key]
+
+        for message in messages:
+            await send(message)
+
+    @property
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    def render_metrics(self) -> str:
+        """Coalescing counters in the Prometheus text exposition format"""
+        return "\n".join([
+            "# HELP wildeditor_singleflight_inflight Distinct GET requests currently executing",
+            "# TYPE wildeditor_singleflight_inflight gauge",
+            f"wildeditor_singleflight_inflight {self.inflight}",
+            "# HELP wildeditor_singleflight_leaders_total GET requests that executed and shared their response",
+            "# TYPE wildeditor_singleflight_leaders_total counter",
+            f"wildeditor_singleflight_leaders_total {self.leaders_total}",
+            "# HELP wildeditor_singleflight_coalesced_total GET requests answered with another request's response",
+            "# TYPE wildeditor_singleflight_coalesced_total counter",
+            f"wildeditor_singleflight_coalesced_total {self.coalesced_total}",
+        ]) + "\n"
+
+# Process-wide coalescing state, shared by the middleware and /api/metrics
+single_flight = SingleFlight(snapshots=snapshot_store)
+
+class SingleFlightMiddleware:
+    """ASGI middleware routing requests through a SingleFlight, e.g. app.add_middleware(SingleFlightMiddleware)"""
+
+    def __init__(self, app, group: SingleFlight = single_flight):
+        self.app = app
+        self.group = group
+
+    async def __call__(self, scope, receive, send):
+        await self.group.handle(self.app, scope, receive, send)
+
+def _on_feature_change(kind: str, action: str, vnum: int, feature: Optional[dict]) -> None:
+    single_flight.record_write()
+
+feature_events.subscribe(_on_feature_change)
@@ -0,0 +1,195 @@
+import math
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import feature_events
+from .snapshot_index import SnapshotIndex
+from .spatial import supercover_cells
+from .world_snapshot import KINDS, WorldSnapshot
+
+# Width of a grid cell in map units; snap tolerances are a few units at most
+CELL_SIZE = 8.0
+
+# Largest tolerance a query may use, keeps lookups to a handful of cells
+MAX_TOLERANCE = 64.0
+
+Cell = Tuple[int, int]
+FeatureKey = Tuple[str, int]
+
+class _SnapFeature:
+    """A region or path as stored in the snap index"""
+    __slots__ = ("kind", "vnum", "zone_vnum", "name", "points", "closed", "vertex_cells", "segment_cells")
+
+    def __init__(self, kind: str, vnum: int, zone_vnum: int, name: Optional[str],
+                 points: List[Tuple[float, float]], closed: bool):
+        self.kind = kind
+        self.vnum = vnum
+        self.zone_vnum = zone_vnum
+        self.name = name
+        self.points = points
+        self.closed = closed
+        self.vertex_cells: Set[Cell] = set()
+        self.segment_cells: Set[Cell] = set()
+
+    def segment(self, index: int) -> Tuple[Tuple[float, float], Tuple[float, float]]:
+        return self.points[index], self.points[(index + 1) % len(self.points)]
+
+    def segment_count(self) -> int:
+        if len(self.points) < 2:
+            return 0
+        return len(self.points) if self.closed else len(self.points) - 1
+
+def _cell(x: float, y: float) -> Cell:
+    return (math.floor(x / CELL_SIZE), math.floor(y / CELL_SIZE))
+
+def _project(x: float, y: float, a: Tuple[float, float], b: Tuple[float, float]) -> Tuple[float, float, float]:
+    """Closest point to (x, y) on segment a-b, returned as (distance, px, py)"""
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length_sq = dx * dx + dy * dy
+    t = 0.0 if length_sq == 0 else min(1.0, max(0.0, ((x - a[0]) * dx + (y - a[1]) * dy) / length_sq))
+    px, py = a[0] + t * dx, a[1] + t * dy
+    return math.hypot(x - px, y - py), px, py
+
+class SnapIndex(SnapshotIndex):
+    """
+    Uniform-grid hash of every region and path vertex and segment.
+
+    Used while drawing or dragging vertices in the editor: the cursor snaps
+    to the nearest existing vertex, or failing that to the nearest point on
+    an existing edge, so shared borders and path junctions line up exactly.
+
+    Each vertex is stored in the cell containing it and each segment in every
+    cell it passes through, so a query only looks at the cells overlapping its
+    tolerance box. Writes replace a single feature's cells in place.
+
+    Vertex indices match the API coordinate lists (regions without the
+    closing point), so a result can be fed straight into a geometry PATCH.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._features: Dict[FeatureKey, _SnapFeature] = {}
+        self._vertices: Dict[Cell, Dict[FeatureKey, List[int]]] = {}
+        self._segments: Dict[Cell, Dict[FeatureKey, List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def load(self, snapshot: WorldSnapshot) -> None:
+        """(Re)load every region and path from a snapshot generation"""
+        with self._lock:
+            self._features = {}
+            self._vertices = {}
+            self._segments = {}
+            for kind in KINDS:
+                zones = snapshot.tables[kind]["zone_vnum"].tolist()
+                for i, vnum in enumerate(snapshot.tables[kind]["vnum"].tolist()):
+                    self._add(kind, vnum, zones[i], snapshot.name(kind, i),
+                              [tuple(point) for point in snapshot.coordinates(kind, i).tolist()])
+            self._loaded = True
+
+    def upsert(self, kind: str, feature: dict) -> None:
+        """Add or replace a region or path from its response dict"""
+        with self._lock:
+            self._remove((kind, feature["vnum"]))
+            self._add(kind, feature["vnum"], feature["zone_vnum"], feature.get("name"),
+                      [(float(c["x"]), float(c["y"])) for c in feature.get("coordinates") or []])
+
+    def delete(self, kind: str, vnum: int) -> None:
+        with self._lock:
+            self._remove((kind, vnum))
+
+    def _add(self, kind: str, vnum: int, zone_vnum: int, name: Optional[str], points: List[Tuple[float, float]]) -> None:
+        if not points:
+            return
+        feature = _SnapFeature(kind, vnum, zone_vnum, name, points, closed=kind == feature_events.FEATURE_REGION)
+        key = (kind, vnum)
+        self._features[key] = feature
+
+        for i, (x, y) in enumerate(points):
+            cell = _cell(x, y)
+            self._vertices.setdefault(cell, {}).setdefault(key, []).append(i)
+            feature.vertex_cells.add(cell)
+
+        for i in range(feature.segment_count()):
+            (x1, y1), (x2, y2) = feature.segment(i)
+            for cell in supercover_cells(x1, y1, x2, y2, CELL_SIZE):
+                indices = self._segments.setdefault(cell, {}).setdefault(key, [])
+                # Corner steps can report a cell twice
+                if not indices or indices[-1] != i:
+                    indices.append(i)
+                feature.segment_cells.add(cell)
+
+    def _remove(self, key: FeatureKey) -> None:
+        feature = self._features.pop(key, None)
+        if feature is None:
+            return
+        for grid, cells in ((self._vertices, feature.vertex_cells), (self._segments, feature.segment_cells)):
+            for cell in cells:
+                bucket = grid.get(cell)
+                if bucket is not None:
+                    bucket.pop(key, None)
+                    if not bucket:
+                        del grid[cell]
+
+    def snap(self, x: float, y: float, tolerance: float,
+             exclude: Optional[FeatureKey] = None) -> Optional[dict]:
+        """
+        Find the snap target for a cursor position.
+
+        The nearest vertex within tolerance wins; otherwise the nearest
+        projection onto a segment within tolerance. Returns None when nothing
+        is close enough. `exclude` skips the feature being edited.
+
+        Returns:
+            Dict with type ('vertex' or 'segment'), kind, vnum, zone_vnum,
+            name, index (vertex index, or segment start index), x, y and distance
+        """
+        min_cell = _cell(x - tolerance, y - tolerance)
+        max_cell = _cell(x + tolerance, y + tolerance)
+        cells = [(i, j) for i in range(min_cell[0], max_cell[0] + 1) for j in range(min_cell[1], max_cell[1] + 1)]
+
+        with self._lock:
+            best = None
+            for cell in cells:
+                for key, indices in self._vertices.get(cell, {}).items():
+                    if key == exclude:
+                        continue
+                    points = self._features[key].points
+                    for i in indices:
+                        distance = math.hypot(x - points[i][0], y - points[i][1])
+                        if distance <= tolerance and (best is None or (distance, key, i) < best[:3]):
+                            best = (distance, key, i, points[i][0], points[i][1])
+            snap_type = "vertex"
+
+            if best is None:
+                snap_type = "segment"
+                for cell in cells:
+                    for key, indices in self._segments.get(cell, {}).items():
+                        if key == exclude:
+                            continue
+                        feature = self._features[key]
+                        for i in indices:
+                            distance, px, py = _project(x, y, *feature.segment(i))
+                            if distance <= tolerance and (best is None or (distance, key, i) < best[:3]):
+                                best = (distance, key, i, px, py)
+
+            if best is None:
+                return None
+            distance, key, index, px, py = best
+            feature = self._features[key]
+            return {
+                "type": snap_type,
+                "kind": feature.kind,
+                "vnum": feature.vnum,
+                "zone_vnum": feature.zone_vnum,
+                "name": feature.name,
+                "index": index,
+                "x": px,
+                "y": py,
+                "distance": distance
+            }
+
+# Process-wide index shared by the points router
+snap_index = SnapIndex()
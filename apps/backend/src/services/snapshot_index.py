@@ -0,0 +1,117 @@
+"""
+In-memory indexes derived from the shared world snapshot.
+
+Each worker keeps its own query structures (R-tree, snap grid, search
+words, ...), but builds them from a snapshot generation instead of the
+database. To catch up, the generation an index was built from is diffed
+against the newest one on disk, so writes handled by any worker reach every
+worker's indexes, and no write can fall between reading the world and
+starting to follow changes.
+"""
+import threading
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from .world_snapshot import (KINDS, PROCESS_STARTED_AT, SnapshotStore, WorldSnapshot,
+                             changed_features, snapshot_store)
+
+# Reload instead of patching when more than this share of all features changed
+RELOAD_FRACTION = 0.25
+
+FeatureKey = Tuple[str, int]
+
+class SnapshotIndex:
+    """
+    Base for indexes that follow the world snapshot.
+
+    Subclasses build themselves from a whole generation in load() and take
+    single features through upsert(kind, feature) and delete(kind, vnum).
+    """
+
+    # Feature kinds the index holds; changes to other kinds are skipped
+    kinds: Tuple[str, ...] = KINDS
+
+    def __init__(self):
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def load(self, snapshot: WorldSnapshot) -> None:
+        raise NotImplementedError
+
+    def upsert(self, kind: str, feature: dict) -> None:
+        raise NotImplementedError
+
+    def delete(self, kind: str, vnum: int) -> None:
+        raise NotImplementedError
+
+    def apply(self, snapshot: WorldSnapshot, changed: Set[FeatureKey]) -> None:
+        """Patch the given features to match `snapshot`"""
+        for kind, vnum in sorted(changed):
+            if kind not in self.kinds:
+                continue
+            row = snapshot.find(kind, vnum)
+            if row is None:
+                self.delete(kind, vnum)
+            else:
+                self.upsert(kind, snapshot.feature(kind, row))
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Load on first use, then catch up with the newest generation"""
+        snapshot_follower.refresh(db, self)
+
+class SnapshotFollower:
+    """
+    Moves every loaded index to the newest snapshot generation together.
+
+    The follower keeps the generation its indexes were built from mapped,
+    diffs it once against each newer generation and hands the changed
+    features to every index, so only two generations are ever mapped.
+    """
+
+    def __init__(self, snapshots: SnapshotStore):
+        self.snapshots = snapshots
+        self._lock = threading.Lock()
+        self._source: Optional[WorldSnapshot] = None
+        self._indexes: List[SnapshotIndex] = []
+
+    @property
+    def generation(self) -> Optional[int]:
+        source = self._source
+        return source.generation if source is not None else None
+
+    def refresh(self, db: Optional[Session] = None, index: Optional[SnapshotIndex] = None) -> Optional[WorldSnapshot]:
+        """
+        Bring the loaded indexes (and `index`, loading it if needed) up to
+        the newest generation. This worker's queued writes are flushed
+        first so it reads its own writes; with a session, a missing
+        snapshot is built from the database.
+        """
+        if self.snapshots.flush() is None and db is not None:
+            self.snapshots.rebuild(db, unless_built_after=PROCESS_STARTED_AT)
+
+        with self._lock:
+            # Read the newest generation under the lock so the source only moves forward
+            snapshot = self.snapshots.current()
+            if snapshot is None:
+                return None
+            source = self._source
+            if source is not None and source.identity != snapshot.identity:
+                changed = changed_features(source, snapshot)
+                reload = len(changed) > RELOAD_FRACTION * sum(snapshot.count(kind) for kind in KINDS)
+                for each in self._indexes:
+                    if reload:
+                        each.load(snapshot)
+                    elif changed:
+                        each.apply(snapshot, changed)
+            self._source = snapshot
+            if index is not None and index not in self._indexes:
+                index.load(snapshot)
+                self._indexes.append(index)
+            return snapshot
+
+# Process-wide follower for the shared snapshot
+snapshot_follower = SnapshotFollower(snapshot_store)
@@ -0,0 +1,88 @@
+from typing import Callable, Dict, List, Optional, Type, Union
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from .coordinate_encoding import COORDINATE_FORMAT_BINARY, COORDINATE_FORMAT_FLAT, coordinates_to_flat
+from .world_snapshot import snapshot_store, feature_summary
+
+# Response fields that can only be produced by decoding the stored geometry
+GEOMETRY_FIELDS = {"coordinates", "geometry_version"}
+
+# Extra fields answered from the world snapshot instead of the geometry
+SUMMARY_FIELDS = {"bbox", "centroid"}
+
+def fields_parameter(model: Type[BaseModel]) -> Callable[..., Optional[List[str]]]:
+    """
+    Build a dependency parsing `fields=vnum,name,...` against a response model.
+    
+    Returns None when the parameter is absent (full responses). `vnum` is
+    always included so every item stays identifiable.
+    """
+    allowed = set(model.__fields__) | SUMMARY_FIELDS
+    
+    def get_fields(
+        fields: Optional[str] = Query(None, description="Comma-separated response fields to return; also accepts 'bbox' and 'centroid'. Geometry is not read unless 'coordinates' or 'geometry_version' is requested")
+    ) -> Optional[List[str]]:
+        if fields is None:
+            return None
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Allowed fields: {', '.join(sorted(allowed))}"
+            )
+        return ["vnum"] + [field for field in dict.fromkeys(requested) if field != "vnum"]
+    
+    return get_fields
+
+def needs_geometry(fields: Optional[List[str]]) -> bool:
+    """Whether the stored geometry has to be read for these fields"""
+    return fields is None or bool(GEOMETRY_FIELDS.intersection(fields))
+
+def sparse_response(
+    kind: str,
+    result: Union[Dict, List[Dict]],
+    fields: List[str],
+    coordinate_format: str,
+    geometry_loader: Callable[[int], List[Dict]],
+    status_code: int = status.HTTP_200_OK
+) -> JSONResponse:
+    """
+    Serialize response dicts reduced to the requested fields.
+    
+    bbox and centroid come precomputed from the world snapshot. A feature
+    the snapshot does not have yet (written moments ago, or before the
+    snapshot is built) falls back to geometry_loader(vnum) for its
+    coordinates. Partial items do not match the full response model, so
+    they are returned as a JSONResponse like the flat coordinate format.
+    """
+    items = result if isinstance(result, list) else [result]
+    if coordinate_format == COORDINATE_FORMAT_BINARY:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The fields parameter cannot be combined with the binary coordinate format"
+        )
+    
+    if SUMMARY_FIELDS.intersection(fields):
+        snapshot = snapshot_store.current()
+        for item in items:
+            i = snapshot.find(kind, item["vnum"]) if snapshot is not None else None
+            if i is not None:
+                item.update(snapshot.summary(kind, i))
+            else:
+                coordinates = item["coordinates"] if "coordinates" in item else geometry_loader(item["vnum"])
+                item.update(feature_summary(kind, coordinates))
+    
+    content = []
+    for item in items:
+        selected = {field: item.get(field) for field in fields}
+        if coordinate_format == COORDINATE_FORMAT_FLAT and "coordinates" in selected:
+            selected["coordinates"] = coordinates_to_flat(selected["coordinates"])
+        content.append(selected)
+    if not isinstance(result, list):
+        content = content[0]
+    return JSONResponse(content=jsonable_encoder(content), status_code=status_code)
@@ -0,0 +1,200 @@
+import re
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+_RING_PATTERN = re.compile(r"\(([^()]*)\)")
+
+def wkt_to_rings(wkt: str) -> List[np.ndarray]:
+    """
+    Parse POLYGON or LINESTRING WKT into (n, 2) float arrays, one per ring.
+
+    Unlike polygon_wkt_to_coordinates this keeps the geometry exactly as
+    stored (closing point, tiny landmark squares, interior rings), which is
+    what the vectorized spatial tests need.
+    """
+    if not wkt:
+        return []
+
+    rings = []
+    for ring_text in _RING_PATTERN.findall(wkt):
+        values = np.array(ring_text.replace(",", " ").split(), dtype=np.float64)
+        if values.size >= 2:
+            rings.append(values[: values.size - values.size % 2].reshape(-1, 2))
+    return rings
+
+def bounding_box(rings: List[np.ndarray]) -> Tuple[float, float, float, float]:
+    """Return (min_x, min_y, max_x, max_y) over all rings"""
+    stacked = np.vstack(rings)
+    return (
+        float(stacked[:, 0].min()), float(stacked[:, 1].min()),
+        float(stacked[:, 0].max()), float(stacked[:, 1].max())
+    )
+
+def envelope_wkt(min_x: float, min_y: float, max_x: float, max_y: float) -> str:
+    """Build a rectangular POLYGON WKT for MBR prefilter queries"""
+    return (
+        f"POLYGON(({min_x} {min_y}, {max_x} {min_y}, {max_x} {max_y}, "
+        f"{min_x} {max_y}, {min_x} {min_y}))"
+    )
+
+def points_in_polygon(px: np.ndarray, py: np.ndarray, rings: List[np.ndarray]) -> np.ndarray:
+    """
+    Even-odd point-in-polygon test for many points at once.
+
+    Points are sorted by y once; each polygon edge then only touches the
+    slice of points inside its y-range (found with searchsorted), so the
+    cost is about (edges x log points) plus the points actually crossing
+    each edge's band. Interior rings (holes) flip the result as expected.
+    """
+    order = np.argsort(py, kind="stable")
+    sorted_x, sorted_y = px[order], py[order]
+    inside = np.zeros(px.shape, dtype=bool)
+
+    for ring in rings:
+        x2s, y2s = ring[:, 0], ring[:, 1]
+        x1s, y1s = np.roll(x2s, 1), np.roll(y2s, 1)
+        # A point crosses an edge when min_y <= y < max_y
+        starts = np.searchsorted(sorted_y, np.minimum(y1s, y2s), side="left")
+        ends = np.searchsorted(sorted_y, np.maximum(y1s, y2s), side="left")
+        for x1, y1, x2, y2, lo, hi in zip(x1s.tolist(), y1s.tolist(), x2s.tolist(), y2s.tolist(), starts.tolist(), ends.tolist()):
+            if lo == hi:
+                continue
+            crossing_x = x1 + (sorted_y[lo:hi] - y1) * ((x2 - x1) / (y2 - y1))
+            inside[lo:hi] ^= sorted_x[lo:hi] < crossing_x
+
+    result = np.empty_like(inside)
+    result[order] = inside
+    return result
+
+def distance_to_segments(px: np.ndarray, py: np.ndarray, vertices: np.ndarray) -> np.ndarray:
+    """Minimum distance from each point to a polyline given as (n, 2) vertices"""
+    if len(vertices) == 1:
+        return np.hypot(px - vertices[0, 0], py - vertices[0, 1])
+
+    best = np.full(px.shape, np.inf)
+    for (x1, y1), (x2, y2) in zip(vertices[:-1].tolist(), vertices[1:].tolist()):
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        if length_sq == 0:
+            t = 0.0
+        else:
+            t = np.clip(((px - x1) * dx + (py - y1) * dy) / length_sq, 0.0, 1.0)
+        np.minimum(best, np.hypot(px - (x1 + t * dx), py - (y1 + t * dy)), out=best)
+    return best
+
+def points_near_segments(px: np.ndarray, py: np.ndarray, vertices: np.ndarray, radius: float) -> np.ndarray:
+    """
+    Points within `radius` of a polyline given as (n, 2) vertices.
+
+    Like points_in_polygon, each segment is only tested against the y-sorted
+    slice of points inside its bounding band, instead of against every point.
+    """
+    if len(vertices) == 1:
+        return np.hypot(px - vertices[0, 0], py - vertices[0, 1]) <= radius
+
+    order = np.argsort(py, kind="stable")
+    sorted_x, sorted_y = px[order], py[order]
+    near = np.zeros(px.shape, dtype=bool)
+
+    x1s, y1s = vertices[:-1, 0], vertices[:-1, 1]
+    x2s, y2s = vertices[1:, 0], vertices[1:, 1]
+    starts = np.searchsorted(sorted_y, np.minimum(y1s, y2s) - radius, side="left")
+    ends = np.searchsorted(sorted_y, np.maximum(y1s, y2s) + radius, side="right")
+
+    for x1, y1, x2, y2, lo, hi in zip(x1s.tolist(), y1s.tolist(), x2s.tolist(), y2s.tolist(), starts.tolist(), ends.tolist()):
+        if lo == hi:
+            continue
+        band_x, band_y = sorted_x[lo:hi], sorted_y[lo:hi]
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = dx * dx + dy * dy
+        if length_sq == 0:
+            t = 0.0
+        else:
+            t = np.clip(((band_x - x1) * dx + (band_y - y1) * dy) / length_sq, 0.0, 1.0)
+        near[lo:hi] |= np.hypot(band_x - (x1 + t * dx), band_y - (y1 + t * dy)) <= radius
+
+    result = np.empty_like(near)
+    result[order] = near
+    return result
+
+def points_near_polygon(px: np.ndarray, py: np.ndarray, rings: List[np.ndarray], radius: float) -> np.ndarray:
+    """Points inside the polygon or within `radius` of its boundary"""
+    hits = points_in_polygon(px, py, rings)
+    if radius > 0:
+        for ring in rings:
+            closed = ring if np.array_equal(ring[0], ring[-1]) else np.vstack([ring, ring[:1]])
+            outside = np.flatnonzero(~hits)
+            hits[outside] |= points_near_segments(px[outside], py[outside], closed, radius)
+    return hits
+
+def point_to_ring_distance(x: float, y: float, ring: np.ndarray) -> float:
+    """
+    Distance from a point to a polygon given as a closed (n, 2) ring.
+
+    Returns 0 for points inside the polygon. A single-vertex ring is treated
+    as a point (landmark). Vectorized over the ring's edges.
+    """
+    if len(ring) == 1:
+        return float(np.hypot(x - ring[0, 0], y - ring[0, 1]))
+
+    x1, y1 = ring[:-1, 0], ring[:-1, 1]
+    x2, y2 = ring[1:, 0], ring[1:, 1]
+
+    straddles = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    if np.count_nonzero(straddles & (x < crossing_x)) % 2:
+        return 0.0
+
+    dx, dy = x2 - x1, y2 - y1
+    length_sq = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(length_sq > 0, ((x - x1) * dx + (y - y1) * dy) / length_sq, 0.0)
+    t = np.clip(t, 0.0, 1.0)
+    return float(np.hypot(x - (x1 + t * dx), y - (y1 + t * dy)).min())
+
+def supercover_cells(x1: float, y1: float, x2: float, y2: float, cell_size: float = 1.0) -> List[Tuple[int, int]]:
+    """
+    Every grid cell a segment passes through, in order from (x1, y1) to (x2, y2).
+
+    Cell (i, j) covers [i * cell_size, (i + 1) * cell_size) on each axis. This
+    is a supercover traversal (Amanatides-Woo): where the segment passes
+    exactly through a cell corner, both side cells are included as well, so
+    no cell the segment touches is missed.
+    """
+    cx, cy = math.floor(x1 / cell_size), math.floor(y1 / cell_size)
+    end_x, end_y = math.floor(x2 / cell_size), math.floor(y2 / cell_size)
+    dx, dy = x2 - x1, y2 - y1
+
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    # Segment parameter t at which the next vertical / horizontal cell boundary is crossed
+    t_max_x = ((cx + (dx > 0)) * cell_size - x1) / dx if dx else math.inf
+    t_max_y = ((cy + (dy > 0)) * cell_size - y1) / dy if dy else math.inf
+    t_delta_x = cell_size / abs(dx) if dx else math.inf
+    t_delta_y = cell_size / abs(dy) if dy else math.inf
+
+    cells = [(cx, cy)]
+    remaining = abs(end_x - cx) + abs(end_y - cy)
+    while remaining > 0:
+        if t_max_x < t_max_y:
+            cx += step_x
+            t_max_x += t_delta_x
+            remaining -= 1
+        elif t_max_y < t_max_x:
+            cy += step_y
+            t_max_y += t_delta_y
+            remaining -= 1
+        else:
+            # Exactly through a corner: include both neighbours, then move diagonally
+            cells.append((cx + step_x, cy))
+            cells.append((cx, cy + step_y))
+            cx += step_x
+            cy += step_y
+            t_max_x += t_delta_x
+            t_max_y += t_delta_y
+            remaining -= 2
+        cells.append((cx, cy))
+    return cells
@@ -0,0 +1,63 @@
+import struct
+import zlib
+from typing import List, Sequence
+
+from ..schemas.common import VertexOperation
+
+# Wilderness coordinate bounds (see coordinate_system in the types endpoints)
+WILDERNESS_MIN = -1024
+WILDERNESS_MAX = 1024
+
+def geometry_version(coordinates: Sequence[dict]) -> str:
+    """
+    Compute a short version token for a coordinate list.
+
+    The token is a CRC32 of the packed vertex doubles, so two clients that
+    fetched the same geometry always see the same version without a
+    dedicated version column in region_data/path_data.
+    """
+    flat: List[float] = []
+    for coord in coordinates:
+        flat.append(float(coord['x']))
+        flat.append(float(coord['y']))
+    packed = struct.pack(f"<{len(flat)}d", *flat)
+    return f"{zlib.crc32(packed):08x}"
+
+def apply_vertex_operations(coordinates: List[dict], operations: Sequence[VertexOperation]) -> List[dict]:
+    """
+    Apply vertex-level insert/move/delete operations to a coordinate list.
+
+    Operations are applied in order, so each index refers to the vertex list
+    as left by the previous operation. Only indices and the new vertices'
+    bounds are checked here; polygon validity is up to the caller, and
+    copying the list makes this O(n) in the vertex count.
+
+    Raises:
+        ValueError: If an index is out of range or a vertex is out of bounds
+    """
+    coords = list(coordinates)
+    
+    for i, operation in enumerate(operations):
+        if operation.op == 'delete':
+            if not 0 <= operation.index < len(coords):
+                raise ValueError(f"Operation {i}: delete index {operation.index} out of range (0-{len(coords) - 1})")
+            del coords[operation.index]
+            continue
+        
+        if operation.x is None or operation.y is None:
+            raise ValueError(f"Operation {i}: {operation.op} requires x and y values")
+        if not (WILDERNESS_MIN <= operation.x <= WILDERNESS_MAX) or not (WILDERNESS_MIN <= operation.y <= WILDERNESS_MAX):
+            raise ValueError(f"Operation {i}: ({operation.x}, {operation.y}) outside wilderness bounds (-1024 to +1024)")
+        
+        vertex = {"x": float(operation.x), "y": float(operation.y)}
+        if operation.op == 'insert':
+            # Inserting at len(coords) appends a vertex
+            if not 0 <= operation.index <= len(coords):
+                raise ValueError(f"Operation {i}: insert index {operation.index} out of range (0-{len(coords)})")
+            coords.insert(operation.index, vertex)
+        else:
+            if not 0 <= operation.index < len(coords):
+                raise ValueError(f"Operation {i}: move index {operation.index} out of range (0-{len(coords) - 1})")
+            coords[operation.index] = vertex
+    
+    return coords
@@ -0,0 +1,132 @@
+from typing import List
+
+# Conversions between API coordinate lists and MySQL WKT (as produced by ST_AsText).
+# MySQL writes no space after commas, e.g. POLYGON((0 0,10 0,10 10,0 0)).
+
+def coordinates_to_polygon_wkt(coordinates: List[dict]) -> str:
+    """Convert coordinate list to MySQL POLYGON WKT format"""
+    if not coordinates:
+        return ""
+    
+    # Handle single point (create a tiny polygon around it)
+    if len(coordinates) == 1:
+        x, y = coordinates[0]['x'], coordinates[0]['y']
+        # Create a very small square around the point (0.001 radius)
+        radius = 0.001
+        coords = [
+            {"x": x - radius, "y": y - radius},
+            {"x": x + radius, "y": y - radius}, 
+            {"x": x + radius, "y": y + radius},
+            {"x": x - radius, "y": y + radius},
+            {"x": x - radius, "y": y - radius}  # Close polygon
+        ]
+    else:
+        coords = coordinates.copy()
+    
+    # Ensure polygon is closed (first point = last point)
+    if len(coords) > 1 and coords[0] != coords[-1]:
+        coords.append(coords[0])
+    
+    points = [f"{coord['x']} {coord['y']}" for coord in coords]
+    return f"POLYGON(({', '.join(points)}))"
+
+def polygon_wkt_to_coordinates(wkt: str) -> List[dict]:
+    """Convert MySQL POLYGON WKT format to coordinate list"""
+    if not wkt:
+        return []
+    
+    # Parse WKT format: POLYGON((x1 y1, x2 y2, ...))
+    try:
+        # Remove POLYGON(( and ))
+        coords_str = wkt.replace("POLYGON((", "").replace("))", "")
+        point_pairs = coords_str.split(",")
+        
+        coordinates = []
+        for pair in point_pairs:
+            if pair.strip():
+                parts = pair.strip().split()
+                if len(parts) >= 2:
+                    x, y = float(parts[0]), float(parts[1])
+                    coordinates.append({"x": x, "y": y})
+        
+        # Remove duplicate closing point if present
+        if len(coordinates) > 1 and coordinates[0] == coordinates[-1]:
+            coordinates = coordinates[:-1]
+        
+        # Handle point regions (landmarks) - check if all points are the same
+        if len(coordinates) >= 3:
+            unique_points: List[dict] = []
+            for coord in coordinates:
+                if not any(abs(coord['x'] - up['x']) < 0.001 and abs(coord['y'] - up['y']) < 0.001 for up in unique_points):
+                    unique_points.append(coord)
+            
+            # If all points are essentially the same (landmark), return single point
+            if len(unique_points) == 1:
+                return [unique_points[0]]
+            
+            # If it's a very small polygon, might be a point region
+            if len(unique_points) <= 4:
+                x_coords = [c['x'] for c in unique_points]
+                y_coords = [c['y'] for c in unique_points]
+                x_range = max(x_coords) - min(x_coords) if len(x_coords) > 1 else 0
+                y_range = max(y_coords) - min(y_coords) if len(y_coords) > 1 else 0
+                
+                # If it's a very small area (< 0.01), treat as point
+                if x_range < 0.01 and y_range < 0.01:
+                    center_x = sum(x_coords) / len(x_coords)
+                    center_y = sum(y_coords) / len(y_coords)
+                    return [{"x": center_x, "y": center_y}]
+                
+            coordinates = unique_points
+            
+        return coordinates
+    except Exception as e:
+        print(f"Error parsing WKT: {e}, WKT: {wkt}")
+        return []
+
+def coordinates_to_linestring_wkt(coordinates: List[dict]) -> str:
+    """
+    Convert coordinate list to MySQL LINESTRING WKT format.
+    
+    Args:
+        coordinates: List of coordinate dictionaries with 'x' and 'y' keys
+        
+    Returns:
+        WKT string in format: LINESTRING(x1 y1, x2 y2, ...)
+    """
+    if not coordinates or len(coordinates) < 2:
+        raise ValueError("Path must have at least 2 coordinate points")
+    
+    points = [f"{coord['x']} {coord['y']}" for coord in coordinates]
+    return f"LINESTRING({', '.join(points)})"
+
+def linestring_wkt_to_coordinates(wkt: str) -> List[dict]:
+    """
+    Convert MySQL LINESTRING WKT format to coordinate list.
+    
+    Args:
+        wkt: WKT string in format LINESTRING(x1 y1, x2 y2, ...)
+        
+    Returns:
+        List of coordinate dictionaries with 'x' and 'y' keys
+    """
+    if not wkt:
+        return []
+    
+    try:
+        # Remove LINESTRING( and )
+        coords_str = wkt.replace("LINESTRING(", "").replace(")", "")
+        point_pairs = coords_str.split(",")
+        
+        coordinates = []
+        for pair in point_pairs:
+            if pair.strip():
+                parts = pair.strip().split()
+                if len(parts) >= 2:
+                    x, y = float(parts[0]), float(parts[1])
+                    coordinates.append({"x": x, "y": y})
+        
+        return coordinates
+    except Exception as e:
+        print(f"Error parsing LINESTRING WKT: {e}, WKT: {wkt}")
+        return []
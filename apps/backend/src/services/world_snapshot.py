@@ -0,0 +1,528 @@
+"""
+Memory-mapped world snapshot shared by every worker process.
+
+All region and path geometry and attributes are written to one read-only
+file of columnar arrays. Workers map it with mmap and read the arrays in
+place (np.frombuffer), so the operating system keeps a single copy in the
+page cache no matter how many workers run.
+
+Layout:
+
+    magic       4 bytes, b"WSNP"
+    version     uint32
+    header_len  uint64
+    header      UTF-8 JSON: generation, built_at and, for every array, its
+                offset (relative to the data start), dtype and shape
+    data        arrays, each starting on a 64-byte boundary; the data
+                start is the first 64-byte boundary after the header
+
+Arrays exist once per feature kind, prefixed "region_" or "path_", with
+features sorted by vnum:
+
+    vnum, zone_vnum, type, props    int32 per feature (props NULL_PROPS = null)
+    bbox                            float64 (n, 4) min_x, min_y, max_x, max_y (NaN if empty)
+    centroid                        float64 (n, 2) area centroid (regions) or length centroid (paths)
+    coord_offsets, coords           CSR: feature i owns coords[offsets[i]:offsets[i + 1]]
+    name_offsets, names             CSR over UTF-8 name bytes
+    grid_offsets, grid_items        CSR from GRID_CELL-sized world cells to feature indices
+
+A new generation is written to a temporary file and renamed over the old
+one, so readers always see a complete file and pick up the new generation
+by checking the file's identity.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from . import feature_events
+from .feature_loader import load_region_features, load_path_features
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: single-process locking only
+    fcntl = None
+
+MAGIC = b"WSNP"
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+NULL_PROPS = np.iinfo(np.int32).min
+
+# Coarse spatial index over the wilderness
+WORLD_MIN = -1024
+WORLD_MAX = 1024
+GRID_CELL = 64
+GRID_SIZE = (WORLD_MAX - WORLD_MIN) // GRID_CELL
+
+# Writes arriving within this window are folded into one new generation
+FLUSH_DELAY_SECONDS = 0.5
+
+DEFAULT_SNAPSHOT_PATH = os.path.join(tempfile.gettempdir(), "wildeditor-world.snapshot")
+
+KINDS = (feature_events.FEATURE_REGION, feature_events.FEATURE_PATH)
+
+Table = Dict[str, np.ndarray]
+
+# listener(previous, current, changed) - runs under the snapshot file lock after a
+# new generation is written; changed is the set of (kind, vnum) keys that were
+# patched, or None after a full rebuild
+GenerationListener = Callable[[Optional["WorldSnapshot"], "WorldSnapshot", Optional[Set[Tuple[str, int]]]], None]
+
+def _align(size: int) -> int:
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+def _feature_bbox(points: np.ndarray) -> List[float]:
+    if not len(points):
+        return [math.nan] * 4
+    return [float(points[:, 0].min()), float(points[:, 1].min()),
+            float(points[:, 0].max()), float(points[:, 1].max())]
+
+def _feature_centroid(kind: str, points: np.ndarray) -> List[float]:
+    """Area centroid of a region ring, or length centroid of a path, falling back to the vertex mean"""
+    if not len(points):
+        return [math.nan] * 2
+    x, y = points[:, 0], points[:, 1]
+    if kind == feature_events.FEATURE_REGION and len(points) >= 3:
+        x2, y2 = np.roll(x, -1), np.roll(y, -1)
+        cross = x * y2 - x2 * y
+        area = cross.sum() / 2
+        if area:
+            return [float(((x + x2) * cross).sum() / (6 * area)), float(((y + y2) * cross).sum() / (6 * area))]
+    lengths = np.hypot(np.diff(x), np.diff(y))
+    if lengths.sum():
+        return [float(((x[:-1] + x[1:]) / 2 * lengths).sum() / lengths.sum()),
+                float(((y[:-1] + y[1:]) / 2 * lengths).sum() / lengths.sum())]
+    return [float(x.mean()), float(y.mean())]
+
+def feature_summary(kind: str, coordinates: List[Dict]) -> Dict[str, Optional[Dict[str, float]]]:
+    """Bounding box and centroid computed from coordinates, as WorldSnapshot.summary returns them"""
+    points = np.array([(c["x"], c["y"]) for c in coordinates], dtype=np.float64).reshape(-1, 2)
+    if not len(points):
+        return {"bbox": None, "centroid": None}
+    min_x, min_y, max_x, max_y = _feature_bbox(points)
+    x, y = _feature_centroid(kind, points)
+    return {
+        "bbox": {"min_x": min_x, "min_y": min_y, "max_x": max_x, "max_y": max_y},
+        "centroid": {"x": x, "y": y}
+    }
+
+def _cell_range(low: float, high: float) -> range:
+    first = min(max(int((low - WORLD_MIN) // GRID_CELL), 0), GRID_SIZE - 1)
+    last = min(max(int((high - WORLD_MIN) // GRID_CELL), 0), GRID_SIZE - 1)
+    return range(first, last + 1)
+
+def _grid_index(bbox: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """CSR mapping of grid cells (row-major, y then x) to the features whose bbox overlaps them"""
+    cells: List[int] = []
+    items: List[int] = []
+    for i, (min_x, min_y, max_x, max_y) in enumerate(bbox.tolist()):
+        if math.isnan(min_x):
+            continue
+        for cy in _cell_range(min_y, max_y):
+            for cx in _cell_range(min_x, max_x):
+                cells.append(cy * GRID_SIZE + cx)
+                items.append(i)
+    cell_ids = np.asarray(cells, dtype=np.int64)
+    order = np.argsort(cell_ids, kind="stable")
+    offsets = np.zeros(GRID_SIZE * GRID_SIZE + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cell_ids, minlength=GRID_SIZE * GRID_SIZE), out=offsets[1:])
+    return offsets, np.asarray(items, dtype=np.int32)[order]
+
+def _empty_table() -> Table:
+    return {
+        "vnum": np.zeros(0, dtype=np.int32),
+        "zone_vnum": np.zeros(0, dtype=np.int32),
+        "type": np.zeros(0, dtype=np.int32),
+        "props": np.zeros(0, dtype=np.int32),
+        "bbox": np.zeros((0, 4), dtype=np.float64),
+        "centroid": np.zeros((0, 2), dtype=np.float64),
+        "coord_offsets": np.zeros(1, dtype=np.int64),
+        "coords": np.zeros((0, 2), dtype=np.float64),
+        "name_offsets": np.zeros(1, dtype=np.int64),
+        "names": np.zeros(0, dtype=np.uint8),
+    }
+
+def _with_grid(table: Table) -> Table:
+    table["grid_offsets"], table["grid_items"] = _grid_index(table["bbox"])
+    return table
+
+def _feature_rows(kind: str, features: List[Dict]) -> Table:
+    """Columnar arrays for features, in the order given and without the grid"""
+    points = [np.array([(c["x"], c["y"]) for c in feature.get("coordinates") or []], dtype=np.float64).reshape(-1, 2)
+              for feature in features]
+    names = [(feature.get("name") or "").encode("utf-8") for feature in features]
+    props = [feature.get(f"{kind}_props") for feature in features]
+
+    table = _empty_table()
+    table["vnum"] = np.array([feature["vnum"] for feature in features], dtype=np.int32)
+    table["zone_vnum"] = np.array([feature["zone_vnum"] for feature in features], dtype=np.int32)
+    table["type"] = np.array([feature[f"{kind}_type"] for feature in features], dtype=np.int32)
+    table["props"] = np.array([NULL_PROPS if p is None else p for p in props], dtype=np.int32)
+    if features:
+        table["bbox"] = np.array([_feature_bbox(p) for p in points], dtype=np.float64)
+        table["centroid"] = np.array([_feature_centroid(kind, p) for p in points], dtype=np.float64)
+        table["coords"] = np.vstack(points)
+    table["coord_offsets"] = np.concatenate([[0], np.cumsum([len(p) for p in points])]).astype(np.int64)
+    table["name_offsets"] = np.concatenate([[0], np.cumsum([len(n) for n in names])]).astype(np.int64)
+    table["names"] = np.frombuffer(b"".join(names), dtype=np.uint8).copy()
+    return table
+
+def build_table(kind: str, features: List[Dict]) -> Table:
+    """Columnar arrays for one feature kind from response-shaped dicts"""
+    return _with_grid(_feature_rows(kind, sorted(features, key=lambda feature: feature["vnum"])))
+
+_ROW_COLUMNS = ("vnum", "zone_vnum", "type", "props", "bbox", "centroid")
+_CSR_COLUMNS = (("coord_offsets", "coords"), ("name_offsets", "names"))
+
+def _csr_take(offsets: np.ndarray, values: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Offsets and values of the given CSR rows, in that order"""
+    starts, lengths = offsets[rows], offsets[rows + 1] - offsets[rows]
+    new_offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    # Position of every kept value in the source array
+    source = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+    return new_offsets, values[source]
+
+def _take_rows(table: Table, rows: np.ndarray) -> Table:
+    """Table of the given rows, in that order, without the grid"""
+    result: Table = {column: table[column][rows] for column in _ROW_COLUMNS}
+    for offsets_name, values_name in _CSR_COLUMNS:
+        result[offsets_name], result[values_name] = _csr_take(table[offsets_name], table[values_name], rows)
+    return result
+
+def _concat_rows(first: Table, second: Table) -> Table:
+    result: Table = {column: np.concatenate([first[column], second[column]]) for column in _ROW_COLUMNS}
+    for offsets_name, values_name in _CSR_COLUMNS:
+        result[values_name] = np.concatenate([first[values_name], second[values_name]])
+        result[offsets_name] = np.concatenate([first[offsets_name], second[offsets_name][1:] + first[offsets_name][-1]])
+    return result
+
+def apply_changes(table: Table, kind: str, changes: Dict[int, Optional[Dict]]) -> Table:
+    """
+    New table with the given features replaced (or removed when None).
+
+    All changes are applied in one pass, and the grid is rebuilt once.
+    """
+    kept = np.flatnonzero(~np.isin(table["vnum"], np.fromiter(changes, dtype=np.int64, count=len(changes))))
+    added = [feature for feature in changes.values() if feature is not None]
+    merged = _concat_rows(_take_rows(table, kept), _feature_rows(kind, added))
+    return _with_grid(_take_rows(merged, np.argsort(merged["vnum"], kind="stable")))
+
+def write_snapshot(path: str, tables: Dict[str, Table], generation: int) -> None:
+    """Write a complete snapshot next to `path`, then atomically rename it into place"""
+    arrays = {f"{kind}_{name}": np.ascontiguousarray(array)
+              for kind, table in tables.items() for name, array in table.items()}
+
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+        offset += _align(array.nbytes)
+    header = json.dumps({"generation": generation, "built_at": time.time(), "arrays": layout}).encode("utf-8")
+    data_start = _align(16 + len(header))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(MAGIC + struct.pack("<IQ", FORMAT_VERSION, len(header)) + header)
+        for name, array in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+class WorldSnapshot:
+    """A read-only, zero-copy view of one snapshot generation"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.identity = _file_identity(os.fstat(f.fileno()))
+
+        version, header_len = struct.unpack("<IQ", self._map[4:16])
+        if self._map[:4] != MAGIC:
+            raise ValueError(f"{path} is not a world snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported world snapshot version {version}")
+        header = json.loads(self._map[16:16 + header_len].decode("utf-8"))
+        data_start = _align(16 + header_len)
+
+        self.generation: int = header["generation"]
+        self.built_at: float = header["built_at"]
+        self.size_bytes = len(self._map)
+        self.tables: Dict[str, Table] = {kind: {} for kind in KINDS}
+        for name, spec in header["arrays"].items():
+            kind, column = name.split("_", 1)
+            dtype = np.dtype(spec["dtype"])
+            count = int(np.prod(spec["shape"], dtype=np.int64))
+            array = np.frombuffer(self._map, dtype=dtype, count=count, offset=data_start + spec["offset"])
+            self.tables[kind][column] = array.reshape(spec["shape"])
+
+    def count(self, kind: str) -> int:
+        return len(self.tables[kind]["vnum"])
+
+    def find(self, kind: str, vnum: int) -> Optional[int]:
+        """Row index of a vnum, found by binary search"""
+        vnums = self.tables[kind]["vnum"]
+        i = int(np.searchsorted(vnums, vnum))
+        return i if i < len(vnums) and vnums[i] == vnum else None
+
+    def coordinates(self, kind: str, i: int) -> np.ndarray:
+        """(n, 2) coordinate view of row i, without copying"""
+        table = self.tables[kind]
+        return table["coords"][table["coord_offsets"][i]:table["coord_offsets"][i + 1]]
+
+    def batch(self, kind: str, rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Coordinates, coordinate offsets and vnums of the given rows as
+        standalone arrays, the batch layout geometry pool kernels take.
+        """
+        table = self.tables[kind]
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = table["coord_offsets"][rows]
+        lengths = table["coord_offsets"][rows + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        gather = np.repeat(starts - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return {
+            "coords": table["coords"][gather],
+            "offsets": offsets,
+            "vnums": table["vnum"][rows].astype(np.int32)
+        }
+
+    def name(self, kind: str, i: int) -> str:
+        table = self.tables[kind]
+        return table["names"][table["name_offsets"][i]:table["name_offsets"][i + 1]].tobytes().decode("utf-8")
+
+    def feature(self, kind: str, i: int) -> Dict:
+        """Response-shaped dict for row i"""
+        table = self.tables[kind]
+        props = int(table["props"][i])
+        return {
+            "vnum": int(table["vnum"][i]),
+            "zone_vnum": int(table["zone_vnum"][i]),
+            "name": self.name(kind, i),
+            f"{kind}_type": int(table["type"][i]),
+            f"{kind}_props": None if props == NULL_PROPS else props,
+            "coordinates": [{"x": x, "y": y} for x, y in self.coordinates(kind, i).tolist()]
+        }
+
+    def summary(self, kind: str, i: int) -> Dict[str, Optional[Dict[str, float]]]:
+        """Precomputed bounding box and centroid of row i"""
+        table = self.tables[kind]
+        min_x, min_y, max_x, max_y = table["bbox"][i].tolist()
+        x, y = table["centroid"][i].tolist()
+        if math.isnan(min_x):
+            return {"bbox": None, "centroid": None}
+        return {
+            "bbox": {"min_x": min_x, "min_y": min_y, "max_x": max_x, "max_y": max_y},
+            "centroid": {"x": x, "y": y}
+        }
+
+    def query(self, kind: str, min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+        """Row indices (ascending vnum) of features whose bbox intersects the given box"""
+        table = self.tables[kind]
+        offsets, items = table["grid_offsets"], table["grid_items"]
+        candidates = [items[offsets[cy * GRID_SIZE + cx]:offsets[cy * GRID_SIZE + cx + 1]]
+                      for cy in _cell_range(min_y, max_y) for cx in _cell_range(min_x, max_x)]
+        rows = np.unique(np.concatenate(candidates)) if candidates else np.zeros(0, dtype=np.int32)
+        bbox = table["bbox"][rows]
+        hits = (bbox[:, 0] <= max_x) & (bbox[:, 2] >= min_x) & (bbox[:, 1] <= max_y) & (bbox[:, 3] >= min_y)
+        return rows[hits]
+
+def changed_features(previous: WorldSnapshot, current: WorldSnapshot) -> Set[Tuple[str, int]]:
+    """
+    (kind, vnum) of every feature added, removed or modified between two
+    generations, compared column by column without building any dicts.
+    """
+    changed: Set[Tuple[str, int]] = set()
+    for kind in KINDS:
+        old, new = previous.tables[kind], current.tables[kind]
+        changed.update((kind, vnum) for vnum in np.setxor1d(old["vnum"], new["vnum"], assume_unique=True).tolist())
+        common, old_rows, new_rows = np.intersect1d(old["vnum"], new["vnum"], assume_unique=True, return_indices=True)
+        differs = np.zeros(len(common), dtype=bool)
+        for column in ("zone_vnum", "type", "props"):
+            differs |= old[column][old_rows] != new[column][new_rows]
+        for offsets_name, values_name in _CSR_COLUMNS:
+            old_lengths = np.diff(old[offsets_name])[old_rows]
+            new_lengths = np.diff(new[offsets_name])[new_rows]
+            differs |= old_lengths != new_lengths
+            # Rows of equal length line up value for value once gathered
+            same = np.flatnonzero(old_lengths == new_lengths)
+            _, old_values = _csr_take(old[offsets_name], old[values_name], old_rows[same])
+            _, new_values = _csr_take(new[offsets_name], new[values_name], new_rows[same])
+            mismatch = old_values != new_values
+            if mismatch.ndim > 1:
+                mismatch = mismatch.any(axis=1)
+            owners = np.repeat(same, old_lengths[same])
+            differs[owners[mismatch]] = True
+        changed.update((kind, vnum) for vnum in common[differs].tolist())
+    return changed
+
+def _file_identity(stat: os.stat_result) -> Tuple[int, int, int]:
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+class SnapshotStore:
+    """
+    Owns the snapshot file: builds it, applies writes to it and hands out the
+    current generation.
+
+    Rebuilds and incremental updates take an exclusive file lock, so across
+    all workers only one process writes a generation at a time, always
+    starting from the latest file on disk. Each write is applied by the
+    worker that handled it, batched over FLUSH_DELAY_SECONDS. Readers call
+    current(), which remaps only when the file has been replaced.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("WORLD_SNAPSHOT_PATH", DEFAULT_SNAPSHOT_PATH)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._snapshot: Optional[WorldSnapshot] = None
+        self._pending: Dict[Tuple[str, int], Optional[Dict]] = {}
+        # Writes taken by a flush that is still writing its generation
+        self._flushing: Dict[Tuple[str, int], Optional[Dict]] = {}
+        # Bounding box each queued write replaced, until the change feed takes it
+        self._replaced: Dict[Tuple[str, int], Optional[Dict[str, float]]] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._listeners: List[GenerationListener] = []
+
+    def subscribe(self, listener: GenerationListener) -> None:
+        """Register a builder for files derived from the snapshot"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def _publish(self, previous: Optional[WorldSnapshot], current: WorldSnapshot,
+                 changed: Optional[Set[Tuple[str, int]]]) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener(previous, current, changed)
+            except Exception as e:
+                print(f"Warning: snapshot generation {current.generation} listener failed: {e}")
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the cross-process snapshot lock (also serializes derived file writers)"""
+        with self._write_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path}.lock", "a+") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def current(self) -> Optional[WorldSnapshot]:
+        """The newest generation on disk, or None before the first build"""
+        try:
+            identity = _file_identity(os.stat(self.path))
+        except FileNotFoundError:
+            return None
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.identity != identity:
+            # Older mappings stay valid until their last reader lets go
+            snapshot = WorldSnapshot(self.path)
+            self._snapshot = snapshot
+        return snapshot
+
+    def rebuild(self, db, unless_built_after: Optional[float] = None) -> WorldSnapshot:
+        """
+        Write a new generation from the database.
+
+        When several workers start together, pass their start time as
+        unless_built_after: the first one builds and the rest reuse its file.
+        """
+        with self.exclusive():
+            try:
+                existing = self.current()
+            except ValueError:
+                # Left by an older format version; replace it
+                existing = None
+            if existing is not None and unless_built_after is not None and existing.built_at >= unless_built_after:
+                return existing
+            tables = {
+                feature_events.FEATURE_REGION: build_table(feature_events.FEATURE_REGION, load_region_features(db)),
+                feature_events.FEATURE_PATH: build_table(feature_events.FEATURE_PATH, load_path_features(db)),
+            }
+            write_snapshot(self.path, tables, existing.generation + 1 if existing else 1)
+            current = self.current()
+            self._publish(existing, current, None)
+            return current
+
+    def _latest_bbox(self, kind: str, vnum: int) -> Optional[Dict[str, float]]:
+        """Bounding box as of this worker's newest queued write, else the newest generation"""
+        for writes in (self._pending, self._flushing):
+            if (kind, vnum) in writes:
+                feature = writes[(kind, vnum)]
+                return feature_summary(kind, feature.get("coordinates") or [])["bbox"] if feature else None
+        snapshot = self.current()
+        i = snapshot.find(kind, vnum) if snapshot is not None else None
+        return snapshot.summary(kind, i)["bbox"] if i is not None else None
+
+    def replaced_bbox(self, kind: str, vnum: int) -> Optional[Dict[str, float]]:
+        """
+        Bounding box the feature had before its latest queued write (None if
+        it was new or had no geometry). Taken from the shared snapshot, so it
+        is right after a restart and for features last written by another
+        worker. Each write's box can be taken once.
+        """
+        with self._lock:
+            return self._replaced.pop((kind, vnum), None)
+
+    def queue_change(self, kind: str, vnum: int, feature: Optional[Dict]) -> None:
+        """Record a committed write; it reaches the file on the next flush"""
+        with self._lock:
+            self._replaced[(kind, vnum)] = self._latest_bbox(kind, vnum)
+            self._pending[(kind, vnum)] = feature
+            if self._timer is None:
+                self._timer = threading.Timer(FLUSH_DELAY_SECONDS, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> Optional[WorldSnapshot]:
+        """Apply queued writes to the latest generation and publish the result"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushing = pending
+            self._timer = None
+        if not pending:
+            return self.current()
+
+        with self.exclusive():
+            try:
+                existing = self.current()
+                if existing is None:
+                    # Nothing to patch; the next rebuild reads the database
+                    return None
+                tables = dict(existing.tables)
+                for kind in KINDS:
+                    changes = {vnum: feature for (k, vnum), feature in pending.items() if k == kind}
+                    if changes:
+                        tables[kind] = apply_changes(tables[kind], kind, changes)
+                write_snapshot(self.path, tables, existing.generation + 1)
+                current = self.current()
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            self._publish(existing, current, set(pending))
+            return current
+
+# Process-wide store; every worker uses the same file
+snapshot_store = SnapshotStore()
+
+# Workers started after this moment can reuse a snapshot built by a sibling
+PROCESS_STARTED_AT = time.time()
+
+def _on_feature_change(kind: str, action: str, vnum: int, feature: Optional[dict]) -> None:
+    snapshot_store.queue_change(kind, vnum, None if action == feature_events.ACTION_DELETE else feature)
+
+feature_events.subscribe(_on_feature_change)
@@ -0,0 +1,183 @@
+import math
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from . import feature_events
+from .polygon_validity import signed_area
+from .snapshot_index import SnapshotIndex
+from .world_snapshot import KINDS, WorldSnapshot
+
+BBox = Tuple[float, float, float, float]
+
+class _Contribution:
+    """What one region or path adds to its zone's totals"""
+    __slots__ = ("zone_vnum", "feature_type", "measure", "vertex_count", "bbox")
+
+    def __init__(self, kind: str, zone_vnum: int, feature_type: int, points: List[Tuple[float, float]]):
+        self.zone_vnum = zone_vnum
+        self.feature_type = feature_type
+        self.vertex_count = len(points)
+        if kind == feature_events.FEATURE_REGION:
+            # Polygon area; single-point landmarks contribute nothing
+            self.measure = abs(signed_area(points)) if len(points) >= 3 else 0.0
+        else:
+            # Path length
+            self.measure = sum(math.hypot(b[0] - a[0], b[1] - a[1]) for a, b in zip(points, points[1:]))
+        self.bbox: Optional[BBox] = None
+        if points:
+            xs, ys = [p[0] for p in points], [p[1] for p in points]
+            self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+class _KindTotals:
+    """Running aggregates for the regions or the paths of one zone"""
+
+    def __init__(self):
+        self.count = 0
+        self.by_type: Dict[int, int] = {}
+        self.measure = 0.0
+        self.vertex_count = 0
+        self.bbox: Optional[BBox] = None
+        self.bbox_stale = False
+
+    def add(self, item: _Contribution) -> None:
+        self.count += 1
+        self.by_type[item.feature_type] = self.by_type.get(item.feature_type, 0) + 1
+        self.measure += item.measure
+        self.vertex_count += item.vertex_count
+        if item.bbox is not None and not self.bbox_stale:
+            self.bbox = item.bbox if self.bbox is None else _union(self.bbox, item.bbox)
+
+    def remove(self, item: _Contribution) -> None:
+        self.count -= 1
+        self.by_type[item.feature_type] -= 1
+        if not self.by_type[item.feature_type]:
+            del self.by_type[item.feature_type]
+        self.measure -= item.measure
+        self.vertex_count -= item.vertex_count
+        if not self.count:
+            # Reset instead of carrying floating-point residue
+            self.measure = 0.0
+            self.bbox = None
+            self.bbox_stale = False
+        elif item.bbox is not None and self.bbox is not None and _touches_edge(item.bbox, self.bbox):
+            # A bounding box cannot be shrunk by subtraction; rebuild it on next read
+            self.bbox_stale = True
+
+def _union(a: BBox, b: BBox) -> BBox:
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+def _touches_edge(inner: BBox, outer: BBox) -> bool:
+    return inner[0] <= outer[0] or inner[1] <= outer[1] or inner[2] >= outer[2] or inner[3] >= outer[3]
+
+def _bbox_dict(bbox: Optional[BBox]) -> Optional[Dict[str, float]]:
+    if bbox is None:
+        return None
+    return {"min_x": bbox[0], "min_y": bbox[1], "max_x": bbox[2], "max_y": bbox[3]}
+
+class ZoneStatsIndex(SnapshotIndex):
+    """
+    Per-zone feature statistics maintained incrementally.
+
+    Every region and path keeps its contribution (type, area or length,
+    vertex count, bounding box) so a write subtracts the old contribution
+    and adds the new one; reading a zone's stats never scans features.
+    The one exception is a bounding box shrinking after a feature on its
+    edge is removed, which is recomputed from that zone's members the next
+    time the zone is read.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._features: Dict[Tuple[str, int], _Contribution] = {}
+        self._zones: Dict[Tuple[str, int], _KindTotals] = {}
+        # vnums of the features in each (kind, zone), for bounding box rebuilds
+        self._members: Dict[Tuple[str, int], Set[int]] = {}
+
+    def load(self, snapshot: WorldSnapshot) -> None:
+        """(Re)compute every zone from a snapshot generation"""
+        with self._lock:
+            self._features = {}
+            self._zones = {}
+            self._members = {}
+            for kind in KINDS:
+                table = snapshot.tables[kind]
+                zones, types = table["zone_vnum"].tolist(), table["type"].tolist()
+                for i, vnum in enumerate(table["vnum"].tolist()):
+                    points = [tuple(point) for point in snapshot.coordinates(kind, i).tolist()]
+                    self._add(kind, vnum, _Contribution(kind, zones[i], types[i], points))
+            self._loaded = True
+
+    def upsert(self, kind: str, feature: dict) -> None:
+        """Apply a created or updated region/path from its response dict"""
+        points = [(float(c["x"]), float(c["y"])) for c in feature.get("coordinates") or []]
+        item = _Contribution(kind, feature["zone_vnum"], feature[f"{kind}_type"], points)
+        with self._lock:
+            self._remove(kind, feature["vnum"])
+            self._add(kind, feature["vnum"], item)
+
+    def delete(self, kind: str, vnum: int) -> None:
+        with self._lock:
+            self._remove(kind, vnum)
+
+    def _add(self, kind: str, vnum: int, item: _Contribution) -> None:
+        self._features[(kind, vnum)] = item
+        self._zones.setdefault((kind, item.zone_vnum), _KindTotals()).add(item)
+        self._members.setdefault((kind, item.zone_vnum), set()).add(vnum)
+
+    def _remove(self, kind: str, vnum: int) -> None:
+        item = self._features.pop((kind, vnum), None)
+        if item is None:
+            return
+        totals = self._zones[(kind, item.zone_vnum)]
+        totals.remove(item)
+        self._members[(kind, item.zone_vnum)].discard(vnum)
+        if not totals.count:
+            del self._zones[(kind, item.zone_vnum)]
+            del self._members[(kind, item.zone_vnum)]
+
+    def _totals(self, kind: str, zone_vnum: int) -> _KindTotals:
+        totals = self._zones.get((kind, zone_vnum))
+        if totals is None:
+            return _KindTotals()
+        if totals.bbox_stale:
+            totals.bbox = None
+            for vnum in self._members[(kind, zone_vnum)]:
+                bbox = self._features[(kind, vnum)].bbox
+                if bbox is not None:
+                    totals.bbox = bbox if totals.bbox is None else _union(totals.bbox, bbox)
+            totals.bbox_stale = False
+        return totals
+
+    def zone_stats(self, zone_vnum: int) -> dict:
+        """Snapshot of one zone's region and path statistics"""
+        with self._lock:
+            regions = self._totals(feature_events.FEATURE_REGION, zone_vnum)
+            paths = self._totals(feature_events.FEATURE_PATH, zone_vnum)
+
+            boxes = [bbox for bbox in (regions.bbox, paths.bbox) if bbox is not None]
+            overall = None
+            for bbox in boxes:
+                overall = bbox if overall is None else _union(overall, bbox)
+
+            return {
+                "zone_vnum": zone_vnum,
+                "regions": {
+                    "count": regions.count,
+                    "by_type": dict(sorted(regions.by_type.items())),
+                    "total_area": regions.measure,
+                    "vertex_count": regions.vertex_count,
+                    "bbox": _bbox_dict(regions.bbox)
+                },
+                "paths": {
+                    "count": paths.count,
+                    "by_type": dict(sorted(paths.by_type.items())),
+                    "total_length": paths.measure,
+                    "vertex_count": paths.vertex_count,
+                    "bbox": _bbox_dict(paths.bbox)
+                },
+                "bbox": _bbox_dict(overall)
+            }
+
+# Process-wide index shared by the zones router
+zone_stats_index = ZoneStatsIndex()
@@ -40,6 +40,15 @@ def test_cors_headers(test_client):
     # For now, just ensure the endpoint works
 
 
+def test_metrics_endpoint(test_client):
+    """Test that admission metrics are exported in Prometheus format"""
+    response = test_client.get("/api/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'wildeditor_admission_queued{cost_class="full_list"}' in response.text
+    assert "wildeditor_singleflight_coalesced_total" in response.text
+
+
 @pytest.mark.unit
 class TestRegionsAPI:
     """Test the regions API endpoints"""
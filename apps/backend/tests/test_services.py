@@ -0,0 +1,2021 @@
+"""
+Unit tests for the geometry services (no database required)
+"""
+import numpy as np
+import pytest
+
+
+@pytest.mark.unit
+class TestVertexPatch:
+    """Test vertex-level geometry patching"""
+    
+    def _square(self):
+        return [{"x": 0.0, "y": 0.0}, {"x": 10.0, "y": 0.0}, {"x": 10.0, "y": 10.0}, {"x": 0.0, "y": 10.0}]
+    
+    def test_geometry_version_is_stable(self):
+        from src.services.vertex_patch import geometry_version
+        assert geometry_version(self._square()) == geometry_version(self._square())
+        moved = self._square()
+        moved[0] = {"x": 1.0, "y": 0.0}
+        assert geometry_version(moved) != geometry_version(self._square())
+    
+    def test_apply_operations_in_order(self):
+        from src.schemas.common import VertexOperation
+        from src.services.vertex_patch import apply_vertex_operations
+        ops = [
+            VertexOperation(op="move", index=0, x=-1, y=-1),
+            VertexOperation(op="insert", index=4, x=-5, y=5),
+            VertexOperation(op="delete", index=1),
+        ]
+        result = apply_vertex_operations(self._square(), ops)
+        assert result == [
+            {"x": -1.0, "y": -1.0}, {"x": 10.0, "y": 10.0}, {"x": 0.0, "y": 10.0}, {"x": -5.0, "y": 5.0}
+        ]
+    
+    def test_out_of_range_and_bounds_rejected(self):
+        from src.schemas.common import VertexOperation
+        from src.services.vertex_patch import apply_vertex_operations
+        with pytest.raises(ValueError):
+            apply_vertex_operations(self._square(), [VertexOperation(op="delete", index=4)])
+        with pytest.raises(ValueError):
+            apply_vertex_operations(self._square(), [VertexOperation(op="move", index=0, x=2000, y=0)])
+    
+    def test_invalid_op_rejected(self):
+        from pydantic import ValidationError
+        from src.schemas.common import VertexOperation
+        with pytest.raises(ValidationError):
+            VertexOperation(op="rotate", index=0)
+
+
+@pytest.mark.unit
+class TestPolygonValidity:
+    """Test the sweep-line polygon validity engine"""
+    
+    def test_bowtie_is_rejected(self):
+        from src.services.polygon_validity import validate_polygon
+        bowtie = [{"x": 0, "y": 0}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 10}]
+        result = validate_polygon(bowtie)
+        assert result["valid"] is False
+        assert any("intersect" in error for error in result["errors"])
+    
+    def test_clockwise_ring_is_normalized(self):
+        from src.services.polygon_validity import validate_polygon, signed_area
+        clockwise = [{"x": 0, "y": 0}, {"x": 0, "y": 10}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 0}]
+        result = validate_polygon(clockwise)
+        assert result["valid"] is True
+        assert result["orientation_fixed"] is True
+        assert result["duplicates_removed"] == 1
+        ring = [(c["x"], c["y"]) for c in result["coordinates"]]
+        assert signed_area(ring) > 0
+    
+    def test_touching_vertex_and_spike_rejected(self):
+        from src.services.polygon_validity import validate_polygon
+        # Vertex (5, 0) lies on the edge from (0, 0) to (10, 0)
+        touching = [{"x": 0, "y": 0}, {"x": 10, "y": 0}, {"x": 10, "y": 10}, {"x": 5, "y": 0}, {"x": 0, "y": 10}]
+        assert validate_polygon(touching)["valid"] is False
+        spike = [{"x": 0, "y": 0}, {"x": 10, "y": 0}, {"x": 5, "y": 0}, {"x": 5, "y": 5}]
+        assert validate_polygon(spike)["valid"] is False
+    
+    def test_sweep_matches_brute_force(self):
+        import random
+        from src.services.polygon_validity import find_self_intersection, segments_intersect
+        
+        def brute_force(ring):
+            n = len(ring)
+            for i in range(n):
+                for j in range(i + 2, n):
+                    if i == 0 and j == n - 1:
+                        continue
+                    if segments_intersect(ring[i], ring[(i + 1) % n], ring[j], ring[(j + 1) % n]):
+                        return True
+            return False
+        
+        rng = random.Random(42)
+        checked = 0
+        while checked < 2000:
+            ring = [(float(rng.randint(0, 6)), float(rng.randint(0, 6))) for _ in range(rng.randint(4, 9))]
+            n = len(ring)
+            if len(set(ring)) != n:
+                continue
+            # Spikes are rejected before the sweep runs
+            if any(
+                (ring[i][0] - ring[i - 1][0]) * (ring[(i + 1) % n][1] - ring[i - 1][1])
+                == (ring[i][1] - ring[i - 1][1]) * (ring[(i + 1) % n][0] - ring[i - 1][0])
+                for i in range(n)
+            ):
+                continue
+            checked += 1
+            assert (find_self_intersection(ring) is not None) == brute_force(ring), ring
+    
+    def test_validate_endpoint(self, test_client):
+        response = test_client.post("/api/regions/validate", json={
+            "coordinates": [{"x": 0, "y": 0}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 10}]
+        })
+        assert response.status_code == 200
+        assert response.json()["valid"] is False
+
+
+@pytest.mark.unit
+class TestCompactCoordinates:
+    """Test the flat [x0, y0, x1, y1, ...] coordinate encoding"""
+    
+    def test_flat_region_payload_expands_to_dicts(self):
+        from src.schemas.region import RegionCreate
+        region = RegionCreate(vnum=1, zone_vnum=1, name="Flat", region_type=1,
+                              coordinates=[0, 0, 10, 0, 10, 10])
+        assert region.coordinates == [{"x": 0.0, "y": 0.0}, {"x": 10.0, "y": 0.0}, {"x": 10.0, "y": 10.0}]
+    
+    def test_dict_payload_still_accepted(self):
+        from src.schemas.path import PathCreate
+        path = PathCreate(vnum=1, zone_vnum=1, name="Road", path_type=1,
+                          coordinates=[{"x": 0, "y": 0}, {"x": 5, "y": 5}])
+        assert path.coordinates[1] == {"x": 5.0, "y": 5.0}
+    
+    def test_flat_payload_rejected_when_invalid(self):
+        from pydantic import ValidationError
+        from src.schemas.path import PathCreate
+        with pytest.raises(ValidationError):
+            PathCreate(vnum=1, zone_vnum=1, name="Road", path_type=1, coordinates=[0, 0, 5])
+        with pytest.raises(ValidationError):
+            PathCreate(vnum=1, zone_vnum=1, name="Road", path_type=1, coordinates=[0, 0, 5, 2048])
+    
+    def test_flat_response_encoding(self):
+        import json
+        from src.schemas.path import PathResponse
+        from src.services.coordinate_encoding import encode_coordinates, COORDINATE_FORMAT_FLAT, COORDINATE_FORMAT_DICT
+        path = PathResponse(vnum=1, zone_vnum=1, name="Road", path_type=1,
+                            coordinates=[{"x": 0, "y": 0}, {"x": 5, "y": 5}])
+        assert encode_coordinates(path, "path", COORDINATE_FORMAT_DICT) is path
+        response = encode_coordinates([path], "path", COORDINATE_FORMAT_FLAT)
+        assert json.loads(response.body)[0]["coordinates"] == [0.0, 0.0, 5.0, 5.0]
+    
+    def test_unknown_format_rejected(self, test_client):
+        response = test_client.get("/api/regions/1?coordinate_format=xml")
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+class TestGeometryCodec:
+    """Test the quantized, delta-encoded binary geometry format"""
+    
+    def test_round_trip_regions(self):
+        from src.services.geometry_codec import encode_features, decode_features, KIND_REGIONS
+        regions = [
+            {"vnum": 1000004, "zone_vnum": 10000, "region_type": 4, "region_props": None, "name": "Hardbuckler",
+             "coordinates": [{"x": -63.5, "y": 200.25}, {"x": -60, "y": 210}, {"x": -55.75, "y": 199}]},
+            {"vnum": 7, "zone_vnum": -3, "region_type": 3, "region_props": -30, "name": "Lake of Tears",
+             "coordinates": [{"x": 1024, "y": -1024}]},
+        ]
+        kind, grid, decoded = decode_features(encode_features(regions, KIND_REGIONS, grid=4))
+        assert (kind, grid) == (KIND_REGIONS, 4)
+        assert [f["vnum"] for f in decoded] == [1000004, 7]
+        assert decoded[0]["props"] is None and decoded[1]["props"] == -30
+        assert decoded[1]["zone_vnum"] == -3
+        assert decoded[1]["name"] == "Lake of Tears"
+        assert decoded[0]["coordinates"] == regions[0]["coordinates"]
+        assert decoded[1]["coordinates"] == [{"x": 1024.0, "y": -1024.0}]
+    
+    def test_stored_fields_survive(self):
+        from datetime import datetime
+        from src.services.geometry_codec import encode_features, decode_features, KIND_REGIONS
+        from src.services.vertex_patch import geometry_version
+        coordinates = [{"x": 0, "y": 0}, {"x": 4, "y": 0}, {"x": 4, "y": 4}]
+        regions = [
+            {"vnum": 1, "zone_vnum": 1, "region_type": 2, "region_props": None, "name": "Lair",
+             "region_reset_data": "mob 1 x3", "region_reset_time": datetime(2024, 5, 6, 7, 8, 9),
+             "geometry_version": geometry_version(coordinates), "coordinates": coordinates},
+            {"vnum": 2, "zone_vnum": 1, "region_type": 1, "region_props": None, "name": "Väli",
+             "region_reset_data": "", "region_reset_time": None, "geometry_version": "00000000",
+             "coordinates": coordinates},
+        ]
+        _, _, decoded = decode_features(encode_features(regions, KIND_REGIONS))
+        assert decoded[0]["geometry_version"] == regions[0]["geometry_version"]
+        assert decoded[0]["reset_data"] == "mob 1 x3" and decoded[0]["reset_time"] == datetime(2024, 5, 6, 7, 8, 9)
+        assert decoded[1]["geometry_version"] == "00000000" and decoded[1]["name"] == "Väli"
+        assert decoded[1]["reset_data"] == "" and decoded[1]["reset_time"] is None
+    
+    def test_empty_list_keeps_its_kind(self):
+        from src.services.coordinate_encoding import encode_coordinates, COORDINATE_FORMAT_BINARY
+        from src.services.geometry_codec import decode_features, KIND_PATHS
+        response = encode_coordinates([], "path", COORDINATE_FORMAT_BINARY)
+        assert decode_features(response.body) == (KIND_PATHS, 4, [])
+    
+    def test_coordinates_are_quantized_to_grid(self):
+        from src.services.geometry_codec import encode_features, decode_features, KIND_PATHS
+        paths = [{"vnum": 1, "zone_vnum": 1, "path_type": 5, "path_props": 36, "name": "River",
+                  "coordinates": [{"x": 0.3, "y": 0.1}, {"x": 10.6, "y": 0}]}]
+        _, _, decoded = decode_features(encode_features(paths, KIND_PATHS, grid=1))
+        assert decoded[0]["coordinates"] == [{"x": 0.0, "y": 0.0}, {"x": 11.0, "y": 0.0}]
+    
+    def test_integer_vertices_are_compact(self):
+        from src.services.geometry_codec import encode_features, KIND_PATHS
+        coordinates = [{"x": float(i), "y": float(i % 3)} for i in range(2000)]
+        payload = encode_features([{"vnum": 1, "zone_vnum": 1, "path_type": 1, "path_props": 11,
+                                    "name": "Road", "coordinates": coordinates}], KIND_PATHS)
+        # One byte per delta component once past the first vertex
+        assert len(payload) < 2000 * 2 + 32
+
+
+@pytest.mark.unit
+class TestRegionOverlaps:
+    """Test the overlap endpoint's request handling (no database required)"""
+    
+    def test_invalid_candidate_rejected_before_query(self, test_client):
+        response = test_client.post("/api/regions/overlaps", json={
+            "coordinates": [{"x": 0, "y": 0}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 10}]
+        })
+        assert response.status_code == 400
+    
+    def test_candidate_needs_three_points(self, test_client):
+        response = test_client.post("/api/regions/overlaps", json={"coordinates": [0, 0, 10, 10]})
+        assert response.status_code == 422
+
+
+@pytest.mark.unit
+class TestVectorizedSpatial:
+    """Test the NumPy point-in-polygon and point-to-segment kernels"""
+    
+    def test_wkt_parsing_keeps_rings(self):
+        from src.services.spatial import wkt_to_rings
+        rings = wkt_to_rings("POLYGON((0 0,10 0,10 10,0 10,0 0),(2 2,4 2,4 4,2 2))")
+        assert [ring.shape for ring in rings] == [(5, 2), (4, 2)]
+        assert wkt_to_rings("LINESTRING(0 0,5 5.5)")[0].tolist() == [[0, 0], [5, 5.5]]
+    
+    def test_points_in_polygon_with_hole(self):
+        import numpy as np
+        from src.services.spatial import wkt_to_rings, points_in_polygon
+        rings = wkt_to_rings("POLYGON((0 0,10 0,10 10,0 10,0 0),(2 2,4 2,4 4,2 4,2 2))")
+        px = np.array([5.0, 3.0, 11.0, 9.9])
+        py = np.array([5.0, 3.0, 5.0, 0.1])
+        assert points_in_polygon(px, py, rings).tolist() == [True, False, False, True]
+    
+    def test_distance_to_segments(self):
+        import numpy as np
+        from src.services.spatial import distance_to_segments
+        line = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0]])
+        distances = distance_to_segments(np.array([5.0, 12.0, -3.0]), np.array([1.0, 5.0, -4.0]), line)
+        assert distances.tolist() == pytest.approx([1.0, 2.0, 5.0])
+    
+    def test_points_near_polygon_uses_radius(self):
+        import numpy as np
+        from src.services.spatial import wkt_to_rings, points_near_polygon
+        rings = wkt_to_rings("POLYGON((0 0,10 0,10 10,0 10,0 0))")
+        px, py = np.array([10.05, 10.5]), np.array([5.0, 5.0])
+        assert points_near_polygon(px, py, rings, 0.1).tolist() == [True, False]
+    
+    def test_batch_endpoint_validates_input(self, test_client):
+        response = test_client.post("/api/points/batch", json={"coordinates": [1, 2, 3]})
+        assert response.status_code == 422
+        response = test_client.post("/api/points/batch", json={"coordinates": [1, 2], "radius": -1})
+        assert response.status_code == 422
+
+
+class _FakeRows:
+    """Minimal stand-in for a SQLAlchemy result"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def fetchall(self):
+        return self.rows
+
+
+class _FakeSession:
+    """Session whose execute() returns the given rows for any query"""
+    
+    def __init__(self, rows):
+        self.rows = rows
+    
+    def execute(self, query, params=None):
+        return _FakeRows(self.rows)
+
+
+def _square_region(vnum, x, y, size, region_type=1):
+    return {"vnum": vnum, "zone_vnum": 1, "name": f"Region {vnum}", "region_type": region_type, "region_props": None,
+            "coordinates": [{"x": x, "y": y}, {"x": x + size, "y": y}, {"x": x + size, "y": y + size}, {"x": x, "y": y + size}]}
+
+
+def _world(tmp_path, regions=(), paths=()):
+    """Snapshot store over a generation holding the given response-shaped features"""
+    from src.services.world_snapshot import SnapshotStore, build_table, write_snapshot
+    store = SnapshotStore(str(tmp_path / "world.snapshot"))
+    write_snapshot(store.path, {"region": build_table("region", list(regions)),
+                                "path": build_table("path", list(paths))}, generation=1)
+    return store
+
+
+@pytest.mark.unit
+class TestNearestRegionIndex:
+    """Test the best-first k-nearest-neighbour region index"""
+    
+    def _index(self, tmp_path, regions):
+        from src.services.nearest_index import NearestRegionIndex
+        index = NearestRegionIndex()
+        index.load(_world(tmp_path, regions).current())
+        return index
+    
+    def test_matches_brute_force(self, tmp_path):
+        import random
+        import numpy as np
+        from src.services.spatial import point_to_ring_distance
+        rng = random.Random(7)
+        regions = [_square_region(i, rng.uniform(-1000, 990), rng.uniform(-1000, 990), rng.uniform(0.4, 10),
+                                  region_type=rng.choice([1, 2])) for i in range(500)]
+        rings = {r["vnum"]: np.array([(c["x"], c["y"]) for c in r["coordinates"] + r["coordinates"][:1]]) for r in regions}
+        index = self._index(tmp_path, regions)
+        for _ in range(20):
+            x, y = rng.uniform(-1024, 1024), rng.uniform(-1024, 1024)
+            expected = sorted(point_to_ring_distance(x, y, rings[r["vnum"]]) for r in regions if r["region_type"] == 1)[:5]
+            result = index.nearest(x, y, 5, region_type=1)
+            assert [d for d, _ in result] == pytest.approx(expected)
+            assert all(entry.region_type == 1 for _, entry in result)
+    
+    def test_point_inside_has_zero_distance(self, tmp_path):
+        index = self._index(tmp_path, [_square_region(1, 0, 0, 10), _square_region(2, 20, 0, 10)])
+        (distance, entry), = index.nearest(5, 5, 1)
+        assert (distance, entry.vnum) == (0.0, 1)
+        assert (entry.name, entry.region_props) == ("Region 1", None)
+    
+    def test_writes_are_visible_without_reload(self, tmp_path):
+        index = self._index(tmp_path, [_square_region(1, 0, 0, 10), _square_region(2, 20, 0, 10)])
+        index.upsert("region", {"vnum": 3, "zone_vnum": 1, "name": "Gate", "region_type": 1, "coordinates": [{"x": 50, "y": 50}]})
+        index.upsert("region", {"vnum": 1, "zone_vnum": 1, "name": "Moved", "region_type": 1,
+                                "coordinates": [{"x": 100, "y": 100}, {"x": 101, "y": 100}, {"x": 101, "y": 101}]})
+        index.delete("region", 2)
+        index.delete("path", 3)
+        assert [entry.vnum for _, entry in index.nearest(49, 49, 3)] == [3, 1]
+        assert len(index) == 2
+
+
+@pytest.mark.unit
+class TestSnapshotFollower:
+    """Test keeping per-process indexes in step with snapshot generations"""
+    
+    def test_changed_features(self, tmp_path):
+        from src.services.world_snapshot import SnapshotStore, changed_features
+        regions = [_square_region(vnum, vnum * 20, 0, 10) for vnum in range(1, 6)]
+        store = _world(tmp_path, regions, [{"vnum": 9, "zone_vnum": 1, "name": "Road", "path_type": 1, "path_props": None,
+                                            "coordinates": [{"x": 0, "y": 0}, {"x": 5, "y": 5}]}])
+        before = store.current()
+        store.queue_change("region", 1, dict(regions[0], name="Renamed"))
+        store.queue_change("region", 2, _square_region(2, 40, 1, 10))
+        store.queue_change("region", 3, dict(regions[2], region_props=4))
+        store.queue_change("region", 4, None)
+        store.queue_change("region", 7, _square_region(7, 0, 0, 1))
+        store.queue_change("path", 9, None)
+        store.flush()
+        after = SnapshotStore(store.path).current()
+        assert changed_features(before, after) == {("region", 1), ("region", 2), ("region", 3), ("region", 4),
+                                                   ("region", 7), ("path", 9)}
+        assert changed_features(after, after) == set()
+    
+    def test_follows_writes_from_other_workers(self, tmp_path):
+        from src.services.world_snapshot import SnapshotStore
+        from src.services.snapshot_index import SnapshotFollower
+        from src.services.nearest_index import NearestRegionIndex
+        store = _world(tmp_path, [_square_region(vnum, vnum * 20, 0, 10) for vnum in range(1, 21)])
+        follower, index = SnapshotFollower(store), NearestRegionIndex()
+        follower.refresh(index=index)
+        # Another worker writes the next generation through its own store
+        other = SnapshotStore(store.path)
+        other.queue_change("region", 1, _square_region(1, 500, 500, 10))
+        other.flush()
+        assert index.nearest(505, 505, 1)[0][1].vnum != 1
+        assert follower.refresh().generation == 2
+        assert index.nearest(505, 505, 1)[0] == (0.0, index._entries[1])
+        assert follower.generation == 2
+    
+    def test_writes_queued_here_are_read_back(self, tmp_path):
+        from src.services.snapshot_index import SnapshotFollower
+        from src.services.nearest_index import NearestRegionIndex
+        store = _world(tmp_path, [_square_region(1, 0, 0, 10)])
+        follower, index = SnapshotFollower(store), NearestRegionIndex()
+        follower.refresh(index=index)
+        store.queue_change("region", 2, _square_region(2, 100, 100, 10))
+        # No waiting for the flush timer: the refresh flushes this worker's queue first
+        follower.refresh()
+        assert index.nearest(105, 105, 1)[0][1].vnum == 2
+    
+    def test_large_changes_reload(self, tmp_path, monkeypatch):
+        from src.services.snapshot_index import SnapshotFollower
+        from src.services.nearest_index import NearestRegionIndex
+        store = _world(tmp_path, [_square_region(1, 0, 0, 10), _square_region(2, 20, 0, 10)])
+        follower, index = SnapshotFollower(store), NearestRegionIndex()
+        follower.refresh(index=index)
+        calls = []
+        monkeypatch.setattr(index, "apply", lambda *args: calls.append("apply"))
+        store.queue_change("region", 1, None)
+        follower.refresh()
+        assert calls == [] and len(index) == 1
+
+
+@pytest.mark.unit
+class TestSnapIndex:
+    """Test the grid-hash vertex snapping index"""
+    
+    def _index(self):
+        from src.services.snap_index import SnapIndex
+        index = SnapIndex()
+        index.upsert("region", {"vnum": 1, "zone_vnum": 10, "name": "Field",
+                                "coordinates": [{"x": 0, "y": 0}, {"x": 40, "y": 0}, {"x": 40, "y": 40}, {"x": 0, "y": 40}]})
+        index.upsert("path", {"vnum": 5, "zone_vnum": 10, "name": "Road",
+                              "coordinates": [{"x": -100, "y": -100}, {"x": 100, "y": 100}]})
+        return index
+    
+    def test_supercover_includes_corner_neighbours(self):
+        from src.services.spatial import supercover_cells
+        assert supercover_cells(0.5, 0.5, 2.5, 0.5) == [(0, 0), (1, 0), (2, 0)]
+        assert supercover_cells(0.5, 0.5, 1.5, 1.5) == [(0, 0), (1, 0), (0, 1), (1, 1)]
+        assert supercover_cells(1.5, 1.5, -0.5, -0.5) == [(1, 1), (0, 1), (1, 0), (0, 0), (-1, 0), (0, -1), (-1, -1)]
+    
+    def test_supercover_matches_dense_sampling(self):
+        import math
+        import random
+        from src.services.spatial import supercover_cells
+        rng = random.Random(3)
+        for _ in range(200):
+            x1, y1, x2, y2 = (rng.uniform(-50, 50) for _ in range(4))
+            cells = set(supercover_cells(x1, y1, x2, y2, 8.0))
+            for step in range(1001):
+                t = step / 1000
+                assert (math.floor((x1 + t * (x2 - x1)) / 8.0), math.floor((y1 + t * (y2 - y1)) / 8.0)) in cells
+    
+    def test_vertex_beats_closer_edge(self):
+        target = self._index().snap(39, 1.5, tolerance=2)
+        assert (target["type"], target["kind"], target["vnum"], target["index"]) == ("vertex", "region", 1, 1)
+        assert (target["x"], target["y"]) == (40, 0)
+    
+    def test_projects_onto_segment(self):
+        index = self._index()
+        target = index.snap(20, 41, tolerance=2)
+        assert (target["type"], target["index"], target["x"], target["y"]) == ("segment", 2, 20, 40)
+        # Closing edge of the ring runs from the last vertex back to the first
+        target = index.snap(-1, 30, tolerance=2)
+        assert (target["index"], target["x"], target["y"]) == (3, 0, 30)
+        # Long path segment is found far from its endpoints
+        target = index.snap(-60, -61, tolerance=2)
+        assert (target["kind"], target["x"], target["y"]) == ("path", -60.5, -60.5)
+    
+    def test_nothing_within_tolerance(self):
+        assert self._index().snap(200, -200, tolerance=5) is None
+    
+    def test_exclude_and_incremental_writes(self):
+        index = self._index()
+        assert index.snap(20, 21, tolerance=2)["vnum"] == 5
+        assert index.snap(20, 21, tolerance=2, exclude=("path", 5)) is None
+        index.upsert("path", {"vnum": 5, "zone_vnum": 10, "name": "Road",
+                              "coordinates": [{"x": 500, "y": 500}, {"x": 510, "y": 500}]})
+        assert index.snap(20, 21, tolerance=2) is None
+        assert index.snap(505, 501, tolerance=2)["index"] == 0
+        index.delete("path", 5)
+        assert index.snap(505, 501, tolerance=2) is None
+        assert index._segments.keys() == {cell for f in index._features.values() for cell in f.segment_cells}
+    
+    def test_loads_from_snapshot(self, tmp_path):
+        from src.services.snap_index import SnapIndex
+        region = {"vnum": 7, "zone_vnum": 1, "name": "Lake", "region_type": 1, "region_props": None,
+                  "coordinates": [{"x": 0, "y": 0}, {"x": 10, "y": 0}, {"x": 10, "y": 10}]}
+        path = {"vnum": 7, "zone_vnum": 1, "name": "Road", "path_type": 1, "path_props": None,
+                "coordinates": [{"x": 0, "y": 0}, {"x": 10, "y": 10}]}
+        index = SnapIndex()
+        index.load(_world(tmp_path, [region], [path]).current())
+        assert len(index) == 2
+        target = index.snap(10.5, 0, tolerance=1)
+        assert (target["kind"], target["name"], target["index"]) == ("region", "Lake", 1)
+    
+    def test_snap_endpoint_validates_input(self, test_client):
+        response = test_client.get("/api/points/snap", params={"x": 0, "y": 0, "tolerance": 1000})
+        assert response.status_code == 422
+        response = test_client.get("/api/points/snap", params={"x": 0, "y": 0, "exclude_kind": "zone"})
+        assert response.status_code == 422
+
+
+@pytest.mark.unit
+class TestZoneStats:
+    """Test incrementally maintained per-zone statistics"""
+    
+    def _square(self, vnum, x, y, size, zone_vnum=10, region_type=1):
+        return {"vnum": vnum, "zone_vnum": zone_vnum, "region_type": region_type,
+                "coordinates": [{"x": x, "y": y}, {"x": x + size, "y": y},
+                                {"x": x + size, "y": y + size}, {"x": x, "y": y + size}]}
+    
+    def _index(self):
+        from src.services.zone_stats import ZoneStatsIndex
+        index = ZoneStatsIndex()
+        index.upsert("region", self._square(1, 0, 0, 10))
+        index.upsert("region", self._square(2, 20, 0, 5, region_type=4))
+        index.upsert("region", {"vnum": 3, "zone_vnum": 10, "region_type": 1, "coordinates": [{"x": -5, "y": 3}]})
+        index.upsert("path", {"vnum": 7, "zone_vnum": 10, "path_type": 1,
+                              "coordinates": [{"x": 0, "y": 0}, {"x": 3, "y": 4}, {"x": 3, "y": 40}]})
+        return index
+    
+    def test_aggregates(self):
+        stats = self._index().zone_stats(10)
+        assert stats["regions"]["count"] == 3
+        assert stats["regions"]["by_type"] == {1: 2, 4: 1}
+        assert stats["regions"]["total_area"] == pytest.approx(125)
+        assert stats["regions"]["vertex_count"] == 9
+        assert stats["regions"]["bbox"] == {"min_x": -5, "min_y": 0, "max_x": 25, "max_y": 10}
+        assert stats["paths"]["total_length"] == pytest.approx(41)
+        assert stats["bbox"] == {"min_x": -5, "min_y": 0, "max_x": 25, "max_y": 40}
+    
+    def test_writes_adjust_totals(self):
+        index = self._index()
+        # Move region 2 to another zone and shrink it
+        index.upsert("region", self._square(2, 100, 100, 2, zone_vnum=11))
+        index.delete("region", 3)
+        stats = index.zone_stats(10)
+        assert stats["regions"]["by_type"] == {1: 1}
+        assert stats["regions"]["total_area"] == pytest.approx(100)
+        assert stats["regions"]["bbox"] == {"min_x": 0, "min_y": 0, "max_x": 10, "max_y": 10}
+        assert index.zone_stats(11)["regions"]["total_area"] == pytest.approx(4)
+    
+    def test_matches_full_recompute(self, tmp_path):
+        import random
+        from src.services.zone_stats import ZoneStatsIndex
+        rng = random.Random(5)
+        index = ZoneStatsIndex()
+        current = {}
+        for _ in range(300):
+            vnum = rng.randrange(40)
+            if rng.random() < 0.3:
+                index.delete("region", vnum)
+                current.pop(vnum, None)
+            else:
+                feature = self._square(vnum, rng.randrange(-100, 100), rng.randrange(-100, 100),
+                                       rng.randrange(1, 20), zone_vnum=rng.choice([1, 2]), region_type=rng.choice([1, 2, 3]))
+                index.upsert("region", feature)
+                current[vnum] = feature
+        fresh = ZoneStatsIndex()
+        fresh.load(_world(tmp_path, current.values()).current())
+        for zone_vnum in (1, 2, 3):
+            incremental, recomputed = index.zone_stats(zone_vnum), fresh.zone_stats(zone_vnum)
+            assert incremental["regions"]["total_area"] == pytest.approx(recomputed["regions"]["total_area"])
+            incremental["regions"]["total_area"] = recomputed["regions"]["total_area"]
+            assert incremental == recomputed
+    
+    def test_empty_zone(self):
+        stats = self._index().zone_stats(999)
+        assert stats["regions"]["count"] == 0 and stats["paths"]["count"] == 0
+        assert stats["bbox"] is None
+    
+    def test_stale_bbox_rebuilds_from_zone_members(self):
+        index = self._index()
+        for vnum in range(100, 200):
+            index.upsert("region", self._square(vnum, vnum, vnum, 1, zone_vnum=20))
+        index.delete("region", 3)
+        
+        class NoScan(dict):
+            def items(self):
+                raise AssertionError("rebuild scanned every feature")
+            values = __iter__ = items
+        index._features = NoScan(index._features)
+        assert index.zone_stats(10)["regions"]["bbox"] == {"min_x": 0, "min_y": 0, "max_x": 25, "max_y": 10}
+
+
+@pytest.mark.unit
+class TestChangeFeed:
+    """Test viewport-filtered fan-out of feature changes over WebSocket"""
+    
+    def _region(self, vnum, x, y, zone_vnum=10):
+        return {"vnum": vnum, "zone_vnum": zone_vnum, "name": f"Region {vnum}", "region_type": 1,
+                "coordinates": [{"x": x, "y": y}, {"x": x + 2, "y": y}, {"x": x + 2, "y": y + 2}]}
+    
+    def test_only_intersecting_viewports_receive_changes(self, test_client):
+        from src.services import feature_events
+        with test_client.websocket_connect("/api/ws/changes") as websocket:
+            websocket.send_json({"type": "subscribe", "bbox": {"min_x": 0, "min_y": 0, "max_x": 100, "max_y": 100}})
+            assert websocket.receive_json()["type"] == "subscribed"
+            
+            feature_events.publish("region", "upsert", 1, self._region(1, 500, 500))
+            feature_events.publish("region", "upsert", 2, self._region(2, 50, 50))
+            message = websocket.receive_json()
+            assert (message["type"], message["vnum"], message["action"]) == ("change", 2, "upsert")
+            assert message["feature"]["coordinates"][0] == {"x": 50, "y": 50}
+            
+            # Moving out of view still reaches the viewport that showed the old geometry
+            feature_events.publish("region", "upsert", 2, self._region(2, 800, 800))
+            assert websocket.receive_json()["feature"]["coordinates"][0] == {"x": 800, "y": 800}
+            feature_events.publish("region", "delete", 2, self._region(2, 800, 800))
+            feature_events.publish("path", "delete", 3, {"vnum": 3, "zone_vnum": 10,
+                                                         "coordinates": [{"x": -5, "y": 1}, {"x": 5, "y": 1}]})
+            message = websocket.receive_json()
+            assert (message["kind"], message["vnum"], message["action"]) == ("path", 3, "delete")
+            assert "feature" not in message
+    
+    def test_zone_filter_and_invalid_subscription(self, test_client):
+        from src.services import feature_events
+        with test_client.websocket_connect("/api/ws/changes") as websocket:
+            websocket.send_json({"type": "subscribe", "bbox": {"min_x": 10, "min_y": 0, "max_x": 0, "max_y": 5}})
+            assert websocket.receive_json()["type"] == "error"
+            websocket.send_json({"zone_vnum": 11})
+            assert websocket.receive_json()["zone_vnum"] == 11
+            feature_events.publish("region", "upsert", 4, self._region(4, 0, 0, zone_vnum=10))
+            feature_events.publish("region", "upsert", 5, self._region(5, 0, 0, zone_vnum=11))
+            assert websocket.receive_json()["vnum"] == 5
+    
+    def test_malformed_messages_get_error_frames(self, test_client):
+        with test_client.websocket_connect("/api/ws/changes") as websocket:
+            websocket.send_text("{not json")
+            message = websocket.receive_json()
+            assert message["type"] == "error" and "Invalid JSON" in message["detail"]
+            websocket.send_text("[1, 2]")
+            assert websocket.receive_json()["type"] == "error"
+            websocket.send_bytes(b"\xff\xfe")
+            assert websocket.receive_json()["type"] == "error"
+            websocket.send_text('{"bbox": {"min_x": NaN, "min_y": 0, "max_x": 1, "max_y": 1}}')
+            assert websocket.receive_json()["type"] == "error"
+            websocket.send_text('{"bbox": "everywhere"}')
+            assert websocket.receive_json()["type"] == "error"
+            # Still subscribed and usable afterwards
+            websocket.send_json({"zone_vnum": 3})
+            assert websocket.receive_json() == {"type": "subscribed", "bbox": None, "zone_vnum": 3}
+    
+    def test_old_geometry_comes_from_shared_snapshot(self, tmp_path):
+        import asyncio
+        import json
+        from src.services.change_feed import ChangeFeed
+        # Region 2 was last written by another worker, or before a restart
+        store = _world(tmp_path, [self._region(2, 50, 50)])
+        feed = ChangeFeed(store)
+        loop = asyncio.new_event_loop()
+        subscriber = feed.register(loop)
+        feed.update(subscriber, (0, 0, 100, 100), None)
+        
+        for x in (800, 900):
+            moved = self._region(2, x, x)
+            store.queue_change("region", 2, moved)
+            feed.publish("region", "upsert", 2, moved)
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+        # Only the move out of the viewport is delivered; the second one stays outside it
+        assert subscriber.queue.qsize() == 1
+        assert json.loads(subscriber.queue.get_nowait())["feature"]["coordinates"][0] == {"x": 800, "y": 800}
+        
+        store.flush()
+        feed.update(subscriber, (850, 850, 950, 950), None)
+        store.queue_change("region", 2, None)
+        feed.publish("region", "delete", 2, None)
+        loop.call_soon(loop.stop)
+        loop.run_forever()
+        assert json.loads(subscriber.queue.get_nowait())["action"] == "delete"
+        loop.close()
+    
+    def test_slow_client_is_told_to_resync(self):
+        import asyncio
+        import json
+        from src.services.change_feed import Subscriber, MAX_QUEUED_MESSAGES
+        subscriber = Subscriber(1, asyncio.new_event_loop())
+        for i in range(MAX_QUEUED_MESSAGES + 1):
+            subscriber.send(json.dumps({"n": i}))
+        assert subscriber.queue.qsize() == 1
+        assert json.loads(subscriber.queue.get_nowait()) == {"type": "resync"}
+        subscriber.loop.close()
+
+
+@pytest.mark.unit
+class TestChangeLog:
+    """Test collapsing the change log into per-feature catch-up results"""
+    
+    def _row(self, change_id, kind, vnum, action):
+        from types import SimpleNamespace
+        return SimpleNamespace(change_id=change_id, feature_kind=kind, vnum=vnum, action=action)
+    
+    def test_latest_action_wins(self):
+        from src.services.change_log import changes_since
+        rows = [
+            self._row(11, "region", 5, "upsert"),
+            self._row(12, "region", 6, "upsert"),
+            self._row(13, "region", 5, "delete"),
+            self._row(14, "path", 2, "delete"),
+            self._row(15, "path", 2, "upsert"),
+        ]
+        token, has_more, changes = changes_since(_FakeSession(rows), 10)
+        assert (token, has_more) == ("15", False)
+        assert changes["region"] == {"upserted": [6], "deleted": [5]}
+        assert changes["path"] == {"upserted": [2], "deleted": []}
+    
+    def test_writers_take_the_sequence_lock_first(self):
+        from src.services.change_log import record_changes
+        statements = []
+        
+        class RecordingSession:
+            def execute(self, statement, params=None):
+                statements.append((" ".join(str(statement).split()), params))
+        
+        record_changes(RecordingSession(), [])
+        assert statements == []
+        record_changes(RecordingSession(), [("region", "upsert", 1), ("path", "delete", 2)])
+        # change_id order matches commit order because appends are serialized on this row
+        assert statements[0][0].startswith("INSERT INTO feature_change_sequence")
+        assert "ON DUPLICATE KEY UPDATE" in statements[0][0]
+        assert statements[1][0].startswith("INSERT INTO feature_change_log") and len(statements[1][1]) == 2
+    
+    def test_paging_and_empty(self):
+        from src.services.change_log import changes_since
+        assert changes_since(_FakeSession([]), 30)[:2] == ("30", False)
+        rows = [self._row(31, "path", 1, "upsert"), self._row(32, "path", 2, "upsert")]
+        assert changes_since(_FakeSession(rows), 30, limit=2)[:2] == ("32", True)
+    
+    def test_invalid_token_rejected(self, test_client):
+        response = test_client.get("/api/changes/", params={"since": "abc"})
+        assert response.status_code == 400
+
+
+@pytest.mark.unit
+class TestReadiness:
+    """Test warm-up tracking behind the /api/ready probe"""
+    
+    def test_retries_failed_step_without_repeating_completed_ones(self):
+        import threading
+        from src.services.readiness import Readiness
+        calls = []
+        failures = [RuntimeError("database unavailable")]
+        
+        def flaky():
+            calls.append("database")
+            if failures:
+                raise failures.pop()
+        
+        readiness = Readiness()
+        steps = [("models", lambda: calls.append("models")), ("database", flaky)]
+        readiness.run(steps, threading.Event(), retry_delay=0)
+        assert readiness.ready
+        assert calls == ["models", "database", "database"]
+        assert readiness.status() == {"status": "ready", "completed": ["models", "database"], "attempts": 2, "error": None}
+    
+    def test_stop_abandons_warm_up(self):
+        import threading
+        from src.services.readiness import Readiness
+        stop = threading.Event()
+        
+        def failing():
+            stop.set()
+            raise RuntimeError("no database")
+        
+        readiness = Readiness()
+        readiness.run([("database", failing)], stop, retry_delay=0)
+        assert not readiness.ready
+        assert readiness.status()["error"] == "database: no database"
+    
+    def test_ready_probe_is_red_until_warm(self, test_client):
+        response = test_client.get("/api/ready")
+        assert response.status_code == 503
+        assert response.json()["status"] == "starting"
+        assert test_client.get("/api/health").status_code == 200
+    
+    def test_models_load_lazily(self):
+        from src import models
+        assert models.Region.__tablename__ == "region_data"
+        assert models.Path.__tablename__ == "path_data"
+
+
+@pytest.mark.unit
+class TestWorldSnapshot:
+    """Test the memory-mapped, generation-swapped world snapshot"""
+    
+    def _regions(self):
+        return [
+            {"vnum": 30, "zone_vnum": 1, "name": "Lake", "region_type": 4, "region_props": 7,
+             "coordinates": [{"x": 100, "y": 100}, {"x": 120, "y": 100}, {"x": 110, "y": 130}]},
+            {"vnum": 10, "zone_vnum": 1, "name": "Woodé", "region_type": 1, "region_props": None,
+             "coordinates": [{"x": -500, "y": -500}, {"x": -400, "y": -500}, {"x": -400, "y": -300}, {"x": -500, "y": -300}]},
+            {"vnum": 20, "zone_vnum": 2, "name": "Gate", "region_type": 1, "region_props": None,
+             "coordinates": [{"x": 5, "y": 5}]},
+        ]
+    
+    def _store(self, tmp_path):
+        from src.services.world_snapshot import SnapshotStore, build_table, write_snapshot
+        store = SnapshotStore(str(tmp_path / "world.snapshot"))
+        write_snapshot(store.path, {
+            "region": build_table("region", self._regions()),
+            "path": build_table("path", [{"vnum": 1, "zone_vnum": 1, "name": "Road", "path_type": 1, "path_props": 11,
+                                          "coordinates": [{"x": 0, "y": 0}, {"x": 300, "y": 0}]}])
+        }, generation=1)
+        return store
+    
+    def test_round_trip_is_zero_copy(self, tmp_path):
+        snapshot = self._store(tmp_path).current()
+        assert snapshot.generation == 1
+        assert snapshot.tables["region"]["vnum"].tolist() == [10, 20, 30]
+        assert not snapshot.tables["region"]["coords"].flags.writeable
+        assert snapshot.tables["region"]["coords"].base is not None
+        for feature in self._regions():
+            assert snapshot.feature("region", snapshot.find("region", feature["vnum"])) == feature
+        assert snapshot.find("region", 99) is None
+        assert snapshot.feature("path", 0)["path_props"] == 11
+    
+    def test_bbox_query_uses_grid(self, tmp_path):
+        snapshot = self._store(tmp_path).current()
+        found = snapshot.query("region", 0, 0, 150, 150)
+        assert snapshot.tables["region"]["vnum"][found].tolist() == [20, 30]
+        assert snapshot.query("region", 600, 600, 700, 700).tolist() == []
+        assert snapshot.query("path", 250, -1, 260, 1).tolist() == [0]
+    
+    def test_queued_writes_publish_new_generation(self, tmp_path):
+        from src.services.world_snapshot import SnapshotStore, build_table
+        store = self._store(tmp_path)
+        old = store.current()
+        moved = dict(self._regions()[0], coordinates=[{"x": 900, "y": 900}, {"x": 910, "y": 900}, {"x": 905, "y": 910}])
+        added = {"vnum": 15, "zone_vnum": 3, "name": "New", "region_type": 2, "region_props": None,
+                 "coordinates": [{"x": 1, "y": 1}, {"x": 2, "y": 1}, {"x": 2, "y": 2}]}
+        store.queue_change("region", 30, moved)
+        store.queue_change("region", 15, added)
+        store.queue_change("region", 20, None)
+        store.flush()
+        
+        # Another worker mapping the same file sees the new generation
+        snapshot = SnapshotStore(store.path).current()
+        assert snapshot.generation == 2
+        expected = build_table("region", [self._regions()[1], added, moved])
+        for column, array in expected.items():
+            assert np.array_equal(snapshot.tables["region"][column], array, equal_nan=True), column
+        # Readers of the previous generation keep a consistent view
+        assert old.generation == 1 and old.tables["region"]["vnum"].tolist() == [10, 20, 30]
+    
+    def test_flush_rebuilds_grid_once_per_kind(self, tmp_path, monkeypatch):
+        from src.services import world_snapshot
+        from src.services.world_snapshot import build_table
+        store = self._store(tmp_path)
+        calls = []
+        grid_index = world_snapshot._grid_index
+        monkeypatch.setattr(world_snapshot, "_grid_index", lambda bbox: calls.append(len(bbox)) or grid_index(bbox))
+        added = [{"vnum": vnum, "zone_vnum": 1, "name": f"R{vnum}", "region_type": 1, "region_props": None,
+                  "coordinates": [{"x": vnum, "y": 0}, {"x": vnum + 1, "y": 0}, {"x": vnum, "y": 1}]}
+                 for vnum in range(100, 300)]
+        for feature in added:
+            store.queue_change("region", feature["vnum"], feature)
+        store.queue_change("region", 10, None)
+        snapshot = store.flush()
+        
+        assert calls == [202]
+        expected = build_table("region", [self._regions()[2], self._regions()[0]] + added)
+        for column, array in expected.items():
+            assert np.array_equal(snapshot.tables["region"][column], array, equal_nan=True), column
+
+
+@pytest.mark.unit
+class TestRegionMembership:
+    """Test the run-length encoded cell-to-region index"""
+    
+    def _region(self, vnum, coordinates):
+        return {"vnum": vnum, "zone_vnum": 1, "name": f"R{vnum}", "region_type": 1, "region_props": None,
+                "coordinates": [{"x": x, "y": y} for x, y in coordinates]}
+    
+    def _regions(self):
+        return [
+            self._region(1, [(0, 0), (10, 0), (10, 10), (0, 10)]),
+            self._region(2, [(5.5, -3.2), (20.7, 4.1), (8.25, 17.9)]),
+            self._region(3, [(-1030, -1030), (-1000, -1030), (-1015, -990)]),
+            self._region(4, [(3.4, 3.6)]),
+        ]
+    
+    def _stores(self, tmp_path, regions):
+        from src.services.world_snapshot import SnapshotStore, build_table, write_snapshot
+        from src.services.region_membership import MembershipStore
+        snapshots = SnapshotStore(str(tmp_path / "world.snapshot"))
+        write_snapshot(snapshots.path, {"region": build_table("region", regions), "path": build_table("path", [])},
+                       generation=1)
+        return snapshots, MembershipStore(snapshots, str(tmp_path / "membership.idx"))
+    
+    def _expected(self, regions, xs, ys):
+        from src.services.spatial import points_in_polygon
+        px, py = np.meshgrid(xs, ys)
+        covered = []
+        for region in regions:
+            points = np.array([[c["x"], c["y"]] for c in region["coordinates"]], dtype=np.float64)
+            if len(points) == 1:
+                covered.append((px == round(points[0, 0])) & (py == round(points[0, 1])))
+            else:
+                covered.append(points_in_polygon(px.ravel().astype(float), py.ravel().astype(float), [points]).reshape(px.shape))
+        return px, py, covered
+    
+    def _assert_matches(self, index, regions, xs, ys):
+        px, py, covered = self._expected(regions, xs, ys)
+        for (r, c), x in np.ndenumerate(px):
+            expected = [region["vnum"] for region, mask in zip(regions, covered) if mask[r, c]]
+            assert index.lookup(int(x), int(py[r, c])) == expected, (x, py[r, c])
+    
+    def test_matches_point_in_polygon(self, tmp_path):
+        regions = self._regions()
+        snapshots, store = self._stores(tmp_path, regions)
+        index = store.ensure_current()
+        assert index.version == 1 and index.source_generation == 1
+        self._assert_matches(index, regions, np.arange(-5, 25), np.arange(-6, 22))
+        assert index.lookup(0, 0) == [1]
+        assert index.lookup(10, 5) == [2]
+        assert index.lookup(3, 4) == [1, 4]
+        # Clipped to the world edge
+        assert index.lookup(-1024, -1024) == [3]
+        assert index.lookup(2000, 0) == []
+    
+    def test_incremental_update_matches_full_build(self, tmp_path):
+        from src.services.region_membership import MembershipIndex, build_rows, encode_index
+        regions = self._regions()
+        snapshots, store = self._stores(tmp_path, regions)
+        store.ensure_current()
+        snapshots.subscribe(store.on_generation)
+        
+        moved = self._region(1, [(2, 2), (14, 2), (14, 12)])
+        snapshots.queue_change("region", 1, moved)
+        snapshots.queue_change("region", 2, None)
+        snapshots.flush()
+        
+        index = store.current()
+        snapshot = snapshots.current()
+        assert index.version == 2 and index.source_generation == snapshot.generation == 2
+        assert index.to_rows() == build_rows(snapshot)
+        assert MembershipIndex(store.path).to_rows() == index.to_rows()
+        self._assert_matches(index, [moved, regions[2], regions[3]], np.arange(-2, 22), np.arange(-4, 20))
+        assert encode_index(index.to_rows(), 2, 2) == open(store.path, "rb").read()
+    
+    def test_path_write_keeps_version(self, tmp_path, monkeypatch):
+        from src.services import region_membership
+        from src.services.region_membership import HEADER_SIZE
+        snapshots, store = self._stores(tmp_path, self._regions())
+        store.ensure_current()
+        snapshots.subscribe(store.on_generation)
+        published = open(store.path, "rb").read()
+        
+        snapshots.queue_change("path", 7, {"vnum": 7, "zone_vnum": 1, "name": "Road", "path_type": 1, "path_props": 0,
+                                           "coordinates": [{"x": 0, "y": 0}, {"x": 5, "y": 5}]})
+        snapshots.flush()
+        
+        index = store.current()
+        assert index.version == 1 and index.source_generation == snapshots.current().generation == 2
+        assert open(store.path, "rb").read()[HEADER_SIZE:] == published[HEADER_SIZE:]
+        # The next region write still patches rows instead of rebuilding
+        monkeypatch.setattr(region_membership, "build_rows", None)
+        snapshots.queue_change("region", 1, None)
+        snapshots.flush()
+        assert store.current().version == 2 and store.current().lookup(0, 0) == []
+    
+    def test_stale_index_is_rebuilt(self, tmp_path):
+        snapshots, store = self._stores(tmp_path, self._regions())
+        store.ensure_current()
+        # Generation moved on without the listener (e.g. written by a process that crashed mid-way)
+        snapshots.queue_change("region", 1, None)
+        snapshots.flush()
+        index = store.ensure_current()
+        assert index.version == 2 and index.source_generation == 2
+        assert index.lookup(0, 0) == []
+    
+    def test_row_runs_sweep(self):
+        from src.services.region_membership import _row_runs
+        rng = np.random.default_rng(7)
+        entries = []
+        for vnum in range(1, 60):
+            start = int(rng.integers(-50, 50))
+            entries.append((start, start + int(rng.integers(1, 30)), vnum))
+        entries.append((0, 5, 3))
+        runs = _row_runs(entries)
+        # Each run holds exactly the vnums covering its start, and the list only changes at run starts
+        for x in range(-60, 90):
+            covering = tuple(sorted({vnum for start, end, vnum in entries if start <= x < end}))
+            current = [vnums for start, vnums in runs if start <= x]
+            assert (current[-1] if current else ()) == covering, x
+        assert all(a[1] != b[1] for a, b in zip(runs, runs[1:]))
+
+
+@pytest.mark.unit
+class TestPathRaster:
+    """Test path rasterization into sector cells"""
+    
+    def _path(self, vnum, props, coordinates):
+        return {"vnum": vnum, "zone_vnum": 1, "name": f"P{vnum}", "path_type": 1, "path_props": props,
+                "coordinates": [{"x": x, "y": y} for x, y in coordinates]}
+    
+    def _index(self, *paths):
+        from src.services.path_raster import PathRasterIndex
+        index = PathRasterIndex()
+        for path in paths:
+            index.upsert("path", path)
+        return index
+    
+    def _by_cell(self, index, **kwargs):
+        return {(c["x"], c["y"]): c for c in index.cells(**kwargs)}
+    
+    def test_orientation_glyphs(self):
+        cells = self._by_cell(self._index(self._path(1, 11, [(0, 0), (5, 0), (5, 4)])))
+        assert [cells[(x, 0)]["sector"] for x in range(5)] == [12] * 5
+        assert [cells[(5, y)]["sector"] for y in range(1, 5)] == [11] * 4
+        assert cells[(5, 0)]["glyph"] in ("ns", "ew")
+        assert len(cells) == 10
+    
+    def test_diagonal_is_supercover(self):
+        cells = self._by_cell(self._index(self._path(1, 26, [(0, 0), (3, 3)])))
+        assert set(cells) == {(0, 0), (1, 0), (0, 1), (1, 1), (2, 1), (1, 2), (2, 2), (3, 2), (2, 3), (3, 3)}
+        assert {c["sector"] for c in cells.values()} <= {26, 27}
+    
+    def test_intersections(self):
+        road = self._path(1, 11, [(0, 5), (10, 5)])
+        dirt = self._path(2, 27, [(5, 0), (5, 10)])
+        river = self._path(3, 36, [(0, 8), (10, 8)])
+        index = self._index(road, dirt, river)
+        cells = self._by_cell(index)
+        # The later path decides which family's intersection sector is used
+        assert cells[(5, 5)] == {"x": 5, "y": 5, "sector": 28, "glyph": "intersection", "paths": [1, 2]}
+        # Rivers keep their own sector and do not make intersections
+        assert cells[(5, 8)]["sector"] == 36 and cells[(5, 8)]["glyph"] is None
+        assert cells[(2, 5)]["sector"] == 12 and cells[(5, 2)]["sector"] == 26
+        
+        loop = self._index(self._path(4, 11, [(0, 0), (4, 0), (4, 4), (2, 4), (2, -2)]))
+        assert self._by_cell(loop)[(2, 0)]["glyph"] == "intersection"
+    
+    def test_incremental_updates(self):
+        road = self._path(1, 11, [(0, 5), (10, 5)])
+        dirt = self._path(2, 27, [(5, 0), (5, 10)])
+        index = self._index(road, dirt)
+        index.upsert("path", dict(dirt, coordinates=[{"x": 20, "y": 0}, {"x": 20, "y": 10}]))
+        cells = self._by_cell(index)
+        assert cells[(5, 5)]["sector"] == 12 and cells[(5, 5)]["paths"] == [1]
+        index.delete("path", 1)
+        assert (5, 5) not in self._by_cell(index)
+        assert self._by_cell(index) == self._by_cell(self._index(dict(dirt, coordinates=[{"x": 20, "y": 0}, {"x": 20, "y": 10}])))
+        assert list(self._by_cell(index, min_y=3, max_y=4)) == [(20, 3), (20, 4)]
+        assert self._by_cell(index, path_vnum=1) == {}
+    
+    def test_loads_from_snapshot(self, tmp_path):
+        from src.services.path_raster import PathRasterIndex
+        paths = [self._path(1, 11, [(0, 5), (10, 5)]), self._path(2, 27, [(5, 0), (5, 10)]), self._path(3, None, [(0, 8), (3, 8)])]
+        index = PathRasterIndex()
+        index.load(_world(tmp_path, [_square_region(1, 0, 0, 10)], paths).current())
+        assert self._by_cell(index) == self._by_cell(self._index(*paths))
+        assert self._by_cell(index)[(1, 8)]["sector"] is None
+
+
+@pytest.mark.unit
+class TestPathNetwork:
+    """Test the road/river topology graph and routing"""
+    
+    def _path(self, vnum, path_type, coordinates):
+        return {"vnum": vnum, "zone_vnum": 1, "name": f"P{vnum}", "path_type": path_type, "path_props": None,
+                "coordinates": [{"x": x, "y": y} for x, y in coordinates]}
+    
+    def _index(self, *paths):
+        from src.services.path_network import PathNetworkIndex
+        index = PathNetworkIndex()
+        for path in paths:
+            index.upsert("path", path)
+        return index
+    
+    def _town_roads(self):
+        return [
+            self._path(1, 1, [(0, 0), (100, 0)]),              # West-east highway
+            self._path(2, 2, [(50, -50), (50, 50)]),           # Crosses the highway at (50, 0)
+            self._path(3, 2, [(50, 50), (100, 50), (100, 0)]), # Loops back to the highway's end
+            self._path(4, 5, [(0, 10), (100, 10)]),            # River, not part of the road network
+        ]
+    
+    def test_junctions_and_components(self):
+        stats = self._index(*self._town_roads()).stats()
+        # Nodes: (0,0) (50,0) (100,0) (50,-50) (50,50)
+        assert stats["road"] == {"paths": 3, "nodes": 5, "edges": 5, "components": 1}
+        assert stats["river"] == {"paths": 1, "nodes": 2, "edges": 1, "components": 1}
+    
+    def test_shortest_route(self):
+        index = self._index(*self._town_roads())
+        route = index.route("road", 0, 0, 50, 40)
+        assert route["connected"]
+        assert route["distance"] == pytest.approx(90)
+        assert [p["vnum"] for p in route["paths"]] == [1, 2]
+        assert route["coordinates"][0] == {"x": 0, "y": 0} and route["coordinates"][-1] == {"x": 50, "y": 40}
+        
+        # Snapped onto the network, along the same stretch
+        same = index.route("road", 10, 3, 40, -2)
+        assert same["distance"] == pytest.approx(30) and same["start"] == {"x": 10, "y": 0, "path_vnum": 1}
+        
+        assert not index.route("road", 0, 0, 500, 500)["connected"]
+        assert index.route("river", 0, 12, 80, 12)["distance"] == pytest.approx(80)
+    
+    def test_incremental_updates(self):
+        index = self._index(*self._town_roads())
+        assert index.route("road", 100, 25, 50, -50)["distance"] == pytest.approx(125)
+        # Cutting the crossing road leaves only the detour through the loop
+        index.upsert("path", self._path(2, 2, [(50, -50), (50, -10)]))
+        assert not index.route("road", 100, 25, 50, -50)["connected"]
+        assert index.stats()["road"]["components"] == 2
+        index.delete("path", 2)
+        assert index.stats()["road"] == {"paths": 2, "nodes": 3, "edges": 2, "components": 1}
+        # A path changing type moves between networks
+        index.upsert("path", self._path(4, 1, [(0, 10), (100, 10)]))
+        assert index.stats()["river"]["paths"] == 0
+        # It meets the loop road at (100, 10)
+        assert index.route("road", 0, 10, 0, 0)["distance"] == pytest.approx(210)
+    
+    def test_loads_from_snapshot(self, tmp_path):
+        from src.services.path_network import PathNetworkIndex
+        index = PathNetworkIndex()
+        index.load(_world(tmp_path, paths=self._town_roads()).current())
+        assert index.stats() == self._index(*self._town_roads()).stats()
+        route = index.route("road", 0, 0, 50, 40)
+        assert route["distance"] == pytest.approx(90) and route["paths"][0]["name"] == "P1"
+
+
+@pytest.mark.unit
+class TestSearchIndex:
+    """Test name/type/zone search with prefix and trigram matching"""
+    
+    def _feature(self, kind, vnum, name, zone_vnum=1, feature_type=1):
+        return {"vnum": vnum, "zone_vnum": zone_vnum, "name": name, f"{kind}_type": feature_type,
+                "coordinates": [{"x": vnum, "y": 0}, {"x": vnum + 10, "y": 5}]}
+    
+    def _features(self):
+        return [
+            self._feature("region", 1, "Lake of Tears", zone_vnum=100, feature_type=4),
+            self._feature("region", 2, "Tears of the Lake", zone_vnum=100),
+            self._feature("region", 3, "Lake", zone_vnum=200),
+            self._feature("path", 4, "Lakeshore Road", zone_vnum=100, feature_type=1),
+            self._feature("path", 5, "Great River", zone_vnum=200, feature_type=5),
+        ]
+    
+    def _index(self):
+        from src.services.search_index import SearchIndex
+        index = SearchIndex()
+        for feature in self._features():
+            index.upsert("region" if "region_type" in feature else "path", feature)
+        return index
+    
+    def _names(self, results):
+        return [r["name"] for r in results]
+    
+    def test_ranking(self):
+        index = self._index()
+        assert self._names(index.search("lake")) == ["Lake", "Lake of Tears", "Lakeshore Road", "Tears of the Lake"]
+        assert self._names(index.search("Lake of t"))[:2] == ["Lake of Tears", "Tears of the Lake"]
+        assert self._names(index.search("tears lake"))[:2] == ["Lake of Tears", "Tears of the Lake"]
+        top = index.search("lake of tears")[0]
+        assert top["kind"] == "region" and top["vnum"] == 1 and top["type_name"] == "Sector Override"
+        assert top["bbox"] == {"min_x": 1.0, "min_y": 0.0, "max_x": 11.0, "max_y": 5.0}
+        assert index.search("   ") == []
+    
+    def test_types_zones_and_misspellings(self):
+        index = self._index()
+        assert self._names(index.search("river")) == ["Great River"]
+        assert self._names(index.search("lake 200")) == ["Lake"]
+        assert self._names(index.search("lake", kind="path")) == ["Lakeshore Road"]
+        assert self._names(index.search("lake", zone_vnum=200)) == ["Lake"]
+        assert self._names(index.search("lake of teers"))[0] == "Lake of Tears"
+        assert self._names(index.search("lake", limit=2)) == ["Lake", "Lake of Tears"]
+    
+    def test_updates(self):
+        index = self._index()
+        index.upsert("region", self._feature("region", 3, "Mirror Pond", zone_vnum=200))
+        assert "Lake" not in self._names(index.search("lake"))
+        assert self._names(index.search("mirr")) == ["Mirror Pond"]
+        index.delete("region", 3)
+        assert index.search("mirror") == []
+        assert index._words == sorted(index._words)
+    
+    def test_load_matches_upserts(self, tmp_path):
+        from src.services.search_index import SearchIndex
+        features = self._features()
+        loaded = SearchIndex()
+        loaded.load(_world(tmp_path, [f for f in features if "region_type" in f], [f for f in features if "path_type" in f]).current())
+        upserted = self._index()
+        assert loaded._words == upserted._words
+        assert loaded.search("lake") == upserted.search("lake")
+
+
+@pytest.mark.unit
+class TestSparseFields:
+    """Test fields= parsing and sparse responses"""
+    
+    def test_parse_fields(self):
+        from fastapi import HTTPException
+        from src.schemas.region import RegionResponse
+        from src.services.sparse_fields import fields_parameter, needs_geometry
+        get_fields = fields_parameter(RegionResponse)
+        assert get_fields(None) is None
+        assert get_fields("name, region_type,name,bbox") == ["vnum", "name", "region_type", "bbox"]
+        assert not needs_geometry(get_fields("name,bbox,centroid"))
+        assert needs_geometry(get_fields("geometry_version")) and needs_geometry(None)
+        with pytest.raises(HTTPException) as error:
+            get_fields("name,polygon")
+        assert error.value.status_code == 400 and "polygon" in error.value.detail
+    
+    def test_centroids(self):
+        from src.services.world_snapshot import feature_summary
+        square = [{"x": 0, "y": 0}, {"x": 4, "y": 0}, {"x": 4, "y": 2}, {"x": 0, "y": 2}]
+        assert feature_summary("region", square) == {"bbox": {"min_x": 0, "min_y": 0, "max_x": 4, "max_y": 2}, "centroid": {"x": 2, "y": 1}}
+        # Linestrings use the length-weighted midpoint
+        line = [{"x": 0, "y": 0}, {"x": 6, "y": 0}, {"x": 6, "y": 2}]
+        assert feature_summary("path", line)["centroid"] == {"x": pytest.approx(3.75), "y": pytest.approx(0.25)}
+        assert feature_summary("path", []) == {"bbox": None, "centroid": None}
+    
+    def test_summaries_from_snapshot(self, tmp_path, monkeypatch):
+        import json
+        from fastapi import HTTPException
+        from src.services import sparse_fields
+        from src.services.world_snapshot import SnapshotStore, build_table, write_snapshot
+        store = SnapshotStore(str(tmp_path / "world.snapshot"))
+        write_snapshot(store.path, {
+            "region": build_table("region", [{"vnum": 1, "zone_vnum": 1, "name": "A", "region_type": 1, "region_props": None,
+                                              "coordinates": [{"x": 0, "y": 0}, {"x": 2, "y": 0}, {"x": 2, "y": 2}, {"x": 0, "y": 2}]}]),
+            "path": build_table("path", [])
+        }, generation=1)
+        monkeypatch.setattr(sparse_fields, "snapshot_store", store)
+        
+        loaded = []
+        def load_geometry(vnum):
+            loaded.append(vnum)
+            return [{"x": 10, "y": 10}, {"x": 12, "y": 10}]
+        items = [{"vnum": 1, "name": "A", "region_type": 1}, {"vnum": 2, "name": "B", "region_type": 2}]
+        response = sparse_fields.sparse_response("region", items, ["vnum", "name", "centroid"], "dict", load_geometry)
+        assert json.loads(response.body) == [
+            {"vnum": 1, "name": "A", "centroid": {"x": 1.0, "y": 1.0}},
+            {"vnum": 2, "name": "B", "centroid": {"x": 11.0, "y": 10.0}},
+        ]
+        # Only the feature missing from the snapshot read its geometry
+        assert loaded == [2]
+        
+        single = sparse_fields.sparse_response("region", {"vnum": 1, "coordinates": [{"x": 1, "y": 2}]},
+                                               ["vnum", "coordinates"], "flat", load_geometry)
+        assert json.loads(single.body) == {"vnum": 1, "coordinates": [1, 2]}
+        with pytest.raises(HTTPException):
+            sparse_fields.sparse_response("region", items, ["vnum"], "binary", load_geometry)
+
+
+@pytest.mark.unit
+class TestFeatureFilters:
+    """Test list filters compile to indexable SQL"""
+    
+    def _sql(self, **filters):
+        from sqlalchemy.dialects import mysql
+        from sqlalchemy.orm import Query
+        from src import models
+        from src.services.feature_filters import apply_feature_filters
+        query = apply_feature_filters(Query(models.Region), models.Region, "region", **filters)
+        return str(query.statement.compile(dialect=mysql.dialect(), compile_kwargs={"literal_binds": True}))
+    
+    def test_zero_is_a_filter_value(self):
+        sql = self._sql(types=[0], zones=[0])
+        assert "region_data.region_type = 0" in sql and "region_data.zone_vnum = 0" in sql
+        assert "WHERE" not in self._sql()
+        assert self._sql().endswith("ORDER BY region_data.vnum")
+    
+    def test_multi_value_and_ranges(self):
+        sql = self._sql(types=[1, 4], zones=[100, 200], props=[6], vnum_min=1000, vnum_max=1999, has_geometry=True)
+        assert "region_data.region_type IN (1, 4)" in sql
+        assert "region_data.zone_vnum IN (100, 200)" in sql
+        assert "region_data.region_props = 6" in sql
+        assert "region_data.vnum >= 1000" in sql and "region_data.vnum <= 1999" in sql
+        assert "region_data.region_polygon IS NOT NULL" in sql
+        assert "region_data.region_polygon IS NULL" in self._sql(has_geometry=False)
+    
+    def test_inverted_range(self):
+        from fastapi import HTTPException
+        with pytest.raises(HTTPException) as error:
+            self._sql(vnum_min=10, vnum_max=1)
+        assert error.value.status_code == 400
+
+
+@pytest.mark.unit
+class TestAdmission:
+    """Test per-cost-class admission control"""
+    
+    def test_queue_and_reject(self):
+        import asyncio
+        from fastapi import HTTPException
+        from src.services.admission import AdmissionController, AdmissionLimit
+        controller = AdmissionController("full_list", AdmissionLimit(concurrency=1, queue_size=1, max_wait=5.0, retry_after=7))
+        
+        async def scenario():
+            await controller.acquire()
+            waiting = asyncio.ensure_future(controller.acquire())
+            await asyncio.sleep(0)
+            assert controller.queued == 1 and controller.active == 1
+            # Queue full: rejected immediately with Retry-After
+            with pytest.raises(HTTPException) as error:
+                await controller.acquire()
+            assert error.value.status_code == 503 and error.value.headers == {"Retry-After": "7"}
+            # Releasing hands the slot to the queued request
+            controller.release()
+            await waiting
+            assert controller.queued == 0 and controller.active == 1
+            controller.release()
+        
+        asyncio.run(scenario())
+        assert controller.stats() == {"concurrency": 1, "queue_size": 1, "active": 0, "queued": 0,
+                                      "admitted_total": 2, "rejected_total": 1}
+    
+    def test_wait_timeout(self):
+        import asyncio
+        from fastapi import HTTPException
+        from src.services.admission import AdmissionController, AdmissionLimit
+        controller = AdmissionController("bulk_write", AdmissionLimit(concurrency=1, queue_size=4, max_wait=0.01, retry_after=2))
+        
+        async def scenario():
+            await controller.acquire()
+            with pytest.raises(HTTPException) as error:
+                await controller.acquire()
+            assert "timed out" in error.value.detail
+            controller.release()
+            # The slot is still usable after a timed-out waiter
+            await controller.acquire()
+            controller.release()
+        
+        asyncio.run(scenario())
+        assert controller.queued == 0 and controller.active == 0
+
+@pytest.mark.unit
+class TestSingleFlight:
+    """Test coalescing of identical concurrent GET requests"""
+    
+    @staticmethod
+    def _scope(path, query=b"", method="GET", headers=()):
+        return {"type": "http", "method": method, "path": path, "query_string": query, "headers": list(headers)}
+    
+    def test_identical_requests_share_one_execution(self):
+        import asyncio
+        from src.services.single_flight import SingleFlight
+        group = SingleFlight()
+        calls = []
+        
+        async def app(scope, receive, send):
+            calls.append(scope["query_string"])
+            await asyncio.sleep(0.01)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"regions:" + scope["query_string"]})
+        
+        async def request(scope):
+            sent = []
+            
+            async def send(message):
+                sent.append(message)
+            
+            await group.handle(app, scope, None, send)
+            return sent
+        
+        async def scenario():
+            return await asyncio.gather(
+                request(self._scope("/api/regions/", b"zone_vnum=10")),
+                request(self._scope("/api/regions/", b"zone_vnum=10")),
+                request(self._scope("/api/regions/", b"zone_vnum=10")),
+                request(self._scope("/api/regions/", b"zone_vnum=11")),
+                # Different coordinate format, different response
+                request(self._scope("/api/regions/", b"zone_vnum=10", headers=[(b"x-coordinate-format", b"flat")])),
+            )
+        
+        responses = asyncio.run(scenario())
+        assert len(calls) == 3
+        assert responses[0] == responses[1] == responses[2]
+        assert responses[0][1]["body"] == b"regions:zone_vnum=10"
+        assert responses[3][1]["body"] == b"regions:zone_vnum=11"
+        assert group.coalesced_total == 2 and group.leaders_total == 3 and group.inflight == 0
+        
+        # Nothing is cached once the leader has finished
+        asyncio.run(request(self._scope("/api/regions/", b"zone_vnum=10")))
+        assert len(calls) == 4
+    
+    def test_writes_and_unlisted_paths_are_not_coalesced(self):
+        import asyncio
+        from src.services.single_flight import SingleFlight
+        group = SingleFlight()
+        calls = []
+        
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+            await asyncio.sleep(0.01)
+        
+        async def noop(message):
+            pass
+        
+        async def scenario():
+            await asyncio.gather(*(
+                group.handle(app, scope, None, noop) for scope in [
+                    self._scope("/api/regions/", method="POST"),
+                    self._scope("/api/regions/", method="POST"),
+                    self._scope("/api/health"),
+                    self._scope("/api/health"),
+                ]
+            ))
+        
+        asyncio.run(scenario())
+        assert len(calls) == 4 and group.leaders_total == 0
+    
+    def test_followers_run_themselves_when_leader_fails(self):
+        import asyncio
+        from src.services.single_flight import SingleFlight
+        group = SingleFlight()
+        calls = []
+        
+        async def app(scope, receive, send):
+            calls.append(scope["path"])
+            await asyncio.sleep(0.01)
+            if len(calls) == 1:
+                raise RuntimeError("database went away")
+            await send({"type": "http.response.body", "body": b"ok"})
+        
+        async def request():
+            sent = []
+            
+            async def send(message):
+                sent.append(message)
+            
+            await group.handle(app, self._scope("/api/paths/"), None, send)
+            return sent
+        
+        async def scenario():
+            return await asyncio.gather(request(), request(), return_exceptions=True)
+        
+        leader, follower = asyncio.run(scenario())
+        assert isinstance(leader, RuntimeError)
+        assert follower == [{"type": "http.response.body", "body": b"ok"}]
+        assert len(calls) == 2 and group.coalesced_total == 0
+    
+    def test_requests_after_a_write_do_not_join_older_flights(self, tmp_path):
+        import asyncio
+        from src.services.single_flight import SingleFlight
+        snapshots = _world(tmp_path)
+        group = SingleFlight(snapshots=snapshots)
+        calls = []
+        
+        async def app(scope, receive, send):
+            calls.append(len(calls))
+            body = b"read %d" % len(calls)
+            await asyncio.sleep(0.05)
+            await send({"type": "http.response.body", "body": body})
+        
+        async def request(delay):
+            await asyncio.sleep(delay)
+            sent = []
+            
+            async def send(message):
+                sent.append(message)
+            
+            await group.handle(app, self._scope("/api/regions/4"), None, send)
+            return sent[0]["body"]
+        
+        async def write(delay, flush=False):
+            await asyncio.sleep(delay)
+            if flush:
+                # Another worker's write reaching the shared snapshot
+                snapshots.queue_change("region", 4, None)
+                snapshots.flush()
+            else:
+                group.record_write()
+        
+        async def scenario():
+            results = await asyncio.gather(request(0), write(0.01), request(0.02), request(0.03),
+                                           request(0.1), write(0.11, flush=True), request(0.12), request(0.13))
+            return [result for result in results if result is not None]
+        
+        assert asyncio.run(scenario()) == [b"read 1", b"read 2", b"read 2", b"read 3", b"read 4", b"read 4"]
+        assert group.coalesced_total == 2 and group.inflight == 0
+
+
+class _MemoryJobStore:
+    """Job store keeping rows in a dict, standing in for the background_job table"""
+    
+    def __init__(self):
+        self.jobs = {}
+    
+    def create(self, job_type_name, params):
+        job_id = len(self.jobs) + 1
+        self.jobs[job_id] = {"job_id": job_id, "job_type": job_type_name, "status": "queued", "params": params,
+                             "progress": 0.0, "message": None, "error": None, "result_size": None,
+                             "cancel_requested": False}
+        return job_id
+    
+    def start(self, job_id):
+        if self.jobs[job_id]["status"] != "queued":
+            return False
+        self.jobs[job_id]["status"] = "running"
+        return True
+    
+    def progress(self, job_id, fraction, message):
+        self.jobs[job_id].update(progress=fraction, message=message or self.jobs[job_id]["message"])
+        return self.jobs[job_id]["cancel_requested"]
+    
+    def finish(self, job_id, status, message=None, error=None, result_size=None):
+        self.jobs[job_id].update(status=status, error=error, result_size=result_size)
+        if message:
+            self.jobs[job_id]["message"] = message
+    
+    def heartbeat(self, job_ids):
+        pass
+    
+    def expire_stale(self):
+        pass
+    
+    def get(self, job_id):
+        return dict(self.jobs[job_id]) if job_id in self.jobs else None
+    
+    def request_cancel(self, job_id):
+        job = self.jobs[job_id]
+        job["cancel_requested"] = True
+        if job["status"] == "queued":
+            job["status"] = "cancelled"
+
+
+@pytest.mark.unit
+class TestJobRunner:
+    """Test the background job runner"""
+    
+    @pytest.fixture
+    def runner(self, tmp_path, monkeypatch):
+        import threading
+        from src.services import jobs
+        gate = threading.Event()
+        
+        def slow_export(context):
+            for i in range(3):
+                context.progress(i / 3, f"step {i}")
+                context.output.write(f"line {i}\n".encode())
+                gate.wait(5)
+            return "done"
+        
+        def broken(context):
+            raise RuntimeError("disk full")
+        
+        monkeypatch.setitem(jobs.JOB_TYPES, "test_export", jobs.JobType(slow_export, "text/plain", "txt", "test"))
+        monkeypatch.setitem(jobs.JOB_TYPES, "test_broken", jobs.JobType(broken, "text/plain", "txt", "test"))
+        runner = jobs.JobRunner(_MemoryJobStore(), workers=1, max_queued=1, results_dir=str(tmp_path))
+        runner.gate = gate
+        yield runner
+        gate.set()
+        runner.shutdown()
+    
+    def _wait_for(self, runner, job_id, *states):
+        import time
+        for _ in range(500):
+            job = runner.get(job_id)
+            if job["status"] in states:
+                return job
+            time.sleep(0.01)
+        raise AssertionError(f"job {job_id} stuck in {job['status']}")
+    
+    def test_job_runs_and_writes_result(self, runner):
+        job = runner.submit("test_export", {"zone_vnum": 1})
+        assert job["status"] in ("queued", "running")
+        runner.gate.set()
+        job = self._wait_for(runner, job["job_id"], "succeeded")
+        with open(runner.result_path(job["job_id"]), "rb") as result:
+            assert result.read() == b"line 0\nline 1\nline 2\n"
+        assert job["result_size"] == 21 and job["message"] == "done"
+        assert runner.held == 0
+    
+    def test_queue_limit_and_cancel(self, runner):
+        from src.services.jobs import JobQueueFull
+        running = runner.submit("test_export", {})["job_id"]
+        queued = runner.submit("test_export", {})["job_id"]
+        # One running plus one queued fills this runner
+        with pytest.raises(JobQueueFull):
+            runner.submit("test_export", {})
+        
+        self._wait_for(runner, running, "running")
+        runner.store.request_cancel(queued)
+        runner.store.request_cancel(running)
+        runner.gate.set()
+        assert self._wait_for(runner, running, "cancelled")["status"] == "cancelled"
+        assert runner.get(queued)["status"] == "cancelled"
+        import os
+        assert not os.path.exists(runner.result_path(running))
+    
+    def test_failures_and_unknown_types(self, runner):
+        job_id = runner.submit("test_broken", {})["job_id"]
+        job = self._wait_for(runner, job_id, "failed")
+        assert job["error"] == "disk full"
+        with pytest.raises(ValueError):
+            runner.submit("no_such_job", {})
+    
+    def test_job_types_endpoint(self, test_client):
+        response = test_client.get("/api/jobs/types")
+        assert response.status_code == 200
+        assert response.json()["export_world"]["content_type"] == "application/x-ndjson"
+        assert test_client.post("/api/jobs/", json={"job_type": "no_such_job"}).status_code == 400
+
+
+@pytest.mark.unit
+class TestGeometryPool:
+    """Test running geometry kernels across processes"""
+    
+    def _batch(self):
+        from src.services.world_snapshot import build_table
+        regions = [
+            {"vnum": 1, "zone_vnum": 1, "name": "A", "region_type": 1,
+             "coordinates": [{"x": 0, "y": 0}, {"x": 10, "y": 0}, {"x": 10, "y": 10}, {"x": 0, "y": 10}]},
+            {"vnum": 2, "zone_vnum": 1, "name": "Bowtie", "region_type": 1,
+             "coordinates": [{"x": 0, "y": 0}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 10}]},
+            {"vnum": 3, "zone_vnum": 1, "name": "Landmark", "region_type": 4, "coordinates": [{"x": 5, "y": 5}]},
+            {"vnum": 4, "zone_vnum": 1, "name": "B", "region_type": 1,
+             "coordinates": [{"x": -20, "y": -20}, {"x": -5, "y": -20}, {"x": -5, "y": -2}]},
+        ]
+        table = build_table("region", regions)
+        return {"coords": table["coords"], "offsets": table["coord_offsets"], "vnums": table["vnum"]}
+    
+    def test_chunk_bounds_balance_weights(self):
+        from src.services.geometry_pool import chunk_bounds
+        assert chunk_bounds(np.array([1, 1, 1, 1]), 2) == [(0, 2), (2, 4)]
+        assert chunk_bounds(np.array([100, 1, 1, 1]), 2) == [(0, 1), (1, 4)]
+        assert chunk_bounds(np.array([5]), 8) == [(0, 1)]
+        assert chunk_bounds(np.array([]), 4) == []
+    
+    def test_small_batches_run_inline(self):
+        from src.services.geometry_pool import GeometryPool
+        from src.services.polygon_validity import validate_rings
+        pool = GeometryPool(processes=4)
+        batch = self._batch()
+        results = pool.run(validate_rings, batch, np.diff(batch["offsets"]))
+        # Below the inline limit: one chunk, no pool started
+        assert len(results) == 1 and pool._executor is None
+        assert [vnum for vnum, _ in results[0]] == [2]
+    
+    def test_process_pool_matches_inline(self):
+        from src.services.geometry_pool import GeometryPool
+        from src.services.region_membership import rasterize_regions
+        batch = self._batch()
+        weights = np.diff(batch["offsets"])
+        inline = GeometryPool(processes=1).run(rasterize_regions, batch, weights)
+        pool = GeometryPool(processes=2, inline_vertex_limit=0)
+        progress = []
+        try:
+            pooled = pool.run(rasterize_regions, batch, weights, progress=lambda done, total: progress.append((done, total)))
+        finally:
+            pool.shutdown()
+        assert len(pooled) > 1 and progress[-1] == (4, 4)
+        assert np.array_equal(np.concatenate(pooled), np.concatenate(inline))
+        # The landmark covers only its own cell
+        spans = np.concatenate(pooled)
+        assert spans[spans[:, 3] == 3].tolist() == [[5, 5, 6, 3]]
+    
+    def test_request_geometry_uses_the_pool(self, monkeypatch):
+        from src.services import polygon_validity, path_raster
+        from src.services.geometry_pool import GeometryPool
+        from src.services.world_snapshot import build_table
+        pool = GeometryPool(processes=2, inline_vertex_limit=0)
+        monkeypatch.setattr(polygon_validity, "geometry_pool", pool)
+        monkeypatch.setattr(path_raster, "geometry_pool", pool)
+        rings = [[{"x": 0, "y": 0}, {"x": 0, "y": 10}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 0}],
+                 [{"x": 0, "y": 0}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 10}],
+                 [{"x": 5, "y": 5}]]
+        paths = [{"vnum": vnum, "zone_vnum": 1, "name": "", "path_type": 1, "path_props": props,
+                  "coordinates": [{"x": x, "y": y} for x, y in points]}
+                 for vnum, props, points in [(1, 11, [(0, 5), (10, 5)]), (2, 27, [(5, 0), (5, 10)]), (3, None, [(0, 0), (3, 3)])]]
+        table = build_table("path", paths)
+        batch = {"coords": table["coords"], "offsets": table["coord_offsets"], "vnums": table["vnum"], "props": table["props"]}
+        try:
+            validated = polygon_validity.validate_polygons(rings)
+            pooled = [item for chunk in pool.run(path_raster.rasterize_paths, batch, np.diff(batch["offsets"])) for item in chunk]
+        finally:
+            pool.shutdown()
+        assert pool.parallel
+        assert validated == [polygon_validity.validate_polygon(ring) for ring in rings]
+        inline = path_raster.rasterize_paths(batch, 0, 3)
+        assert [(p.vnum, p.sector, p.cells, p.crossings) for p in pooled] == [(p.vnum, p.sector, p.cells, p.crossings) for p in inline]
+
+
+@pytest.mark.unit
+class TestChangesets:
+    """Test planning and writing staged changesets"""
+    
+    SQUARE = [{"x": 0, "y": 0}, {"x": 10, "y": 0}, {"x": 10, "y": 10}, {"x": 0, "y": 10}]
+    
+    def _op(self, op, kind, vnum, data=None, base_version=None):
+        from src.schemas.changeset import ChangesetOperation
+        return ChangesetOperation(op=op, kind=kind, vnum=vnum, data=data, base_version=base_version)
+    
+    def _stored_region(self, vnum):
+        from datetime import datetime
+        return {"vnum": vnum, "zone_vnum": 1, "name": f"Region {vnum}", "region_type": 1, "region_props": None,
+                "region_reset_data": "", "region_reset_time": datetime(2000, 1, 1),
+                "coordinates": [dict(c, x=float(c["x"]), y=float(c["y"])) for c in self.SQUARE]}
+    
+    def test_operations_apply_in_order(self):
+        from src.services.changesets import plan_changeset, net_changes
+        from src.services.vertex_patch import geometry_version
+        initial = {("region", 1): self._stored_region(1), ("region", 2): self._stored_region(2),
+                   ("path", 7): None}
+        version = geometry_version(initial[("region", 1)]["coordinates"])
+        ok, results, final = plan_changeset([
+            self._op("update", "region", 1, {"name": "Renamed"}, base_version=version),
+            self._op("update", "region", 1, {"coordinates": [0, 0, 20, 0, 20, 20]}),
+            self._op("delete", "region", 2, base_version=version),
+            self._op("create", "path", 7, {"zone_vnum": 1, "name": "Road", "path_type": 1,
+                                           "coordinates": [{"x": 0, "y": 0}, {"x": 5, "y": 5}]}),
+        ], initial)
+        assert ok and [r["status"] for r in results] == ["applied"] * 4
+        assert final[("region", 1)]["name"] == "Renamed" and len(final[("region", 1)]["coordinates"]) == 3
+        assert results[1]["geometry_version"] == geometry_version(final[("region", 1)]["coordinates"])
+        assert final[("region", 2)] is None and final[("path", 7)]["path_type"] == 1
+        assert net_changes(initial, final) == ([("path", 7)], [("region", 1)], [("region", 2)])
+    
+    def test_stale_version_rejects_whole_changeset(self):
+        from src.services.changesets import plan_changeset
+        initial = {("region", 1): self._stored_region(1), ("region", 3): None}
+        ok, results, _ = plan_changeset([
+            self._op("create", "region", 3, {"zone_vnum": 1, "name": "New", "region_type": 1, "coordinates": self.SQUARE}),
+            self._op("delete", "region", 1, base_version="deadbeef"),
+            self._op("delete", "region", 3),
+        ], initial)
+        assert not ok
+        assert [r["status"] for r in results] == ["not_applied", "conflict", "not_applied"]
+        assert results[0]["geometry_version"] is None
+    
+    def test_invalid_and_missing_features(self):
+        from src.services.changesets import plan_changeset
+        bowtie = [{"x": 0, "y": 0}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 10}]
+        ok, results, _ = plan_changeset(
+            [self._op("update", "region", 1, {"coordinates": bowtie})], {("region", 1): self._stored_region(1)})
+        assert not ok and results[0]["status"] == "invalid" and "intersect" in results[0]["detail"]
+        ok, results, _ = plan_changeset([self._op("delete", "path", 9)], {("path", 9): None})
+        assert results[0]["status"] == "not_found"
+        ok, results, _ = plan_changeset(
+            [self._op("create", "region", 1, {"zone_vnum": 1, "name": "Dup", "region_type": 1, "coordinates": self.SQUARE})],
+            {("region", 1): self._stored_region(1)})
+        assert results[0]["status"] == "exists"
+    
+    def test_polygons_are_checked_in_one_batch(self, monkeypatch):
+        from src.services import changesets
+        batches = []
+        validate_polygons = changesets.validate_polygons
+        monkeypatch.setattr(changesets, "validate_polygons", lambda rings: batches.append(len(rings)) or validate_polygons(rings))
+        bowtie = [{"x": 0, "y": 0}, {"x": 10, "y": 10}, {"x": 10, "y": 0}, {"x": 0, "y": 10}]
+        ok, results, _ = changesets.plan_changeset([
+            self._op("create", "region", 3, {"zone_vnum": 1, "name": "New", "region_type": 1, "coordinates": self.SQUARE}),
+            self._op("create", "region", 4, {"zone_vnum": 1, "name": "Gate", "region_type": 1, "coordinates": [{"x": 1, "y": 1}]}),
+            self._op("update", "region", 1, {"coordinates": bowtie}),
+            self._op("update", "region", 1, {"name": 5}),
+        ], {("region", 1): self._stored_region(1), ("region", 3): None, ("region", 4): None})
+        # Landmarks skip validation; everything else goes through one pool batch
+        assert batches == [2]
+        assert [r["status"] for r in results] == ["not_applied", "not_applied", "invalid", "not_applied"]
+    
+    def test_writes_are_batched(self):
+        from src.services.changesets import write_changes
+        
+        class RecordingSession:
+            def __init__(self):
+                self.statements = []
+            
+            def execute(self, statement, params=None):
+                self.statements.append((" ".join(str(statement).split()), params))
+                return self
+            
+            def fetchall(self):
+                return []
+        
+        initial = {("region", n): self._stored_region(n) for n in (1, 2, 3, 4)}
+        initial.update({("region", n): None for n in (5, 6)})
+        final = dict(initial)
+        final[("region", 1)] = dict(initial[("region", 1)], name="A")
+        final[("region", 2)] = dict(initial[("region", 2)], name="B")
+        final[("region", 3)] = None
+        final[("region", 4)] = None
+        final[("region", 5)] = self._stored_region(5)
+        final[("region", 6)] = self._stored_region(6)
+        db = RecordingSession()
+        changes = write_changes(db, initial, final)
+        
+        # One DELETE, one INSERT and one UPDATE for the kind, one read-back, one history
+        # read and one history batch, then the change-log sequence lock and one change-log batch
+        kinds = [sql.split()[0] for sql, _ in db.statements]
+        assert kinds == ["DELETE", "INSERT", "UPDATE", "SELECT", "SELECT", "INSERT", "INSERT", "INSERT"]
+        assert db.statements[0][1] == {"vnums": [3, 4]}
+        assert len(db.statements[1][1]) == 2 and len(db.statements[2][1]) == 2
+        assert "feature_revision" in db.statements[5][0] and len(db.statements[5][1]) == 6
+        assert "feature_change_sequence" in db.statements[6][0]
+        assert len(db.statements[7][1]) == 6 and len(changes) == 6
+    
+    def test_request_validation(self, test_client):
+        response = test_client.post("/api/changesets/", json={"operations": [{"op": "rename", "kind": "region", "vnum": 1}]})
+        assert response.status_code == 422
+        response = test_client.post("/api/changesets/", json={"operations": [{"op": "update", "kind": "path", "vnum": 1}]})
+        assert response.status_code == 422
+        assert test_client.post("/api/changesets/", json={"operations": []}).status_code == 422
+
+
+@pytest.mark.unit
+class TestRevisionHistory:
+    """Test diff-based revision storage and reconstruction"""
+    
+    def _feature(self, name, points):
+        return {"vnum": 1, "zone_vnum": 1, "name": name, "region_type": 1, "region_props": None,
+                "coordinates": [{"x": float(x), "y": float(y)} for x, y in points]}
+    
+    def _record(self, features):
+        from src.services.revision_history import next_revision
+        history = []
+        for feature in features:
+            # The chain a write reads: from the latest keyframe or delete onwards
+            start = max((i for i, r in enumerate(history) if r.keyframe or r.action == "delete"), default=0)
+            history.append(next_revision(history[start:], feature))
+        return history
+    
+    def test_vertex_diff_round_trip(self):
+        from src.services.revision_history import vertex_diff, apply_vertex_diff, encode_record, decode_record
+        old = [(float(i), float(i * i)) for i in range(50)]
+        new = old[:10] + [(0.5, -3.25)] + old[10:30] + old[31:]
+        new[40] = (99.0, 99.0)
+        ops = vertex_diff(old, new)
+        assert sum(len(inserted) for _, _, inserted in ops) == 2
+        assert apply_vertex_diff(old, ops) == new
+        attributes, decoded = decode_record(encode_record({"name": "x"}, ops))
+        assert attributes == {"name": "x"} and apply_vertex_diff(old, decoded) == new
+    
+    def test_diffs_between_keyframes(self):
+        from src.services.revision_history import KEYFRAME_INTERVAL, replay
+        ring = [(i, (i * 7) % 13) for i in range(200)]
+        features = [self._feature("Start", ring)]
+        for n in range(KEYFRAME_INTERVAL + 3):
+            ring = ring[:n] + [(n + 0.5, -1)] + ring[n:]
+            features.append(self._feature(f"Step {n}" if n % 2 else "Start", ring))
+        history = self._record(features)
+        
+        keyframes = [r.revision for r in history if r.keyframe]
+        assert keyframes == [1, KEYFRAME_INTERVAL + 1]
+        assert all(len(r.payload) < len(history[0].payload) / 4 for r in history if not r.keyframe)
+        # Every revision rebuilds from its keyframe
+        for i, revision in enumerate(history):
+            start = max(j for j in range(i + 1) if history[j].keyframe)
+            assert replay(history[start:i + 1])[-1][1] == features[i]
+    
+    def test_delete_and_recreate(self):
+        from src.services.revision_history import replay
+        square = [(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)]
+        history = self._record([self._feature("A", square), self._feature("B", square), None,
+                                self._feature("C", square)])
+        assert [(r.action, r.keyframe) for r in history] == [
+            ("upsert", True), ("upsert", False), ("delete", False), ("upsert", True)]
+        states = replay(history)
+        assert states[1][1]["name"] == "B" and states[1][2] == []
+        assert states[2][1] is None and states[2][2] == [(0, 5, [])]
+        assert states[3][1] == self._feature("C", square)
+    
+    def test_history_endpoint_validates_paging(self, test_client):
+        assert test_client.get("/api/regions/1/history?limit=0").status_code == 422
+        assert test_client.get("/api/paths/1/history?before=0").status_code == 422
+    
+    def test_concurrent_writers_number_revisions_in_commit_order(self):
+        from src.services.revision_history import record_revisions, replay, _revision
+        committed = []
+        first, second = _RevisionSession(committed), _RevisionSession(committed)
+        # Both endpoints pre-read the feature before either writes
+        first.begin()
+        second.begin()
+        square = [(0, 0), (10, 0), (10, 10), (0, 10)]
+        record_revisions(first, "region", {1: self._feature("First", square)})
+        first.commit()
+        record_revisions(second, "region", {1: self._feature("Second", square + [(-5, 5)])})
+        second.commit()
+        assert [row.revision for row in committed] == [1, 2]
+        assert replay([_revision(row) for row in committed])[-1][1] == self._feature("Second", square + [(-5, 5)])
+
+
+class _RevisionSession:
+    """
+    feature_revision as InnoDB serves it under REPEATABLE READ: plain reads
+    see the snapshot taken when the transaction began, locking reads see
+    the latest committed rows, and a duplicate revision fails at commit.
+    """
+    
+    def __init__(self, committed):
+        self.committed = committed
+        self.snapshot = []
+        self.pending = []
+    
+    def begin(self):
+        self.snapshot = list(self.committed)
+    
+    def execute(self, statement, params=None):
+        from types import SimpleNamespace
+        from unittest.mock import Mock
+        sql = str(statement)
+        if sql.lstrip().startswith("INSERT INTO feature_revision"):
+            self.pending += [SimpleNamespace(changed_at=None, **row) for row in params]
+            return Mock()
+        rows = (self.committed if "FOR UPDATE" in sql else self.snapshot) + self.pending
+        rows = [row for row in rows if row.kind == params["kind"] and row.vnum in params["vnums"]]
+        start = max((row.revision for row in rows if row.is_keyframe or row.action == "delete"), default=0)
+        return Mock(fetchall=Mock(return_value=sorted((row for row in rows if row.revision >= start),
+                                                      key=lambda row: row.revision)))
+    
+    def commit(self):
+        from sqlalchemy.exc import IntegrityError
+        taken = {(row.kind, row.vnum, row.revision) for row in self.committed}
+        if any((row.kind, row.vnum, row.revision) in taken for row in self.pending):
+            raise IntegrityError("INSERT INTO feature_revision", {}, Exception("Duplicate entry for idx_feature_revision_feature"))
+        self.committed += self.pending
+        self.pending = []
+
+
+class _WriteSession:
+    """Session double for the create endpoints: the row appears once committed"""
+    
+    def __init__(self, stored, geometry_wkt):
+        self.stored = stored
+        self.geometry_wkt = geometry_wkt
+        self.committed = False
+    
+    def query(self, model):
+        return self
+    
+    def filter(self, *criteria):
+        return self
+    
+    def options(self, *options):
+        return self
+    
+    def first(self):
+        return self.stored if self.committed else None
+    
+    def execute(self, statement, params=None):
+        from unittest.mock import Mock
+        from types import SimpleNamespace
+        sql = str(statement)
+        if "FOR UPDATE" in sql and "feature_revision" not in sql:
+            row = SimpleNamespace(**vars(self.stored), geometry_wkt=self.geometry_wkt)
+            return Mock(fetchall=Mock(return_value=[row]))
+        if "ST_AsText(:" in sql:
+            return Mock(fetchone=Mock(return_value=(self.geometry_wkt,)))
+        return Mock(fetchall=Mock(return_value=[]), fetchone=Mock(return_value=None))
+    
+    def commit(self):
+        self.committed = True
+    
+    def rollback(self):
+        pass
+
+
+@pytest.mark.unit
+class TestCreateEndpoints:
+    """Test that creates return the stored feature and notify listeners"""
+    
+    @pytest.fixture
+    def published(self):
+        from src.services import feature_events
+        events = []
+        listener = lambda kind, action, vnum, feature: events.append((kind, action, vnum, feature))
+        feature_events.subscribe(listener)
+        yield events
+        feature_events.unsubscribe(listener)
+    
+    def _post(self, test_client, session, url, body):
+        from src.main import app
+        from src.config.config_database import get_db
+        app.dependency_overrides[get_db] = lambda: session
+        try:
+            return test_client.post(url, json=body)
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+    
+    def test_create_region(self, test_client, published):
+        from datetime import datetime
+        from types import SimpleNamespace
+        stored = SimpleNamespace(vnum=4242, zone_vnum=1, name="Lake", region_type=1, region_props=None,
+                                 region_reset_data="", region_reset_time=datetime(2000, 1, 1), region_polygon=b"polygon")
+        session = _WriteSession(stored, "POLYGON((0 0,10 0,10 10,0 10,0 0))")
+        response = self._post(test_client, session, "/api/regions/", {
+            "vnum": 4242, "zone_vnum": 1, "name": "Lake", "region_type": 1,
+            "coordinates": [{"x": 0, "y": 0}, {"x": 10, "y": 0}, {"x": 10, "y": 10}, {"x": 0, "y": 10}]
+        })
+        assert response.status_code == 201, response.text
+        assert response.json()["vnum"] == 4242 and len(response.json()["coordinates"]) == 4
+        assert [event[:3] for event in published] == [("region", "upsert", 4242)]
+    
+    def test_create_landmark(self, test_client, published):
+        from datetime import datetime
+        from types import SimpleNamespace
+        stored = SimpleNamespace(vnum=4243, zone_vnum=1, name="Gate", region_type=1, region_props=None,
+                                 region_reset_data="", region_reset_time=datetime(2000, 1, 1), region_polygon=b"polygon")
+        session = _WriteSession(stored, "POLYGON((0 0,1 0,1 1,0 1,0 0))")
+        response = self._post(test_client, session,
+                              "/api/regions/landmarks?x=0.5&y=0.5&name=Gate&vnum=4243&zone_vnum=1", None)
+        assert response.status_code == 201, response.text
+        assert [event[:3] for event in published] == [("region", "upsert", 4243)]
+    
+    def test_create_path(self, test_client, published):
+        from types import SimpleNamespace
+        stored = SimpleNamespace(vnum=4244, zone_vnum=1, name="Road", path_type=1, path_props=0,
+                                 path_linestring=b"linestring")
+        session = _WriteSession(stored, "LINESTRING(0 0,5 5)")
+        response = self._post(test_client, session, "/api/paths/", {
+            "vnum": 4244, "zone_vnum": 1, "name": "Road", "path_type": 1, "path_props": 0,
+            "coordinates": [{"x": 0, "y": 0}, {"x": 5, "y": 5}]
+        })
+        assert response.status_code == 201, response.text
+        assert response.json()["path_type"] == 1
+        assert [event[:3] for event in published] == [("path", "upsert", 4244)]
+    
+    def test_stale_geometry_patch_locks_the_row(self, test_client, published):
+        from types import SimpleNamespace
+        from unittest.mock import Mock
+        session = Mock()
+        query = session.query.return_value.filter.return_value
+        query.with_for_update.return_value.first.return_value = SimpleNamespace(vnum=4245, region_polygon=b"polygon")
+        session.execute.return_value.fetchone.return_value = ("POLYGON((0 0,10 0,10 10,0 10,0 0))",)
+        from src.main import app
+        from src.config.config_database import get_db
+        app.dependency_overrides[get_db] = lambda: session
+        try:
+            response = test_client.patch("/api/regions/4245", json={
+                "base_version": "stale", "operations": [{"op": "move", "index": 0, "x": 1, "y": 1}]
+            })
+        finally:
+            app.dependency_overrides.pop(get_db, None)
+        assert response.status_code == 409, response.text
+        query.with_for_update.assert_called_once_with()
+        query.first.assert_not_called()
+        session.commit.assert_not_called()
+        assert published == []
@@ -1,4 +1,122 @@
 import { Region, Path, Point, ApiResponse } from '@wildeditor/shared/types';
+import { decodeGeometry, DecodedFeature } from './geometryCodec';
+
+export interface VertexOperation {
+  op: 'insert' | 'move' | 'delete';
+  index: number;
+  x?: number;
+  y?: number;
+}
+
+export interface GeometryPatchAck {
+  vnum: number;
+  version: string;
+  vertex_count: number;
+  normalized: boolean;
+}
+
+export interface ZoneBoundingBox {
+  min_x: number;
+  min_y: number;
+  max_x: number;
+  max_y: number;
+}
+
+export interface ZoneFeatureStats {
+  count: number;
+  by_type: Record<string, number>;
+  by_type_name: Record<string, number>;
+  vertex_count: number;
+  bbox: ZoneBoundingBox | null;
+}
+
+export interface ZoneStats {
+  zone_vnum: number;
+  regions: ZoneFeatureStats & { total_area: number };
+  paths: ZoneFeatureStats & { total_length: number };
+  bbox: ZoneBoundingBox | null;
+}
+
+export interface FeatureChanges<T> {
+  upserted: T[];
+  deleted: number[];
+}
+
+export interface ChangesSince {
+  token: string;
+  has_more: boolean;
+  regions: FeatureChanges<Region>;
+  paths: FeatureChanges<Path>;
+}
+
+export interface FeatureSummary {
+  vnum: number;
+  [field: string]: unknown;
+  bbox?: ZoneBoundingBox | null;
+  centroid?: { x: number; y: number } | null;
+}
+
+export interface SearchResult {
+  kind: 'region' | 'path';
+  vnum: number;
+  name: string;
+  zone_vnum: number;
+  type: number;
+  type_name: string;
+  bbox: ZoneBoundingBox | null;
+  score: number;
+}
+
+export interface SearchResponse {
+  query: string;
+  count: number;
+  results: SearchResult[];
+}
+
+export interface ChangesetOperation {
+  op: 'create' | 'update' | 'delete';
+  kind: 'region' | 'path';
+  vnum: number;
+  base_version?: string;
+  data?: Record<string, unknown>;
+}
+
+export interface ChangesetOperationResult {
+  index: number;
+  op: ChangesetOperation['op'];
+  kind: ChangesetOperation['kind'];
+  vnum: number;
+  status: 'applied' | 'conflict' | 'not_found' | 'exists' | 'invalid' | 'not_applied';
+  detail: string | null;
+  geometry_version: string | null;
+}
+
+export interface ChangesetResponse {
+  committed: boolean;
+  applied: number;
+  results: ChangesetOperationResult[];
+}
+
+export interface FeatureRevision {
+  revision: number;
+  action: 'upsert' | 'delete';
+  changed_at: string;
+  keyframe: boolean;
+  payload_bytes: number;
+  geometry_version: string | null;
+  vertex_count: number;
+  changed_fields: string[];
+  vertices_deleted: number;
+  vertices_inserted: number;
+  feature?: Record<string, unknown> | null;
+}
+
+export interface FeatureHistoryPage {
+  kind: 'region' | 'path';
+  vnum: number;
+  revisions: FeatureRevision[];
+  next_before: number | null;
+}
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000/api';
 
@@ -40,12 +158,44 @@ class ApiClient {
     }
   }
 
+  private async requestGeometry(endpoint: string): Promise<DecodedFeature[]> {
+    const url = `${this.baseUrl}${endpoint}`;
+    const headers = {
+      Accept: 'application/octet-stream',
+      ...(this.token && { Authorization: `Bearer ${this.token}` })
+    };
+
+    try {
+      const response = await fetch(url, { headers });
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      return decodeGeometry(await response.arrayBuffer()).features;
+    } catch (error) {
+      console.error(`API Error (${endpoint}):`, error);
+      throw error;
+    }
+  }
+
   // Region methods
   async getRegions(): Promise<Region[]> {
     const response = await this.request<Region[]>('/regions');
     return response.data;
   }
 
+  // Compact binary listing for loading the full world
+  async getRegionGeometry(zoneVnum?: number): Promise<DecodedFeature[]> {
+    return this.requestGeometry(zoneVnum === undefined ? '/regions/' : `/regions/?zone_vnum=${zoneVnum}`);
+  }
+
+  // Selected fields only; geometry is skipped unless requested
+  async getRegionSummaries(fields: string[], zoneVnum?: number): Promise<FeatureSummary[]> {
+    const params = new URLSearchParams({ fields: fields.join(',') });
+    if (zoneVnum !== undefined) params.set('zone_vnum', String(zoneVnum));
+    const response = await this.request<FeatureSummary[]>(`/regions/?${params.toString()}`);
+    return response.data;
+  }
+
   async getRegion(id: string): Promise<Region> {
     const response = await this.request<Region>(`/regions/${id}`);
     return response.data;
@@ -67,6 +217,14 @@ class ApiClient {
     return response.data;
   }
 
+  async patchRegionGeometry(id: string, baseVersion: string, operations: VertexOperation[]): Promise<GeometryPatchAck> {
+    const response = await this.request<GeometryPatchAck>(`/regions/${id}`, {
+      method: 'PATCH',
+      body: JSON.stringify({ base_version: baseVersion, operations })
+    });
+    return response.data;
+  }
+
   async deleteRegion(id: string): Promise<void> {
     await this.request<void>(`/regions/${id}`, {
       method: 'DELETE'
@@ -79,6 +237,17 @@ class ApiClient {
     return response.data;
   }
 
+  async getPathSummaries(fields: string[], zoneVnum?: number): Promise<FeatureSummary[]> {
+    const params = new URLSearchParams({ fields: fields.join(',') });
+    if (zoneVnum !== undefined) params.set('zone_vnum', String(zoneVnum));
+    const response = await this.request<FeatureSummary[]>(`/paths/?${params.toString()}`);
+    return response.data;
+  }
+
+  async getPathGeometry(zoneVnum?: number): Promise<DecodedFeature[]> {
+    return this.requestGeometry(zoneVnum === undefined ? '/paths/' : `/paths/?zone_vnum=${zoneVnum}`);
+  }
+
   async getPath(id: string): Promise<Path> {
     const response = await this.request<Path>(`/paths/${id}`);
     return response.data;
@@ -100,6 +269,14 @@ class ApiClient {
     return response.data;
   }
 
+  async patchPathGeometry(id: string, baseVersion: string, operations: VertexOperation[]): Promise<GeometryPatchAck> {
+    const response = await this.request<GeometryPatchAck>(`/paths/${id}`, {
+      method: 'PATCH',
+      body: JSON.stringify({ base_version: baseVersion, operations })
+    });
+    return response.data;
+  }
+
   async deletePath(id: string): Promise<void> {
     await this.request<void>(`/paths/${id}`, {
       method: 'DELETE'
@@ -139,6 +316,61 @@ class ApiClient {
     });
   }
 
+  // Zone methods
+  async getZoneStats(zoneVnum: number): Promise<ZoneStats> {
+    const response = await this.request<ZoneStats>(`/zones/${zoneVnum}/stats`);
+    return response.data;
+  }
+
+  // Change log methods
+  async getChanges(since?: string): Promise<ChangesSince> {
+    const query = since === undefined ? '' : `?since=${encodeURIComponent(since)}`;
+    const response = await this.request<ChangesSince>(`/changes${query}`);
+    return response.data;
+  }
+
+  // Search methods
+  async search(q: string, options: { kind?: 'region' | 'path'; zoneVnum?: number; limit?: number } = {}): Promise<SearchResponse> {
+    const params = new URLSearchParams({ q });
+    if (options.kind) params.set('kind', options.kind);
+    if (options.zoneVnum !== undefined) params.set('zone_vnum', String(options.zoneVnum));
+    if (options.limit !== undefined) params.set('limit', String(options.limit));
+    const response = await this.request<SearchResponse>(`/search?${params.toString()}`);
+    return response.data;
+  }
+
+  // Changeset methods
+  async commitChangeset(operations: ChangesetOperation[]): Promise<ChangesetResponse> {
+    const response = await fetch(`${this.baseUrl}/changesets/`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(this.token && { Authorization: `Bearer ${this.token}` })
+      },
+      body: JSON.stringify({ operations })
+    });
+    const data = await response.json();
+    // Rejected changesets (400/409) still carry per-operation results
+    if (response.ok || response.status === 400 || response.status === 409) {
+      if ('results' in data) return data as ChangesetResponse;
+    }
+    throw new Error(data.detail || `HTTP ${response.status}`);
+  }
+
+  async getFeatureHistory(
+    kind: 'region' | 'path',
+    vnum: number,
+    options: { before?: number; limit?: number; includeFeatures?: boolean } = {}
+  ): Promise<FeatureHistoryPage> {
+    const params = new URLSearchParams();
+    if (options.before !== undefined) params.set('before', String(options.before));
+    if (options.limit !== undefined) params.set('limit', String(options.limit));
+    if (options.includeFeatures) params.set('include_features', 'true');
+    const query = params.toString();
+    const response = await this.request<FeatureHistoryPage>(`/${kind}s/${vnum}/history${query ? `?${query}` : ''}`);
+    return response.data;
+  }
+
   // Health check
   async healthCheck(): Promise<{ status: string; timestamp: string }> {
     const response = await this.request<{ status: string; timestamp: string }>('/health');
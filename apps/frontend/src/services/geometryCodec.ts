@@ -0,0 +1,112 @@
+import { Coordinate } from '@wildeditor/shared/types';
+
+// Decoder for the backend's binary geometry transport (WGEO).
+// See apps/backend/src/services/geometry_codec.py for the layout.
+
+export const GEOMETRY_KIND_REGIONS = 1;
+export const GEOMETRY_KIND_PATHS = 2;
+
+export interface DecodedFeature {
+  vnum: number;
+  zone_vnum: number;
+  type: number;
+  props: number | null;
+  name: string;
+  geometry_version: string | null;
+  coordinates: Coordinate[];
+  // Regions only
+  reset_data?: string;
+  reset_time?: string | null;
+}
+
+export interface DecodedGeometry {
+  kind: number;
+  grid: number;
+  features: DecodedFeature[];
+}
+
+const MAGIC = 'WGEO';
+const FORMAT_VERSION = 2;
+const ATTRIBUTE_COUNT = 9;
+
+const unzigzag = (value: number): number => (value % 2 === 0 ? value / 2 : -(value + 1) / 2);
+
+export function decodeGeometry(buffer: ArrayBuffer): DecodedGeometry {
+  const bytes = new Uint8Array(buffer);
+  let offset = 0;
+
+  if (String.fromCharCode(...bytes.subarray(0, 4)) !== MAGIC) {
+    throw new Error('Not a WGEO geometry payload');
+  }
+  if (bytes[4] !== FORMAT_VERSION) {
+    throw new Error(`Unsupported WGEO version ${bytes[4]}`);
+  }
+  const kind = bytes[5];
+  offset = 6;
+
+  // Varints can exceed 32 bits, so accumulate with multiplication instead of shifts
+  const readVarint = (): number => {
+    let result = 0;
+    let scale = 1;
+    let byte: number;
+    do {
+      byte = bytes[offset++];
+      result += (byte & 0x7f) * scale;
+      scale *= 128;
+    } while (byte & 0x80);
+    return result;
+  };
+
+  const grid = readVarint();
+  const count = readVarint();
+
+  const attributes: number[][] = [];
+  for (let i = 0; i < count; i++) {
+    const row: number[] = [];
+    for (let j = 0; j < ATTRIBUTE_COUNT; j++) row.push(readVarint());
+    attributes.push(row);
+  }
+
+  const coordinates: Coordinate[][] = attributes.map(([, , , , , vertexCount]) => {
+    const ring: Coordinate[] = [];
+    let x = 0;
+    let y = 0;
+    for (let j = 0; j < vertexCount; j++) {
+      const dx = unzigzag(readVarint());
+      const dy = unzigzag(readVarint());
+      x = j === 0 ? dx : x + dx;
+      y = j === 0 ? dy : y + dy;
+      ring.push({ x: x / grid, y: y / grid });
+    }
+    return ring;
+  });
+
+  const decoder = new TextDecoder();
+  const features: DecodedFeature[] = attributes.map(([vnum, zoneVnum, type, props, nameLength, , version], i) => {
+    const name = decoder.decode(bytes.subarray(offset, offset + nameLength));
+    offset += nameLength;
+    return {
+      vnum: unzigzag(vnum),
+      zone_vnum: unzigzag(zoneVnum),
+      type: unzigzag(type),
+      props: props === 0 ? null : unzigzag(props - 1),
+      name,
+      geometry_version: version === 0 ? null : (version - 1).toString(16).padStart(8, '0'),
+      coordinates: coordinates[i]
+    };
+  });
+
+  if (kind === GEOMETRY_KIND_REGIONS) {
+    features.forEach((feature, i) => {
+      const [, , , , , , , resetTime, resetLength] = attributes[i];
+      feature.reset_data = decoder.decode(bytes.subarray(offset, offset + resetLength));
+      offset += resetLength;
+      // Same naive ISO form as JSON responses
+      feature.reset_time = resetTime === 0
+        ? null
+        : new Date(unzigzag(resetTime - 1) * 1000).toISOString().slice(0, 19);
+    });
+  }
+
+  return { kind, grid, features };
+}
@@ -33,15 +33,81 @@ CREATE TABLE IF NOT EXISTS path_data (
 
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_region_data_vnum ON region_data(vnum);
-CREATE INDEX IF NOT EXISTS idx_region_data_zone_vnum ON region_data(zone_vnum);
-CREATE INDEX IF NOT EXISTS idx_region_data_type ON region_data(region_type);
+-- Composite indexes for the list endpoint filters; vnum last so filtered rows come back in vnum order
+CREATE INDEX IF NOT EXISTS idx_region_data_zone_type_vnum ON region_data(zone_vnum, region_type, vnum);
+CREATE INDEX IF NOT EXISTS idx_region_data_type_props_vnum ON region_data(region_type, region_props, vnum);
+CREATE INDEX IF NOT EXISTS idx_region_data_props ON region_data(region_props);
 CREATE SPATIAL INDEX IF NOT EXISTS idx_region_polygon ON region_data(region_polygon);
 
 CREATE INDEX IF NOT EXISTS idx_path_data_vnum ON path_data(vnum);
-CREATE INDEX IF NOT EXISTS idx_path_data_zone_vnum ON path_data(zone_vnum);
-CREATE INDEX IF NOT EXISTS idx_path_data_type ON path_data(path_type);
+CREATE INDEX IF NOT EXISTS idx_path_data_zone_type_vnum ON path_data(zone_vnum, path_type, vnum);
+CREATE INDEX IF NOT EXISTS idx_path_data_type_props_vnum ON path_data(path_type, path_props, vnum);
+CREATE INDEX IF NOT EXISTS idx_path_data_props ON path_data(path_props);
 CREATE SPATIAL INDEX IF NOT EXISTS idx_path_linestring ON path_data(path_linestring);
 
+-- Single-column indexes superseded by the composites above (databases created before them)
+DROP INDEX IF EXISTS idx_region_data_zone_vnum ON region_data;
+DROP INDEX IF EXISTS idx_region_data_type ON region_data;
+DROP INDEX IF EXISTS idx_path_data_zone_vnum ON path_data;
+DROP INDEX IF EXISTS idx_path_data_type ON path_data;
+
+-- Change log written in the same transaction as every region/path write (GET /api/changes)
+CREATE TABLE IF NOT EXISTS feature_change_log (
+  change_id BIGINT AUTO_INCREMENT PRIMARY KEY,  -- Monotonic change token
+  feature_kind VARCHAR(10) NOT NULL,            -- 'region' or 'path'
+  vnum INT(11) NOT NULL,                        -- Changed feature
+  action VARCHAR(10) NOT NULL,                  -- 'upsert' or 'delete'
+  changed_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+) ENGINE=InnoDB;
+
+CREATE INDEX IF NOT EXISTS idx_feature_change_log_changed_at ON feature_change_log(changed_at);
+
+-- Single row locked by every change-log append until its transaction ends, so change_id
+-- follows commit order and GET /api/changes tokens never skip a slow transaction
+CREATE TABLE IF NOT EXISTS feature_change_sequence (
+  id TINYINT PRIMARY KEY,                       -- Always 1
+  writes BIGINT NOT NULL DEFAULT 0              -- Transactions that appended to the change log
+) ENGINE=InnoDB;
+
+INSERT IGNORE INTO feature_change_sequence (id, writes) VALUES (1, 0);
+
+-- Per-feature revision history (GET /api/regions/{vnum}/history), written with every region/path write.
+-- Rows are zlib-compressed vertex diffs against the previous revision, with a full keyframe
+-- at least every 16 revisions (see apps/backend/src/services/revision_history.py)
+CREATE TABLE IF NOT EXISTS feature_revision (
+  revision_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  feature_kind VARCHAR(10) NOT NULL,            -- 'region' or 'path'
+  vnum INT(11) NOT NULL,                        -- Revised feature
+  revision INT NOT NULL,                        -- 1, 2, ... per feature
+  action VARCHAR(10) NOT NULL,                  -- 'upsert' or 'delete'
+  is_keyframe TINYINT(1) NOT NULL,              -- Full state rather than a diff
+  payload MEDIUMBLOB NOT NULL,                  -- Compressed keyframe or diff
+  vertex_count INT NOT NULL DEFAULT 0,          -- Vertices after this revision
+  geometry_version CHAR(8) NULL,                -- Geometry version after this revision
+  changed_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)
+) ENGINE=InnoDB;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_feature_revision_feature ON feature_revision(feature_kind, vnum, revision);
+
+-- Background jobs started with POST /api/jobs, shared by every backend worker
+CREATE TABLE IF NOT EXISTS background_job (
+  job_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+  job_type VARCHAR(50) NOT NULL,                -- e.g. 'export_world', 'rebuild_snapshot'
+  status VARCHAR(10) NOT NULL,                  -- queued, running, succeeded, failed or cancelled
+  params TEXT NULL,                             -- JSON parameters the job was started with
+  progress DOUBLE NOT NULL DEFAULT 0,           -- 0 to 1
+  message VARCHAR(255) NULL,                    -- Latest progress message
+  error TEXT NULL,                              -- Why a failed job failed
+  result_size BIGINT NULL,                      -- Bytes of the downloadable result
+  cancel_requested TINYINT(1) NOT NULL DEFAULT 0,
+  created_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+  started_at DATETIME(6) NULL,
+  finished_at DATETIME(6) NULL,
+  heartbeat_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6)  -- Refreshed while a worker holds the job
+) ENGINE=InnoDB;
+
+CREATE INDEX IF NOT EXISTS idx_background_job_status_heartbeat ON background_job(status, heartbeat_at);
+
 -- Create database user for the wildeditor backend - DEVELOPMENT
 -- Run these commands separately as a MySQL admin user:
 -- CREATE USER 'wildeditor_dev_user'@'%' IDENTIFIED BY 'dev_password';